@@ -149,6 +149,65 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 
+# ===========================================
+# CAPAS GEOGRÁFICAS (TopoJSON del frontend)
+# ===========================================
+
+GEO_DIR = BASE_DIR / 'frontend' / 'public' / 'geo'
+# Límites distritales para la detección punto-en-polígono
+DISTRITOS_TOPOJSON = config('DISTRITOS_TOPOJSON', default=str(GEO_DIR / 'DISTRITOS_PI7.topojson'))
+# Recortes por departamento/provincia (python manage.py generar_recortes_topojson)
+GEO_RECORTES_DIR = config('GEO_RECORTES_DIR', default=str(BASE_DIR / 'geo_recortes'))
+# Pirámide de simplificación por zoom (python manage.py generar_niveles_topojson)
+GEO_NIVELES_DIR = config('GEO_NIVELES_DIR', default=str(BASE_DIR / 'geo_niveles'))
+# Caché en disco de teselas vectoriales (/api/tiles/), con desalojo LRU
+TESELAS_CACHE_DIR = config('TESELAS_CACHE_DIR', default=str(BASE_DIR / 'cache_teselas'))
+TESELAS_CACHE_MB = config('TESELAS_CACHE_MB', default=256, cast=int)
+
+
+# ===========================================
+# SNAPSHOT DEL CATÁLOGO (distritos, zonas, cultivos)
+# ===========================================
+
+# Cada cuántos segundos un proceso compara su snapshot con la versión
+# del catálogo en la base (cambios hechos desde otro proceso de gunicorn)
+CATALOGO_VERIFICACION_SEGUNDOS = config('CATALOGO_VERIFICACION_SEGUNDOS', default=1.0, cast=float)
+# Segundos que el navegador y los proxies reutilizan los listados del
+# catálogo antes de revalidarlos con su ETag (304 si no cambiaron)
+CATALOGO_MAX_AGE = config('CATALOGO_MAX_AGE', default=300, cast=int)
+
+
+# ===========================================
+# CACHÉS
+# ===========================================
+
+# 'calculos': resultados de /api/calcular-costos/ (ver resultados.py).
+# LocMemCache es por proceso, con desalojo LRU al superar MAX_ENTRIES;
+# con django.core.cache.backends.filebased.FileBasedCache y un directorio
+# en CALCULOS_CACHE_LOCATION la comparten los procesos de gunicorn.
+# Los resultados de más de CALCULOS_CACHE_ENTRADA_KB no se guardan, así
+# que la caché ocupa a lo sumo unos CALCULOS_CACHE_MB (un cálculo de
+# costos serializado pesa unos 2,5 KB)
+CALCULOS_CACHE_MB = config('CALCULOS_CACHE_MB', default=64, cast=int)
+CALCULOS_CACHE_ENTRADA_KB = config('CALCULOS_CACHE_ENTRADA_KB', default=32, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'calculos': {
+        'BACKEND': config(
+            'CALCULOS_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': config('CALCULOS_CACHE_LOCATION', default='calculos'),
+        'TIMEOUT': 24 * 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': CALCULOS_CACHE_MB * 1024 // CALCULOS_CACHE_ENTRADA_KB,
+        },
+    },
+}
+
+
 # ===========================================
 # CONFIGURACIÓN CORS (para React dev server)
 # ===========================================
@@ -15,6 +15,7 @@ import 'leaflet-draw';
 import 'leaflet-draw/dist/leaflet.draw.css';
 import 'leaflet-geometryutil';
 import * as topojson from 'topojson-client';
+import { API_BASE_URL, getManifiestoGeo, getNivelesGeo } from '../services/api';
 
 // Fix para bug de leaflet-draw con Leaflet 1.9+
 if (L.Draw && L.Draw.Polygon) {
@@ -105,6 +106,48 @@ async function loadTopoJSON(url) {
     }
 }
 
+// Manifiesto de recortes del backend (una sola petición por sesión)
+let manifestPromise = null;
+
+function loadManifest() {
+    if (!manifestPromise) {
+        manifestPromise = getManifiestoGeo().catch((error) => {
+            console.warn('Recortes TopoJSON no disponibles, se usan los archivos completos:', error);
+            return null;
+        });
+    }
+    return manifestPromise;
+}
+
+// URL del recorte de una capa (p. ej. 'DISTRITOS', 'JUNIN/HUANCAYO') o el archivo completo
+async function resolveTopoUrl(capa, clave, fullUrl) {
+    const manifest = await loadManifest();
+    const recorte = manifest?.capas?.[capa]?.recortes?.[clave];
+    return recorte ? `${API_BASE_URL}/geo/recortes/${recorte}` : fullUrl;
+}
+
+// Índice de niveles simplificados por zoom (una sola petición por sesión)
+let levelsPromise = null;
+
+function loadLevels() {
+    if (!levelsPromise) {
+        levelsPromise = getNivelesGeo().catch((error) => {
+            console.warn('Niveles simplificados no disponibles, se usan los archivos completos:', error);
+            return null;
+        });
+    }
+    return levelsPromise;
+}
+
+// URL del nivel de una capa para el zoom actual: el primero con zoom_max >= zoom
+async function resolveLevelUrl(capa, zoom, fullUrl) {
+    const index = await loadLevels();
+    const nivel = index?.capas?.[capa]?.niveles?.find(
+        (n) => n.zoom_max === null || zoom <= n.zoom_max
+    );
+    return nivel ? `${API_BASE_URL}/geo/niveles/${nivel.archivo}` : fullUrl;
+}
+
 // Componente para mostrar capas geográficas y hacer zoom
 function GeoLayers({ selectedDepartamento, selectedProvincia, selectedDistrito, uploadedGeoJSON }) {
     const map = useMap();
@@ -128,7 +171,11 @@ function GeoLayers({ selectedDepartamento, selectedProvincia, selectedDistrito,
             // Determinar qué nivel mostrar
             if (selectedDistrito?.nombre) {
                 // Nivel distrito - zoom al distrito seleccionado
-                topoUrl = '/geo/DISTRITOS_PI7.topojson';
+                topoUrl = await resolveTopoUrl(
+                    'DISTRITOS',
+                    `${selectedDepartamento}/${selectedProvincia}`,
+                    '/geo/DISTRITOS_PI7.topojson'
+                );
                 objectName = 'DISTRITOS_PI7';
                 filterFn = (props) =>
                     props.NOM_DEP === selectedDepartamento &&
@@ -136,19 +183,31 @@ function GeoLayers({ selectedDepartamento, selectedProvincia, selectedDistrito,
                     props.NOM_DIST === selectedDistrito.nombre;
             } else if (selectedProvincia) {
                 // Nivel provincia - zoom a la provincia seleccionada
-                topoUrl = '/geo/PROVINCIAS_PI7.topojson';
+                topoUrl = await resolveTopoUrl(
+                    'PROVINCIAS',
+                    selectedDepartamento,
+                    '/geo/PROVINCIAS_PI7.topojson'
+                );
                 objectName = 'PROVINCIAS_PI7';
                 filterFn = (props) =>
                     props.NOM_DEP === selectedDepartamento &&
                     props.NOM_PROV === selectedProvincia;
             } else if (selectedDepartamento) {
                 // Nivel departamento - zoom al departamento seleccionado
-                topoUrl = '/geo/DEPARTAMENTOS_PI7.topojson';
+                topoUrl = await resolveTopoUrl(
+                    'DEPARTAMENTOS',
+                    selectedDepartamento,
+                    '/geo/DEPARTAMENTOS_PI7.topojson'
+                );
                 objectName = 'DEPARTAMENTOS_PI7';
                 filterFn = (props) => props.NOM_DEP === selectedDepartamento;
             } else {
-                // Vista inicial - mostrar los 7 departamentos
-                topoUrl = '/geo/DEPARTAMENTOS_PI7.topojson';
+                // Vista inicial - mostrar los 7 departamentos (nivel simplificado según zoom)
+                topoUrl = await resolveLevelUrl(
+                    'DEPARTAMENTOS',
+                    map.getZoom(),
+                    '/geo/DEPARTAMENTOS_PI7.topojson'
+                );
                 objectName = 'DEPARTAMENTOS_PI7';
                 filterFn = (props) => DEPARTAMENTOS_PROYECTO.includes(props.NOM_DEP);
             }
@@ -5,7 +5,7 @@ import axios from 'axios';
 // 2. Si no, intenta usar el backend predecible (geovisor-costos-backend.up.railway.app).
 // 3. En desarrollo local, usa '/api' que el proxy de Vite redirige a localhost:8000.
 
-const API_BASE_URL = import.meta.env.VITE_API_URL || (import.meta.env.DEV ? '/api' : 'https://geovisorcostos-production.up.railway.app/api');
+export const API_BASE_URL = import.meta.env.VITE_API_URL || (import.meta.env.DEV ? '/api' : 'https://geovisorcostos-production.up.railway.app/api');
 
 const api = axios.create({
     baseURL: API_BASE_URL,
@@ -14,12 +14,35 @@ const api = axios.create({
     },
 });
 
+// Campos de distrito que usa el frontend
+const CAMPOS_DISTRITO = [
+    'cod_ubigeo',
+    'nombre',
+    'departamento',
+    'provincia',
+    'costo_jornal_sugerido',
+    'costo_planton_sugerido',
+];
+
 /**
  * Obtiene la lista de distritos disponibles.
+ *
+ * Usa el formato compacto (un arreglo por campo y los datos de zona
+ * una vez por zona) y lo expande a un objeto por distrito.
  */
 export const getDistritos = async () => {
-    const response = await api.get('/distritos/');
-    return response.data;
+    const response = await api.get('/distritos/', {
+        params: { format: 'compact', fields: CAMPOS_DISTRITO.join(',') },
+    });
+    const { total, columnas, zonas } = response.data;
+    return Array.from({ length: total }, (_, i) => {
+        const distrito = {};
+        for (const campo of Object.keys(columnas)) {
+            distrito[campo] = columnas[campo][i];
+        }
+        Object.assign(distrito, zonas[distrito.zona_economica]);
+        return distrito;
+    });
 };
 
 /**
@@ -49,4 +72,20 @@ export const detectDistrito = async (lat, lng) => {
     return response.data;
 };
 
+/**
+ * Obtiene el manifiesto de recortes TopoJSON por departamento y provincia.
+ */
+export const getManifiestoGeo = async () => {
+    const response = await api.get('/geo/manifiesto/');
+    return response.data;
+};
+
+/**
+ * Obtiene el índice de niveles simplificados por zoom de las capas de límites.
+ */
+export const getNivelesGeo = async () => {
+    const response = await api.get('/geo/niveles/');
+    return response.data;
+};
+
 export default api;
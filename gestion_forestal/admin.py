@@ -6,7 +6,16 @@ de datos del geovisor de costos forestales.
 """
 
 from django.contrib import admin
-from .models import ZonaEconomica, Distrito, Cultivo, PaqueteTecnologico
+from .models import (
+    ZonaEconomica,
+    Distrito,
+    Cultivo,
+    PaqueteTecnologico,
+    RegistroCarga,
+    VersionCatalogo,
+    ObservacionPrecio,
+    EstadisticaPrecio
+)
 
 
 @admin.register(ZonaEconomica)
@@ -104,3 +113,87 @@ class PaqueteTecnologicoAdmin(admin.ModelAdmin):
             'description': 'Determina cómo se calcula el costo final (pendiente y densidad)'
         }),
     )
+
+
+@admin.register(RegistroCarga)
+class RegistroCargaAdmin(admin.ModelAdmin):
+    """
+    Huellas de los comandos de carga.
+    
+    Eliminar un registro obliga a que el comando vuelva a cargar sus
+    datos en el siguiente arranque.
+    """
+    
+    list_display = ['comando', 'huella', 'actualizado']
+    readonly_fields = ['comando', 'huella', 'actualizado']
+    ordering = ['comando']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(VersionCatalogo)
+class VersionCatalogoAdmin(admin.ModelAdmin):
+    """Versión del catálogo (la incrementan las señales, ver catalogo.py)."""
+    
+    list_display = ['nombre', 'version', 'actualizado']
+    readonly_fields = ['nombre', 'version', 'actualizado']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ObservacionPrecio)
+class ObservacionPrecioAdmin(admin.ModelAdmin):
+    """Administración de la base de precios (cargada por import_precios_madera)."""
+    
+    list_display = [
+        'especie',
+        'departamento',
+        'anio',
+        'mes',
+        'tipo_producto',
+        'unidad',
+        'precio'
+    ]
+    list_filter = ['departamento', 'anio', 'tipo_producto', 'unidad', 'recurso']
+    search_fields = ['especie', 'nombre_cientifico', 'id_origen']
+    ordering = ['especie', 'departamento', '-anio', '-mes']
+    
+    # Solo lectura: los datos vienen del CSV de SERFOR (y el ETag de
+    # /api/precios/ asume que las filas no se editan en el sitio)
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EstadisticaPrecio)
+class EstadisticaPrecioAdmin(admin.ModelAdmin):
+    """Estadísticas de precios (recalculadas por actualizar_estadisticas_precios)."""
+    
+    list_display = [
+        'especie',
+        'departamento',
+        'anio',
+        'tipo_producto',
+        'observaciones',
+        'mediana',
+        'p25',
+        'p75'
+    ]
+    list_filter = ['tipo_producto', 'departamento', 'anio']
+    search_fields = ['especie']
+    ordering = ['tipo_producto', 'especie', 'departamento', '-anio']
+    
+    # Solo lectura: actualizar_estadisticas_precios recalcula la tabla
+    # completa y versiona el catálogo una vez al terminar
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class GestionForestalConfig(AppConfig):
     name = 'gestion_forestal'
+
+    def ready(self):
+        # Registrar señales de invalidación de cachés
+        from . import signals  # noqa: F401
@@ -0,0 +1,278 @@
+"""
+Snapshot del catálogo (distritos, zonas económicas y cultivos) en memoria.
+
+El catálogo es pequeño y casi nunca cambia, así que cada proceso lo carga
+una vez: tuplas inmutables indexadas por UBIGEO o id para el motor de
+cálculo y el JSON ya serializado de los listados de la API. El snapshot
+se reemplaza completo (una asignación bajo el lock), nunca se modifica.
+
+Invalidación:
+- En el proceso donde ocurre el cambio, las señales de signals.py llaman
+  a invalidar_catalogo(), que además incrementa VersionCatalogo en la base.
+- Los demás procesos de gunicorn comparan la versión de su snapshot con
+  la de la base como mucho cada CATALOGO_VERIFICACION_SEGUNDOS; si
+  cambió, descartan el snapshot y también los planes compilados, el
+  índice espacial, las teselas y los precios de madera, que dependen de
+  las mismas tablas.
+- Las estadísticas de precios no forman parte del snapshot, pero el
+  comando actualizar_estadisticas_precios también incrementa la versión
+  al terminar: con ella se identifican los resultados en caché del
+  cálculo de costos (ver resultados.py).
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from threading import Lock
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import F, QuerySet
+from rest_framework.renderers import JSONRenderer
+
+from .indice_espacial import invalidar_indice
+from .models import Cultivo, Distrito, VersionCatalogo, ZonaEconomica
+from .motor import factor_pendiente
+from .plan_costos import invalidar_planes
+from .precios import invalidar_precios
+from .serializers import CultivoSerializer, DistritoSerializer, ZonaEconomicaSerializer
+from .teselas import invalidar_teselas
+
+
+# Fila de VersionCatalogo de este catálogo
+NOMBRE_VERSION_CATALOGO = 'catalogo'
+
+
+class ZonaCatalogo(NamedTuple):
+    """Zona económica del snapshot."""
+
+    id: int
+    nombre: str
+    costo_jornal_referencial: Decimal
+    costo_planton_referencial: Decimal
+
+
+class DistritoCatalogo(NamedTuple):
+    """Distrito del snapshot, con los atributos que usa el motor de cálculo."""
+
+    cod_ubigeo: str
+    nombre: str
+    departamento: str
+    provincia: str
+    zona_economica_id: Optional[int]
+    latitud: Optional[Decimal]
+    longitud: Optional[Decimal]
+    pendiente_promedio_estimada: int
+
+    def calcular_factor_pendiente(self) -> Decimal:
+        """Igual que Distrito.calcular_factor_pendiente."""
+        return factor_pendiente(self.pendiente_promedio_estimada)
+
+
+class CultivoCatalogo(NamedTuple):
+    """Cultivo del snapshot."""
+
+    id: int
+    nombre: str
+    turno_estimado: int
+    densidad_base: int
+    precio_madera_referencial: Decimal
+    rendimiento_m3_ha: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class Catalogo:
+    """
+    Snapshot inmutable del catálogo.
+
+    Attributes:
+        version: Versión de VersionCatalogo con la que se cargó.
+        huella: Hash de la versión y de los listados (base de los ETag:
+            cambia con los datos y con la forma de serializarlos).
+        zonas, distritos, cultivos: Tuplas por id / UBIGEO.
+        json_zonas, json_distritos, json_cultivos: Cuerpo de los listados
+            de la API, idéntico al que producen los serializadores.
+    """
+
+    version: int
+    huella: str
+    zonas: Dict[int, ZonaCatalogo]
+    distritos: Dict[str, DistritoCatalogo]
+    cultivos: Dict[int, CultivoCatalogo]
+    json_zonas: bytes
+    json_distritos: bytes
+    json_cultivos: bytes
+
+
+def version_catalogo() -> int:
+    """Versión actual del catálogo en la base (0 si nunca cambió)."""
+    version = VersionCatalogo.objects.filter(
+        nombre=NOMBRE_VERSION_CATALOGO
+    ).values_list('version', flat=True).first()
+    return version or 0
+
+
+def incrementar_version_catalogo() -> None:
+    """Marca el catálogo como modificado para todos los procesos."""
+    actualizadas = VersionCatalogo.objects.filter(
+        nombre=NOMBRE_VERSION_CATALOGO
+    ).update(version=F('version') + 1)
+    if not actualizadas:
+        VersionCatalogo.objects.get_or_create(
+            nombre=NOMBRE_VERSION_CATALOGO, defaults={'version': 1}
+        )
+
+
+def cargar_catalogo() -> Catalogo:
+    """
+    Lee el catálogo completo (tres consultas más la de versión).
+
+    La versión se lee antes que los datos: si el catálogo cambia durante
+    la carga, la siguiente verificación ve una versión mayor y recarga.
+    """
+    version = version_catalogo()
+    renderer = JSONRenderer()
+
+    zonas = list(ZonaEconomica.objects.all())
+    distritos = list(Distrito.objects.select_related('zona_economica').all())
+    cultivos = list(Cultivo.objects.all())
+
+    json_zonas = renderer.render(ZonaEconomicaSerializer(zonas, many=True).data)
+    json_distritos = renderer.render(DistritoSerializer(distritos, many=True).data)
+    json_cultivos = renderer.render(CultivoSerializer(cultivos, many=True).data)
+    sha = hashlib.sha256(str(version).encode('ascii'))
+    for cuerpo in (json_zonas, json_distritos, json_cultivos):
+        sha.update(cuerpo)
+
+    return Catalogo(
+        version=version,
+        huella=sha.hexdigest()[:16],
+        zonas={
+            z.id: ZonaCatalogo(
+                z.id, z.nombre, z.costo_jornal_referencial, z.costo_planton_referencial
+            )
+            for z in zonas
+        },
+        distritos={
+            d.cod_ubigeo: DistritoCatalogo(
+                d.cod_ubigeo, d.nombre, d.departamento, d.provincia, d.zona_economica_id,
+                d.latitud, d.longitud, d.pendiente_promedio_estimada
+            )
+            for d in distritos
+        },
+        cultivos={
+            c.id: CultivoCatalogo(
+                c.id, c.nombre, c.turno_estimado, c.densidad_base,
+                c.precio_madera_referencial, c.rendimiento_m3_ha
+            )
+            for c in cultivos
+        },
+        json_zonas=json_zonas,
+        json_distritos=json_distritos,
+        json_cultivos=json_cultivos,
+    )
+
+
+def descartar_dependientes() -> None:
+    """Invalida las cachés del proceso que se construyen con las tablas del catálogo."""
+    invalidar_planes()
+    invalidar_indice()
+    invalidar_teselas()
+    invalidar_precios()
+
+
+class CacheCatalogo:
+    """
+    Snapshot del catálogo, local al proceso y seguro entre hilos.
+
+    Usa el mismo esquema de generaciones que CachePlanes: un snapshot
+    cargado mientras ocurría una invalidación se descarta.
+    """
+
+    def __init__(self):
+        self._catalogo: Optional[Catalogo] = None
+        self._lock = Lock()
+        self._generacion = 0
+        self._verificado = 0.0
+
+    def obtener(self, verificar: bool = False) -> Catalogo:
+        """
+        Retorna el snapshot, recargándolo si fue invalidado o cambió en la base.
+
+        Args:
+            verificar: Leer la versión de la base aunque no haya pasado
+                CATALOGO_VERIFICACION_SEGUNDOS desde la última lectura.
+        """
+        intervalo = settings.CATALOGO_VERIFICACION_SEGUNDOS
+        with self._lock:
+            catalogo = self._catalogo
+            generacion = self._generacion
+            vencido = verificar or time.monotonic() - self._verificado >= intervalo
+
+        if catalogo is not None and not vencido:
+            return catalogo
+        if catalogo is not None:
+            version = version_catalogo()
+            with self._lock:
+                self._verificado = time.monotonic()
+            if version == catalogo.version:
+                return catalogo
+            # Otro proceso modificó el catálogo: sus señales no llegan aquí
+            self.invalidar()
+            descartar_dependientes()
+            with self._lock:
+                generacion = self._generacion
+
+        nuevo = cargar_catalogo()
+        with self._lock:
+            if generacion == self._generacion:
+                self._catalogo = nuevo
+                self._verificado = time.monotonic()
+        return nuevo
+
+    def invalidar(self) -> None:
+        """Descarta el snapshot; se recarga en la siguiente consulta."""
+        with self._lock:
+            self._generacion += 1
+            self._catalogo = None
+
+
+cache_catalogo = CacheCatalogo()
+
+
+def obtener_catalogo(verificar: bool = False) -> Catalogo:
+    """Atajo para obtener el snapshot del catálogo del proceso."""
+    return cache_catalogo.obtener(verificar)
+
+
+def descartar_catalogo() -> None:
+    """Atajo para descartar el snapshot del proceso (sin tocar la base)."""
+    cache_catalogo.invalidar()
+
+
+def invalidar_catalogo() -> None:
+    """
+    Registra un cambio del catálogo: incrementa la versión en la base y
+    descarta el snapshot del proceso.
+
+    Las operaciones en bloque (bulk_create, bulk_update, QuerySet.update)
+    no emiten señales: los comandos que las usan deben llamarla.
+    """
+    incrementar_version_catalogo()
+    descartar_catalogo()
+
+
+def borrar_sin_senales(queryset: QuerySet) -> int:
+    """
+    Borra las filas del queryset con un solo DELETE, sin emitir señales.
+
+    Con receptores de post_delete conectados, QuerySet.delete() carga
+    cada fila y emite una señal por fila. Solo para modelos sin relaciones
+    en cascada (PaqueteTecnologico, EstadisticaPrecio); quien la usa debe
+    llamar a invalidar_catalogo() al terminar.
+
+    Returns:
+        int: Filas borradas.
+    """
+    return queryset._raw_delete(queryset.db)
@@ -0,0 +1,229 @@
+"""
+Barrido de escenarios sobre un plan de costos compilado.
+
+Evalúa la grilla (producto cartesiano) de geometrías de siembra,
+hectáreas, costo de jornal y costo de plantón sin repetir el cálculo
+por actividad. Como el costo de cada año es lineal en esos parámetros
+(ver PlanCostos), los vectores de coeficientes por año se reducen una
+sola vez por factor de densidad a sumas simples y descontadas; cada
+celda de la grilla cuesta entonces unas pocas multiplicaciones.
+
+Los resultados son valores en punto flotante redondeados a céntimos;
+pueden diferir en algunos céntimos del cálculo exacto por actividad.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .finanzas import TASA_DESCUENTO, calcular_tir, factores_descuento
+from .motor import PlanCostos
+
+
+# Orden de los ejes en la matriz aplanada (el último varía más rápido)
+ORDEN_EJES = (
+    'sistema_siembra',
+    'distanciamiento_largo',
+    'distanciamiento_ancho',
+    'hectareas',
+    'costo_jornal_usuario',
+    'costo_planton_usuario',
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SumasPlan:
+    """
+    Reducción de un plan para un factor de densidad y de pendiente.
+
+    Todas las magnitudes son por hectárea: jornales, plantones y costos
+    fijos (S/) del rango de años, sus valores presentes y los del año
+    de cosecha (cero si la cosecha está fuera del rango). Los vectores
+    anuales (índice = año, ceros fuera del rango) alimentan la TIR.
+    """
+
+    jornales: float
+    plantones: float
+    fijos: float
+    jornales_vp: float
+    plantones_vp: float
+    fijos_vp: float
+    jornales_cosecha: float
+    plantones_cosecha: float
+    fijos_cosecha: float
+    jornales_anuales: Tuple[float, ...]
+    plantones_anuales: Tuple[float, ...]
+    fijos_anuales: Tuple[float, ...]
+
+
+def sumar_plan(
+    plan: PlanCostos,
+    factor_densidad: float,
+    factor_pendiente: float,
+    anio_inicio: int,
+    anio_fin: int,
+    incluir_servicios: bool = True
+) -> SumasPlan:
+    """
+    Reduce los coeficientes anuales del plan a sumas por hectárea.
+
+    Args:
+        plan: Plan de costos compilado.
+        factor_densidad: Plantas del usuario / densidad base.
+        factor_pendiente: Factor de pendiente del distrito.
+        anio_inicio: Primer año incluido.
+        anio_fin: Último año incluido.
+        incluir_servicios: Incluir servicios, legal y activos.
+
+    Returns:
+        SumasPlan: Sumas simples, descontadas y del año de cosecha.
+    """
+    ultimo = min(anio_fin, plan.horizonte)
+    descuento = factores_descuento(float(TASA_DESCUENTO), max(ultimo, 0))
+    factor_mo = 0.5 + 0.5 * factor_densidad
+    servicios = 1.0 if incluir_servicios else 0.0
+    cosecha = plan.turno_estimado
+
+    jornales = plantones = fijos = 0.0
+    jornales_vp = plantones_vp = fijos_vp = 0.0
+    jornales_cosecha = plantones_cosecha = fijos_cosecha = 0.0
+    anios = max(ultimo + 1, 0)
+    jornales_anuales = [0.0] * anios
+    plantones_anuales = [0.0] * anios
+    fijos_anuales = [0.0] * anios
+
+    for anio in range(anio_inicio, ultimo + 1):
+        j = (
+            plan.jornales_fijos[anio]
+            + plan.jornales_pendiente[anio] * factor_pendiente
+            + (plan.jornales_densidad[anio]
+               + plan.jornales_densidad_pendiente[anio] * factor_pendiente) * factor_mo
+        )
+        p = plan.plantones_fijos[anio] + plan.plantones_densidad[anio] * factor_densidad
+        f = (
+            plan.insumos_fijos[anio] + plan.insumos_densidad[anio] * factor_densidad
+            + servicios * (plan.servicios_fijos[anio]
+                           + plan.servicios_densidad[anio] * factor_densidad)
+        )
+
+        jornales_anuales[anio] = j
+        plantones_anuales[anio] = p
+        fijos_anuales[anio] = f
+
+        d = descuento[anio]
+        jornales += j
+        plantones += p
+        fijos += f
+        jornales_vp += j * d
+        plantones_vp += p * d
+        fijos_vp += f * d
+
+        if anio == cosecha:
+            jornales_cosecha, plantones_cosecha, fijos_cosecha = j, p, f
+
+    return SumasPlan(
+        jornales, plantones, fijos,
+        jornales_vp, plantones_vp, fijos_vp,
+        jornales_cosecha, plantones_cosecha, fijos_cosecha,
+        tuple(jornales_anuales), tuple(plantones_anuales), tuple(fijos_anuales),
+    )
+
+
+def tir_por_hectarea(
+    sumas: SumasPlan,
+    costo_jornal: float,
+    costo_planton: float,
+    ingreso_ha: float,
+    anio_cosecha: int
+) -> Optional[float]:
+    """
+    TIR (%) del flujo de una hectárea.
+
+    La TIR no depende de la superficie (el flujo escala con ella), así
+    que se calcula una vez por combinación de densidad, jornal y plantón.
+    """
+    flujos = [
+        -(costo_jornal * j + costo_planton * p + f)
+        for j, p, f in zip(sumas.jornales_anuales, sumas.plantones_anuales, sumas.fijos_anuales)
+    ]
+    if anio_cosecha >= len(flujos):
+        flujos.extend([0.0] * (anio_cosecha + 1 - len(flujos)))
+    flujos[anio_cosecha] += ingreso_ha
+
+    tir = calcular_tir(flujos).tir
+    return None if tir is None else round(tir * 100, 2)
+
+
+def barrer_escenarios(
+    plan: PlanCostos,
+    factor_pendiente: float,
+    factores_densidad: Sequence[float],
+    hectareas: Sequence[float],
+    costos_jornal: Sequence[float],
+    costos_planton: Sequence[float],
+    anio_inicio: int,
+    anio_fin: int,
+    incluir_servicios: bool = True
+) -> Dict[str, List[float]]:
+    """
+    Evalúa costo total, VAN, ratio B/C y TIR para toda la grilla.
+
+    El orden de las celdas es (densidad, hectáreas, jornal, plantón),
+    con el costo de plantón variando más rápido.
+
+    Returns:
+        Dict: Listas aplanadas 'costo_total_proyecto', 'van',
+        'ratio_beneficio_costo' y 'tir' (% anual, None si no existe).
+    """
+    cosecha = plan.turno_estimado
+    d_cosecha = factores_descuento(float(TASA_DESCUENTO), cosecha)[cosecha]
+    ingreso_ha = float(plan.rendimiento_m3_ha) * float(plan.precio_madera_referencial)
+
+    costos: List[float] = []
+    vans: List[float] = []
+    ratios: List[float] = []
+    tirs: List[Optional[float]] = []
+
+    for factor_densidad in factores_densidad:
+        s = sumar_plan(
+            plan, factor_densidad, factor_pendiente,
+            anio_inicio, anio_fin, incluir_servicios
+        )
+        tirs_densidad = [
+            tir_por_hectarea(s, jornal, planton, ingreso_ha, cosecha)
+            for jornal in costos_jornal
+            for planton in costos_planton
+        ]
+        for ha in hectareas:
+            ingreso = round(ha * ingreso_ha, 2)
+            for jornal in costos_jornal:
+                base = ha * (jornal * s.jornales + s.fijos)
+                base_vp = ha * (jornal * s.jornales_vp + s.fijos_vp)
+                base_cosecha = ha * (jornal * s.jornales_cosecha + s.fijos_cosecha)
+                for planton in costos_planton:
+                    costo = base + ha * planton * s.plantones
+                    vp_costo = base_vp + ha * planton * s.plantones_vp
+                    costo_cosecha = base_cosecha + ha * planton * s.plantones_cosecha
+
+                    # El año de cosecha neta costo e ingreso en un solo flujo
+                    flujo_cosecha = ingreso - costo_cosecha
+                    vp_otros = vp_costo - costo_cosecha * d_cosecha
+                    if flujo_cosecha > 0:
+                        vp_ingresos = flujo_cosecha * d_cosecha
+                        vp_costos = vp_otros
+                    else:
+                        vp_ingresos = 0.0
+                        vp_costos = vp_otros - flujo_cosecha * d_cosecha
+
+                    costos.append(round(costo, 2))
+                    vans.append(round(ingreso * d_cosecha - vp_costo, 2))
+                    ratios.append(
+                        round(vp_ingresos / vp_costos, 2) if vp_costos > 0 else 0.0
+                    )
+            tirs.extend(tirs_densidad)
+
+    return {
+        'costo_total_proyecto': costos,
+        'van': vans,
+        'ratio_beneficio_costo': ratios,
+        'tir': tirs,
+    }
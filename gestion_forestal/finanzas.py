@@ -0,0 +1,338 @@
+"""
+Utilidades financieras del motor de cálculo de costos forestales.
+
+Centraliza la tasa de descuento del proyecto, las tablas de factores
+de descuento usadas para el VAN y el ratio Beneficio/Costo, y el
+cálculo de la TIR.
+
+Trabaja con floats y sin dependencias externas: el VAN se evalúa como
+polinomio (Horner) y la TIR con Newton acotado, de modo que se pueden
+calcular miles de TIR por solicitud (lotes, escenarios).
+
+Los montos en soles no pasan por floats: el motor los lleva como
+enteros escalados (mantisa y número de decimales) y solo redondea a
+céntimos, con el mismo criterio que Decimal.quantize, al armar la salida.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+# Tasa de descuento anual del proyecto (10%)
+TASA_DESCUENTO = Decimal('0.10')
+
+
+@lru_cache(maxsize=64)
+def factores_descuento(tasa: float, horizonte: int) -> Tuple[float, ...]:
+    """
+    Tabla de factores de descuento 1 / (1 + tasa)^t.
+    
+    Se calcula una sola vez por (tasa, horizonte) y se reutiliza
+    entre solicitudes.
+    
+    Args:
+        tasa: Tasa de descuento anual (ej: 0.10).
+        horizonte: Último año incluido en la tabla.
+    
+    Returns:
+        Tuple[float, ...]: Factores para t = 0..horizonte.
+    """
+    base = 1.0 + tasa
+    return tuple(base ** -t for t in range(horizonte + 1))
+
+
+@lru_cache(maxsize=64)
+def factores_capitalizacion(tasa: Decimal, horizonte: int) -> Tuple[Decimal, ...]:
+    """
+    Tabla de divisores (1 + tasa)^t en Decimal para el VAN y el ratio B/C.
+    
+    Cada factor se calcula exactamente como lo hacía el motor en cada
+    solicitud ((1 + tasa) ** Decimal(t)), así que dividir por la tabla
+    da los mismos valores presentes.
+    
+    Args:
+        tasa: Tasa de descuento anual (ej: Decimal('0.10')).
+        horizonte: Último año incluido en la tabla.
+    
+    Returns:
+        Tuple[Decimal, ...]: Factores para t = 0..horizonte.
+    """
+    base = Decimal('1') + tasa
+    return tuple(base ** Decimal(t) for t in range(horizonte + 1))
+
+
+# ===========================================
+# ARITMÉTICA EXACTA EN ENTEROS ESCALADOS
+# ===========================================
+
+# Un céntimo; Decimal(centimos) * CENTIMO da el monto con dos decimales
+CENTIMO = Decimal('0.01')
+
+
+def entero_escalado(valor: Decimal) -> Tuple[int, int]:
+    """
+    Descompone un Decimal finito en (mantisa, decimales).
+    
+    valor == mantisa / 10**decimales, sin pérdida.
+    
+    Args:
+        valor: Decimal a descomponer (ej: Decimal('47.50')).
+    
+    Returns:
+        Tuple[int, int]: Mantisa entera y decimales (ej: (4750, 2)).
+    """
+    signo, digitos, exponente = valor.as_tuple()
+    mantisa = int(''.join(map(str, digitos))) if digitos else 0
+    if signo:
+        mantisa = -mantisa
+    if exponente >= 0:
+        return mantisa * 10 ** exponente, 0
+    return mantisa, -exponente
+
+
+def redondear_centimos(mantisa: int, decimales: int) -> int:
+    """
+    Redondea mantisa / 10**decimales a céntimos (mitad al par).
+    
+    Es el mismo redondeo que Decimal.quantize(Decimal('0.01')) con el
+    contexto por defecto, pero sin límite de dígitos.
+    
+    Args:
+        mantisa: Valor escalado.
+        decimales: Decimales de la mantisa.
+    
+    Returns:
+        int: Valor en céntimos.
+    """
+    if decimales <= 2:
+        return mantisa * 10 ** (2 - decimales)
+    divisor = 10 ** (decimales - 2)
+    cociente, resto = divmod(mantisa, divisor)
+    doble = 2 * resto
+    if doble > divisor or (doble == divisor and cociente % 2):
+        cociente += 1
+    return cociente
+
+
+# ===========================================
+# TASA INTERNA DE RETORNO (TIR)
+# ===========================================
+
+# Rango de búsqueda de la TIR (tasa anual, -99% a 100 000%)
+TIR_MINIMA = -0.99
+TIR_MAXIMA = 1000.0
+TOLERANCIA_TIR = 1e-10
+MAX_ITERACIONES_TIR = 100
+
+# Diagnósticos de la TIR
+TIR_UNICA = 'UNICA'
+TIR_MULTIPLE = 'MULTIPLE'
+TIR_SIN_RAIZ = 'SIN_RAIZ'
+TIR_SIN_CAMBIO_SIGNO = 'SIN_CAMBIO_SIGNO'
+
+# Tasas para la curva VAN vs tasa de descuento (0% a 30%)
+TASAS_CURVA_VAN = tuple(i / 100 for i in range(0, 31))
+
+# Grilla de exploración para flujos con varios cambios de signo:
+# fina cerca de 0 y geométrica hacia las tasas extremas.
+_GRILLA_TIR = tuple(sorted(set(
+    [TIR_MINIMA + i * 0.01 for i in range(0, 99, 3)]
+    + [i / 100 for i in range(0, 100)]
+    + [1.0 * 1.25 ** i for i in range(0, 32)]
+    + [TIR_MAXIMA]
+)))
+
+
+@dataclass(frozen=True, slots=True)
+class ResultadoTIR:
+    """
+    Resultado del cálculo de la TIR.
+    
+    Attributes:
+        tir: Tasa interna de retorno (fracción, ej: 0.15) o None si no
+            existe. Con varias raíces es la más cercana a la tasa de
+            descuento (como la "estimación" de una hoja de cálculo).
+        diagnostico: UNICA, MULTIPLE, SIN_RAIZ o SIN_CAMBIO_SIGNO.
+        raices: Todas las tasas encontradas con VAN = 0.
+        cambios_signo: Cambios de signo del flujo (regla de Descartes:
+            cota superior del número de raíces).
+    """
+    
+    tir: Optional[float]
+    diagnostico: str
+    raices: Tuple[float, ...]
+    cambios_signo: int
+
+
+def van_flujos(flujos: Sequence[float], tasa: float) -> float:
+    """
+    VAN de un flujo anual (índice = año) para una tasa.
+    
+    Evalúa el polinomio del flujo por Horner en v = 1 / (1 + tasa),
+    sin potencias ni listas intermedias.
+    """
+    v = 1.0 / (1.0 + tasa)
+    total = 0.0
+    for flujo in reversed(flujos):
+        total = total * v + flujo
+    return total
+
+
+def curva_van(flujos: Sequence[float], tasas: Iterable[float] = TASAS_CURVA_VAN) -> List[float]:
+    """VAN del flujo para cada tasa de descuento."""
+    return [van_flujos(flujos, tasa) for tasa in tasas]
+
+
+def _van_y_derivada(flujos: Sequence[float], tasa: float) -> Tuple[float, float]:
+    """VAN y su derivada respecto de la tasa, en una sola pasada de Horner."""
+    v = 1.0 / (1.0 + tasa)
+    p = 0.0
+    dp = 0.0
+    for flujo in reversed(flujos):
+        dp = dp * v + p
+        p = p * v + flujo
+    # dVAN/dtasa = P'(v) · dv/dtasa = -v² · P'(v)
+    return p, -v * v * dp
+
+
+def contar_cambios_signo(flujos: Iterable[float]) -> int:
+    """Cuenta los cambios de signo del flujo, ignorando ceros."""
+    cambios = 0
+    anterior = 0.0
+    for flujo in flujos:
+        if flujo == 0:
+            continue
+        if anterior and (flujo > 0) != (anterior > 0):
+            cambios += 1
+        anterior = flujo
+    return cambios
+
+
+def _resolver_intervalo(
+    flujos: Sequence[float],
+    bajo: float,
+    alto: float,
+    van_bajo: float
+) -> float:
+    """
+    Newton acotado en [bajo, alto], con VAN(bajo) y VAN(alto) de signos opuestos.
+    
+    Si el paso de Newton sale del intervalo se usa bisección, por lo que
+    la convergencia está garantizada.
+    """
+    tasa = 0.5 * (bajo + alto)
+    for _ in range(MAX_ITERACIONES_TIR):
+        van, derivada = _van_y_derivada(flujos, tasa)
+        if van == 0.0:
+            return tasa
+        
+        if (van < 0) == (van_bajo < 0):
+            bajo, van_bajo = tasa, van
+        else:
+            alto = tasa
+        
+        siguiente = tasa - van / derivada if derivada else bajo - 1.0
+        if not bajo < siguiente < alto:
+            siguiente = 0.5 * (bajo + alto)
+        
+        if abs(siguiente - tasa) <= TOLERANCIA_TIR * (1.0 + abs(tasa)):
+            return siguiente
+        tasa = siguiente
+    return tasa
+
+
+def _acotar_raiz_unica(flujos: Sequence[float]) -> Optional[Tuple[float, float, float]]:
+    """
+    Busca un intervalo con cambio de signo del VAN partiendo de tasa 0.
+    
+    Con un solo cambio de signo en el flujo existe a lo sumo una raíz
+    en (-1, ∞), así que basta con expandir hacia un lado.
+    """
+    van_cero = van_flujos(flujos, 0.0)
+    # Para tasas muy altas el VAN tiende al signo del primer flujo no nulo
+    primero = next(f for f in flujos if f != 0)
+    
+    if van_cero == 0.0:
+        return (0.0, 0.0, 0.0)
+    
+    if (van_cero > 0) != (primero > 0):
+        # La raíz está por encima de 0
+        bajo, alto = 0.0, 0.1
+        while alto <= TIR_MAXIMA:
+            van_alto = van_flujos(flujos, alto)
+            if (van_alto > 0) != (van_cero > 0) or van_alto == 0.0:
+                return (bajo, alto, van_flujos(flujos, bajo))
+            bajo, alto = alto, alto * 2.0
+        return None
+    
+    # La raíz está entre -1 y 0
+    bajo, alto = -0.5, 0.0
+    while bajo >= TIR_MINIMA:
+        van_bajo = van_flujos(flujos, bajo)
+        if (van_bajo > 0) != (van_cero > 0) or van_bajo == 0.0:
+            return (bajo, alto, van_bajo)
+        alto, bajo = bajo, -1.0 + (1.0 + bajo) / 2.0
+    return None
+
+
+def calcular_tir(
+    flujos: Sequence[float],
+    referencia: float = float(TASA_DESCUENTO)
+) -> ResultadoTIR:
+    """
+    Calcula la TIR de un flujo anual (índice = año) con diagnóstico.
+    
+    - Sin cambios de signo: no existe TIR.
+    - Un cambio de signo: raíz única, acotada y resuelta con Newton.
+    - Varios cambios de signo: se explora una grilla de tasas y se
+      resuelve cada intervalo con cambio de signo. Si hay más de una
+      raíz el diagnóstico es MULTIPLE y se informa la más cercana a
+      la tasa de referencia.
+    
+    Args:
+        flujos: Flujo de caja por año (floats).
+        referencia: Tasa usada para elegir entre raíces múltiples.
+    
+    Returns:
+        ResultadoTIR: TIR, diagnóstico y raíces encontradas.
+    """
+    cambios = contar_cambios_signo(flujos)
+    if cambios == 0:
+        return ResultadoTIR(None, TIR_SIN_CAMBIO_SIGNO, (), 0)
+    
+    if cambios == 1:
+        intervalo = _acotar_raiz_unica(flujos)
+        if intervalo is None:
+            return ResultadoTIR(None, TIR_SIN_RAIZ, (), 1)
+        bajo, alto, van_bajo = intervalo
+        tasa = bajo if van_bajo == 0.0 else _resolver_intervalo(flujos, bajo, alto, van_bajo)
+        return ResultadoTIR(tasa, TIR_UNICA, (tasa,), 1)
+    
+    raices = []
+    tasa_anterior = _GRILLA_TIR[0]
+    van_anterior = van_flujos(flujos, tasa_anterior)
+    for tasa in _GRILLA_TIR[1:]:
+        van = van_flujos(flujos, tasa)
+        if van_anterior == 0.0:
+            raices.append(tasa_anterior)
+        elif van != 0.0 and (van > 0) != (van_anterior > 0):
+            raices.append(_resolver_intervalo(flujos, tasa_anterior, tasa, van_anterior))
+        tasa_anterior, van_anterior = tasa, van
+    if van_anterior == 0.0:
+        raices.append(tasa_anterior)
+    
+    if not raices:
+        return ResultadoTIR(None, TIR_SIN_RAIZ, (), cambios)
+    if len(raices) == 1:
+        return ResultadoTIR(raices[0], TIR_UNICA, tuple(raices), cambios)
+    tir = min(raices, key=lambda raiz: abs(raiz - referencia))
+    return ResultadoTIR(tir, TIR_MULTIPLE, tuple(raices), cambios)
+
+
+def tir_porcentaje(resultado: ResultadoTIR) -> Optional[Decimal]:
+    """TIR expresada en porcentaje con 2 decimales (None si no existe)."""
+    if resultado.tir is None:
+        return None
+    return Decimal(repr(resultado.tir * 100)).quantize(Decimal('0.01'))
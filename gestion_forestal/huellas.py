@@ -0,0 +1,53 @@
+"""
+Huellas de contenido para los comandos de carga de datos.
+
+El contenedor ejecuta seed_data e import_distritos en cada arranque,
+antes de que gunicorn acepte conexiones. Cada comando calcula el hash
+SHA-256 de sus datos de origen (tablas del módulo, CSV) y lo compara con
+el guardado en RegistroCarga: si coincide, no hay nada que escribir y el
+comando termina con una sola consulta.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from .models import RegistroCarga
+
+
+# Bloque de lectura para archivos de origen
+TAMANO_BLOQUE = 1 << 16
+
+
+def huella_datos(*partes: Any, ruta: Optional[str] = None) -> str:
+    """
+    Calcula la huella SHA-256 de datos de origen.
+
+    Las partes se serializan como JSON canónico (claves ordenadas;
+    Decimal y demás tipos no JSON como texto), de modo que la huella no
+    depende del orden de inserción de los diccionarios.
+
+    Args:
+        *partes: Tablas o valores que definen la carga.
+        ruta: Archivo de origen cuyo contenido también forma parte de la huella.
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps(partes, sort_keys=True, default=str).encode('utf-8'))
+    if ruta is not None:
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b''):
+                sha.update(bloque)
+    return sha.hexdigest()
+
+
+def carga_vigente(comando: str, huella: str) -> bool:
+    """True si la última carga completa del comando usó esos mismos datos."""
+    return RegistroCarga.objects.filter(comando=comando, huella=huella).exists()
+
+
+def registrar_carga(comando: str, huella: str) -> None:
+    """Guarda la huella de una carga completada."""
+    RegistroCarga.objects.update_or_create(comando=comando, defaults={'huella': huella})
@@ -0,0 +1,280 @@
+"""
+Índice espacial de distritos para la detección por coordenadas.
+
+La detección usa primero los límites distritales (ver poligonos.py):
+el distrito cuyo polígono contiene el punto. Solo si el punto cae fuera
+de todos los polígonos (mar, frontera, archivo ausente) se recurre al
+centroide más cercano.
+
+Los centroides (latitud, longitud) de los distritos se proyectan a
+vectores unitarios 3D y se ordenan en un KD-tree implícito (arreglos
+'d' con la mediana de cada rango como nodo). La distancia euclidiana
+entre vectores unitarios (cuerda) crece con la distancia sobre la esfera,
+así que el vecino más cercano por cuerda es también el más cercano por
+haversine, sin las distorsiones de comparar grados de latitud y longitud.
+
+El índice se construye de forma perezosa una vez por proceso, guarda los
+Distrito (con su zona económica) en memoria y se invalida mediante
+señales (ver signals.py).
+"""
+
+import math
+from array import array
+from dataclasses import dataclass
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from .models import Distrito
+from .poligonos import AlmacenPoligonos, cargar_almacen
+
+
+# Radio medio de la Tierra (km)
+RADIO_TIERRA_KM = 6371.0088
+
+
+def distancia_haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Distancia sobre la superficie terrestre entre dos coordenadas.
+
+    Args:
+        lat1, lng1: Primera coordenada en grados.
+        lat2, lng2: Segunda coordenada en grados.
+
+    Returns:
+        float: Distancia en kilómetros.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _vector_unitario(lat: float, lng: float) -> Tuple[float, float, float]:
+    """Proyecta una coordenada geográfica a un vector unitario 3D."""
+    phi = math.radians(lat)
+    lam = math.radians(lng)
+    cos_phi = math.cos(phi)
+    return cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi)
+
+
+@dataclass(frozen=True, slots=True)
+class DistritoCercano:
+    """
+    Resultado de una búsqueda.
+
+    Attributes:
+        distrito: Distrito detectado.
+        distancia_km: Distancia al centroide (None si no tiene coordenadas).
+        dentro: True si el punto está dentro del límite del distrito.
+    """
+
+    distrito: Distrito
+    distancia_km: Optional[float]
+    dentro: bool = False
+
+
+class IndiceDistritos:
+    """
+    Índice inmutable de distritos: polígonos y KD-tree de centroides.
+
+    Los nodos se guardan en orden de árbol implícito: el nodo de un
+    rango [inicio, fin) está en su posición media y los subárboles en
+    las mitades izquierda y derecha. Los ejes alternan x, y, z.
+    """
+
+    def __init__(self, distritos: List[Distrito], poligonos: Optional[AlmacenPoligonos] = None):
+        puntos = [
+            (_vector_unitario(float(d.latitud), float(d.longitud)), d)
+            for d in distritos
+            if d.latitud is not None and d.longitud is not None
+        ]
+        self._x = array('d', bytes(8 * len(puntos)))
+        self._y = array('d', bytes(8 * len(puntos)))
+        self._z = array('d', bytes(8 * len(puntos)))
+        self._distritos: List[Optional[Distrito]] = [None] * len(puntos)
+        self._por_ubigeo = {d.cod_ubigeo: d for d in distritos}
+        self._construir(puntos, 0, len(puntos), 0)
+
+        # Polígono -> Distrito, por (departamento, provincia, nombre)
+        self._poligonos = poligonos
+        self._distrito_poligono: List[Optional[Distrito]] = []
+        if poligonos is not None:
+            por_nombre = {(d.departamento, d.provincia, d.nombre): d for d in distritos}
+            self._distrito_poligono = [por_nombre.get(clave) for clave in poligonos.claves]
+
+    def _construir(self, puntos: list, inicio: int, fin: int, eje: int) -> None:
+        if inicio >= fin:
+            return
+        puntos[inicio:fin] = sorted(puntos[inicio:fin], key=lambda p: p[0][eje])
+        medio = (inicio + fin) // 2
+        (x, y, z), distrito = puntos[medio]
+        self._x[medio], self._y[medio], self._z[medio] = x, y, z
+        self._distritos[medio] = distrito
+        siguiente = (eje + 1) % 3
+        self._construir(puntos, inicio, medio, siguiente)
+        self._construir(puntos, medio + 1, fin, siguiente)
+
+    def __len__(self) -> int:
+        return len(self._distritos)
+
+    def obtener(self, cod_ubigeo: str) -> Optional[Distrito]:
+        """Retorna el distrito con ese UBIGEO, si está en el índice."""
+        return self._por_ubigeo.get(cod_ubigeo)
+
+    def mas_cercano(self, lat: float, lng: float) -> Optional[DistritoCercano]:
+        """
+        Busca el distrito cuyo centroide está más cerca de la coordenada.
+
+        Args:
+            lat: Latitud en grados.
+            lng: Longitud en grados.
+
+        Returns:
+            DistritoCercano o None si el índice está vacío.
+        """
+        if not self._distritos:
+            return None
+
+        objetivo = _vector_unitario(lat, lng)
+        coordenadas = (self._x, self._y, self._z)
+        mejor = [-1, math.inf]
+
+        def buscar(inicio: int, fin: int, eje: int) -> None:
+            if inicio >= fin:
+                return
+            medio = (inicio + fin) // 2
+            dx = self._x[medio] - objetivo[0]
+            dy = self._y[medio] - objetivo[1]
+            dz = self._z[medio] - objetivo[2]
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 < mejor[1]:
+                mejor[0], mejor[1] = medio, d2
+
+            diferencia = objetivo[eje] - coordenadas[eje][medio]
+            siguiente = (eje + 1) % 3
+            if diferencia < 0:
+                cercano, lejano = (inicio, medio), (medio + 1, fin)
+            else:
+                cercano, lejano = (medio + 1, fin), (inicio, medio)
+            buscar(cercano[0], cercano[1], siguiente)
+            # El otro lado solo puede mejorar si el plano de corte está más cerca
+            if diferencia * diferencia < mejor[1]:
+                buscar(lejano[0], lejano[1], siguiente)
+
+        buscar(0, len(self._distritos), 0)
+
+        distrito = self._distritos[mejor[0]]
+        return DistritoCercano(
+            distrito,
+            distancia_haversine(lat, lng, float(distrito.latitud), float(distrito.longitud))
+        )
+
+    def localizar(self, lat: float, lng: float) -> Optional[DistritoCercano]:
+        """
+        Detecta el distrito que contiene la coordenada.
+
+        Si el punto no cae dentro de ningún polígono con distrito en la
+        base de datos, retorna el de centroide más cercano (dentro=False).
+
+        Args:
+            lat: Latitud en grados.
+            lng: Longitud en grados.
+
+        Returns:
+            DistritoCercano o None si no hay distritos.
+        """
+        if self._poligonos is not None:
+            poligono = self._poligonos.localizar(lng, lat)
+            distrito = self._distrito_poligono[poligono] if poligono is not None else None
+            if distrito is not None:
+                distancia = None
+                if distrito.latitud is not None and distrito.longitud is not None:
+                    distancia = distancia_haversine(
+                        lat, lng, float(distrito.latitud), float(distrito.longitud)
+                    )
+                return DistritoCercano(distrito, distancia, dentro=True)
+        return self.mas_cercano(lat, lng)
+
+    def dividir_parcela(self, parcela: AlmacenPoligonos) -> List[Tuple[Distrito, float]]:
+        """
+        Reparte el área de una parcela entre los distritos que toca.
+
+        Args:
+            parcela: Almacén con la parcela como único polígono.
+
+        Returns:
+            List: (distrito, área en m²) de mayor a menor área. Vacía si
+            no hay límites distritales cargados.
+        """
+        if self._poligonos is None:
+            return []
+        fragmentos = []
+        for poligono in self._poligonos.intersectan(*parcela.cajas[0]):
+            distrito = self._distrito_poligono[poligono]
+            if distrito is None:
+                continue
+            area = self._poligonos.area_interseccion(poligono, parcela)
+            if area > 0:
+                fragmentos.append((distrito, area))
+        fragmentos.sort(key=lambda f: f[1], reverse=True)
+        return fragmentos
+
+
+def cargar_indice() -> IndiceDistritos:
+    """Construye el índice con los distritos y los límites de DISTRITOS_TOPOJSON."""
+    distritos = list(Distrito.objects.select_related('zona_economica').all())
+    poligonos = cargar_almacen(str(settings.DISTRITOS_TOPOJSON))
+    return IndiceDistritos(distritos, poligonos)
+
+
+class CacheIndice:
+    """
+    Índice de distritos perezoso, local al proceso y seguro entre hilos.
+
+    Usa el mismo esquema de generaciones que CachePlanes: un índice
+    construido mientras ocurría una invalidación se descarta.
+    """
+
+    def __init__(self):
+        self._indice: Optional[IndiceDistritos] = None
+        self._lock = Lock()
+        self._generacion = 0
+
+    def obtener(self) -> IndiceDistritos:
+        """Retorna el índice, construyéndolo si fue invalidado."""
+        with self._lock:
+            if self._indice is not None:
+                return self._indice
+            generacion = self._generacion
+
+        indice = cargar_indice()
+        with self._lock:
+            if generacion == self._generacion:
+                self._indice = indice
+        return indice
+
+    def invalidar(self) -> None:
+        """Descarta el índice; se reconstruye en la siguiente consulta."""
+        with self._lock:
+            self._generacion += 1
+            self._indice = None
+
+
+cache_indice = CacheIndice()
+
+
+def obtener_indice() -> IndiceDistritos:
+    """Atajo para obtener el índice de distritos del proceso."""
+    return cache_indice.obtener()
+
+
+def invalidar_indice() -> None:
+    """Atajo para invalidar el índice de distritos del proceso."""
+    cache_indice.invalidar()
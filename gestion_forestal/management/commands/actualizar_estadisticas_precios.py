@@ -0,0 +1,64 @@
+"""
+Comando para recalcular las estadísticas de precios de madera.
+
+Resume las ObservacionPrecio de madera (rolliza y aserrada, en m³ o
+pies tablares) por especie (nombre común y nombre científico),
+departamento y año: mediana, p25, p75 y n, en S/ por m³. Ejecutar después de import_precios_madera.
+
+Uso:
+    python manage.py actualizar_estadisticas_precios
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from gestion_forestal.catalogo import borrar_sin_senales, invalidar_catalogo
+from gestion_forestal.models import EstadisticaPrecio, ObservacionPrecio
+from gestion_forestal.precios import (
+    FACTOR_UNIDAD_M3,
+    TIPO_PRECIO_MOTOR,
+    TIPOS_MADERA,
+    TODO_EL_PAIS,
+    calcular_estadisticas,
+    invalidar_precios,
+)
+
+
+class Command(BaseCommand):
+    """Comando para recalcular EstadisticaPrecio."""
+
+    help = 'Recalcula las estadísticas de precios de madera (mediana, p25, p75, n)'
+
+    def handle(self, *args, **options):
+        """Ejecuta el recálculo."""
+        inicio = time.perf_counter()
+
+        filas = ObservacionPrecio.objects.filter(
+            tipo_producto__in=TIPOS_MADERA,
+            unidad__in=FACTOR_UNIDAD_M3.keys()
+        ).values_list(
+            'especie', 'nombre_cientifico', 'departamento', 'anio', 'tipo_producto', 'unidad', 'precio'
+        ).iterator(chunk_size=5000)
+
+        estadisticas = calcular_estadisticas(filas)
+
+        with transaction.atomic():
+            borradas = borrar_sin_senales(EstadisticaPrecio.objects.all())
+            EstadisticaPrecio.objects.bulk_create(estadisticas, batch_size=1000)
+
+        # Ni el borrado ni bulk_create emiten señales: descartar el snapshot
+        # del proceso y versionar el catálogo una vez (resultados en caché
+        # de otros procesos)
+        invalidar_precios()
+        invalidar_catalogo()
+
+        motor = [
+            e for e in estadisticas
+            if e.tipo_producto == TIPO_PRECIO_MOTOR and e.departamento != TODO_EL_PAIS
+        ]
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Estadísticas recalculadas: {len(estadisticas)} '
+            f'(antes {borradas}), {len(motor)} de {TIPO_PRECIO_MOTOR.lower()} '
+            f'por departamento ({segundos:.1f} s)'
+        ))
@@ -0,0 +1,146 @@
+"""
+Comando para medir el motor de cálculo de costos.
+
+Mide, sin pasar por DRF ni por la caché de resultados:
+- El tiempo de importar motor.py en un intérprete nuevo, sin configurar
+  Django, y verifica que la importación no cargue Django ni DRF.
+- El tiempo por cálculo de motor.calcular_costos_plan para cada cultivo
+  con paquete tecnológico en cada zona económica, con una grilla de
+  superficies, geometrías y rangos de años.
+
+Uso:
+    python manage.py benchmark_motor
+    python manage.py benchmark_motor --repeticiones 10
+"""
+
+import itertools
+import json
+import statistics
+import subprocess
+import sys
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from gestion_forestal.catalogo import obtener_catalogo
+from gestion_forestal.models import PaqueteTecnologico
+from gestion_forestal.motor import ParametrosCalculo, calcular_costos_plan
+from gestion_forestal.plan_costos import obtener_planes
+from gestion_forestal.precios import aplicar_precio_regional
+
+
+# Script del intérprete nuevo: tiempo de importación y módulos cargados
+SCRIPT_IMPORTACION = (
+    'import json, sys, time\n'
+    'inicio = time.perf_counter()\n'
+    'import gestion_forestal.motor\n'
+    'segundos = time.perf_counter() - inicio\n'
+    'print(json.dumps({"segundos": segundos, "modulos": sorted(\n'
+    '    m for m in sys.modules if m.split(".")[0] in ("django", "rest_framework"))}))\n'
+)
+
+# Grilla de parámetros por par (cultivo, zona)
+HECTAREAS = (Decimal('1.00'), Decimal('3.37'), Decimal('50.00'))
+GEOMETRIAS = (
+    ('CUADRADO', Decimal('3.00'), None),
+    ('RECTANGULAR', Decimal('3.00'), Decimal('4.00')),
+    ('TRES_BOLILLO', Decimal('2.50'), None),
+)
+RANGOS_ANIOS = ((0, 50), (0, 0), (1, 5))
+
+
+class Command(BaseCommand):
+    """Comando para medir la importación y el cálculo del motor."""
+
+    help = 'Mide el tiempo de importación y de cálculo del motor de costos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=5,
+            help='Pasadas sobre la grilla; se informa la más rápida (default: 5)',
+        )
+
+    def medir_importacion(self) -> None:
+        """Importa motor.py en un intérprete nuevo, sin DJANGO_SETTINGS_MODULE."""
+        proceso = subprocess.run(
+            [sys.executable, '-c', SCRIPT_IMPORTACION],
+            cwd=settings.BASE_DIR,
+            env={'PYTHONDONTWRITEBYTECODE': '1'},
+            capture_output=True,
+            text=True,
+        )
+        if proceso.returncode != 0:
+            raise CommandError(f'No se pudo importar motor.py:\n{proceso.stderr}')
+        medicion = json.loads(proceso.stdout)
+        self.stdout.write(
+            f"📦 Importación de motor.py: {medicion['segundos'] * 1000:.1f} ms"
+        )
+        if medicion['modulos']:
+            raise CommandError(
+                f"motor.py carga módulos de Django/DRF: {', '.join(medicion['modulos'])}"
+            )
+        self.stdout.write('   Sin Django ni DRF cargados')
+
+    def handle(self, *args, **options):
+        """Ejecuta las mediciones."""
+        repeticiones = max(1, options['repeticiones'])
+        self.medir_importacion()
+
+        catalogo = obtener_catalogo()
+        cultivos = PaqueteTecnologico.objects.values_list(
+            'cultivo_id', flat=True
+        ).order_by('cultivo_id').distinct()
+
+        # Un distrito por zona (el precio de la madera es el de su departamento)
+        distritos = {}
+        for distrito in sorted(catalogo.distritos.values()):
+            distritos.setdefault(distrito.zona_economica_id, distrito)
+
+        pares = list(itertools.product(cultivos, distritos))
+        planes = obtener_planes(pares)
+        casos = []
+        for cultivo_id, zona_id in pares:
+            distrito = distritos[zona_id]
+            zona = catalogo.zonas.get(zona_id)
+            plan = planes.get((cultivo_id, zona_id))
+            if plan is None or zona is None:
+                continue
+            plan = aplicar_precio_regional(plan, distrito.departamento)
+            factor = distrito.calcular_factor_pendiente()
+            for ha, (sistema, largo, ancho), (inicio, fin) in itertools.product(
+                HECTAREAS, GEOMETRIAS, RANGOS_ANIOS
+            ):
+                casos.append((plan, factor, ParametrosCalculo(
+                    hectareas=ha,
+                    costo_jornal=zona.costo_jornal_referencial,
+                    costo_planton=zona.costo_planton_referencial,
+                    anio_inicio=inicio,
+                    anio_fin=fin,
+                    sistema_siembra=sistema,
+                    distanciamiento_largo=largo,
+                    distanciamiento_ancho=ancho,
+                )))
+
+        if not casos:
+            raise CommandError('No hay pares (cultivo, zona) con plan para medir.')
+
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            for plan, factor, parametros in casos:
+                calcular_costos_plan(plan, factor, parametros)
+            tiempos.append(time.perf_counter() - inicio)
+
+        mejor = min(tiempos)
+        self.stdout.write(
+            f'📊 {len(pares)} pares (cultivo, zona), {len(casos)} cálculos por pasada, '
+            f'{repeticiones} pasadas\n'
+            f'   Mejor pasada:   {mejor * 1000 / len(casos):.3f} ms/cálculo\n'
+            f'   Mediana:        {statistics.median(tiempos) * 1000 / len(casos):.3f} ms/cálculo'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(casos) / mejor:,.0f} cálculos por segundo'
+        ))
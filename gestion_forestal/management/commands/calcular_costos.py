@@ -0,0 +1,146 @@
+"""
+Comando para calcular los costos de una plantación sin pasar por la API.
+
+Usa el mismo motor que /api/calcular-costos/ (ver motor.py) con el plan
+compilado del cultivo para la zona del distrito y el precio de la madera
+de su departamento. Sin --jornal o --planton se usan los costos
+referenciales de la zona económica.
+
+Uso:
+    python manage.py calcular_costos 150101 1 --hectareas 2.5
+    python manage.py calcular_costos 150101 1 --sistema RECTANGULAR --largo 3 --ancho 4
+    python manage.py calcular_costos 150101 1 --fin 5 --sin-servicios --json
+"""
+
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from gestion_forestal.catalogo import obtener_catalogo
+from gestion_forestal.motor import (
+    TASAS_CURVA_VAN_DECIMAL,
+    ParametrosCalculo,
+    SistemaSiembra,
+    calcular_costos_plan,
+)
+from gestion_forestal.plan_costos import obtener_plan
+from gestion_forestal.precios import aplicar_precio_regional
+
+
+def a_json(valor: Any) -> Any:
+    """Registros del motor (NamedTuple) como diccionarios, para json.dumps."""
+    if hasattr(valor, '_asdict'):
+        return {campo: a_json(dato) for campo, dato in valor._asdict().items()}
+    if isinstance(valor, tuple):
+        return [a_json(dato) for dato in valor]
+    return valor
+
+
+def decimal_positivo(valor: str) -> Decimal:
+    """Tipo de argparse: Decimal mayor que cero."""
+    try:
+        numero = Decimal(valor)
+    except InvalidOperation:
+        raise ValueError(valor)
+    if not numero.is_finite() or numero <= 0:
+        raise ValueError(valor)
+    return numero
+
+
+class Command(BaseCommand):
+    """Comando para calcular costos con el motor desde la línea de comandos."""
+
+    help = 'Calcula los costos de una plantación para un distrito y un cultivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('distrito', type=str, help='UBIGEO del distrito')
+        parser.add_argument('cultivo', type=int, help='ID del cultivo')
+        parser.add_argument('--hectareas', type=decimal_positivo, default=Decimal('1.00'))
+        parser.add_argument('--jornal', type=decimal_positivo, help='Costo del jornal (default: zona)')
+        parser.add_argument('--planton', type=decimal_positivo, help='Costo del plantón (default: zona)')
+        parser.add_argument(
+            '--sistema',
+            choices=[codigo for codigo, _ in SistemaSiembra.CHOICES],
+            default=SistemaSiembra.CUADRADO,
+        )
+        parser.add_argument('--largo', type=decimal_positivo, default=Decimal('3.00'))
+        parser.add_argument('--ancho', type=decimal_positivo, help='Solo para RECTANGULAR')
+        parser.add_argument('--inicio', type=int, default=0, help='Año inicial (default: 0)')
+        parser.add_argument('--fin', type=int, default=20, help='Año final (default: 20)')
+        parser.add_argument(
+            '--sin-servicios',
+            action='store_true',
+            help='Excluir servicios, costos legales y activos',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Imprimir el resultado completo en JSON',
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta el cálculo."""
+        catalogo = obtener_catalogo()
+        distrito = catalogo.distritos.get(options['distrito'])
+        if distrito is None:
+            raise CommandError(f"Distrito con UBIGEO {options['distrito']} no encontrado.")
+        plan = obtener_plan(options['cultivo'], distrito.zona_economica_id)
+        if plan is None:
+            raise CommandError(f"Cultivo con ID {options['cultivo']} no encontrado.")
+        plan = aplicar_precio_regional(plan, distrito.departamento)
+
+        zona = catalogo.zonas.get(distrito.zona_economica_id)
+        jornal = options['jornal'] or (zona.costo_jornal_referencial if zona else None)
+        planton = options['planton'] or (zona.costo_planton_referencial if zona else None)
+        if jornal is None or planton is None:
+            raise CommandError('El distrito no tiene zona económica: indique --jornal y --planton.')
+
+        parametros = ParametrosCalculo(
+            hectareas=options['hectareas'],
+            costo_jornal=jornal,
+            costo_planton=planton,
+            anio_inicio=options['inicio'],
+            anio_fin=options['fin'],
+            sistema_siembra=options['sistema'],
+            distanciamiento_largo=options['largo'],
+            distanciamiento_ancho=options['ancho'],
+            incluir_servicios=not options['sin_servicios'],
+        )
+        try:
+            resultado = calcular_costos_plan(plan, distrito.calcular_factor_pendiente(), parametros)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            datos = a_json(resultado)
+            datos['curva_van'] = [
+                {'tasa': tasa, 'van': van}
+                for tasa, van in zip(TASAS_CURVA_VAN_DECIMAL, resultado.curva_van)
+            ]
+            self.stdout.write(json.dumps(datos, default=str, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(
+            f'🌳 {resultado.cultivo} en {distrito.nombre} ({distrito.cod_ubigeo}), '
+            f'{resultado.hectareas} ha\n'
+            f'   Factor pendiente: {resultado.factor_pendiente} | '
+            f'Factor densidad: {resultado.factor_densidad} '
+            f'({resultado.densidad_usuario} plantas/ha)\n'
+            f'   Jornal: S/ {resultado.costo_jornal_usado} | Plantón: S/ {resultado.costo_planton_usado} | '
+            f'Madera: S/ {resultado.precio_madera_usado} ({resultado.fuente_precio_madera})'
+        )
+        self.stdout.write('   Año   Mano de obra      Insumos    Servicios        Total')
+        anuales = ([resultado.costos_instalacion] if resultado.costos_instalacion else [])
+        for costo in anuales + list(resultado.resumen_anual):
+            self.stdout.write(
+                f'   {costo.anio:>3} {costo.mano_obra:>14} {costo.insumos:>12} '
+                f'{costo.servicios:>12} {costo.total:>12}'
+            )
+
+        tir = f'{resultado.tir} %' if resultado.tir is not None else resultado.tir_diagnostico
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Costo total: S/ {resultado.costo_total_proyecto} | '
+            f'Ingreso: S/ {resultado.ingreso_total_estimado} | VAN: S/ {resultado.van} | '
+            f'TIR: {tir} | B/C: {resultado.ratio_beneficio_costo}'
+        ))
@@ -0,0 +1,135 @@
+"""
+Comando para generar la pirámide de simplificación de las capas de límites.
+
+Para DEPARTAMENTOS, PROVINCIAS y DISTRITOS genera una versión por cada
+nivel de zoom de simplificacion.NIVELES (Visvalingam por arco, con la
+topología preservada, y cuantizada a medio píxel) más la topología
+completa, con variantes .gz/.br, y un índice con vértices y tamaños por
+nivel. Al terminar muestra la tabla comparativa de cada capa.
+
+Uso:
+    python manage.py generar_niveles_topojson
+    python manage.py generar_niveles_topojson --output /ruta/niveles
+"""
+
+import os
+import time
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from gestion_forestal.recortes import (
+    CAPAS_RECORTE,
+    EXTENSION,
+    escribir_artefacto,
+    hash_contenido,
+    limpiar_artefactos,
+    serializar,
+    variantes_comprimidas,
+)
+from gestion_forestal.simplificacion import (
+    NIVELES,
+    NOMBRE_INDICE_NIVELES,
+    PiramideTopologia,
+    contar_vertices,
+)
+from gestion_forestal.topologia import cargar_topologia
+
+
+class Command(BaseCommand):
+    """Comando para generar los niveles simplificados y su índice."""
+
+    help = 'Genera versiones simplificadas por zoom de las capas TopoJSON, con índice y benchmark'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--geo-dir',
+            type=str,
+            default=str(settings.GEO_DIR),
+            help='Directorio de las capas TopoJSON (default: settings.GEO_DIR)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=str(settings.GEO_NIVELES_DIR),
+            help='Directorio de salida (default: settings.GEO_NIVELES_DIR)'
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta la generación de niveles."""
+        geo_dir = options['geo_dir']
+        salida = options['output']
+        inicio = time.perf_counter()
+
+        self.stdout.write('='*60)
+        self.stdout.write('🗺️  Generando pirámide de simplificación...')
+        self.stdout.write('='*60)
+
+        indice = {'capas': {}}
+        escritos = 0
+
+        for nombre_capa, capa in CAPAS_RECORTE.items():
+            ruta_capa = os.path.join(geo_dir, capa.archivo)
+            if not os.path.exists(ruta_capa):
+                self.stderr.write(self.style.WARNING(f'   ⚠️ Capa no encontrada, se omite: {ruta_capa}'))
+                continue
+
+            t0 = time.perf_counter()
+            topologia = cargar_topologia(ruta_capa)
+            piramide = PiramideTopologia(topologia)
+            self.stdout.write(
+                f'\n📐 {nombre_capa}: áreas de Visvalingam en {time.perf_counter() - t0:.1f} s'
+            )
+
+            versiones = [(nivel.zoom_max, piramide.nivel(nivel)) for nivel in NIVELES]
+            versiones.append((None, topologia))
+
+            niveles = []
+            for zoom_max, version in versiones:
+                datos = serializar(version)
+                variantes = variantes_comprimidas(datos)
+                nombre = f'z{zoom_max}' if zoom_max is not None else 'completo'
+                relativa = f'{nombre_capa.lower()}/{nombre}.{hash_contenido(datos)}{EXTENSION}'
+                escritos += escribir_artefacto(salida, relativa, datos, variantes)
+                niveles.append({
+                    'zoom_max': zoom_max,
+                    'archivo': relativa,
+                    'vertices': contar_vertices(version),
+                    'bytes': len(datos),
+                    'bytes_gzip': len(variantes['.gz']),
+                })
+
+            indice['capas'][nombre_capa] = {
+                'objeto': next(iter(topologia['objects'])),
+                'niveles': niveles,
+            }
+            self._tabla(niveles)
+
+        # El índice se identifica por el conjunto de niveles que publica
+        indice['version'] = hash_contenido(serializar(indice['capas']))
+        escribir_artefacto(salida, NOMBRE_INDICE_NIVELES, serializar(indice), {}, reemplazar=True)
+        eliminados = limpiar_artefactos(
+            salida,
+            (n['archivo'] for capa in indice['capas'].values() for n in capa['niveles']),
+            NOMBRE_INDICE_NIVELES
+        )
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('✅ Niveles generados!'))
+        self.stdout.write('='*60)
+        self.stdout.write(f'''
+📊 Resumen:
+   • Archivos nuevos: {escritos}, obsoletos eliminados: {eliminados}
+   • Índice: {os.path.join(salida, NOMBRE_INDICE_NIVELES)} (versión {indice['version']})
+   • Tiempo: {segundos:.1f} s''')
+
+    def _tabla(self, niveles: list) -> None:
+        """Muestra vértices y tamaños de cada nivel frente a la topología completa."""
+        completo = niveles[-1]
+        self.stdout.write(f"   {'Nivel':<10}{'Vértices':>10}{'%':>7}{'JSON (KB)':>12}{'gzip (KB)':>12}")
+        for nivel in niveles:
+            nombre = f"z≤{nivel['zoom_max']}" if nivel['zoom_max'] is not None else 'completo'
+            self.stdout.write(
+                f"   {nombre:<10}{nivel['vertices']:>10,}"
+                f"{100 * nivel['vertices'] / completo['vertices']:>6.1f}%"
+                f"{nivel['bytes'] / 1024:>12,.0f}{nivel['bytes_gzip'] / 1024:>12,.0f}"
+            )
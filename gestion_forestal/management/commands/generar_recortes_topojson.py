@@ -0,0 +1,122 @@
+"""
+Comando para generar los recortes TopoJSON por departamento y provincia.
+
+Divide DEPARTAMENTOS, PROVINCIAS y DISTRITOS (frontend/public/geo) en
+topologías parciales con los arcos compartidos preservados (ver
+recortes.py), escribe cada una con su hash en el nombre y variantes .gz
+(y .br con el módulo brotli) y publica un manifiesto. Se ejecuta al
+construir la imagen; los archivos que ya existen no se reescriben y los
+que dejaron de estar en el manifiesto se eliminan.
+
+Uso:
+    python manage.py generar_recortes_topojson
+    python manage.py generar_recortes_topojson --output /ruta/recortes
+"""
+
+import os
+import time
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from gestion_forestal.recortes import (
+    CAPAS_RECORTE,
+    NOMBRE_MANIFIESTO,
+    brotli,
+    claves_recorte,
+    escribir_artefacto,
+    hash_contenido,
+    limpiar_artefactos,
+    recortar_topologia,
+    ruta_recorte,
+    seleccion_clave,
+    serializar,
+    variantes_comprimidas,
+)
+from gestion_forestal.topologia import cargar_topologia
+
+
+class Command(BaseCommand):
+    """Comando para generar los recortes TopoJSON y su manifiesto."""
+
+    help = 'Genera recortes TopoJSON por departamento y provincia, precomprimidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--geo-dir',
+            type=str,
+            default=str(settings.GEO_DIR),
+            help='Directorio de las capas TopoJSON (default: settings.GEO_DIR)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=str(settings.GEO_RECORTES_DIR),
+            help='Directorio de salida (default: settings.GEO_RECORTES_DIR)'
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta la generación de recortes."""
+        geo_dir = options['geo_dir']
+        salida = options['output']
+        inicio = time.perf_counter()
+
+        self.stdout.write('='*60)
+        self.stdout.write('🗺️  Generando recortes TopoJSON...')
+        self.stdout.write('='*60 + '\n')
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('   ⚠️ Módulo brotli no instalado: solo variantes .gz'))
+
+        manifiesto = {'capas': {}}
+        escritos = 0
+        bytes_json = 0
+        bytes_gzip = 0
+
+        for nombre_capa, capa in CAPAS_RECORTE.items():
+            ruta_capa = os.path.join(geo_dir, capa.archivo)
+            if not os.path.exists(ruta_capa):
+                self.stderr.write(self.style.WARNING(f'   ⚠️ Capa no encontrada, se omite: {ruta_capa}'))
+                continue
+
+            topologia = cargar_topologia(ruta_capa)
+            recortes = {}
+            for clave in claves_recorte(topologia, capa):
+                recorte = recortar_topologia(topologia, seleccion_clave(capa, clave))
+                if recorte is None:
+                    continue
+
+                datos = serializar(recorte)
+                relativa = ruta_recorte(nombre_capa, clave, hash_contenido(datos))
+                variantes = variantes_comprimidas(datos)
+                escritos += escribir_artefacto(salida, relativa, datos, variantes)
+                recortes['/'.join(clave)] = relativa
+                bytes_json += len(datos)
+                bytes_gzip += len(variantes['.gz'])
+
+            manifiesto['capas'][nombre_capa] = {
+                'objeto': next(iter(topologia['objects'])),
+                'recortes': recortes,
+            }
+            self.stdout.write(
+                f'   ✓ {nombre_capa}: {len(recortes)} recortes '
+                f'(archivo completo {os.path.getsize(ruta_capa) / 1e6:.1f} MB)'
+            )
+
+        # El manifiesto se identifica por el conjunto de recortes que publica
+        manifiesto['version'] = hash_contenido(serializar(manifiesto['capas']))
+        escribir_artefacto(salida, NOMBRE_MANIFIESTO, serializar(manifiesto), {}, reemplazar=True)
+        eliminados = limpiar_artefactos(
+            salida,
+            (r for capa in manifiesto['capas'].values() for r in capa['recortes'].values()),
+            NOMBRE_MANIFIESTO
+        )
+
+        segundos = time.perf_counter() - inicio
+        total = sum(len(c['recortes']) for c in manifiesto['capas'].values())
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('✅ Recortes generados!'))
+        self.stdout.write('='*60)
+        self.stdout.write(f'''
+📊 Resumen:
+   • Recortes: {total} (nuevos: {escritos}, obsoletos eliminados: {eliminados})
+   • Tamaño JSON: {bytes_json / 1e6:.1f} MB, gzip: {bytes_gzip / 1e6:.1f} MB
+   • Manifiesto: {os.path.join(salida, NOMBRE_MANIFIESTO)} (versión {manifiesto['version']})
+   • Tiempo: {segundos:.1f} s''')
@@ -7,15 +7,29 @@ de Zonas Económicas y Distritos correspondientes.
 Formato esperado del CSV:
 UBIGEO,NOM_DEP,NOM_PROV,NOM_DIST,COD_REG_NAT,REGION NATURAL
 
+Los distritos existentes solo se actualizan si cambió algún campo del
+CSV y conservan sus coordenadas; todo ocurre en una transacción.
+Si el CSV y la configuración de zonas no cambiaron desde la última
+importación (misma huella SHA-256), el comando termina sin leer el CSV.
+
 Uso:
     python manage.py import_distritos
+    python manage.py import_distritos --dry-run
+    python manage.py import_distritos --force
 """
 
 import csv
 import os
+import time
+from collections import defaultdict
+from typing import Dict, Tuple
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.db import transaction
 from decimal import Decimal
+from gestion_forestal.huellas import carga_vigente, huella_datos, registrar_carga
+from gestion_forestal.catalogo import invalidar_catalogo
+from gestion_forestal.indice_espacial import invalidar_indice
 from gestion_forestal.models import ZonaEconomica, Distrito
 
 
@@ -56,6 +70,20 @@ PENDIENTES_POR_REGION = {
 }
 
 
+# Coordenadas placeholder para distritos nuevos (luego: import_coords_topojson)
+LATITUD_PLACEHOLDER = Decimal('-9.0')
+LONGITUD_PLACEHOLDER = Decimal('-76.0')
+
+# Campos que el CSV define; las coordenadas existentes nunca se sobrescriben
+CAMPOS_CSV = (
+    'nombre',
+    'departamento',
+    'provincia',
+    'zona_economica_id',
+    'pendiente_promedio_estimada',
+)
+
+
 class Command(BaseCommand):
     """Comando para importar distritos desde CSV."""
     
@@ -68,10 +96,22 @@ class Command(BaseCommand):
             default=os.path.join(settings.BASE_DIR, 'gestion_forestal', 'fixtures', 'UBIGEO_DISTRITOS.csv'),
             help='Ruta al archivo CSV (default: gestion_forestal/fixtures/UBIGEO_DISTRITOS.csv)'
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Muestra las diferencias con la base de datos sin guardar cambios'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Importa aunque el CSV no haya cambiado desde la última importación'
+        )
     
     def handle(self, *args, **options):
         """Ejecuta la importación de distritos."""
         csv_path = options['file']
+        dry_run = options['dry_run']
+        inicio = time.perf_counter()
         
         # Validar archivo
         if not os.path.exists(csv_path):
@@ -80,38 +120,163 @@ class Command(BaseCommand):
             )
             return
         
+        # Huella del CSV y de la configuración que define zonas y pendientes
+        huella = huella_datos(
+            REGION_TO_ZONA, ZONAS_CONFIG, PENDIENTES_POR_REGION, ruta=csv_path
+        )
+        if not (dry_run or options['force']) and carga_vigente('import_distritos', huella):
+            self.stdout.write(
+                '✓ import_distritos: CSV sin cambios, nada que importar (usar --force para reimportar)'
+            )
+            return
+        
         self.stdout.write('='*60)
         self.stdout.write('🗺️  Importando distritos desde CSV...')
+        if dry_run:
+            self.stdout.write(self.style.WARNING('   (dry-run: no se guardará ningún cambio)'))
         self.stdout.write('='*60 + '\n')
         
-        # =====================================================
-        # 1. CREAR ZONAS ECONÓMICAS
-        # =====================================================
+        # Leer todo el CSV en memoria antes de tocar la base de datos
+        filas, errores, por_departamento = self._leer_csv(csv_path)
         
-        self.stdout.write('📍 Creando/Actualizando Zonas Económicas...')
-        zonas_cache = {}
+        # Una sola transacción; en dry-run se revierte al final
+        with transaction.atomic():
+            
+            # =====================================================
+            # 1. CREAR ZONAS ECONÓMICAS
+            # =====================================================
+            
+            self.stdout.write('📍 Creando/Actualizando Zonas Económicas...')
+            zonas_cache = {}
+            
+            for nombre, config in ZONAS_CONFIG.items():
+                zona, created = ZonaEconomica.objects.update_or_create(
+                    nombre=nombre,
+                    defaults=config
+                )
+                zonas_cache[nombre] = zona
+                status = '✨' if created else '✓'
+                self.stdout.write(
+                    f"   {status} {nombre} (Jornal: S/ {config['costo_jornal_referencial']})"
+                )
+            
+            # =====================================================
+            # 2. COMPARAR CON LOS DISTRITOS EXISTENTES
+            # =====================================================
+            
+            self.stdout.write('\n🏘️  Comparando distritos...')
+            
+            existentes = Distrito.objects.in_bulk(field_name='cod_ubigeo')
+            nuevos = []
+            modificados = []
+            campos_modificados = set()
+            cambios = []
+            
+            for cod_ubigeo, fila in filas.items():
+                valores = {
+                    'nombre': fila['nombre'],
+                    'departamento': fila['departamento'],
+                    'provincia': fila['provincia'],
+                    'zona_economica_id': zonas_cache[fila['zona']].id,
+                    'pendiente_promedio_estimada': fila['pendiente'],
+                }
+                
+                actual = existentes.get(cod_ubigeo)
+                if actual is None:
+                    nuevos.append(Distrito(
+                        cod_ubigeo=cod_ubigeo,
+                        latitud=LATITUD_PLACEHOLDER,
+                        longitud=LONGITUD_PLACEHOLDER,
+                        **valores
+                    ))
+                    continue
+                
+                diferencias = [
+                    campo for campo in CAMPOS_CSV
+                    if getattr(actual, campo) != valores[campo]
+                ]
+                if diferencias:
+                    for campo in diferencias:
+                        setattr(actual, campo, valores[campo])
+                    modificados.append(actual)
+                    campos_modificados.update(diferencias)
+                    cambios.append((cod_ubigeo, actual.nombre, diferencias))
+            
+            # =====================================================
+            # 3. GUARDAR EN BLOQUE
+            # =====================================================
+            
+            if nuevos:
+                Distrito.objects.bulk_create(nuevos, batch_size=500)
+            if modificados:
+                Distrito.objects.bulk_update(
+                    modificados, sorted(campos_modificados), batch_size=500
+                )
+            
+            if dry_run:
+                transaction.set_rollback(True)
+            else:
+                registrar_carga('import_distritos', huella)
         
-        for nombre, config in ZONAS_CONFIG.items():
-            zona, created = ZonaEconomica.objects.update_or_create(
-                nombre=nombre,
-                defaults=config
-            )
-            zonas_cache[nombre] = zona
-            status = '✨' if created else '✓'
-            self.stdout.write(
-                f"   {status} {nombre} (Jornal: S/ {config['costo_jornal_referencial']})"
-            )
+        # Las operaciones en bloque no emiten señales
+        if not dry_run and (nuevos or modificados):
+            invalidar_indice()
+            invalidar_catalogo()
         
         # =====================================================
-        # 2. IMPORTAR DISTRITOS
+        # RESUMEN
         # =====================================================
         
-        self.stdout.write('\n🏘️  Importando distritos...')
+        sin_cambios = len(filas) - len(nuevos) - len(modificados)
+        segundos = time.perf_counter() - inicio
+        
+        self.stdout.write('\n' + '='*60)
+        if dry_run:
+            self.stdout.write(self.style.WARNING('🔎 Dry-run completado (sin cambios guardados)'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Importación completada!'))
+        self.stdout.write('='*60)
+        
+        self.stdout.write(f'''
+📊 Resumen:
+   • Distritos creados: {len(nuevos)}
+   • Distritos actualizados: {len(modificados)}
+   • Distritos sin cambios: {sin_cambios}
+   • Errores: {errores}
+   • Total procesados: {len(filas)}
+   • Tiempo: {segundos:.1f} s''')
+        
+        if dry_run and (nuevos or cambios):
+            self.stdout.write('\n🔎 Diferencias:')
+            for distrito in nuevos[:20]:
+                self.stdout.write(f'   + {distrito.cod_ubigeo} {distrito.nombre}')
+            for cod_ubigeo, nombre, diferencias in cambios[:20]:
+                self.stdout.write(f"   ~ {cod_ubigeo} {nombre}: {', '.join(diferencias)}")
+            restantes = max(0, len(nuevos) - 20) + max(0, len(cambios) - 20)
+            if restantes:
+                self.stdout.write(f'   … y {restantes} más')
         
-        creados = 0
-        actualizados = 0
+        self.stdout.write('\n🗺️  Por departamento:')
+        for depto, count in sorted(por_departamento.items()):
+            self.stdout.write(f'   • {depto}: {count} distritos')
+        
+        self.stdout.write(f'''
+📡 API disponible en:
+   GET /api/distritos/           → Lista todos los distritos
+   GET /api/distritos/?departamento=SAN MARTIN → Filtrar por departamento
+   GET /api/distritos/?provincia=TOCACHE → Filtrar por provincia
+''')
+    
+    def _leer_csv(self, csv_path: str) -> Tuple[Dict[str, Dict], int, Dict[str, int]]:
+        """
+        Lee y normaliza las filas del CSV.
+        
+        Returns:
+            Tuple: (filas por UBIGEO, número de errores, conteo por departamento).
+        """
+        filas = {}
         errores = 0
-        por_departamento = {}
+        por_departamento = defaultdict(int)
         
         with open(csv_path, 'r', encoding='utf-8-sig') as f:
             reader = csv.DictReader(f)
@@ -140,66 +305,20 @@ class Command(BaseCommand):
                         errores += 1
                         continue
                     
-                    zona = zonas_cache[zona_nombre]
-                    
-                    # Pendiente estimada por región
-                    pendiente = PENDIENTES_POR_REGION.get(region_natural, 20)
-                    
-                    # Coordenadas placeholder
-                    lat = Decimal('-9.0')
-                    lon = Decimal('-76.0')
-                    
-                    # Crear/Actualizar distrito
-                    distrito_obj, created = Distrito.objects.update_or_create(
-                        cod_ubigeo=cod_ubigeo,
-                        defaults={
-                            'nombre': distrito,
-                            'departamento': departamento,
-                            'provincia': provincia,
-                            'zona_economica': zona,
-                            'latitud': lat,
-                            'longitud': lon,
-                            'pendiente_promedio_estimada': pendiente,
-                        }
-                    )
-                    
-                    if created:
-                        creados += 1
-                    else:
-                        actualizados += 1
+                    filas[cod_ubigeo] = {
+                        'nombre': distrito,
+                        'departamento': departamento,
+                        'provincia': provincia,
+                        'zona': zona_nombre,
+                        # Pendiente estimada por región
+                        'pendiente': PENDIENTES_POR_REGION.get(region_natural, 20),
+                    }
                     
                     # Contador por departamento
-                    if departamento not in por_departamento:
-                        por_departamento[departamento] = 0
                     por_departamento[departamento] += 1
                     
                 except Exception as e:
                     self.stderr.write(f"   ❌ Error en fila: {row} - {e}")
                     errores += 1
         
-        # =====================================================
-        # RESUMEN
-        # =====================================================
-        
-        self.stdout.write('\n' + '='*60)
-        self.stdout.write(self.style.SUCCESS('✅ Importación completada!'))
-        self.stdout.write('='*60)
-        
-        self.stdout.write(f'''
-📊 Resumen:
-   • Distritos creados: {creados}
-   • Distritos actualizados: {actualizados}
-   • Errores: {errores}
-   • Total procesados: {creados + actualizados}
-
-🗺️  Por departamento:''')
-        
-        for depto, count in sorted(por_departamento.items()):
-            self.stdout.write(f'   • {depto}: {count} distritos')
-        
-        self.stdout.write(f'''
-📡 API disponible en:
-   GET /api/distritos/           → Lista todos los distritos
-   GET /api/distritos/?departamento=SAN MARTIN → Filtrar por departamento
-   GET /api/distritos/?provincia=TOCACHE → Filtrar por provincia
-''')
+        return filas, errores, dict(por_departamento)
@@ -0,0 +1,176 @@
+"""
+Comando para importar la base de precios de productos forestales.
+
+Lee data/4.1.4.BD_PRECIOS_MADERAS.csv fila por fila (sin cargarlo
+entero en memoria), normaliza especie, producto, unidad y mes (ver
+precios.py) y guarda las observaciones con bulk_create en bloques.
+
+Modos:
+- Completo (por defecto): reemplaza todas las observaciones en una
+  transacción. Se omite si el CSV no cambió desde la última carga.
+- Incremental: solo agrega las filas cuyo ID aún no está en la BD.
+
+Uso:
+    python manage.py import_precios_madera
+    python manage.py import_precios_madera --incremental
+    python manage.py import_precios_madera --force
+"""
+
+import csv
+import os
+import time
+from itertools import islice
+from typing import Iterator, Set
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import transaction
+from gestion_forestal.huellas import carga_vigente, huella_datos, registrar_carga
+from gestion_forestal.models import ObservacionPrecio
+from gestion_forestal.precios import (
+    ALIAS_ESPECIES,
+    ALIAS_UNIDADES,
+    COLUMNAS_CSV,
+    MESES,
+    observacion_desde_fila,
+)
+
+
+# Filas por cada bulk_create
+TAMANO_LOTE = 2000
+
+# Errores de fila que se muestran en detalle
+MAX_ERRORES_DETALLE = 10
+
+
+class Command(BaseCommand):
+    """Comando para importar observaciones de precios desde CSV."""
+
+    help = 'Importa la base de precios de madera (4.1.4.BD_PRECIOS_MADERAS.csv)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            default=os.path.join(settings.BASE_DIR, 'data', '4.1.4.BD_PRECIOS_MADERAS.csv'),
+            help='Ruta al archivo CSV (default: data/4.1.4.BD_PRECIOS_MADERAS.csv)'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Solo agrega las filas con IDs nuevos, sin borrar las existentes'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TAMANO_LOTE,
+            help=f'Filas por bulk_create (default: {TAMANO_LOTE})'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recarga aunque el CSV no haya cambiado desde la última importación'
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta la importación de precios."""
+        csv_path = options['file']
+        incremental = options['incremental']
+        tamano_lote = max(1, options['batch_size'])
+        inicio = time.perf_counter()
+
+        if not os.path.exists(csv_path):
+            self.stderr.write(self.style.ERROR(f'❌ Archivo no encontrado: {csv_path}'))
+            return
+
+        # Huella del CSV y de las tablas de normalización
+        huella = huella_datos(MESES, ALIAS_ESPECIES, ALIAS_UNIDADES, ruta=csv_path)
+        if not options['force'] and carga_vigente('import_precios_madera', huella):
+            self.stdout.write(
+                '✓ import_precios_madera: CSV sin cambios, nada que importar (usar --force para reimportar)'
+            )
+            return
+
+        # Validar columnas antes de borrar nada
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            faltantes = set(COLUMNAS_CSV) - set(csv.DictReader(f).fieldnames or [])
+        if faltantes:
+            self.stderr.write(self.style.ERROR(
+                f"❌ Columnas faltantes en el CSV: {', '.join(sorted(faltantes))}"
+            ))
+            return
+
+        self.stdout.write('='*60)
+        modo = 'incremental' if incremental else 'completa'
+        self.stdout.write(f'🌳 Importando precios de madera (carga {modo})...')
+        self.stdout.write('='*60 + '\n')
+
+        self._errores = 0
+
+        with transaction.atomic():
+            if incremental:
+                existentes = set(ObservacionPrecio.objects.values_list('id_origen', flat=True))
+                self.stdout.write(f'   Observaciones existentes: {len(existentes)}')
+            else:
+                borradas, _ = ObservacionPrecio.objects.all().delete()
+                existentes = set()
+                self.stdout.write(f'   Observaciones anteriores eliminadas: {borradas}')
+
+            observaciones = self._leer_csv(csv_path, existentes)
+            creadas = 0
+            while True:
+                lote = list(islice(observaciones, tamano_lote))
+                if not lote:
+                    break
+                ObservacionPrecio.objects.bulk_create(lote)
+                creadas += len(lote)
+                self.stdout.write(f'   … {creadas} observaciones guardadas')
+
+            registrar_carga('import_precios_madera', huella)
+
+        # =====================================================
+        # RESUMEN
+        # =====================================================
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('✅ Importación de precios completada!'))
+        self.stdout.write('='*60)
+        self.stdout.write(f'''
+📊 Resumen:
+   • Observaciones nuevas: {creadas}
+   • IDs ya existentes (omitidos): {self._omitidas}
+   • Filas con errores: {self._errores}
+   • Total en la BD: {ObservacionPrecio.objects.count()}
+   • Tiempo: {segundos:.1f} s
+
+👉 Recalcular los precios regionales: python manage.py actualizar_estadisticas_precios''')
+
+    def _leer_csv(self, csv_path: str, omitir: Set[int]) -> Iterator[ObservacionPrecio]:
+        """
+        Recorre el CSV y produce las observaciones normalizadas.
+
+        Args:
+            csv_path: Ruta al CSV.
+            omitir: IDs de origen que ya están en la base de datos.
+
+        Yields:
+            ObservacionPrecio: Observaciones sin guardar, en el orden del CSV.
+        """
+        self._omitidas = 0
+        vistos = set()
+
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for linea, fila in enumerate(csv.DictReader(f), start=2):
+                try:
+                    observacion = observacion_desde_fila(fila)
+                except (ValueError, TypeError) as e:
+                    self._errores += 1
+                    if self._errores <= MAX_ERRORES_DETALLE:
+                        self.stderr.write(self.style.WARNING(f'   ⚠️ Línea {linea}: {e}'))
+                    continue
+
+                if observacion.id_origen in omitir or observacion.id_origen in vistos:
+                    self._omitidas += 1
+                    continue
+                vistos.add(observacion.id_origen)
+                yield observacion
@@ -9,10 +9,13 @@ Incluye 4 especies forestales con paquetes tecnológicos diferenciados:
 
 Uso:
     python manage.py seed_data
+    python manage.py seed_data --force  # Recarga aunque los datos no cambiaron
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from decimal import Decimal
+from gestion_forestal.huellas import carga_vigente, huella_datos, registrar_carga
 from gestion_forestal.models import (
     ZonaEconomica,
     Distrito,
@@ -21,6 +24,25 @@ from gestion_forestal.models import (
 )
 
 
+# =====================================================
+# ZONA Y DISTRITO DE PRUEBA
+# =====================================================
+
+ZONA_PRUEBA = {
+    'nombre': 'Selva Alta',
+    'costo_jornal_referencial': Decimal('50.00'),
+    'costo_planton_referencial': Decimal('0.80'),
+}
+
+DISTRITO_PRUEBA = {
+    'cod_ubigeo': '220903',
+    'nombre': 'Uchiza',
+    'latitud': Decimal('-8.4600000'),
+    'longitud': Decimal('-76.4600000'),
+    'pendiente_promedio_estimada': 20,
+}
+
+
 # =====================================================
 # DEFINICIÓN DE ESPECIES FORESTALES
 # =====================================================
@@ -271,13 +293,51 @@ def generar_actividades_base(cultivo_nombre, costo_planton):
     return actividades
 
 
+def nombre_base(nombre: str) -> str:
+    """Nombre del cultivo sin el paréntesis (ej: "Pino (Pinus ...)" -> "Pino")."""
+    return nombre.split(' (')[0]
+
+
+def huella_seed() -> str:
+    """
+    Huella de todo lo que escribe el comando.
+
+    Incluye las actividades generadas (no solo ESPECIES), así un cambio
+    en generar_actividades_base también fuerza la recarga.
+    """
+    actividades = [
+        generar_actividades_base(nombre_base(e['nombre']), e['costo_planton'])
+        for e in ESPECIES
+    ]
+    return huella_datos(ZONA_PRUEBA, DISTRITO_PRUEBA, ESPECIES, actividades)
+
+
 class Command(BaseCommand):
     """Comando para cargar datos de prueba multi-especie."""
     
     help = 'Carga datos de prueba v2.2: 4 especies forestales con paquetes tecnológicos'
     
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recarga aunque los datos de origen no hayan cambiado'
+        )
+    
     def handle(self, *args, **options):
         """Ejecuta la carga de datos."""
+        huella = huella_seed()
+        if not options['force'] and carga_vigente('seed_data', huella):
+            self.stdout.write('✓ seed_data: datos sin cambios, nada que cargar (usar --force para recargar)')
+            return
+        
+        # La huella se registra en la misma transacción que los datos
+        with transaction.atomic():
+            self._cargar()
+            registrar_carga('seed_data', huella)
+    
+    def _cargar(self):
+        """Crea o actualiza zona, distrito, cultivos y paquetes de prueba."""
         self.stdout.write('='*60)
         self.stdout.write('🌲 Iniciando carga de datos v1.0 (Producción)...')
         self.stdout.write('='*60 + '\n')
@@ -287,10 +347,10 @@ class Command(BaseCommand):
         # =====================================================
         
         zona, created = ZonaEconomica.objects.update_or_create(
-            nombre='Selva Alta',
+            nombre=ZONA_PRUEBA['nombre'],
             defaults={
-                'costo_jornal_referencial': Decimal('50.00'),
-                'costo_planton_referencial': Decimal('0.80'),
+                'costo_jornal_referencial': ZONA_PRUEBA['costo_jornal_referencial'],
+                'costo_planton_referencial': ZONA_PRUEBA['costo_planton_referencial'],
             }
         )
         status = '✨ creada' if created else '✓ actualizada'
@@ -301,13 +361,13 @@ class Command(BaseCommand):
         # =====================================================
         
         distrito, created = Distrito.objects.update_or_create(
-            cod_ubigeo='220903',
+            cod_ubigeo=DISTRITO_PRUEBA['cod_ubigeo'],
             defaults={
-                'nombre': 'Uchiza',
+                'nombre': DISTRITO_PRUEBA['nombre'],
                 'zona_economica': zona,
-                'latitud': Decimal('-8.4600000'),
-                'longitud': Decimal('-76.4600000'),
-                'pendiente_promedio_estimada': 20,
+                'latitud': DISTRITO_PRUEBA['latitud'],
+                'longitud': DISTRITO_PRUEBA['longitud'],
+                'pendiente_promedio_estimada': DISTRITO_PRUEBA['pendiente_promedio_estimada'],
             }
         )
         status = '✨ creado' if created else '✓ actualizado'
@@ -346,7 +406,7 @@ class Command(BaseCommand):
         
         for cultivo, costo_planton in cultivos_creados:
             actividades = generar_actividades_base(
-                cultivo.nombre.split(' (')[0],  # Quitar paréntesis del nombre
+                nombre_base(cultivo.nombre),  # Quitar paréntesis del nombre
                 costo_planton
             )
             
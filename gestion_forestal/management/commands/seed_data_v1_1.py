@@ -2,12 +2,25 @@
 Comando para poblar la base de datos con datos CALIBRADOS v2.1.
 Basado en PROMPT_MAESTRO.md Tables 1 & 2.
 
+Los paquetes se generan primero en memoria y cada combinación
+(cultivo, zona) se reemplaza con un solo bulk_create. Toda la carga
+ocurre en una transacción: las consultas de costos ven los paquetes
+anteriores o los nuevos, nunca una mezcla.
+
 Ejecuta:
     python manage.py seed_data_v1_1
+    python manage.py seed_data_v1_1 --force  # Recarga aunque las tablas no cambiaron
 """
 
+import time
+from typing import List
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from decimal import Decimal
+from gestion_forestal.catalogo import borrar_sin_senales, invalidar_catalogo
+from gestion_forestal.huellas import carga_vigente, huella_datos, registrar_carga
+from gestion_forestal.indice_espacial import invalidar_indice
+from gestion_forestal.plan_costos import invalidar_planes
 from gestion_forestal.models import (
     ZonaEconomica,
     Distrito,
@@ -57,12 +70,136 @@ COEFICIENTES_DATA = [
     (20, 'MADRE DE DIOS', 'Castaña (Injerto)', 'RECTANGULO', 7, 7, 15.0, 60, 1500, 0.15),
 ]
 
+
+def generar_paquetes(cultivo, zona, param, sistema, df, dp, cost_plant, jornal_base, insumos_base, gestion) -> List[PaqueteTecnologico]:
+    """
+    Genera en memoria los paquetes de una combinación cultivo/zona.
+
+    Args:
+        cultivo: Cultivo de la fila de COEFICIENTES_DATA.
+        zona: Zona económica de la región.
+        param: ParametroMantenimiento de la región.
+        sistema, df, dp: Sistema de plantación y distanciamientos (m).
+        cost_plant, jornal_base, insumos_base, gestion: Coeficientes de la Tabla 1.
+
+    Returns:
+        List[PaqueteTecnologico]: Instancias sin guardar.
+    """
+    especie = cultivo.nombre
+    paquetes = []
+
+    # --- AÑO 0: INSTALACIÓN (Datos de Tabla 1) ---
+    
+    # Insumos (Fertilizantes etc)
+    paquetes.append(PaqueteTecnologico(
+        cultivo=cultivo, zona_economica=zona, anio_proyecto=0,
+        rubro='INSUMO', actividad='Insumos Instalación (Fertilizantes/Hidrogel)',
+        unidad_medida='Global', cantidad_tecnica=1, sensible_densidad=True,
+        costo_unitario_referencial=Decimal(insumos_base), es_planton=False
+    ))
+    
+    # Plantones
+    densidad_aprox = 10000 / (df * dp) if sistema != 'TRES_BOLILLO' else 10000 / ((df * df) * 0.866)
+    paquetes.append(PaqueteTecnologico(
+        cultivo=cultivo, zona_economica=zona, anio_proyecto=0,
+        rubro='INSUMO', actividad=f'Plantones {especie}',
+        unidad_medida='Unidad', cantidad_tecnica=Decimal(densidad_aprox), sensible_densidad=True,
+        costo_unitario_referencial=Decimal(cost_plant), es_planton=True
+    ))
+    
+    # Mano de Obra (Jornales Base de Tabla 1)
+    # Desglosamos genericamente el jornal base: 
+    # 50% Hoyado/Siembra (variable), 50% Rozo/Trazo (Fijo) -> Segun modelo
+    # Pero aqui el 'jornal_base' ya es el total. Lo dividiremos en actividades representativas.
+    
+    jornales_variables = Decimal(jornal_base) * Decimal('0.6') # Hoyado y siembra pesan mas
+    jornales_fijos = Decimal(jornal_base) * Decimal('0.4')
+    
+    paquetes.append(PaqueteTecnologico(
+        cultivo=cultivo, zona_economica=zona, anio_proyecto=0,
+        rubro='MANO_OBRA', actividad='Limpieza, Rozo y Trazo',
+        unidad_medida='Jornal', cantidad_tecnica=jornales_fijos, sensible_densidad=False,
+        costo_unitario_referencial=0
+    ))
+    paquetes.append(PaqueteTecnologico(
+        cultivo=cultivo, zona_economica=zona, anio_proyecto=0,
+        rubro='MANO_OBRA', actividad='Hoyado y Siembra',
+        unidad_medida='Jornal', cantidad_tecnica=jornales_variables, sensible_densidad=True,
+        costo_unitario_referencial=0
+    ))
+    
+    # --- AÑOS 1-20: MANTENIMIENTO (Datos de Tabla 2) ---
+    
+    # Limpieza (Años 2-5 según usuario: "mantenimiento hasta cierre de copas")
+    for anio in range(2, 6): # Años 2, 3, 4, 5
+        paquetes.append(PaqueteTecnologico(
+            cultivo=cultivo, zona_economica=zona, anio_proyecto=anio,
+            rubro='MANO_OBRA', actividad=f'Mantenimiento y Control Malezas (Año {anio})',
+            unidad_medida='Jornal', cantidad_tecnica=param.dias_limpieza, sensible_densidad=False, sensible_pendiente=True,
+            costo_unitario_referencial=0
+        ))
+    
+    # Poda (A partir del año 3 hasta el 5)
+    for anio in range(3, 6): # Años 3, 4, 5
+        paquetes.append(PaqueteTecnologico(
+            cultivo=cultivo, zona_economica=zona, anio_proyecto=anio,
+            rubro='MANO_OBRA', actividad=f'Podas y Manejo (Año {anio})',
+            unidad_medida='Jornal', cantidad_tecnica=param.dias_poda, sensible_densidad=True,
+            costo_unitario_referencial=0
+        ))
+    
+    # Gastos de Gestión (Todos los años)
+    for anio in range(0, 11): # Hasta año 10
+        paquetes.append(PaqueteTecnologico(
+            cultivo=cultivo, zona_economica=zona, anio_proyecto=anio,
+            rubro='SERVICIOS', actividad=f'Gestión y Administración {int(gestion*100)}%',
+            unidad_medida='Global', cantidad_tecnica=1,
+            # Esto es un % del costo, pero aqui lo ponemos como costo fijo aprox para simplificar el seed inicial
+            # Lo ideal seria que el backend calcule el % dinamicamente.
+            # Por ahora pondremos un monto fijo representativo: 10% de la inversion aprox
+            costo_unitario_referencial=Decimal('500.00') 
+        ))
+
+    return paquetes
+
+
 class Command(BaseCommand):
     help = 'Carga datos calibrados v2.1'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recarga aunque las tablas de origen no hayan cambiado'
+        )
+
     def handle(self, *args, **options):
+        huella = huella_datos(MANTENIMIENTO_DATA, COEFICIENTES_DATA)
+        if not options['force'] and carga_vigente('seed_data_v1_1', huella):
+            self.stdout.write('✓ seed_data_v1_1: tablas sin cambios, nada que cargar (usar --force para recargar)')
+            return
+
         self.stdout.write(self.style.WARNING('🚀 Iniciando carga de datos v2.1...'))
-        
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            paquetes = self._cargar()
+            registrar_carga('seed_data_v1_1', huella)
+
+        # Ni el borrado por combinación, ni bulk_create ni QuerySet.update
+        # emiten señales
+        invalidar_planes()
+        invalidar_indice()
+        invalidar_catalogo()
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✨ Carga v2.1 completada con éxito: {len(COEFICIENTES_DATA)} combinaciones, '
+            f'{paquetes} paquetes ({segundos:.1f} s).'
+        ))
+
+    def _cargar(self) -> int:
+        """Carga zonas, parámetros y paquetes; retorna el total de paquetes."""
         # 1. Crear Zonas Económicas y Parametros de Mantenimiento
         zonas_creadas = {}
         for reg, nivel, d_limp, d_poda, c_insumos, jornada_ref in MANTENIMIENTO_DATA:
@@ -92,101 +229,46 @@ class Command(BaseCommand):
             count_dist = Distrito.objects.filter(departamento__iexact=reg).update(zona_economica=zona)
             self.stdout.write(f"  📍 Zona {reg}: {count_dist} distritos asignados.")
 
-        # 2. Procesar Cultivos y Paquetes Tecnológicos
+        # Parámetros leídos una sola vez (valores tal como quedaron en la BD)
+        parametros = ParametroMantenimiento.objects.in_bulk(field_name='region')
+
+        # 2. Generar Cultivos y Paquetes Tecnológicos en memoria
         self.stdout.write(self.style.WARNING('\n📦 Generando Paquetes Tecnológicos Específicos...'))
         
+        cultivos = {}
+        combinaciones = []
         for idx, region, especie, sistema, df, dp, cost_plant, jornal_base, insumos_base, gestion in COEFICIENTES_DATA:
             
             zona = zonas_creadas.get(region)
             if not zona:
                 continue
 
-            # Crear/Get Cultivo
-            cultivo_obj, _ = Cultivo.objects.get_or_create(
-                nombre=especie,
-                defaults={
-                    'turno_estimado': 20, # Default generico, ajustaremos si es necesario
-                    'densidad_base': 1111 
-                }
-            )
-            
-            # Limpiar paquetes previos para este cultivo en esta zona
-            PaqueteTecnologico.objects.filter(cultivo=cultivo_obj, zona_economica=zona).delete()
-            
-            # --- AÑO 0: INSTALACIÓN (Datos de Tabla 1) ---
-            
-            # Insumos (Fertilizantes etc)
-            PaqueteTecnologico.objects.create(
-                cultivo=cultivo_obj, zona_economica=zona, anio_proyecto=0,
-                rubro='INSUMO', actividad='Insumos Instalación (Fertilizantes/Hidrogel)',
-                unidad_medida='Global', cantidad_tecnica=1, sensible_densidad=True,
-                costo_unitario_referencial=Decimal(insumos_base), es_planton=False
-            )
-            
-            # Plantones
-            densidad_aprox = 10000 / (df * dp) if sistema != 'TRES_BOLILLO' else 10000 / ((df * df) * 0.866)
-            PaqueteTecnologico.objects.create(
-                cultivo=cultivo_obj, zona_economica=zona, anio_proyecto=0,
-                rubro='INSUMO', actividad=f'Plantones {especie}',
-                unidad_medida='Unidad', cantidad_tecnica=Decimal(densidad_aprox), sensible_densidad=True,
-                costo_unitario_referencial=Decimal(cost_plant), es_planton=True
-            )
-            
-            # Mano de Obra (Jornales Base de Tabla 1)
-            # Desglosamos genericamente el jornal base: 
-            # 50% Hoyado/Siembra (variable), 50% Rozo/Trazo (Fijo) -> Segun modelo
-            # Pero aqui el 'jornal_base' ya es el total. Lo dividiremos en actividades representativas.
-            
-            jornales_variables = Decimal(jornal_base) * Decimal('0.6') # Hoyado y siembra pesan mas
-            jornales_fijos = Decimal(jornal_base) * Decimal('0.4')
-            
-            PaqueteTecnologico.objects.create(
-                cultivo=cultivo_obj, zona_economica=zona, anio_proyecto=0,
-                rubro='MANO_OBRA', actividad='Limpieza, Rozo y Trazo',
-                unidad_medida='Jornal', cantidad_tecnica=jornales_fijos, sensible_densidad=False,
-                costo_unitario_referencial=0
-            )
-            PaqueteTecnologico.objects.create(
-                cultivo=cultivo_obj, zona_economica=zona, anio_proyecto=0,
-                rubro='MANO_OBRA', actividad='Hoyado y Siembra',
-                unidad_medida='Jornal', cantidad_tecnica=jornales_variables, sensible_densidad=True,
-                costo_unitario_referencial=0
-            )
-            
-            # --- AÑOS 1-20: MANTENIMIENTO (Datos de Tabla 2) ---
-            # Recuperar param mantenimiento de la zona
-            param = ParametroMantenimiento.objects.get(region=region)
-            
-            # Limpieza (Años 2-5 según usuario: "mantenimiento hasta cierre de copas")
-            for anio in range(2, 6): # Años 2, 3, 4, 5
-                PaqueteTecnologico.objects.create(
-                    cultivo=cultivo_obj, zona_economica=zona, anio_proyecto=anio,
-                    rubro='MANO_OBRA', actividad=f'Mantenimiento y Control Malezas (Año {anio})',
-                    unidad_medida='Jornal', cantidad_tecnica=param.dias_limpieza, sensible_densidad=False, sensible_pendiente=True,
-                    costo_unitario_referencial=0
+            # Crear/Get Cultivo (una vez por especie)
+            cultivo_obj = cultivos.get(especie)
+            if cultivo_obj is None:
+                cultivo_obj, _ = Cultivo.objects.get_or_create(
+                    nombre=especie,
+                    defaults={
+                        'turno_estimado': 20, # Default generico, ajustaremos si es necesario
+                        'densidad_base': 1111 
+                    }
                 )
+                cultivos[especie] = cultivo_obj
             
-            # Poda (A partir del año 3 hasta el 5)
-            for anio in range(3, 6): # Años 3, 4, 5
-                 PaqueteTecnologico.objects.create(
-                    cultivo=cultivo_obj, zona_economica=zona, anio_proyecto=anio,
-                    rubro='MANO_OBRA', actividad=f'Podas y Manejo (Año {anio})',
-                    unidad_medida='Jornal', cantidad_tecnica=param.dias_poda, sensible_densidad=True,
-                    costo_unitario_referencial=0
-                )
-            
-            # Gastos de Gestión (Todos los años)
-            for anio in range(0, 11): # Hasta año 10
-                 PaqueteTecnologico.objects.create(
-                    cultivo=cultivo_obj, zona_economica=zona, anio_proyecto=anio,
-                    rubro='SERVICIOS', actividad=f'Gestión y Administración {int(gestion*100)}%',
-                    unidad_medida='Global', cantidad_tecnica=1,
-                    # Esto es un % del costo, pero aqui lo ponemos como costo fijo aprox para simplificar el seed inicial
-                    # Lo ideal seria que el backend calcule el % dinamicamente.
-                    # Por ahora pondremos un monto fijo representativo: 10% de la inversion aprox
-                    costo_unitario_referencial=Decimal('500.00') 
-                )
+            paquetes = generar_paquetes(
+                cultivo_obj, zona, parametros[region],
+                sistema, df, dp, cost_plant, jornal_base, insumos_base, gestion
+            )
+            combinaciones.append((region, especie, cultivo_obj, zona, paquetes))
 
-            self.stdout.write(f"    ✅ {region} | {especie}")
+        # 3. Reemplazar cada combinación (cultivo, zona) en bloque
+        total = 0
+        for region, especie, cultivo_obj, zona, paquetes in combinaciones:
+            borrar_sin_senales(
+                PaqueteTecnologico.objects.filter(cultivo=cultivo_obj, zona_economica=zona)
+            )
+            PaqueteTecnologico.objects.bulk_create(paquetes)
+            total += len(paquetes)
+            self.stdout.write(f"    ✅ {region} | {especie} ({len(paquetes)} paquetes)")
 
-        self.stdout.write(self.style.SUCCESS('\n✨ Carga v2.1 completada con éxito.'))
+        return total
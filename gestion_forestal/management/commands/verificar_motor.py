@@ -0,0 +1,292 @@
+"""
+Comando para verificar el motor de cálculo contra su versión de referencia.
+
+El motor calcula con enteros escalados y una tabla de factores de
+descuento (ver motor.py y finanzas.py). Este comando
+conserva el algoritmo original, que opera todo en Decimal, y compara
+ambas salidas campo por campo (incluida la representación de cada
+Decimal) para cada cultivo con paquete tecnológico en cada zona
+económica (con el paquete de la zona o el genérico), un distrito por
+cada pendiente de la zona y una grilla de parámetros.
+
+Uso:
+    python manage.py verificar_motor
+    python manage.py verificar_motor --cultivo 3
+"""
+
+import itertools
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_forestal.catalogo import obtener_catalogo
+from gestion_forestal.finanzas import (
+    TASA_DESCUENTO,
+    TASAS_CURVA_VAN,
+    calcular_tir,
+    curva_van,
+    tir_porcentaje,
+)
+from gestion_forestal.models import PaqueteTecnologico
+from gestion_forestal.motor import (
+    CostoActividad,
+    CostoAnual,
+    PlanCostos,
+    calcular_factor_densidad,
+    calcular_plantas_por_hectarea,
+)
+from gestion_forestal.views import calcular_costos, resolver_distrito_plan
+
+
+# Grilla de parámetros por distrito y cultivo
+HECTAREAS = (Decimal('0.50'), Decimal('1.00'), Decimal('3.37'), Decimal('125.25'))
+GEOMETRIAS = (
+    ('CUADRADO', Decimal('2.50'), None),
+    ('RECTANGULAR', Decimal('3.00'), Decimal('4.00')),
+    ('TRES_BOLILLO', Decimal('3.00'), None),
+)
+COSTOS_JORNAL = (Decimal('35.00'), Decimal('47.50'))
+COSTOS_PLANTON = (Decimal('0.80'), Decimal('1.15'))
+RANGOS_ANIOS = ((0, 50), (1, 5), (0, 0))
+INCLUIR_SERVICIOS = (True, False)
+
+
+def calcular_costos_referencia(distrito, plan: PlanCostos, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Versión de referencia del motor: cada operación en Decimal.
+
+    Es el algoritmo anterior a los enteros escalados, sin cambios; se
+    mantiene solo como oráculo de este comando. La salida usa los mismos
+    registros que el motor (CostoActividad, CostoAnual).
+    """
+    hectareas = data['hectareas']
+    costo_jornal = data['costo_jornal_usuario']
+    costo_planton = data['costo_planton_usuario']
+    factor_pendiente = distrito.calcular_factor_pendiente()
+    densidad_usuario = calcular_plantas_por_hectarea(
+        sistema_siembra=data['sistema_siembra'],
+        distanciamiento_largo=data['distanciamiento_largo'],
+        distanciamiento_ancho=data.get('distanciamiento_ancho')
+    )
+    factor_densidad = calcular_factor_densidad(plan.densidad_base, densidad_usuario)
+
+    detalle_actividades = []
+    resumen_por_anio: Dict[int, Dict[str, Decimal]] = {}
+    actividades = plan.actividades_en_rango(
+        data['anio_inicio'], data['anio_fin'], data.get('incluir_servicios', True)
+    )
+    for actividad in actividades:
+        cantidad_base = actividad.cantidad_tecnica * hectareas
+        cantidad_ajustada = cantidad_base
+        if actividad.sensible_densidad:
+            if actividad.es_mano_obra:
+                parte_fija = cantidad_ajustada * Decimal('0.5')
+                parte_variable = cantidad_ajustada * Decimal('0.5') * factor_densidad
+                cantidad_ajustada = parte_fija + parte_variable
+            else:
+                cantidad_ajustada = cantidad_ajustada * factor_densidad
+        if actividad.sensible_pendiente:
+            cantidad_ajustada = cantidad_ajustada * factor_pendiente
+
+        if actividad.es_mano_obra:
+            costo_unitario = costo_jornal
+        elif actividad.es_planton:
+            costo_unitario = costo_planton
+        else:
+            costo_unitario = actividad.costo_unitario_referencial
+
+        costo_total = (cantidad_ajustada * costo_unitario).quantize(Decimal('0.01'))
+        detalle_actividades.append(CostoActividad(
+            anio=actividad.anio,
+            rubro=actividad.rubro_display,
+            actividad=actividad.actividad,
+            cantidad_base=cantidad_base.quantize(Decimal('0.01')),
+            cantidad_ajustada=cantidad_ajustada.quantize(Decimal('0.01')),
+            costo_unitario=costo_unitario,
+            costo_total=costo_total
+        ))
+        categorias = resumen_por_anio.setdefault(actividad.anio, {
+            'mano_obra': Decimal('0'), 'insumos': Decimal('0'), 'servicios': Decimal('0')
+        })
+        categorias[actividad.categoria] += costo_total
+
+    resumen_anual = []
+    costos_instalacion = None
+    costo_total_proyecto = Decimal('0')
+    for anio in sorted(resumen_por_anio.keys()):
+        datos = resumen_por_anio[anio]
+        total_anio = datos['mano_obra'] + datos['insumos'] + datos['servicios']
+        costo_total_proyecto += total_anio
+        resumen_obj = CostoAnual(
+            anio=anio,
+            mano_obra=datos['mano_obra'],
+            insumos=datos['insumos'],
+            servicios=datos['servicios'],
+            total=total_anio
+        )
+        if anio == 0:
+            costos_instalacion = resumen_obj
+        else:
+            resumen_anual.append(resumen_obj)
+
+    ingreso_total = (
+        hectareas * plan.rendimiento_m3_ha * plan.precio_madera_referencial
+    ).quantize(Decimal('0.01'))
+    anio_cosecha = plan.turno_estimado
+    flujo_caja = {}
+    for anio, datos in resumen_por_anio.items():
+        flujo_caja[anio] = -(datos['mano_obra'] + datos['insumos'] + datos['servicios'])
+    if anio_cosecha not in flujo_caja:
+        flujo_caja[anio_cosecha] = Decimal('0')
+    flujo_caja[anio_cosecha] += ingreso_total
+
+    van = Decimal('0')
+    for anio, flujo in flujo_caja.items():
+        van += flujo / (Decimal('1') + TASA_DESCUENTO) ** Decimal(anio)
+    van = van.quantize(Decimal('0.01'))
+
+    flujos_lista = [float(flujo_caja.get(a, 0)) for a in range(max(flujo_caja.keys()) + 1)]
+    resultado_tir = calcular_tir(flujos_lista)
+    curva = [
+        {'tasa': Decimal(repr(tasa)), 'van': Decimal(repr(round(valor, 2)))}
+        for tasa, valor in zip(TASAS_CURVA_VAN, curva_van(flujos_lista))
+    ]
+
+    vp_ingresos = Decimal('0')
+    vp_costos = Decimal('0')
+    for anio, flujo in flujo_caja.items():
+        factor = (Decimal('1') + TASA_DESCUENTO) ** Decimal(anio)
+        if flujo > 0:
+            vp_ingresos += flujo / factor
+        else:
+            vp_costos += abs(flujo) / factor
+    ratio_bc = Decimal('0')
+    if vp_costos > 0:
+        ratio_bc = (vp_ingresos / vp_costos).quantize(Decimal('0.01'))
+
+    return {
+        'distrito': f"{distrito.nombre} ({distrito.cod_ubigeo})",
+        'cultivo': plan.cultivo_nombre,
+        'hectareas': hectareas,
+        'factor_pendiente': factor_pendiente,
+        'factor_densidad': factor_densidad,
+        'densidad_base': plan.densidad_base,
+        'densidad_usuario': densidad_usuario,
+        'sistema_siembra': data['sistema_siembra'],
+        'costo_jornal_usado': costo_jornal,
+        'costo_planton_usado': costo_planton,
+        'precio_madera_usado': plan.precio_madera_referencial,
+        'fuente_precio_madera': plan.fuente_precio_madera,
+        'detalle_actividades': tuple(detalle_actividades),
+        'costos_instalacion': costos_instalacion,
+        'resumen_anual': tuple(resumen_anual),
+        'costo_total_proyecto': costo_total_proyecto,
+        'van': van,
+        'tir': tir_porcentaje(resultado_tir),
+        'tir_diagnostico': resultado_tir.diagnostico,
+        'curva_van': curva,
+        'ratio_beneficio_costo': ratio_bc,
+        'ingreso_total_estimado': ingreso_total,
+        'vp_ingresos': vp_ingresos,
+        'vp_costos': vp_costos,
+        'flujos': tuple(flujos_lista)
+    }
+
+
+def primera_diferencia(esperado: Dict[str, Any], obtenido: Dict[str, Any]) -> Optional[str]:
+    """Primer campo cuya representación difiere entre ambas salidas (None si son iguales)."""
+    for campo in esperado.keys() | obtenido.keys():
+        if repr(esperado.get(campo)) != repr(obtenido.get(campo)):
+            return campo
+    return None
+
+
+class Command(BaseCommand):
+    """Comando para comparar el motor con su versión de referencia en Decimal."""
+
+    help = 'Verifica que el motor de cálculo coincide exactamente con la versión en Decimal'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cultivo',
+            type=int,
+            help='Verificar solo este cultivo (id)',
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta la comparación sobre todos los pares sembrados."""
+        cultivos = PaqueteTecnologico.objects.values_list(
+            'cultivo_id', flat=True
+        ).order_by('cultivo_id').distinct()
+        if options['cultivo'] is not None:
+            cultivos = cultivos.filter(cultivo_id=options['cultivo'])
+
+        # Un distrito por pendiente en cada zona (la pendiente define el factor)
+        distritos_por_zona: Dict[Optional[int], Dict[int, str]] = {}
+        for distrito in sorted(obtener_catalogo().distritos.values()):
+            pendientes = distritos_por_zona.setdefault(distrito.zona_economica_id, {})
+            pendientes.setdefault(distrito.pendiente_promedio_estimada, distrito.cod_ubigeo)
+
+        casos: List[Dict[str, Any]] = []
+        pares = list(itertools.product(cultivos, distritos_por_zona))
+        for cultivo_id, zona_id in pares:
+            for ubigeo in distritos_por_zona[zona_id].values():
+                for ha, (sistema, largo, ancho), jornal, planton, (inicio, fin), servicios in itertools.product(
+                    HECTAREAS, GEOMETRIAS, COSTOS_JORNAL, COSTOS_PLANTON, RANGOS_ANIOS, INCLUIR_SERVICIOS
+                ):
+                    casos.append({
+                        'distrito_id': ubigeo,
+                        'cultivo_id': cultivo_id,
+                        'hectareas': ha,
+                        'costo_jornal_usuario': jornal,
+                        'costo_planton_usuario': planton,
+                        'anio_inicio': inicio,
+                        'anio_fin': fin,
+                        'sistema_siembra': sistema,
+                        'distanciamiento_largo': largo,
+                        'distanciamiento_ancho': ancho,
+                        'incluir_servicios': servicios,
+                    })
+
+        if not casos:
+            raise CommandError('No hay pares (cultivo, zona) con distritos para verificar.')
+
+        entradas = []
+        for data in casos:
+            distrito, plan, error = resolver_distrito_plan(data)
+            if error is None:
+                entradas.append((distrito, plan, data))
+
+        # Ambas versiones se ejecutan alternadas sobre el mismo caso, sin
+        # retener las salidas, para medir tiempos comparables
+        segundos_referencia = 0.0
+        segundos_motor = 0.0
+        diferencias = 0
+        for distrito, plan, data in entradas:
+            inicio = time.perf_counter()
+            esperado = calcular_costos_referencia(distrito, plan, data)
+            medio = time.perf_counter()
+            obtenido = calcular_costos(distrito, plan, data)
+            segundos_referencia += medio - inicio
+            segundos_motor += time.perf_counter() - medio
+
+            campo = primera_diferencia(esperado, obtenido)
+            if campo is not None:
+                diferencias += 1
+                if diferencias <= 10:
+                    self.stdout.write(self.style.ERROR(
+                        f"  ❌ {data['cultivo_id']}/{data['distrito_id']} {campo}: "
+                        f"{esperado.get(campo)!r} != {obtenido.get(campo)!r}"
+                    ))
+
+        total = len(entradas)
+        self.stdout.write(
+            f'📊 {len(pares)} pares (cultivo, zona), {total} cálculos\n'
+            f'   Referencia (Decimal): {segundos_referencia * 1000 / total:.3f} ms/cálculo\n'
+            f'   Motor:                {segundos_motor * 1000 / total:.3f} ms/cálculo'
+        )
+        if diferencias:
+            raise CommandError(f'{diferencias} de {total} cálculos difieren de la referencia.')
+        self.stdout.write(self.style.SUCCESS(f'✅ Los {total} cálculos coinciden exactamente'))
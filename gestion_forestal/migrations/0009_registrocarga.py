@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_forestal', '0008_cultivo_precio_madera_referencial_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroCarga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comando', models.CharField(max_length=100, unique=True, verbose_name='Comando')),
+                ('huella', models.CharField(max_length=64, verbose_name='Huella SHA-256')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Última carga')),
+            ],
+            options={
+                'verbose_name': 'Registro de Carga',
+                'verbose_name_plural': 'Registros de Carga',
+                'ordering': ['comando'],
+            },
+        ),
+    ]
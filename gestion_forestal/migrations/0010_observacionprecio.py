@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_forestal', '0009_registrocarga'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObservacionPrecio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_origen', models.PositiveIntegerField(unique=True, verbose_name='ID en el CSV')),
+                ('autoridad', models.CharField(max_length=100, verbose_name='ARFFS / ATFFS')),
+                ('sede', models.CharField(blank=True, max_length=100, verbose_name='Sede')),
+                ('departamento', models.CharField(max_length=100, verbose_name='Departamento')),
+                ('anio', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('mes', models.PositiveSmallIntegerField(verbose_name='Mes')),
+                ('especie', models.CharField(max_length=100, verbose_name='Especie (nombre común)')),
+                ('nombre_cientifico', models.CharField(blank=True, max_length=150, verbose_name='Nombre científico')),
+                ('tipo_producto', models.CharField(max_length=100, verbose_name='Tipo de producto')),
+                ('producto', models.CharField(blank=True, max_length=100, verbose_name='Producto')),
+                ('dimensiones', models.CharField(blank=True, max_length=100, verbose_name='Dimensiones')),
+                ('unidad', models.CharField(help_text='PT = pie tablar', max_length=20, verbose_name='Unidad')),
+                ('precio', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Precio (S/)')),
+                ('observacion', models.TextField(blank=True, verbose_name='Observación')),
+                ('recurso', models.CharField(max_length=20, verbose_name='Recurso')),
+            ],
+            options={
+                'verbose_name': 'Observación de Precio',
+                'verbose_name_plural': 'Observaciones de Precio',
+                'ordering': ['especie', 'departamento', 'anio', 'mes'],
+                'indexes': [models.Index(fields=['especie', 'departamento', 'anio', 'mes'], name='precio_especie_depto_periodo'), models.Index(fields=['departamento', 'anio', 'mes'], name='precio_depto_periodo')],
+            },
+        ),
+    ]
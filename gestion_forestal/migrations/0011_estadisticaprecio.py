@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_forestal', '0010_observacionprecio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaPrecio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('especie', models.CharField(max_length=100, verbose_name='Especie (nombre común)')),
+                ('departamento', models.CharField(blank=True, help_text='Vacío = todo el país', max_length=100, verbose_name='Departamento')),
+                ('anio', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('tipo_producto', models.CharField(max_length=100, verbose_name='Tipo de producto')),
+                ('observaciones', models.PositiveIntegerField(verbose_name='Observaciones (n)')),
+                ('mediana', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Mediana (S/ por m3)')),
+                ('p25', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Percentil 25 (S/ por m3)')),
+                ('p75', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Percentil 75 (S/ por m3)')),
+                ('minimo', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Mínimo (S/ por m3)')),
+                ('maximo', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Máximo (S/ por m3)')),
+            ],
+            options={
+                'verbose_name': 'Estadística de Precio',
+                'verbose_name_plural': 'Estadísticas de Precio',
+                'ordering': ['tipo_producto', 'especie', 'departamento', 'anio'],
+                'unique_together': {('tipo_producto', 'especie', 'departamento', 'anio')},
+            },
+        ),
+    ]
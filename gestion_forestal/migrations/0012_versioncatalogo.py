@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_forestal', '0011_estadisticaprecio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionCatalogo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='Catálogo')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Versión')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Último cambio')),
+            ],
+            options={
+                'verbose_name': 'Versión de Catálogo',
+                'verbose_name_plural': 'Versiones de Catálogo',
+                'ordering': ['nombre'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_forestal', '0012_versioncatalogo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='estadisticaprecio',
+            name='especie',
+            field=models.CharField(max_length=100, verbose_name='Especie (nombre común o científico)'),
+        ),
+    ]
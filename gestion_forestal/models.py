@@ -14,6 +14,8 @@ from django.db import models
 from decimal import Decimal
 from typing import Optional
 
+from .motor import factor_pendiente
+
 
 class ZonaEconomica(models.Model):
     """
@@ -146,14 +148,7 @@ class Distrito(models.Model):
         Returns:
             Decimal: Factor multiplicador para mano de obra.
         """
-        pendiente = self.pendiente_promedio_estimada
-        
-        if pendiente < 15:
-            return Decimal('1.00')
-        elif pendiente <= 30:
-            return Decimal('1.15')
-        else:
-            return Decimal('1.30')
+        return factor_pendiente(self.pendiente_promedio_estimada)
 
 
 class Cultivo(models.Model):
@@ -368,3 +363,267 @@ class ParametroMantenimiento(models.Model):
     
     def __str__(self):
         return f"{self.region} ({self.nivel_maleza})"
+
+
+class RegistroCarga(models.Model):
+    """
+    Huella del último origen de datos cargado por un comando.
+    
+    Los comandos de carga (seed_data, seed_data_v1_1, import_distritos)
+    guardan aquí el hash SHA-256 de sus datos de origen. Si el hash no
+    cambió, el comando termina sin tocar la base de datos.
+    
+    Attributes:
+        comando: Nombre del comando de gestión.
+        huella: Hash SHA-256 (hex) de los datos de origen.
+        actualizado: Fecha de la última carga completa.
+    """
+    
+    comando: str = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Comando"
+    )
+    huella: str = models.CharField(
+        max_length=64,
+        verbose_name="Huella SHA-256"
+    )
+    actualizado = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Última carga"
+    )
+    
+    class Meta:
+        verbose_name = "Registro de Carga"
+        verbose_name_plural = "Registros de Carga"
+        ordering = ['comando']
+    
+    def __str__(self) -> str:
+        return f"{self.comando} ({self.huella[:12]})"
+
+
+class VersionCatalogo(models.Model):
+    """
+    Contador de versión de los datos del motor de cálculo.
+    
+    Cada cambio en distritos, zonas, cultivos, paquetes o estadísticas
+    de precios incrementa el contador (ver catalogo.py).
+    Cada proceso de gunicorn guarda un snapshot del catálogo con la
+    versión con la que lo cargó y lo compara con esta fila: así los
+    procesos que no recibieron la señal del cambio también lo descartan.
+    
+    Attributes:
+        nombre: Nombre del contador (una fila por catálogo).
+        version: Número de versión, creciente.
+        actualizado: Fecha del último cambio.
+    """
+    
+    nombre: str = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name="Catálogo"
+    )
+    version: int = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Versión"
+    )
+    actualizado = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Último cambio"
+    )
+    
+    class Meta:
+        verbose_name = "Versión de Catálogo"
+        verbose_name_plural = "Versiones de Catálogo"
+        ordering = ['nombre']
+    
+    def __str__(self) -> str:
+        return f"{self.nombre} v{self.version}"
+
+
+class ObservacionPrecio(models.Model):
+    """
+    Precio de un producto forestal observado en un mes y departamento.
+    
+    Una fila de la base de precios de SERFOR
+    (data/4.1.4.BD_PRECIOS_MADERAS.csv), con los textos normalizados
+    por el comando import_precios_madera (ver precios.py).
+    
+    Attributes:
+        id_origen: ID de la fila en el CSV (clave de la carga incremental).
+        autoridad: ATFFS o gobierno regional que reporta el precio.
+        sede: Sede de la autoridad.
+        departamento: Departamento (ej: "SAN MARTIN").
+        anio: Año de la observación.
+        mes: Mes de la observación (1-12).
+        especie: Nombre común normalizado (ej: "CAPIRONA").
+        nombre_cientifico: Nombre científico, vacío si no se reporta.
+        tipo_producto: Tipo de producto (ej: "MADERA ASERRADA").
+        producto: Producto (ej: "MADERA COMERCIAL").
+        dimensiones: Dimensiones tal como se reportan.
+        unidad: Unidad del precio (PT = pie tablar, M3, KG, U...).
+        precio: Precio por unidad (S/).
+        observacion: Nota de la fuente.
+        recurso: MADERABLE o NO MADERABLE.
+    """
+    
+    id_origen: int = models.PositiveIntegerField(
+        unique=True,
+        verbose_name="ID en el CSV"
+    )
+    autoridad: str = models.CharField(
+        max_length=100,
+        verbose_name="ARFFS / ATFFS"
+    )
+    sede: str = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Sede"
+    )
+    departamento: str = models.CharField(
+        max_length=100,
+        verbose_name="Departamento"
+    )
+    anio: int = models.PositiveSmallIntegerField(
+        verbose_name="Año"
+    )
+    mes: int = models.PositiveSmallIntegerField(
+        verbose_name="Mes"
+    )
+    especie: str = models.CharField(
+        max_length=100,
+        verbose_name="Especie (nombre común)"
+    )
+    nombre_cientifico: str = models.CharField(
+        max_length=150,
+        blank=True,
+        verbose_name="Nombre científico"
+    )
+    tipo_producto: str = models.CharField(
+        max_length=100,
+        verbose_name="Tipo de producto"
+    )
+    producto: str = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Producto"
+    )
+    dimensiones: str = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Dimensiones"
+    )
+    unidad: str = models.CharField(
+        max_length=20,
+        verbose_name="Unidad",
+        help_text="PT = pie tablar"
+    )
+    precio: Decimal = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="Precio (S/)"
+    )
+    observacion: str = models.TextField(
+        blank=True,
+        verbose_name="Observación"
+    )
+    recurso: str = models.CharField(
+        max_length=20,
+        verbose_name="Recurso"
+    )
+    
+    class Meta:
+        verbose_name = "Observación de Precio"
+        verbose_name_plural = "Observaciones de Precio"
+        ordering = ['especie', 'departamento', 'anio', 'mes']
+        indexes = [
+            models.Index(
+                fields=['especie', 'departamento', 'anio', 'mes'],
+                name='precio_especie_depto_periodo'
+            ),
+            models.Index(
+                fields=['departamento', 'anio', 'mes'],
+                name='precio_depto_periodo'
+            ),
+        ]
+    
+    def __str__(self) -> str:
+        return f"{self.especie} {self.departamento} {self.anio}-{self.mes:02d}: S/ {self.precio}/{self.unidad}"
+
+
+class EstadisticaPrecio(models.Model):
+    """
+    Estadísticas precalculadas del precio de la madera.
+    
+    Resume las ObservacionPrecio de una especie, departamento, año y
+    tipo de producto, con los precios llevados a S/ por m³ (las
+    observaciones en pies tablares se convierten). La recalcula el
+    comando actualizar_estadisticas_precios; el motor de cálculo lee
+    la mediana como precio regional de la madera (ver precios.py).
+    
+    Attributes:
+        especie: Nombre común o científico normalizado (ej: "CAPIRONA",
+            "PINUS RADIATA"); cada observación cuenta bajo ambos.
+        departamento: Departamento; vacío = todo el país.
+        anio: Año de las observaciones.
+        tipo_producto: Tipo de producto (ej: "MADERA ROLLIZA").
+        observaciones: Número de observaciones (n).
+        mediana, p25, p75: Percentiles del precio (S/ por m³).
+        minimo, maximo: Extremos del precio (S/ por m³).
+    """
+    
+    especie: str = models.CharField(
+        max_length=100,
+        verbose_name="Especie (nombre común o científico)"
+    )
+    departamento: str = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Departamento",
+        help_text="Vacío = todo el país"
+    )
+    anio: int = models.PositiveSmallIntegerField(
+        verbose_name="Año"
+    )
+    tipo_producto: str = models.CharField(
+        max_length=100,
+        verbose_name="Tipo de producto"
+    )
+    observaciones: int = models.PositiveIntegerField(
+        verbose_name="Observaciones (n)"
+    )
+    mediana: Decimal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Mediana (S/ por m3)"
+    )
+    p25: Decimal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Percentil 25 (S/ por m3)"
+    )
+    p75: Decimal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Percentil 75 (S/ por m3)"
+    )
+    minimo: Decimal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Mínimo (S/ por m3)"
+    )
+    maximo: Decimal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Máximo (S/ por m3)"
+    )
+    
+    class Meta:
+        verbose_name = "Estadística de Precio"
+        verbose_name_plural = "Estadísticas de Precio"
+        ordering = ['tipo_producto', 'especie', 'departamento', 'anio']
+        unique_together = ['tipo_producto', 'especie', 'departamento', 'anio']
+    
+    def __str__(self) -> str:
+        region = self.departamento or 'PERÚ'
+        return f"{self.especie} {region} {self.anio}: S/ {self.mediana}/m3 (n={self.observaciones})"
@@ -0,0 +1,634 @@
+"""
+Motor de cálculo de costos forestales v2.1.
+
+Módulo puro: solo usa la biblioteca estándar y finanzas.py, sin ORM ni
+DRF, así que se importa sin configurar Django y sin cargar las apps.
+Lo usan la vista /api/calcular-costos/ y sus variantes (lote, parcela,
+simulación), el comando calcular_costos y el comando benchmark_motor.
+
+Entradas (valores planos):
+- PlanCostos: paquete tecnológico compilado de un cultivo en una zona
+  económica (ver plan_costos.compilar_plan), con el precio de la madera
+  ya resuelto (ver precios.aplicar_precio_regional).
+- Factor de pendiente del distrito (ver factor_pendiente).
+- ParametrosCalculo: hectáreas, costos del usuario, geometría de
+  siembra y rango de años.
+
+Salida: ResultadoCostos, con registros por actividad y por año. Los
+parámetros, el resultado y sus registros son NamedTuple: se crean
+varios por cálculo y una dataclass congelada cuesta el doble de
+construir (un object.__setattr__ por campo). El plan compilado, que se
+crea una vez y se comparte, sí es una dataclass congelada.
+
+Los montos se calculan con enteros escalados (mantisa y decimales de
+cada Decimal de entrada) y se redondean a céntimos solo en la salida;
+el resultado es idéntico al del cálculo en Decimal (ver el comando
+verificar_motor).
+"""
+
+from array import array
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterator, Mapping, NamedTuple, Optional, Tuple
+
+from .finanzas import (
+    CENTIMO,
+    TASA_DESCUENTO,
+    TASAS_CURVA_VAN,
+    calcular_tir,
+    curva_van,
+    entero_escalado,
+    factores_capitalizacion,
+    redondear_centimos,
+    tir_porcentaje,
+)
+
+
+# ===========================================
+# FACTORES DE AJUSTE
+# ===========================================
+
+class SistemaSiembra:
+    """Opciones de sistema de siembra."""
+    CUADRADO = 'CUADRADO'
+    RECTANGULAR = 'RECTANGULAR'
+    TRES_BOLILLO = 'TRES_BOLILLO'
+
+    CHOICES = [
+        (CUADRADO, 'Cuadrado (distancia×distancia)'),
+        (RECTANGULAR, 'Rectangular (largo×ancho)'),
+        (TRES_BOLILLO, 'Tres Bolillo (triángulo equilátero)'),
+    ]
+
+
+# Factor para Tres Bolillo: sin(60°) = sqrt(3)/2 ≈ 0.866025
+FACTOR_TRES_BOLILLO = Decimal('0.866025')
+
+# 10,000 m² = 1 hectárea
+AREA_HECTAREA = Decimal('10000')
+
+
+def factor_pendiente(pendiente: int) -> Decimal:
+    """
+    Factor de ajuste de mano de obra para una pendiente (%).
+
+    Ver Distrito.calcular_factor_pendiente.
+    """
+    if pendiente < 15:
+        return Decimal('1.00')
+    elif pendiente <= 30:
+        return Decimal('1.15')
+    else:
+        return Decimal('1.30')
+
+
+def calcular_plantas_por_hectarea(
+    sistema_siembra: str,
+    distanciamiento_largo: Decimal,
+    distanciamiento_ancho: Decimal = None
+) -> int:
+    """
+    Calcula el número de plantas por hectárea según la geometría de siembra.
+
+    Fórmulas:
+    - CUADRADO: plantas = 10,000 / (largo × largo)
+    - RECTANGULAR: plantas = 10,000 / (largo × ancho)
+    - TRES_BOLILLO: plantas = 10,000 / ((largo × largo) × 0.866025)
+
+    Args:
+        sistema_siembra: Tipo de geometría ('CUADRADO', 'RECTANGULAR', 'TRES_BOLILLO')
+        distanciamiento_largo: Distancia entre plantas en metros
+        distanciamiento_ancho: Distancia entre hileras (solo para RECTANGULAR)
+
+    Returns:
+        int: Número de plantas por hectárea (redondeado)
+    """
+    if sistema_siembra == SistemaSiembra.CUADRADO:
+        # Cuadrado: distancia × distancia
+        area_por_planta = distanciamiento_largo * distanciamiento_largo
+        plantas = AREA_HECTAREA / area_por_planta
+
+    elif sistema_siembra == SistemaSiembra.RECTANGULAR:
+        # Rectangular: largo × ancho
+        if distanciamiento_ancho is None or distanciamiento_ancho <= 0:
+            raise ValueError("distanciamiento_ancho es requerido para sistema RECTANGULAR")
+        area_por_planta = distanciamiento_largo * distanciamiento_ancho
+        plantas = AREA_HECTAREA / area_por_planta
+
+    elif sistema_siembra == SistemaSiembra.TRES_BOLILLO:
+        # Tres Bolillo: (largo × largo) × sin(60°)
+        # sin(60°) = √3/2 ≈ 0.866025
+        area_por_planta = distanciamiento_largo * distanciamiento_largo * FACTOR_TRES_BOLILLO
+        plantas = AREA_HECTAREA / area_por_planta
+
+    else:
+        raise ValueError(f"Sistema de siembra no reconocido: {sistema_siembra}")
+
+    # Redondear al entero más cercano
+    return int(plantas.quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def calcular_factor_densidad(
+    densidad_base: int,
+    densidad_usuario: int
+) -> Decimal:
+    """
+    Calcula el factor de densidad.
+
+    factor = plantas_usuario / densidad_base
+
+    Si el usuario elige más plantas que el estándar, el factor > 1
+    y los costos sensibles a densidad aumentan proporcionalmente.
+
+    Args:
+        densidad_base: Densidad estándar del cultivo (plantas/ha)
+        densidad_usuario: Densidad calculada del usuario (plantas/ha)
+
+    Returns:
+        Decimal: Factor de densidad (ej: 1.2500 si 25% más plantas)
+    """
+    if densidad_base <= 0:
+        return Decimal('1.0000')
+
+    factor = Decimal(densidad_usuario) / Decimal(densidad_base)
+    return factor.quantize(Decimal('0.0001'))
+
+
+# ===========================================
+# PAQUETE TECNOLÓGICO COMPILADO
+# ===========================================
+
+# Categorías del resumen anual
+CATEGORIA_MANO_OBRA = 'mano_obra'
+CATEGORIA_INSUMOS = 'insumos'
+CATEGORIA_SERVICIOS = 'servicios'
+
+# Origen del precio de la madera de un plan recién compilado
+FUENTE_PRECIO_CULTIVO = 'cultivo'
+
+
+@dataclass(frozen=True, slots=True)
+class ActividadCompilada:
+    """
+    Actividad del paquete tecnológico con su lógica de costo resuelta.
+
+    Attributes:
+        anio: Año del proyecto (0 = instalación).
+        rubro: Código del rubro (MANO_OBRA, INSUMO, ...).
+        rubro_display: Etiqueta legible del rubro.
+        actividad: Descripción de la actividad.
+        cantidad_tecnica: Cantidad por hectárea en terreno plano.
+        costo_unitario_referencial: Costo fijo (insumos no plantón y servicios).
+        categoria: Categoría del resumen anual (mano_obra, insumos, servicios).
+        es_mano_obra: Usa el costo de jornal del usuario.
+        es_planton: Usa el costo de plantón del usuario.
+        es_servicio: Se excluye si incluir_servicios=False.
+        sensible_densidad: Escala con el factor de densidad.
+        sensible_pendiente: Escala con el factor de pendiente (solo mano de obra).
+        cantidad_escalada: cantidad_tecnica como (mantisa, decimales).
+        costo_escalado: costo_unitario_referencial como (mantisa, decimales).
+    """
+
+    anio: int
+    rubro: str
+    rubro_display: str
+    actividad: str
+    cantidad_tecnica: Decimal
+    costo_unitario_referencial: Decimal
+    categoria: str
+    es_mano_obra: bool
+    es_planton: bool
+    es_servicio: bool
+    sensible_densidad: bool
+    sensible_pendiente: bool
+    cantidad_escalada: Tuple[int, int]
+    costo_escalado: Tuple[int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class PlanCostos:
+    """
+    Paquete tecnológico compilado para un par (cultivo, zona económica).
+
+    Los arreglos de coeficientes se indexan por año del proyecto y están
+    expresados por hectárea. Con ellos el costo de un año es:
+
+        mano_obra = jornal × (fijos + pendiente·fp
+                              + (densidad + densidad_pendiente·fp) × (0.5 + 0.5·fd))
+        insumos   = planton × (plantones_fijos + plantones_densidad·fd)
+                    + insumos_fijos + insumos_densidad·fd
+        servicios = servicios_fijos + servicios_densidad·fd
+
+    No debe mutarse: se comparte entre hilos del mismo proceso. El
+    precio de la madera regional se aplica con dataclasses.replace
+    (ver precios.aplicar_precio_regional), que copia solo la cabecera.
+    """
+
+    cultivo_id: int
+    cultivo_nombre: str
+    turno_estimado: int
+    densidad_base: int
+    precio_madera_referencial: Decimal
+    rendimiento_m3_ha: Decimal
+    zona_economica_id: Optional[int]
+    actividades: Tuple[ActividadCompilada, ...]
+
+    # Jornales por hectárea (mano de obra)
+    jornales_fijos: array
+    jornales_densidad: array
+    jornales_pendiente: array
+    jornales_densidad_pendiente: array
+    # Plantones por hectárea (unidades)
+    plantones_fijos: array
+    plantones_densidad: array
+    # Costos referenciales por hectárea (S/)
+    insumos_fijos: array
+    insumos_densidad: array
+    servicios_fijos: array
+    servicios_densidad: array
+
+    # Origen de precio_madera_referencial (cultivo, departamento o nacional)
+    fuente_precio_madera: str = FUENTE_PRECIO_CULTIVO
+
+    @property
+    def horizonte(self) -> int:
+        """Último año con actividades (-1 si el paquete está vacío)."""
+        return len(self.jornales_fijos) - 1
+
+    def actividades_en_rango(
+        self,
+        anio_inicio: int,
+        anio_fin: int,
+        incluir_servicios: bool = True
+    ) -> Iterator[ActividadCompilada]:
+        """
+        Itera las actividades del rango de años solicitado.
+
+        Conserva el orden (anio_proyecto, rubro, actividad) del paquete.
+        """
+        for actividad in self.actividades:
+            if actividad.anio < anio_inicio:
+                continue
+            if actividad.anio > anio_fin:
+                break
+            if not incluir_servicios and actividad.es_servicio:
+                continue
+            yield actividad
+
+
+# ===========================================
+# PARÁMETROS Y RESULTADOS
+# ===========================================
+
+class ParametrosCalculo(NamedTuple):
+    """
+    Parámetros del usuario para un cálculo.
+
+    Attributes:
+        hectareas: Superficie de la plantación.
+        costo_jornal: Costo del jornal (S/ por día).
+        costo_planton: Costo del plantón (S/ por unidad).
+        anio_inicio, anio_fin: Rango de años del proyecto.
+        sistema_siembra: CUADRADO, RECTANGULAR o TRES_BOLILLO.
+        distanciamiento_largo: Distancia entre plantas (m).
+        distanciamiento_ancho: Distancia entre hileras (solo RECTANGULAR).
+        incluir_servicios: Incluir servicios, costos legales y activos.
+    """
+
+    hectareas: Decimal
+    costo_jornal: Decimal
+    costo_planton: Decimal
+    anio_inicio: int
+    anio_fin: int
+    sistema_siembra: str
+    distanciamiento_largo: Decimal
+    distanciamiento_ancho: Optional[Decimal] = None
+    incluir_servicios: bool = True
+
+    @classmethod
+    def desde_datos(cls, data: Mapping[str, Any]) -> 'ParametrosCalculo':
+        """
+        Parámetros a partir de los datos validados por CalculoCostosInputSerializer.
+
+        Args:
+            data: Datos con los nombres de campo de la API.
+
+        Returns:
+            ParametrosCalculo: Parámetros del cálculo.
+        """
+        return cls(
+            hectareas=data['hectareas'],
+            costo_jornal=data['costo_jornal_usuario'],
+            costo_planton=data['costo_planton_usuario'],
+            anio_inicio=data['anio_inicio'],
+            anio_fin=data['anio_fin'],
+            sistema_siembra=data['sistema_siembra'],
+            distanciamiento_largo=data['distanciamiento_largo'],
+            distanciamiento_ancho=data.get('distanciamiento_ancho'),
+            incluir_servicios=data.get('incluir_servicios', True),
+        )
+
+
+class CostoActividad(NamedTuple):
+    """Costo de una actividad del paquete (montos con dos decimales)."""
+
+    anio: int
+    rubro: str
+    actividad: str
+    cantidad_base: Decimal
+    cantidad_ajustada: Decimal
+    costo_unitario: Decimal
+    costo_total: Decimal
+
+
+class CostoAnual(NamedTuple):
+    """Costos de un año por categoría (Decimal('0') si no hubo actividades)."""
+
+    anio: int
+    mano_obra: Decimal
+    insumos: Decimal
+    servicios: Decimal
+    total: Decimal
+
+
+class ResultadoCostos(NamedTuple):
+    """
+    Resultado de un cálculo de costos.
+
+    Attributes:
+        cultivo: Nombre del cultivo del plan.
+        hectareas, sistema_siembra: Parámetros usados.
+        factor_pendiente, factor_densidad: Factores aplicados.
+        densidad_base, densidad_usuario: Plantas por hectárea.
+        costo_jornal_usado, costo_planton_usado: Costos del usuario.
+        precio_madera_usado, fuente_precio_madera: Precio del plan y su origen.
+        detalle_actividades: Costo de cada actividad del rango.
+        costos_instalacion: Año 0, o None si no está en el rango.
+        resumen_anual: Años 1+ con actividades.
+        costo_total_proyecto: Suma de los costos anuales.
+        van: Valor actual neto a la tasa del proyecto.
+        tir: TIR en % con 2 decimales (None si no existe).
+        tir_diagnostico: UNICA, MULTIPLE, SIN_RAIZ o SIN_CAMBIO_SIGNO.
+        curva_van: VAN para cada tasa de TASAS_CURVA_VAN_DECIMAL (0% a 30%).
+        ratio_beneficio_costo: VP de ingresos / VP de costos.
+        ingreso_total_estimado: Ingreso por la madera al final del turno.
+        vp_ingresos, vp_costos: Valores presentes sin redondear
+            (para agregar carteras).
+        flujos: Flujo de caja anual denso (índice = año) en floats.
+    """
+
+    cultivo: str
+    hectareas: Decimal
+    factor_pendiente: Decimal
+    factor_densidad: Decimal
+    densidad_base: int
+    densidad_usuario: int
+    sistema_siembra: str
+    costo_jornal_usado: Decimal
+    costo_planton_usado: Decimal
+    precio_madera_usado: Decimal
+    fuente_precio_madera: str
+    detalle_actividades: Tuple[CostoActividad, ...]
+    costos_instalacion: Optional[CostoAnual]
+    resumen_anual: Tuple[CostoAnual, ...]
+    costo_total_proyecto: Decimal
+    van: Decimal
+    tir: Optional[Decimal]
+    tir_diagnostico: str
+    curva_van: Tuple[Decimal, ...]
+    ratio_beneficio_costo: Decimal
+    ingreso_total_estimado: Decimal
+    vp_ingresos: Decimal
+    vp_costos: Decimal
+    flujos: Tuple[float, ...]
+
+
+# ===========================================
+# CÁLCULO
+# ===========================================
+
+# Tasas de la curva VAN como Decimal (se comparten entre resultados)
+TASAS_CURVA_VAN_DECIMAL = tuple(Decimal(repr(tasa)) for tasa in TASAS_CURVA_VAN)
+
+
+def _monto(centimos: Optional[int]) -> Decimal:
+    """Céntimos como Decimal con dos decimales (Decimal('0') si no hubo montos)."""
+    return Decimal('0') if centimos is None else Decimal(centimos) * CENTIMO
+
+
+def calcular_costos_plan(
+    plan: PlanCostos,
+    factor_pendiente: Decimal,
+    parametros: ParametrosCalculo,
+    tasa_descuento: Decimal = TASA_DESCUENTO
+) -> ResultadoCostos:
+    """
+    Calcula los costos de una plantación a partir de un plan compilado.
+
+    Args:
+        plan: Paquete tecnológico compilado, con el precio de la madera
+            ya aplicado.
+        factor_pendiente: Factor de pendiente del distrito.
+        parametros: Parámetros del usuario.
+        tasa_descuento: Tasa anual para el VAN y el ratio B/C.
+
+    Returns:
+        ResultadoCostos: Costos por actividad y por año e indicadores financieros.
+
+    Raises:
+        ValueError: Si el sistema de siembra no es válido.
+    """
+    hectareas = parametros.hectareas
+    costo_jornal = parametros.costo_jornal
+    costo_planton = parametros.costo_planton
+
+    # ===========================================
+    # CÁLCULO DE FACTORES
+    # ===========================================
+
+    # Factor de Densidad (según geometría de siembra del usuario)
+    densidad_usuario = calcular_plantas_por_hectarea(
+        sistema_siembra=parametros.sistema_siembra,
+        distanciamiento_largo=parametros.distanciamiento_largo,
+        distanciamiento_ancho=parametros.distanciamiento_ancho
+    )
+    factor_densidad = calcular_factor_densidad(plan.densidad_base, densidad_usuario)
+
+    # ===========================================
+    # CÁLCULO DE COSTOS
+    # ===========================================
+
+    # Aritmética exacta en enteros escalados (mantisa, decimales): sin
+    # Decimal por actividad y sin floats en los montos. Solo la salida se
+    # redondea a céntimos, con el mismo criterio que Decimal.quantize.
+    ha, decimales_ha = entero_escalado(hectareas)
+    fd, decimales_fd = entero_escalado(factor_densidad)
+    fp, decimales_fp = entero_escalado(factor_pendiente)
+    jornal_escalado = entero_escalado(costo_jornal)
+    planton_escalado = entero_escalado(costo_planton)
+
+    # Modelo 50/50: (Base * 0.5) + (Base * 0.5 * Factor) = Base * 5 * (1 + Factor) / 10
+    fd_mano_obra = 5 * (10 ** decimales_fd + fd)
+    decimales_fd_mano_obra = decimales_fd + 1
+
+    detalle_actividades = []
+    # Céntimos por año y categoría (solo las categorías con actividades)
+    resumen_por_anio: Dict[int, Dict[str, int]] = {}
+
+    actividades = plan.actividades_en_rango(
+        parametros.anio_inicio, parametros.anio_fin, parametros.incluir_servicios
+    )
+    for actividad in actividades:
+        # Cantidad base por hectárea
+        cantidad, decimales = actividad.cantidad_escalada
+        cantidad *= ha
+        decimales += decimales_ha
+        cantidad_base = redondear_centimos(cantidad, decimales)
+
+        # 1. Aplicar Factor de Densidad
+        # Mano de Obra sensible (Hoyado, Plantación): modelo 50/50
+        # Insumos (Plantones): el factor es 100% directo
+        if actividad.sensible_densidad:
+            if actividad.es_mano_obra:
+                cantidad *= fd_mano_obra
+                decimales += decimales_fd_mano_obra
+            else:
+                cantidad *= fd
+                decimales += decimales_fd
+
+        # 2. Aplicar Factor de Pendiente (el plan solo lo marca en mano de obra)
+        if actividad.sensible_pendiente:
+            cantidad *= fp
+            decimales += decimales_fp
+
+        # 3. Determinar costo unitario según rubro
+        if actividad.es_mano_obra:
+            costo_unitario = costo_jornal
+            unitario, decimales_unitario = jornal_escalado
+        elif actividad.es_planton:
+            costo_unitario = costo_planton
+            unitario, decimales_unitario = planton_escalado
+        else:
+            costo_unitario = actividad.costo_unitario_referencial
+            unitario, decimales_unitario = actividad.costo_escalado
+
+        # 4. Calcular costo total de la actividad (céntimos)
+        costo_total = redondear_centimos(cantidad * unitario, decimales + decimales_unitario)
+
+        # Argumentos posicionales: en el bucle por actividad cuestan la
+        # mitad que por nombre (orden de los campos de CostoActividad)
+        detalle_actividades.append(CostoActividad(
+            actividad.anio,
+            actividad.rubro_display,
+            actividad.actividad,
+            Decimal(cantidad_base) * CENTIMO,
+            Decimal(redondear_centimos(cantidad, decimales)) * CENTIMO,
+            costo_unitario,
+            Decimal(costo_total) * CENTIMO,
+        ))
+
+        # Agregar al resumen anual
+        categorias = resumen_por_anio.setdefault(actividad.anio, {})
+        categorias[actividad.categoria] = categorias.get(actividad.categoria, 0) + costo_total
+
+    # ===========================================
+    # RESUMEN ANUAL
+    # ===========================================
+
+    resumen_anual = []
+    costos_instalacion = None
+    costo_total_proyecto = Decimal('0')
+
+    for anio in sorted(resumen_por_anio.keys()):
+        categorias = resumen_por_anio[anio]
+        total_anio = Decimal(sum(categorias.values())) * CENTIMO
+        costo_total_proyecto += total_anio
+
+        costo_anual = CostoAnual(
+            anio=anio,
+            mano_obra=_monto(categorias.get(CATEGORIA_MANO_OBRA)),
+            insumos=_monto(categorias.get(CATEGORIA_INSUMOS)),
+            servicios=_monto(categorias.get(CATEGORIA_SERVICIOS)),
+            total=total_anio,
+        )
+
+        # Segregar Año 0 (Instalación) de Años 1+ (Mantenimiento)
+        if anio == 0:
+            costos_instalacion = costo_anual
+        else:
+            resumen_anual.append(costo_anual)
+
+    # ===========================================
+    # CÁLCULO FINANCIERO (VAN / TIR)
+    # ===========================================
+
+    # Ingreso proyectado al final del turno
+    rendimiento, decimales_rendimiento = entero_escalado(plan.rendimiento_m3_ha)
+    precio, decimales_precio = entero_escalado(plan.precio_madera_referencial)
+    ingreso_centimos = redondear_centimos(
+        ha * rendimiento * precio, decimales_ha + decimales_rendimiento + decimales_precio
+    )
+    anio_cosecha = plan.turno_estimado
+
+    # Flujo de caja en céntimos: Ingresos - Costos
+    # 1. Costos (flujos negativos)
+    flujo_caja = {
+        anio: -sum(categorias.values()) for anio, categorias in resumen_por_anio.items()
+    }
+
+    # 2. Ingresos (flujos positivos)
+    # Sumar al año de cosecha (si está dentro del rango o si es el final)
+    flujo_caja[anio_cosecha] = flujo_caja.get(anio_cosecha, 0) + ingreso_centimos
+
+    # 3. VAN y valores presentes del ratio Beneficio/Costo
+    # (B/C = VP_Ingresos / VP_Costos) con una sola división por año,
+    # usando la tabla de factores (1 + tasa)^t de la tasa y el horizonte
+    factores = factores_capitalizacion(tasa_descuento, max(flujo_caja.keys()))
+    van = Decimal('0')
+    vp_ingresos = Decimal('0')
+    vp_costos = Decimal('0')
+
+    for anio, centimos in flujo_caja.items():
+        descontado = Decimal(centimos) * CENTIMO / factores[anio]
+        van += descontado
+        if centimos > 0:
+            vp_ingresos += descontado
+        else:
+            vp_costos += abs(descontado)
+
+    ratio_bc = Decimal('0')
+    if vp_costos > 0:
+        ratio_bc = (vp_ingresos / vp_costos).quantize(CENTIMO)
+
+    # 4. TIR (Newton acotado sobre el polinomio del flujo)
+    # Flujo anual denso (índice = año) en floats para el solver
+    flujos = tuple(flujo_caja.get(a, 0) / 100 for a in range(max(flujo_caja.keys()) + 1))
+    resultado_tir = calcular_tir(flujos)
+
+    return ResultadoCostos(
+        cultivo=plan.cultivo_nombre,
+        hectareas=hectareas,
+        factor_pendiente=factor_pendiente,
+        factor_densidad=factor_densidad,
+        densidad_base=plan.densidad_base,
+        densidad_usuario=densidad_usuario,
+        sistema_siembra=parametros.sistema_siembra,
+        costo_jornal_usado=costo_jornal,
+        costo_planton_usado=costo_planton,
+        precio_madera_usado=plan.precio_madera_referencial,
+        fuente_precio_madera=plan.fuente_precio_madera,
+        detalle_actividades=tuple(detalle_actividades),
+        costos_instalacion=costos_instalacion,
+        resumen_anual=tuple(resumen_anual),
+        costo_total_proyecto=costo_total_proyecto,
+        van=van.quantize(CENTIMO),
+        tir=tir_porcentaje(resultado_tir),
+        tir_diagnostico=resultado_tir.diagnostico,
+        # Curva VAN vs tasa de descuento
+        curva_van=tuple([Decimal(repr(round(valor, 2))) for valor in curva_van(flujos)]),
+        ratio_beneficio_costo=ratio_bc,
+        ingreso_total_estimado=Decimal(ingreso_centimos) * CENTIMO,
+        vp_ingresos=vp_ingresos,
+        vp_costos=vp_costos,
+        flujos=flujos,
+    )
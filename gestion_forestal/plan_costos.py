@@ -0,0 +1,276 @@
+"""
+Plan de costos compilado para el Geovisor de Costos Forestales v2.1.
+
+El paquete tecnológico de un cultivo en una zona económica solo cambia
+cuando un administrador lo edita. En lugar de consultar y recorrer las
+filas de PaqueteTecnologico en cada cálculo, se compila una vez en un
+PlanCostos inmutable (definido en motor.py, que no depende del ORM):
+
+- Actividades pre-clasificadas (categoría de resumen, costo unitario),
+  con cantidades y costos ya convertidos a enteros escalados
+- Coeficientes por año y por hectárea en arreglos compactos (array 'd')
+
+Los planes se guardan en una caché LRU local al proceso que se invalida
+mediante señales (ver signals.py).
+"""
+
+from array import array
+from collections import OrderedDict
+from itertools import groupby
+from threading import Lock
+from typing import Collection, Dict, Iterable, Optional, Tuple
+
+from django.db import models
+
+from .finanzas import entero_escalado
+from .models import Cultivo, PaqueteTecnologico
+from .motor import (
+    CATEGORIA_INSUMOS,
+    CATEGORIA_MANO_OBRA,
+    CATEGORIA_SERVICIOS,
+    ActividadCompilada,
+    PlanCostos,
+)
+
+
+# Rubros que se excluyen cuando incluir_servicios=False
+RUBROS_SERVICIOS = frozenset({
+    PaqueteTecnologico.Rubro.SERVICIOS,
+    PaqueteTecnologico.Rubro.LEGAL,
+    PaqueteTecnologico.Rubro.ACTIVO,
+})
+
+# Número máximo de planes (cultivo, zona) retenidos por proceso
+CAPACIDAD_CACHE_PLANES = 256
+
+ClavePlan = Tuple[int, Optional[int]]
+
+
+def compilar_plan(
+    cultivo: Cultivo,
+    paquetes: Iterable[PaqueteTecnologico],
+    zona_economica_id: Optional[int]
+) -> PlanCostos:
+    """
+    Compila las filas del paquete tecnológico en un PlanCostos.
+
+    Args:
+        cultivo: Cultivo al que pertenece el paquete.
+        paquetes: Filas ordenadas por (anio_proyecto, rubro, actividad).
+        zona_economica_id: Zona económica del paquete (None = genérico).
+
+    Returns:
+        PlanCostos: Plan inmutable listo para el motor de cálculo.
+    """
+    actividades = []
+    for paquete in paquetes:
+        es_mano_obra = paquete.rubro == PaqueteTecnologico.Rubro.MANO_OBRA
+        es_insumo = paquete.rubro == PaqueteTecnologico.Rubro.INSUMO
+
+        if es_mano_obra:
+            categoria = CATEGORIA_MANO_OBRA
+        elif es_insumo:
+            categoria = CATEGORIA_INSUMOS
+        else:
+            categoria = CATEGORIA_SERVICIOS
+
+        actividades.append(ActividadCompilada(
+            anio=paquete.anio_proyecto,
+            rubro=paquete.rubro,
+            rubro_display=paquete.get_rubro_display(),
+            actividad=paquete.actividad,
+            cantidad_tecnica=paquete.cantidad_tecnica,
+            costo_unitario_referencial=paquete.costo_unitario_referencial,
+            categoria=categoria,
+            es_mano_obra=es_mano_obra,
+            es_planton=es_insumo and paquete.es_planton,
+            es_servicio=paquete.rubro in RUBROS_SERVICIOS,
+            sensible_densidad=paquete.sensible_densidad,
+            sensible_pendiente=paquete.sensible_pendiente and es_mano_obra,
+            cantidad_escalada=entero_escalado(paquete.cantidad_tecnica),
+            costo_escalado=entero_escalado(paquete.costo_unitario_referencial),
+        ))
+
+    anios = max((a.anio for a in actividades), default=-1) + 1
+    coeficientes: Dict[str, array] = {
+        nombre: array('d', bytes(8 * anios))
+        for nombre in (
+            'jornales_fijos', 'jornales_densidad', 'jornales_pendiente',
+            'jornales_densidad_pendiente', 'plantones_fijos', 'plantones_densidad',
+            'insumos_fijos', 'insumos_densidad', 'servicios_fijos', 'servicios_densidad',
+        )
+    }
+
+    for act in actividades:
+        cantidad = float(act.cantidad_tecnica)
+        sufijo = 'densidad' if act.sensible_densidad else 'fijos'
+
+        if act.es_mano_obra:
+            if act.sensible_densidad and act.sensible_pendiente:
+                destino = 'jornales_densidad_pendiente'
+            elif act.sensible_pendiente:
+                destino = 'jornales_pendiente'
+            else:
+                destino = f'jornales_{sufijo}'
+        elif act.es_planton:
+            destino = f'plantones_{sufijo}'
+        else:
+            cantidad *= float(act.costo_unitario_referencial)
+            destino = f'{act.categoria}_{sufijo}'
+
+        coeficientes[destino][act.anio] += cantidad
+
+    return PlanCostos(
+        cultivo_id=cultivo.id,
+        cultivo_nombre=cultivo.nombre,
+        turno_estimado=cultivo.turno_estimado,
+        densidad_base=cultivo.densidad_base,
+        precio_madera_referencial=cultivo.precio_madera_referencial,
+        rendimiento_m3_ha=cultivo.rendimiento_m3_ha,
+        zona_economica_id=zona_economica_id,
+        actividades=tuple(actividades),
+        **coeficientes
+    )
+
+
+def cargar_plan(cultivo_id: int, zona_economica_id: Optional[int]) -> Optional[PlanCostos]:
+    """
+    Lee de la base de datos y compila el plan de un par (cultivo, zona).
+
+    Returns:
+        PlanCostos o None si el cultivo no existe.
+    """
+    try:
+        cultivo = Cultivo.objects.get(id=cultivo_id)
+    except Cultivo.DoesNotExist:
+        return None
+
+    paquetes = PaqueteTecnologico.objects.filter(
+        cultivo_id=cultivo_id,
+        zona_economica_id=zona_economica_id
+    ).order_by('anio_proyecto', 'rubro', 'actividad')
+
+    return compilar_plan(cultivo, paquetes, zona_economica_id)
+
+
+def cargar_planes(claves: Collection[ClavePlan]) -> Dict[ClavePlan, PlanCostos]:
+    """
+    Compila varios planes con una consulta de cultivos y una de paquetes.
+
+    Las claves cuyo cultivo no existe no aparecen en el resultado.
+    """
+    cultivos = Cultivo.objects.in_bulk({cultivo_id for cultivo_id, _ in claves})
+    zonas = {zona_id for _, zona_id in claves if zona_id is not None}
+
+    paquetes = PaqueteTecnologico.objects.filter(cultivo_id__in=cultivos.keys())
+    if None in {zona_id for _, zona_id in claves}:
+        paquetes = paquetes.filter(
+            models.Q(zona_economica_id__in=zonas) | models.Q(zona_economica__isnull=True)
+        )
+    else:
+        paquetes = paquetes.filter(zona_economica_id__in=zonas)
+    paquetes = paquetes.order_by(
+        'cultivo_id', 'zona_economica_id', 'anio_proyecto', 'rubro', 'actividad'
+    )
+
+    filas: Dict[ClavePlan, list] = {}
+    for clave, grupo in groupby(paquetes, key=lambda p: (p.cultivo_id, p.zona_economica_id)):
+        filas[clave] = list(grupo)
+
+    return {
+        clave: compilar_plan(cultivos[clave[0]], filas.get(clave, ()), clave[1])
+        for clave in claves
+        if clave[0] in cultivos
+    }
+
+
+class CachePlanes:
+    """
+    Caché LRU de planes compilados, local al proceso y segura entre hilos.
+
+    Cada invalidación incrementa una generación; un plan compilado mientras
+    ocurría una invalidación no se guarda, para no reintroducir datos viejos.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_CACHE_PLANES):
+        self.capacidad = capacidad
+        self._planes: 'OrderedDict[ClavePlan, PlanCostos]' = OrderedDict()
+        self._lock = Lock()
+        self._generacion = 0
+
+    def obtener(self, cultivo_id: int, zona_economica_id: Optional[int]) -> Optional[PlanCostos]:
+        """Retorna el plan de la caché o lo compila desde la base de datos."""
+        clave = (cultivo_id, zona_economica_id)
+
+        with self._lock:
+            plan = self._planes.get(clave)
+            if plan is not None:
+                self._planes.move_to_end(clave)
+                return plan
+            generacion = self._generacion
+
+        plan = cargar_plan(cultivo_id, zona_economica_id)
+        if plan is not None:
+            self._guardar(clave, plan, generacion)
+        return plan
+
+    def obtener_varios(self, claves: Iterable[ClavePlan]) -> Dict[ClavePlan, PlanCostos]:
+        """
+        Retorna los planes de varias claves, compilando los faltantes juntos.
+
+        Cada (cultivo, zona) se carga a lo sumo una vez por llamada.
+        """
+        planes: Dict[ClavePlan, PlanCostos] = {}
+        faltantes = set()
+
+        with self._lock:
+            for clave in set(claves):
+                plan = self._planes.get(clave)
+                if plan is None:
+                    faltantes.add(clave)
+                else:
+                    self._planes.move_to_end(clave)
+                    planes[clave] = plan
+            generacion = self._generacion
+
+        if faltantes:
+            for clave, plan in cargar_planes(faltantes).items():
+                self._guardar(clave, plan, generacion)
+                planes[clave] = plan
+        return planes
+
+    def _guardar(self, clave: ClavePlan, plan: PlanCostos, generacion: int) -> None:
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._planes[clave] = plan
+            self._planes.move_to_end(clave)
+            while len(self._planes) > self.capacidad:
+                self._planes.popitem(last=False)
+
+    def invalidar(self) -> None:
+        """Descarta todos los planes compilados."""
+        with self._lock:
+            self._generacion += 1
+            self._planes.clear()
+
+    def __len__(self) -> int:
+        return len(self._planes)
+
+
+cache_planes = CachePlanes()
+
+
+def obtener_plan(cultivo_id: int, zona_economica_id: Optional[int]) -> Optional[PlanCostos]:
+    """Atajo para obtener un plan desde la caché del proceso."""
+    return cache_planes.obtener(cultivo_id, zona_economica_id)
+
+
+def obtener_planes(claves: Iterable[ClavePlan]) -> Dict[ClavePlan, PlanCostos]:
+    """Atajo para obtener varios planes desde la caché del proceso."""
+    return cache_planes.obtener_varios(claves)
+
+
+def invalidar_planes() -> None:
+    """Atajo para invalidar la caché de planes del proceso."""
+    cache_planes.invalidar()
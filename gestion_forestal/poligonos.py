@@ -0,0 +1,622 @@
+"""
+Almacén compacto de polígonos distritales para consultas punto-en-polígono.
+
+Los límites de DISTRITOS_PI7.topojson se decodifican una sola vez en
+arreglos contiguos (array 'd'): todos los vértices de todos los anillos
+uno tras otro, con tablas de desplazamiento por anillo y por distrito.
+Las cajas envolventes de los distritos se indexan con un R-tree empaquetado
+por Sort-Tile-Recursive (STR), de modo que cada consulta solo aplica el
+ray casting (regla par-impar) a los pocos distritos cuya caja contiene
+el punto. Además, las aristas de cada distrito se reparten en franjas
+horizontales: un rayo horizontal solo puede cruzar las aristas de la
+franja de su latitud. No requiere GDAL ni GEOS.
+
+Las áreas son geodésicas con la misma fórmula que
+L.GeometryUtil.geodesicArea de Leaflet, para que el backend y el mapa
+reporten las mismas hectáreas. El área de la intersección entre una
+parcela y un distrito se obtiene por el teorema de Green sin construir
+el polígono recortado: el borde de la intersección son los tramos del
+borde de la parcela dentro del distrito más los tramos del borde del
+distrito dentro de la parcela. Para ello los anillos exteriores se
+orientan en sentido antihorario y los huecos en sentido horario.
+"""
+
+import math
+from array import array
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .topologia import (
+    cargar_topologia,
+    decodificar_arcos,
+    ensamblar_anillo,
+    geometrias,
+    normalizar_nombre,
+    poligonos_geometria,
+)
+
+
+# Hijos por nodo del R-tree
+CAPACIDAD_NODO = 8
+
+# Franjas horizontales por distrito: una por cada ~16 vértices, hasta 64
+VERTICES_POR_FRANJA = 16
+MAX_FRANJAS = 64
+
+# Radio usado por Leaflet (L.GeometryUtil.geodesicArea), en metros
+RADIO_GEODESICO_M = 6378137.0
+
+# Clave de un distrito en la topología: (departamento, provincia, distrito)
+ClaveDistrito = Tuple[str, str, str]
+
+# Propiedades de DISTRITOS_PI7.topojson que forman la clave
+CAMPOS_DISTRITO = ('NOM_DEP', 'NOM_PRO', 'NOM_DIST')
+
+# Distancia máxima (grados, ~0.1 mm) para considerar dos aristas colineales
+TOLERANCIA_COLINEAL = 1e-9
+
+# Segmento (x1, y1, x2, y2) en grados
+Segmento = Tuple[float, float, float, float]
+
+# Tramo de un segmento sobre el borde del otro polígono: (t0, t1, mismo_sentido)
+Solape = Tuple[float, float, bool]
+
+
+def _integral_tramo(x1: float, y1: float, x2: float, y2: float) -> float:
+    """Término de un tramo en la fórmula de área de Leaflet (radianes)."""
+    return math.radians(x2 - x1) * (
+        2.0 + math.sin(math.radians(y1)) + math.sin(math.radians(y2))
+    )
+
+
+def area_anillo(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """
+    Área geodésica con signo de un anillo cerrado (m²).
+
+    Positiva en sentido antihorario (lng, lat), negativa en horario.
+    """
+    suma = 0.0
+    for i in range(len(xs) - 1):
+        suma += _integral_tramo(xs[i], ys[i], xs[i + 1], ys[i + 1])
+    return -suma * RADIO_GEODESICO_M * RADIO_GEODESICO_M / 2.0
+
+
+def orientar_anillo(xs: array, ys: array, exterior: bool) -> Tuple[array, array]:
+    """Cierra el anillo y lo orienta: antihorario si es exterior, horario si es hueco."""
+    if len(xs) and (xs[0] != xs[-1] or ys[0] != ys[-1]):
+        xs = xs + array('d', [xs[0]])
+        ys = ys + array('d', [ys[0]])
+    if (area_anillo(xs, ys) > 0) != exterior:
+        return xs[::-1], ys[::-1]
+    return xs, ys
+
+
+def _interseccion(a: Segmento, b: Segmento) -> Optional[Tuple[float, float]]:
+    """
+    Parámetros (t, u) del cruce de dos segmentos, o None si no se cruzan.
+
+    Los segmentos paralelos (incluso colineales) no se consideran cruce;
+    los solapes colineales se tratan en _solape.
+    """
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    dax, day = ax2 - ax1, ay2 - ay1
+    dbx, dby = bx2 - bx1, by2 - by1
+    denominador = dax * dby - day * dbx
+    if abs(denominador) <= 1e-12 * math.hypot(dax, day) * math.hypot(dbx, dby):
+        return None
+    ex, ey = bx1 - ax1, by1 - ay1
+    t = (ex * dby - ey * dbx) / denominador
+    u = (ex * day - ey * dax) / denominador
+    if 0.0 <= t <= 1.0 and 0.0 <= u <= 1.0:
+        return t, u
+    return None
+
+
+def _solape(a: Segmento, b: Segmento) -> Optional[Tuple[float, float, float, float, bool]]:
+    """
+    Tramo común de dos segmentos colineales.
+
+    Ocurre cuando la parcela sigue exactamente un límite distrital
+    (p. ej. una parcela dibujada sobre la misma topología).
+
+    Returns:
+        (t0, t1, u0, u1, mismo_sentido) con t0 < t1 sobre a y los
+        parámetros correspondientes sobre b, o None si no se solapan.
+    """
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    dax, day = ax2 - ax1, ay2 - ay1
+    largo2 = dax * dax + day * day
+    if largo2 == 0.0:
+        return None
+    largo = math.sqrt(largo2)
+    if (abs(dax * (by1 - ay1) - day * (bx1 - ax1)) / largo > TOLERANCIA_COLINEAL
+            or abs(dax * (by2 - ay1) - day * (bx2 - ax1)) / largo > TOLERANCIA_COLINEAL):
+        return None
+
+    tb1 = ((bx1 - ax1) * dax + (by1 - ay1) * day) / largo2
+    tb2 = ((bx2 - ax1) * dax + (by2 - ay1) * day) / largo2
+    if tb1 == tb2:
+        return None
+    t0 = max(0.0, min(tb1, tb2))
+    t1 = min(1.0, max(tb1, tb2))
+    if t1 <= t0:
+        return None
+    u0 = (t0 - tb1) / (tb2 - tb1)
+    u1 = (t1 - tb1) / (tb2 - tb1)
+    return t0, t1, u0, u1, tb2 > tb1
+
+
+class NivelArbol:
+    """
+    Un nivel del R-tree: cajas de sus entradas en orden STR.
+
+    En el nivel de hojas 'ref' es el índice del distrito; en los niveles
+    superiores es el número de grupo del nivel inferior, cuyas entradas
+    son [ref * CAPACIDAD_NODO, (ref + 1) * CAPACIDAD_NODO).
+    """
+
+    __slots__ = ('min_x', 'min_y', 'max_x', 'max_y', 'ref')
+
+    def __init__(self, cajas: Sequence[Tuple[float, float, float, float, int]]):
+        self.min_x = array('d', (c[0] for c in cajas))
+        self.min_y = array('d', (c[1] for c in cajas))
+        self.max_x = array('d', (c[2] for c in cajas))
+        self.max_y = array('d', (c[3] for c in cajas))
+        self.ref = array('l', (c[4] for c in cajas))
+
+    def __len__(self) -> int:
+        return len(self.ref)
+
+
+def _ordenar_str(cajas: list) -> list:
+    """Ordena cajas por Sort-Tile-Recursive: franjas en x, luego y en cada franja."""
+    n = len(cajas)
+    grupos = math.ceil(n / CAPACIDAD_NODO)
+    franjas = max(1, math.ceil(math.sqrt(grupos)))
+    por_franja = math.ceil(n / franjas)
+
+    cajas = sorted(cajas, key=lambda c: c[0] + c[2])
+    ordenadas = []
+    for inicio in range(0, n, por_franja):
+        franja = cajas[inicio:inicio + por_franja]
+        ordenadas.extend(sorted(franja, key=lambda c: c[1] + c[3]))
+    return ordenadas
+
+
+def construir_rtree(cajas: Sequence[Tuple[float, float, float, float]]) -> List[NivelArbol]:
+    """
+    Construye un R-tree STR sobre las cajas dadas.
+
+    Args:
+        cajas: (min_x, min_y, max_x, max_y) por elemento.
+
+    Returns:
+        List[NivelArbol]: Niveles desde las hojas hasta la raíz.
+    """
+    entradas = [(*caja, i) for i, caja in enumerate(cajas)]
+    niveles = []
+    while True:
+        entradas = _ordenar_str(entradas)
+        niveles.append(NivelArbol(entradas))
+        if len(entradas) <= CAPACIDAD_NODO:
+            return niveles
+        padres = []
+        for grupo, inicio in enumerate(range(0, len(entradas), CAPACIDAD_NODO)):
+            hijos = entradas[inicio:inicio + CAPACIDAD_NODO]
+            padres.append((
+                min(h[0] for h in hijos),
+                min(h[1] for h in hijos),
+                max(h[2] for h in hijos),
+                max(h[3] for h in hijos),
+                grupo,
+            ))
+        entradas = padres
+
+
+class AlmacenPoligonos:
+    """
+    Polígonos de distritos en arreglos contiguos con índice R-tree.
+
+    Attributes:
+        claves: (departamento, provincia, distrito) de cada polígono.
+        xs, ys: Vértices de todos los anillos (longitud, latitud).
+        inicio_anillo: Desplazamiento del primer vértice de cada anillo
+            (con un centinela final).
+        inicio_poligono: Primer anillo de cada distrito (con centinela).
+        inicio_franjas: Primera franja de cada distrito (con centinela).
+        inicio_aristas: Primera arista de cada franja (con centinela).
+        aristas: Vértice inicial de cada arista, agrupadas por franja.
+    """
+
+    def __init__(self, claves: List[ClaveDistrito], anillos: List[List[Tuple[array, array]]]):
+        self.claves = claves
+        self.xs = array('d')
+        self.ys = array('d')
+        self.inicio_anillo = array('l', [0])
+        self.inicio_poligono = array('l', [0])
+        cajas = []
+
+        for anillos_distrito in anillos:
+            min_x = min_y = math.inf
+            max_x = max_y = -math.inf
+            for xs, ys in anillos_distrito:
+                self.xs.extend(xs)
+                self.ys.extend(ys)
+                self.inicio_anillo.append(len(self.xs))
+                if xs:
+                    min_x, max_x = min(min_x, min(xs)), max(max_x, max(xs))
+                    min_y, max_y = min(min_y, min(ys)), max(max_y, max(ys))
+            self.inicio_poligono.append(len(self.inicio_anillo) - 1)
+            cajas.append((min_x, min_y, max_x, max_y))
+
+        self.cajas = cajas
+        self.niveles = construir_rtree(cajas) if cajas else []
+        self._construir_franjas()
+
+    def _construir_franjas(self) -> None:
+        """Reparte las aristas de cada distrito en franjas de latitud."""
+        ys = self.ys
+        self.inicio_franjas = array('l', [0])
+        self.inicio_aristas = array('l', [0])
+        self.aristas = array('l')
+
+        for poligono, (_, min_y, _, max_y) in enumerate(self.cajas):
+            primer_anillo = self.inicio_poligono[poligono]
+            ultimo_anillo = self.inicio_poligono[poligono + 1]
+            vertices = self.inicio_anillo[ultimo_anillo] - self.inicio_anillo[primer_anillo]
+            n = max(1, min(MAX_FRANJAS, vertices // VERTICES_POR_FRANJA))
+            alto = (max_y - min_y) / n if max_y > min_y else 1.0
+            franjas = [[] for _ in range(n)]
+
+            # Los anillos son cerrados: arista i une los vértices i e i + 1
+            for anillo in range(primer_anillo, ultimo_anillo):
+                for i in range(self.inicio_anillo[anillo], self.inicio_anillo[anillo + 1] - 1):
+                    y1, y2 = ys[i], ys[i + 1]
+                    if y1 == y2:
+                        continue
+                    bajo = min(n - 1, int((min(y1, y2) - min_y) / alto))
+                    arriba = min(n - 1, int((max(y1, y2) - min_y) / alto))
+                    for franja in range(bajo, arriba + 1):
+                        franjas[franja].append(i)
+
+            for franja in franjas:
+                self.aristas.extend(franja)
+                self.inicio_aristas.append(len(self.aristas))
+            self.inicio_franjas.append(len(self.inicio_aristas) - 1)
+
+    def __len__(self) -> int:
+        return len(self.claves)
+
+    def candidatos(self, x: float, y: float) -> List[int]:
+        """Distritos cuya caja envolvente contiene el punto."""
+        return self.intersectan(x, y, x, y)
+
+    def intersectan(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[int]:
+        """Distritos cuya caja envolvente intersecta la caja dada."""
+        if not self.niveles:
+            return []
+        resultado = []
+        niveles = self.niveles
+        # Pila de (nivel, primera entrada, última entrada exclusiva)
+        pila = [(len(niveles) - 1, 0, len(niveles[-1]))]
+        while pila:
+            n, inicio, fin = pila.pop()
+            nivel = niveles[n]
+            for i in range(inicio, min(fin, len(nivel))):
+                if (nivel.min_x[i] <= max_x and min_x <= nivel.max_x[i]
+                        and nivel.min_y[i] <= max_y and min_y <= nivel.max_y[i]):
+                    ref = nivel.ref[i]
+                    if n == 0:
+                        resultado.append(ref)
+                    else:
+                        pila.append((n - 1, ref * CAPACIDAD_NODO, (ref + 1) * CAPACIDAD_NODO))
+        return resultado
+
+    def contiene(self, poligono: int, x: float, y: float) -> bool:
+        """Ray casting par-impar sobre las aristas de la franja del punto."""
+        min_x, min_y, max_x, max_y = self.cajas[poligono]
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+
+        primera = self.inicio_franjas[poligono]
+        n = self.inicio_franjas[poligono + 1] - primera
+        alto = (max_y - min_y) / n if max_y > min_y else 1.0
+        franja = primera + min(n - 1, int((y - min_y) / alto))
+
+        xs, ys = self.xs, self.ys
+        dentro = False
+        for i in self.aristas[self.inicio_aristas[franja]:self.inicio_aristas[franja + 1]]:
+            y1, y2 = ys[i], ys[i + 1]
+            if (y1 > y) != (y2 > y):
+                x1, x2 = xs[i], xs[i + 1]
+                if x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                    dentro = not dentro
+        return dentro
+
+    def localizar(self, lng: float, lat: float) -> Optional[int]:
+        """
+        Índice del distrito que contiene la coordenada.
+
+        Args:
+            lng: Longitud en grados.
+            lat: Latitud en grados.
+
+        Returns:
+            int o None si el punto está fuera de todos los polígonos.
+        """
+        for poligono in self.candidatos(lng, lat):
+            if self.contiene(poligono, lng, lat):
+                return poligono
+        return None
+
+    def segmentos(self, poligono: int) -> List[Segmento]:
+        """Aristas de todos los anillos de un distrito."""
+        xs, ys = self.xs, self.ys
+        resultado = []
+        for anillo in range(self.inicio_poligono[poligono], self.inicio_poligono[poligono + 1]):
+            for i in range(self.inicio_anillo[anillo], self.inicio_anillo[anillo + 1] - 1):
+                resultado.append((xs[i], ys[i], xs[i + 1], ys[i + 1]))
+        return resultado
+
+    def area(self, poligono: int) -> float:
+        """Área geodésica de un distrito (m²), descontando huecos."""
+        total = 0.0
+        for anillo in range(self.inicio_poligono[poligono], self.inicio_poligono[poligono + 1]):
+            inicio = self.inicio_anillo[anillo]
+            fin = self.inicio_anillo[anillo + 1]
+            total += area_anillo(self.xs[inicio:fin], self.ys[inicio:fin])
+        return total
+
+    def centroide(self, poligono: int) -> Optional[Tuple[float, float]]:
+        """
+        Centroide ponderado por área de un distrito (lng, lat).
+
+        Suma los centroides de los anillos ponderados por su área con
+        signo, así los huecos restan y las islas de un MultiPolygon
+        pesan según su tamaño.
+
+        Returns:
+            (lng, lat) o None si el polígono no tiene área.
+        """
+        xs, ys = self.xs, self.ys
+        area_total = cx_total = cy_total = 0.0
+        for anillo in range(self.inicio_poligono[poligono], self.inicio_poligono[poligono + 1]):
+            inicio = self.inicio_anillo[anillo]
+            fin = self.inicio_anillo[anillo + 1]
+            if fin - inicio < 4:
+                continue
+            # Coordenadas relativas al primer vértice para estabilidad numérica
+            x0, y0 = xs[inicio], ys[inicio]
+            area = cx = cy = 0.0
+            for i in range(inicio, fin - 1):
+                xa, ya = xs[i] - x0, ys[i] - y0
+                xb, yb = xs[i + 1] - x0, ys[i + 1] - y0
+                cruz = xa * yb - xb * ya
+                area += cruz
+                cx += (xa + xb) * cruz
+                cy += (ya + yb) * cruz
+            if area == 0.0:
+                continue
+            area /= 2.0
+            area_total += area
+            cx_total += (cx / (6.0 * area) + x0) * area
+            cy_total += (cy / (6.0 * area) + y0) * area
+        if area_total == 0.0:
+            return None
+        return cx_total / area_total, cy_total / area_total
+
+    def area_interseccion(self, poligono: int, parcela: 'AlmacenPoligonos') -> float:
+        """
+        Área geodésica de la intersección de un distrito con una parcela (m²).
+
+        Args:
+            poligono: Índice del distrito en este almacén.
+            parcela: Almacén con un único polígono (la parcela).
+
+        Returns:
+            float: Área en m² (0 si no se intersectan).
+        """
+        p_min_x, p_min_y, p_max_x, p_max_y = parcela.cajas[0]
+
+        # Solo las aristas del distrito dentro de la caja de la parcela
+        # pueden cortarla o quedar dentro de ella
+        locales = [
+            s for s in self.segmentos(poligono)
+            if min(s[0], s[2]) <= p_max_x and max(s[0], s[2]) >= p_min_x
+            and min(s[1], s[3]) <= p_max_y and max(s[1], s[3]) >= p_min_y
+        ]
+        if not locales:
+            # La parcela está totalmente dentro o totalmente fuera
+            if self.contiene(poligono, parcela.xs[0], parcela.ys[0]):
+                return parcela.area(0)
+            return 0.0
+
+        propios = parcela.segmentos(0)
+        cortes_parcela: List[List[float]] = [[] for _ in propios]
+        cortes_distrito: List[List[float]] = [[] for _ in locales]
+        solapes_parcela: List[List[Solape]] = [[] for _ in propios]
+        solapes_distrito: List[List[Solape]] = [[] for _ in locales]
+
+        # Grilla sobre la caja de la parcela para emparejar solo aristas vecinas
+        n = max(1, min(64, int(math.sqrt(len(locales)))))
+        ancho = (p_max_x - p_min_x) / n or 1.0
+        alto = (p_max_y - p_min_y) / n or 1.0
+
+        def celdas(s: Segmento) -> Iterator[int]:
+            c0 = max(0, min(n - 1, int((min(s[0], s[2]) - p_min_x) / ancho)))
+            c1 = max(0, min(n - 1, int((max(s[0], s[2]) - p_min_x) / ancho)))
+            f0 = max(0, min(n - 1, int((min(s[1], s[3]) - p_min_y) / alto)))
+            f1 = max(0, min(n - 1, int((max(s[1], s[3]) - p_min_y) / alto)))
+            for f in range(f0, f1 + 1):
+                for c in range(c0, c1 + 1):
+                    yield f * n + c
+
+        grilla: List[List[int]] = [[] for _ in range(n * n)]
+        for j, s in enumerate(locales):
+            for celda in celdas(s):
+                grilla[celda].append(j)
+
+        d_min_x, d_min_y, d_max_x, d_max_y = self.cajas[poligono]
+        for i, a in enumerate(propios):
+            a_min_x, a_max_x = min(a[0], a[2]), max(a[0], a[2])
+            a_min_y, a_max_y = min(a[1], a[3]), max(a[1], a[3])
+            if a_max_x < d_min_x or a_min_x > d_max_x or a_max_y < d_min_y or a_min_y > d_max_y:
+                continue
+            vistos = set()
+            for celda in celdas(a):
+                for j in grilla[celda]:
+                    if j in vistos:
+                        continue
+                    vistos.add(j)
+                    b = locales[j]
+                    if (max(b[0], b[2]) < a_min_x or min(b[0], b[2]) > a_max_x
+                            or max(b[1], b[3]) < a_min_y or min(b[1], b[3]) > a_max_y):
+                        continue
+                    cruce = _interseccion(a, b)
+                    if cruce is not None:
+                        cortes_parcela[i].append(cruce[0])
+                        cortes_distrito[j].append(cruce[1])
+                        continue
+                    solape = _solape(a, b)
+                    if solape is not None:
+                        t0, t1, u0, u1, mismo = solape
+                        cortes_parcela[i] += [t0, t1]
+                        cortes_distrito[j] += [u0, u1]
+                        solapes_parcela[i].append((t0, t1, mismo))
+                        solapes_distrito[j].append((min(u0, u1), max(u0, u1), mismo))
+
+        # Un borde compartido pertenece a la intersección solo si ambos lo
+        # recorren en el mismo sentido, y se cuenta una vez (del lado de la parcela)
+        suma = self._sumar_tramos(
+            propios, cortes_parcela, solapes_parcela, True,
+            lambda x, y: self.contiene(poligono, x, y)
+        )
+        suma += self._sumar_tramos(
+            locales, cortes_distrito, solapes_distrito, False,
+            lambda x, y: parcela.contiene(0, x, y)
+        )
+        return max(0.0, -suma * RADIO_GEODESICO_M * RADIO_GEODESICO_M / 2.0)
+
+    @staticmethod
+    def _sumar_tramos(
+        segmentos: List[Segmento],
+        cortes: List[List[float]],
+        solapes: List[List[Solape]],
+        incluir_solapes: bool,
+        dentro
+    ) -> float:
+        """Integral de Green de los tramos de cada segmento que quedan dentro."""
+        suma = 0.0
+        for (x1, y1, x2, y2), ts, tramos in zip(segmentos, cortes, solapes):
+            dx, dy = x2 - x1, y2 - y1
+            puntos = [0.0, *sorted(ts), 1.0] if ts else (0.0, 1.0)
+            for t0, t1 in zip(puntos, puntos[1:]):
+                if t1 <= t0:
+                    continue
+                medio = (t0 + t1) / 2.0
+                solape = next((m for a, b, m in tramos if a <= medio <= b), None)
+                if solape is not None:
+                    incluir = incluir_solapes and solape
+                else:
+                    incluir = dentro(x1 + dx * medio, y1 + dy * medio)
+                if incluir:
+                    suma += _integral_tramo(
+                        x1 + dx * t0, y1 + dy * t0, x1 + dx * t1, y1 + dy * t1
+                    )
+        return suma
+
+
+def almacen_desde_topologia(
+    topologia: dict,
+    campos: Tuple[Optional[str], Optional[str], Optional[str]] = CAMPOS_DISTRITO
+) -> AlmacenPoligonos:
+    """
+    Construye el almacén a partir de un TopoJSON de distritos.
+
+    Args:
+        topologia: TopoJSON cargado.
+        campos: Propiedades de departamento, provincia y distrito. Para
+            capas de provincias o departamentos los niveles que no
+            existen van como None y quedan vacíos en la clave.
+    """
+    arcos = decodificar_arcos(topologia)
+    claves = []
+    anillos = []
+    for geometria in geometrias(topologia):
+        props = geometria.get('properties') or {}
+        poligonos = poligonos_geometria(geometria)
+        if not poligonos:
+            continue
+        claves.append(tuple(
+            normalizar_nombre(props.get(campo)) if campo else ''
+            for campo in campos
+        ))
+        anillos.append([
+            orientar_anillo(*ensamblar_anillo(arcos, anillo), exterior=(k == 0))
+            for poligono in poligonos
+            for k, anillo in enumerate(poligono)
+        ])
+    return AlmacenPoligonos(claves, anillos)
+
+
+def almacen_geojson(geometria: dict) -> AlmacenPoligonos:
+    """
+    Construye un almacén de un solo polígono a partir de GeoJSON.
+
+    Acepta Polygon o MultiPolygon (también dentro de un Feature); las
+    coordenadas son [lng, lat]. Los anillos se cierran y se orientan.
+
+    Raises:
+        ValueError: Si la geometría no es un polígono válido.
+    """
+    if geometria.get('type') == 'Feature':
+        geometria = geometria.get('geometry') or {}
+    tipo = geometria.get('type')
+    coordenadas = geometria.get('coordinates')
+    if tipo == 'Polygon':
+        poligonos = [coordenadas]
+    elif tipo == 'MultiPolygon':
+        poligonos = coordenadas
+    else:
+        raise ValueError('La geometría debe ser Polygon o MultiPolygon.')
+
+    # Primero se leen todos los anillos: cualquier error de forma o de
+    # tipo en las coordenadas es el mismo mensaje para el usuario
+    try:
+        leidos = [
+            [
+                (array('d', (float(p[0]) for p in anillo)), array('d', (float(p[1]) for p in anillo)))
+                for anillo in poligono
+            ]
+            for poligono in poligonos
+        ]
+    except (TypeError, ValueError, IndexError):
+        raise ValueError('Coordenadas inválidas: use pares [lng, lat].')
+
+    anillos = []
+    for poligono in leidos:
+        for k, (xs, ys) in enumerate(poligono):
+            if len(xs) < 3:
+                raise ValueError('Cada anillo debe tener al menos 3 vértices.')
+            anillos.append(orientar_anillo(xs, ys, exterior=(k == 0)))
+    if not anillos:
+        raise ValueError('La geometría no tiene anillos.')
+    return AlmacenPoligonos([('', '', '')], [anillos])
+
+
+@lru_cache(maxsize=4)
+def cargar_almacen(ruta: str) -> Optional[AlmacenPoligonos]:
+    """
+    Carga (una vez por proceso) el almacén de polígonos de un archivo.
+
+    Returns:
+        AlmacenPoligonos o None si el archivo no existe; en ese caso
+        la detección usa solo el centroide más cercano.
+    """
+    try:
+        topologia = cargar_topologia(ruta)
+    except FileNotFoundError:
+        return None
+    return almacen_desde_topologia(topologia)
@@ -0,0 +1,430 @@
+"""
+Normalización de la base de precios de productos forestales (SERFOR).
+
+El archivo data/4.1.4.BD_PRECIOS_MADERAS.csv reúne observaciones de
+precios reportadas por las ATFFS y los gobiernos regionales. Los textos
+llegan con mayúsculas, tildes y espacios inconsistentes ("OJÉ" / "OJE",
+"ANA CASPI" / "ANACASPI") y los meses como abreviaturas. Este módulo
+convierte cada fila en un ObservacionPrecio con claves comparables.
+
+Las observaciones de madera se resumen (mediana, p25, p75, n) por
+especie, departamento y año en EstadisticaPrecio. El motor de cálculo
+toma de ahí el precio de la madera del departamento del distrito,
+desde un snapshot en memoria local al proceso, en lugar del precio
+nacional fijo de Cultivo.
+"""
+
+import hashlib
+import re
+import statistics
+import unicodedata
+from collections import defaultdict
+from dataclasses import replace
+from functools import lru_cache
+from decimal import Decimal, InvalidOperation
+from threading import Lock
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db.models import Count, Max
+
+from .models import EstadisticaPrecio, ObservacionPrecio, RegistroCarga
+from .plan_costos import PlanCostos
+
+
+# Columnas del CSV (la primera viene con BOM: leer con utf-8-sig)
+COLUMNAS_CSV = (
+    'ID', 'ARFFS', 'SEDE', 'DEPART', 'AÑO', 'MES', 'NOMCOM', 'NOMCIE',
+    'TIPPROD', 'PRODUC', 'DIMENS', 'UNID', 'PRECIO', 'OBSERV', 'RECURSO',
+)
+
+# Meses por sus tres primeras letras (SET y SEP para setiembre)
+MESES = {
+    'ENE': 1, 'FEB': 2, 'MAR': 3, 'ABR': 4, 'MAY': 5, 'JUN': 6,
+    'JUL': 7, 'AGO': 8, 'SET': 9, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DIC': 12,
+}
+
+# Variantes de nombre común escritas juntas o separadas
+ALIAS_ESPECIES = {
+    'ANACASPI': 'ANA CASPI',
+    'COTOCALLANA': 'COTO CALLANA',
+    'HUARMICASPI': 'HUARMI CASPI',
+    'PALIPERRO': 'PALI PERRO',
+    'PINOCHUNCHO': 'PINO CHUNCHO',
+    'PINO TECUNUMANII': 'PINO TECUNUMANI',
+}
+
+# Variantes de unidad de medida -> código normalizado
+ALIAS_UNIDADES = {
+    'P2': 'PT',
+    'PIE TABLAR': 'PT',
+    'PIES TABLARES': 'PT',
+    'UND': 'U',
+    'UNID': 'U',
+    'UNIDAD': 'U',
+    'KGS': 'KG',
+    'KILO': 'KG',
+    'LITRO': 'L',
+    'LT': 'L',
+}
+
+# Nombre científico no disponible
+SIN_DATO = 'S/D'
+
+_ESPACIOS = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def normalizar_texto(valor) -> str:
+    """
+    Mayúsculas, sin tildes (se conserva la Ñ) y con espacios simples.
+
+    Ejemplo: " Ojé  blanco" -> "OJE BLANCO". Memorizada: el CSV repite
+    pocas autoridades, sedes, especies y unidades en miles de filas.
+    """
+    descompuesto = unicodedata.normalize('NFD', valor or '')
+    # U+0303 es la tilde de la Ñ: se conserva y se recompone con NFC
+    sin_tildes = ''.join(
+        c for c in descompuesto if c == '\u0303' or not unicodedata.combining(c)
+    )
+    texto = unicodedata.normalize('NFC', sin_tildes)
+    return _ESPACIOS.sub(' ', texto).strip().upper()
+
+
+def normalizar_especie(nombre_comun) -> str:
+    """Nombre común normalizado y con las variantes unificadas."""
+    especie = normalizar_texto(nombre_comun)
+    return ALIAS_ESPECIES.get(especie, especie)
+
+
+def normalizar_unidad(unidad) -> str:
+    """Código de unidad (PT, KG, U, M3...) con las variantes unificadas."""
+    codigo = normalizar_texto(unidad)
+    return ALIAS_UNIDADES.get(codigo, codigo)
+
+
+def normalizar_mes(mes) -> int:
+    """
+    Número de mes (1-12) desde una abreviatura, nombre o número.
+
+    Raises:
+        ValueError: Si el mes no se reconoce.
+    """
+    texto = normalizar_texto(mes)
+    if texto.isdigit() and 1 <= int(texto) <= 12:
+        return int(texto)
+    numero = MESES.get(texto[:3])
+    if numero is None:
+        raise ValueError(f'Mes no reconocido: {mes!r}')
+    return numero
+
+
+def observacion_desde_fila(fila: Dict[str, str]) -> ObservacionPrecio:
+    """
+    Convierte una fila del CSV en una observación sin guardar.
+
+    Args:
+        fila: Fila leída con csv.DictReader (ver COLUMNAS_CSV).
+
+    Returns:
+        ObservacionPrecio: Instancia lista para bulk_create.
+
+    Raises:
+        ValueError: Si falta el ID o el año, el mes no se reconoce o el
+            precio no es un número positivo.
+    """
+    try:
+        precio = Decimal(fila['PRECIO'].strip().replace(',', ''))
+    except (InvalidOperation, AttributeError):
+        raise ValueError(f"Precio inválido: {fila.get('PRECIO')!r}")
+    if not precio.is_finite() or precio <= 0:
+        raise ValueError(f"Precio inválido: {fila.get('PRECIO')!r}")
+
+    nombre_cientifico = normalizar_texto(fila['NOMCIE'])
+    if nombre_cientifico == SIN_DATO:
+        nombre_cientifico = ''
+
+    return ObservacionPrecio(
+        id_origen=int(fila['ID']),
+        autoridad=normalizar_texto(fila['ARFFS']),
+        sede=normalizar_texto(fila['SEDE']),
+        departamento=normalizar_texto(fila['DEPART']),
+        anio=int(fila['AÑO']),
+        mes=normalizar_mes(fila['MES']),
+        especie=normalizar_especie(fila['NOMCOM']),
+        nombre_cientifico=nombre_cientifico,
+        tipo_producto=normalizar_texto(fila['TIPPROD']),
+        producto=normalizar_texto(fila['PRODUC']),
+        dimensiones=(fila['DIMENS'] or '').strip(),
+        unidad=normalizar_unidad(fila['UNID']),
+        precio=precio.quantize(Decimal('0.01')),
+        observacion=(fila['OBSERV'] or '').strip(),
+        recurso=normalizar_texto(fila['RECURSO']),
+    )
+
+
+def version_precios() -> str:
+    """
+    Versión de la base de precios, para ETag de /api/precios/.
+
+    Cambia con cada importación (huella y IDs nuevos) y con cada borrado.
+    Las observaciones no se editan en el sitio (el admin es de solo
+    lectura), así que conteo e ID máximo bastan. Una consulta agregada
+    sobre la clave primaria más una búsqueda por clave única.
+    """
+    resumen = ObservacionPrecio.objects.aggregate(n=Count('id'), ultimo=Max('id'))
+    huella = RegistroCarga.objects.filter(
+        comando='import_precios_madera'
+    ).values_list('huella', flat=True).first()
+    return f"{resumen['n']}:{resumen['ultimo']}:{huella or ''}"
+
+
+# =====================================================
+# ESTADÍSTICAS DE PRECIOS DE MADERA
+# =====================================================
+
+# Tipos de producto resumidos en EstadisticaPrecio
+TIPOS_MADERA = ('MADERA ROLLIZA', 'MADERA ASERRADA')
+
+# Tipo de producto cuyo precio usa el motor (madera en troza, la más
+# cercana al precio en pie de Cultivo.precio_madera_referencial)
+TIPO_PRECIO_MOTOR = 'MADERA ROLLIZA'
+
+# Pies tablares en un metro cúbico (1 PT = 1" x 1' x 1')
+PIES_TABLARES_POR_M3 = 423.776
+
+# Factor para llevar el precio de cada unidad de volumen a S/ por m³
+FACTOR_UNIDAD_M3 = {
+    'M3': 1.0,
+    'PT': PIES_TABLARES_POR_M3,
+}
+
+# Departamento de las estadísticas nacionales
+TODO_EL_PAIS = ''
+
+# Observaciones mínimas para usar una estadística en el motor
+MIN_OBSERVACIONES = 3
+
+# Origen del precio de la madera aplicado a un plan. Las fuentes
+# _GENERO indican que no hubo precio de la especie y se usó el del género
+# (p. ej. "PINO" para "Pino (Pinus tecunumanii)")
+FUENTE_DEPARTAMENTO = 'departamento'
+FUENTE_NACIONAL = 'nacional'
+FUENTE_DEPARTAMENTO_GENERO = 'departamento_genero'
+FUENTE_NACIONAL_GENERO = 'nacional_genero'
+
+
+def _redondear(valor: float) -> Decimal:
+    return Decimal(repr(round(valor, 2))).quantize(Decimal('0.01'))
+
+
+def calcular_estadisticas(
+    filas: Iterable[Tuple[str, str, str, int, str, str, Decimal]]
+) -> List[EstadisticaPrecio]:
+    """
+    Agrupa observaciones de madera y calcula sus estadísticas.
+
+    Cada observación cuenta en su departamento y en el total nacional
+    (departamento = TODO_EL_PAIS), bajo su nombre común y, si lo tiene,
+    también bajo su nombre científico: el nombre común suele ser el del
+    género ("PINO" reúne PINUS RADIATA, PINUS PATULA...). Las unidades
+    que no son de volumen (PIEZA, U...) se ignoran.
+
+    Args:
+        filas: (especie, nombre_cientifico, departamento, anio,
+            tipo_producto, unidad, precio).
+
+    Returns:
+        List[EstadisticaPrecio]: Instancias sin guardar.
+    """
+    grupos: Dict[tuple, List[float]] = defaultdict(list)
+    for especie, nombre_cientifico, departamento, anio, tipo_producto, unidad, precio in filas:
+        factor = FACTOR_UNIDAD_M3.get(unidad)
+        if factor is None:
+            continue
+        precio_m3 = float(precio) * factor
+        nombres = (especie, nombre_cientifico) if nombre_cientifico not in ('', especie) else (especie,)
+        for nombre in nombres:
+            grupos[(nombre, departamento, anio, tipo_producto)].append(precio_m3)
+            grupos[(nombre, TODO_EL_PAIS, anio, tipo_producto)].append(precio_m3)
+
+    estadisticas = []
+    for (especie, departamento, anio, tipo_producto), precios in grupos.items():
+        if len(precios) > 1:
+            p25, mediana, p75 = statistics.quantiles(precios, n=4, method='inclusive')
+        else:
+            p25 = mediana = p75 = precios[0]
+        estadisticas.append(EstadisticaPrecio(
+            especie=especie,
+            departamento=departamento,
+            anio=anio,
+            tipo_producto=tipo_producto,
+            observaciones=len(precios),
+            mediana=_redondear(mediana),
+            p25=_redondear(p25),
+            p75=_redondear(p75),
+            minimo=_redondear(min(precios)),
+            maximo=_redondear(max(precios)),
+        ))
+    return estadisticas
+
+
+class ClavesEspecie(NamedTuple):
+    """Nombres con que se busca un cultivo en las estadísticas, en orden."""
+    especie: Tuple[str, ...]
+    genero: Tuple[str, ...]
+
+
+@lru_cache(maxsize=256)
+def claves_especie(nombre_cultivo: str) -> ClavesEspecie:
+    """
+    Especies de la base de precios que corresponden a un cultivo.
+
+    Primero el nombre científico entre paréntesis y el nombre común
+    completo; el género solo si ninguno de los dos tiene precio:
+    "Pino (Pinus tecunumanii)" -> especie ("PINUS TECUNUMANII",
+    "PINO TECUNUMANI"), género ("PINO",); "Pino Radiata" -> especie
+    ("PINO RADIATA",), género ("PINO",); "Teca (Clonal)" -> especie
+    ("TECA",). Un paréntesis de una palabra ("Clonal", "Injerto") no es
+    un nombre científico y se ignora.
+    """
+    nombre, _, parentesis = nombre_cultivo.partition(' (')
+    comun = normalizar_especie(nombre)
+    palabras = normalizar_texto(parentesis.rstrip(')')).split(' ')
+    genero = comun.split(' ')[0]
+
+    especie = []
+    if len(palabras) >= 2:
+        # "Pinus tecunumanii" o abreviado "E. grandis": el epíteto completa
+        # un nombre común de una sola palabra ("PINO" -> "PINO TECUNUMANI")
+        if not palabras[0].endswith('.'):
+            especie.append(' '.join(palabras))
+        if comun == genero:
+            comun = normalizar_especie(f'{comun} {palabras[1]}')
+    especie.append(comun)
+    return ClavesEspecie(
+        especie=tuple(especie),
+        genero=(genero,) if genero not in especie else (),
+    )
+
+
+class PreciosReferencia:
+    """
+    Snapshot inmutable de precios de madera por (especie, departamento).
+
+    Guarda la mediana del año más reciente con al menos
+    MIN_OBSERVACIONES observaciones de TIPO_PRECIO_MOTOR.
+    """
+
+    def __init__(self, estadisticas: Iterable[EstadisticaPrecio]):
+        self._precios: Dict[Tuple[str, str], Tuple[int, Decimal]] = {}
+        for e in estadisticas:
+            clave = (e.especie, e.departamento)
+            actual = self._precios.get(clave)
+            if actual is None or e.anio > actual[0]:
+                self._precios[clave] = (e.anio, e.mediana)
+        # Identifica el contenido del snapshot (clave de resultados en caché)
+        self.huella = hashlib.sha256(
+            repr(sorted(self._precios.items())).encode('utf-8')
+        ).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self._precios)
+
+    def buscar(self, nombre_cultivo: str, departamento: str) -> Optional[Tuple[Decimal, str]]:
+        """
+        Precio por m³ de un cultivo en un departamento.
+
+        Prefiere la especie (en el departamento y luego en el total
+        nacional) sobre el género; el precio del género se informa con
+        las fuentes _GENERO.
+
+        Returns:
+            (precio, fuente) o None si no hay estadísticas.
+        """
+        regiones = [(TODO_EL_PAIS, FUENTE_NACIONAL, FUENTE_NACIONAL_GENERO)]
+        if departamento:
+            regiones.insert(0, (
+                normalizar_texto(departamento), FUENTE_DEPARTAMENTO, FUENTE_DEPARTAMENTO_GENERO
+            ))
+        claves = claves_especie(nombre_cultivo)
+        for especies, es_genero in ((claves.especie, False), (claves.genero, True)):
+            for region, fuente, fuente_genero in regiones:
+                for especie in especies:
+                    encontrado = self._precios.get((especie, region))
+                    if encontrado is not None:
+                        return encontrado[1], fuente_genero if es_genero else fuente
+        return None
+
+
+def cargar_precios() -> PreciosReferencia:
+    """Construye el snapshot con una consulta a EstadisticaPrecio."""
+    return PreciosReferencia(EstadisticaPrecio.objects.filter(
+        tipo_producto=TIPO_PRECIO_MOTOR,
+        observaciones__gte=MIN_OBSERVACIONES
+    ).only('especie', 'departamento', 'anio', 'mediana'))
+
+
+class CachePrecios:
+    """
+    Snapshot de precios perezoso, local al proceso y seguro entre hilos.
+
+    Usa el mismo esquema de generaciones que CachePlanes.
+    """
+
+    def __init__(self):
+        self._precios: Optional[PreciosReferencia] = None
+        self._lock = Lock()
+        self._generacion = 0
+
+    def obtener(self) -> PreciosReferencia:
+        """Retorna el snapshot, construyéndolo si fue invalidado."""
+        with self._lock:
+            if self._precios is not None:
+                return self._precios
+            generacion = self._generacion
+
+        precios = cargar_precios()
+        with self._lock:
+            if generacion == self._generacion:
+                self._precios = precios
+        return precios
+
+    def invalidar(self) -> None:
+        """Descarta el snapshot; se reconstruye en la siguiente consulta."""
+        with self._lock:
+            self._generacion += 1
+            self._precios = None
+
+
+cache_precios = CachePrecios()
+
+
+def obtener_precios() -> PreciosReferencia:
+    """Atajo para obtener el snapshot de precios del proceso."""
+    return cache_precios.obtener()
+
+
+def invalidar_precios() -> None:
+    """Atajo para invalidar el snapshot de precios del proceso."""
+    cache_precios.invalidar()
+
+
+def aplicar_precio_regional(plan: PlanCostos, departamento: str) -> PlanCostos:
+    """
+    Plan con el precio de la madera del departamento.
+
+    Sin estadísticas para el cultivo retorna el mismo plan (precio de
+    Cultivo). El plan en caché no se modifica: se copia su cabecera.
+
+    Args:
+        plan: Plan compilado del cultivo.
+        departamento: Departamento del distrito.
+
+    Returns:
+        PlanCostos: Plan con precio_madera_referencial y fuente_precio_madera.
+    """
+    encontrado = obtener_precios().buscar(plan.cultivo_nombre, departamento or '')
+    if encontrado is None:
+        return plan
+    precio, fuente = encontrado
+    return replace(plan, precio_madera_referencial=precio, fuente_precio_madera=fuente)
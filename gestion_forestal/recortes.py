@@ -0,0 +1,351 @@
+"""
+Recortes de las capas TopoJSON por departamento y provincia.
+
+El mapa dibuja un solo departamento, provincia o distrito a la vez, pero
+los archivos completos pesan megabytes. Aquí se generan topologías
+parciales: cada recorte conserva las geometrías de un departamento (o de
+una provincia) y solo los arcos que estas usan, reindexados. Los arcos se
+copian tal cual (cuantizados y codificados por diferencias, con la misma
+transformación), así que los bordes compartidos siguen compartidos y las
+coordenadas no cambian.
+
+Cada recorte se escribe con su hash de contenido en el nombre, junto con
+variantes .gz (y .br si el módulo brotli está instalado), y un
+manifiesto JSON asocia cada clave ('JUNIN', 'JUNIN/HUANCAYO') con su
+archivo. Como el nombre cambia cuando cambia el contenido, los recortes
+se sirven con caché inmutable de un año; solo el manifiesto se revalida.
+La escritura de artefactos y la lectura de manifiestos también las usa
+la pirámide de simplificación (ver simplificacion.py).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .topologia import geometrias, normalizar_nombre
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin brotli solo se genera la variante gzip
+    brotli = None
+
+
+# Nombre del manifiesto dentro del directorio de recortes
+NOMBRE_MANIFIESTO = 'manifiesto.json'
+
+# Variantes precomprimidas, en orden de preferencia para el cliente
+CODIFICACIONES = (('br', '.br'), ('gzip', '.gz'))
+
+# Extensión de los artefactos publicados
+EXTENSION = '.topojson'
+
+# Caracteres del hash de contenido en el nombre de archivo
+LARGO_HASH = 12
+
+
+@dataclass(frozen=True, slots=True)
+class CapaRecorte:
+    """Capa TopoJSON a recortar y las propiedades que identifican sus niveles."""
+
+    archivo: str
+    campo_departamento: str
+    campo_provincia: Optional[str] = None
+
+
+# Capas del frontend (frontend/public/geo). DEPARTAMENTOS solo se recorta
+# por departamento; las demás también por provincia
+CAPAS_RECORTE = {
+    'DEPARTAMENTOS': CapaRecorte('DEPARTAMENTOS_PI7.topojson', 'NOM_DEP'),
+    'PROVINCIAS': CapaRecorte('PROVINCIAS_PI7.topojson', 'NOM_DEP', 'NOM_PROV'),
+    'DISTRITOS': CapaRecorte('DISTRITOS_PI7.topojson', 'NOM_DEP', 'NOM_PRO'),
+}
+
+
+def slug(texto: str) -> str:
+    """Texto en minúsculas ASCII con guiones, apto para nombres de archivo."""
+    ascii_ = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_.lower()).strip('-') or 'sin-nombre'
+
+
+def _remapear(arcos: Any, mapa: Dict[int, int]) -> Any:
+    """
+    Reemplaza los índices de arco de una geometría por los del recorte.
+
+    Los índices negativos (~i: arco i recorrido al revés) conservan su
+    sentido: ~i pasa a ~mapa[i].
+    """
+    if isinstance(arcos, int):
+        if arcos >= 0:
+            return mapa.setdefault(arcos, len(mapa))
+        return ~mapa.setdefault(~arcos, len(mapa))
+    return [_remapear(elemento, mapa) for elemento in arcos]
+
+
+def recortar_topologia(topologia: Dict, seleccion: Callable[[Dict], bool]) -> Optional[Dict]:
+    """
+    Topología parcial con las geometrías seleccionadas y sus arcos.
+
+    Args:
+        topologia: TopoJSON cargado.
+        seleccion: Recibe las propiedades de cada geometría; True para conservarla.
+
+    Returns:
+        Dict: TopoJSON con los mismos objetos (solo las geometrías
+        seleccionadas), los arcos que usan y la misma transformación;
+        None si ninguna geometría coincide.
+    """
+    mapa: Dict[int, int] = {}
+    objetos = {}
+
+    for nombre, capa in topologia['objects'].items():
+        miembros = capa.get('geometries', []) if capa.get('type') == 'GeometryCollection' else [capa]
+        seleccionadas = []
+        for geometria in miembros:
+            if not seleccion(geometria.get('properties') or {}):
+                continue
+            copia = dict(geometria)
+            if 'arcs' in geometria:
+                copia['arcs'] = _remapear(geometria['arcs'], mapa)
+            seleccionadas.append(copia)
+        if seleccionadas:
+            objetos[nombre] = {'type': 'GeometryCollection', 'geometries': seleccionadas}
+
+    if not objetos:
+        return None
+
+    # El mapa asigna índices nuevos en orden de primera aparición
+    arcos = [None] * len(mapa)
+    for original, nuevo in mapa.items():
+        arcos[nuevo] = topologia['arcs'][original]
+
+    recorte = {'type': 'Topology', 'arcs': arcos, 'objects': objetos}
+    if 'transform' in topologia:
+        recorte['transform'] = topologia['transform']
+    return recorte
+
+
+def claves_recorte(topologia: Dict, capa: CapaRecorte) -> List[Tuple[str, ...]]:
+    """
+    Claves de recorte presentes en la topología, ordenadas.
+
+    Returns:
+        List: (departamento,) por cada departamento y, si la capa tiene
+        nivel provincial, (departamento, provincia) por cada provincia.
+    """
+    claves = set()
+    for geometria in geometrias(topologia):
+        propiedades = geometria.get('properties') or {}
+        departamento = normalizar_nombre(propiedades.get(capa.campo_departamento))
+        if not departamento:
+            continue
+        claves.add((departamento,))
+        if capa.campo_provincia:
+            provincia = normalizar_nombre(propiedades.get(capa.campo_provincia))
+            if provincia:
+                claves.add((departamento, provincia))
+    return sorted(claves)
+
+
+def seleccion_clave(capa: CapaRecorte, clave: Tuple[str, ...]) -> Callable[[Dict], bool]:
+    """Predicado que selecciona las geometrías de un departamento o provincia."""
+    campos = (capa.campo_departamento, capa.campo_provincia)[:len(clave)]
+
+    def seleccion(propiedades: Dict) -> bool:
+        return all(
+            normalizar_nombre(propiedades.get(campo)) == valor
+            for campo, valor in zip(campos, clave)
+        )
+
+    return seleccion
+
+
+def serializar(topologia: Dict) -> bytes:
+    """JSON compacto (sin espacios) en UTF-8."""
+    return json.dumps(topologia, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def variantes_comprimidas(datos: bytes) -> Dict[str, bytes]:
+    """
+    Variantes precomprimidas del contenido, por extensión.
+
+    gzip se genera con mtime=0 para que el resultado sea reproducible.
+    """
+    variantes = {'.gz': gzip.compress(datos, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes['.br'] = brotli.compress(datos, quality=11)
+    return variantes
+
+
+def escribir_artefacto(salida: str, relativa: str, datos: bytes, variantes: Dict[str, bytes],
+                       reemplazar: bool = False) -> int:
+    """
+    Escribe un archivo y sus variantes comprimidas.
+
+    Los artefactos llevan su hash en el nombre: si ya existen (con todas
+    sus variantes), el contenido es el mismo y no se reescriben. Cada
+    archivo se escribe en un temporal y se renombra, así los lectores
+    nunca ven un archivo a medias.
+
+    Args:
+        salida: Directorio base.
+        relativa: Ruta relativa del archivo dentro de salida.
+        datos: Contenido sin comprimir.
+        variantes: Contenido comprimido por extensión (ver variantes_comprimidas).
+        reemplazar: Escribir aunque ya exista (manifiestos).
+
+    Returns:
+        int: 1 si el archivo se escribió, 0 si ya existía.
+    """
+    ruta = os.path.join(salida, relativa)
+    sufijos = [''] + list(variantes)
+    if not reemplazar and all(os.path.exists(ruta + sufijo) for sufijo in sufijos):
+        return 0
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    for sufijo, contenido in [('', datos)] + list(variantes.items()):
+        temporal = f'{ruta}{sufijo}.tmp'
+        with open(temporal, 'wb') as f:
+            f.write(contenido)
+        os.replace(temporal, ruta + sufijo)
+    return 1
+
+
+def limpiar_artefactos(salida: str, vigentes: Iterable[str], nombre_manifiesto: str) -> int:
+    """
+    Elimina los archivos (y variantes) que no figuran en el manifiesto.
+
+    Returns:
+        int: Artefactos eliminados (sin contar sus variantes).
+    """
+    conservar = {nombre_manifiesto}
+    for relativa in vigentes:
+        conservar.update(relativa + sufijo for sufijo in ('', '.gz', '.br'))
+
+    eliminados = 0
+    for raiz, _, archivos in os.walk(salida):
+        for archivo in archivos:
+            ruta = os.path.join(raiz, archivo)
+            relativa = os.path.relpath(ruta, salida).replace(os.sep, '/')
+            if relativa not in conservar:
+                os.remove(ruta)
+                eliminados += relativa.endswith(EXTENSION)
+    return eliminados
+
+
+def hash_contenido(datos: bytes) -> str:
+    """Prefijo del SHA-256 del contenido, para el nombre de archivo."""
+    return hashlib.sha256(datos).hexdigest()[:LARGO_HASH]
+
+
+def ruta_recorte(nombre_capa: str, clave: Tuple[str, ...], huella: str) -> str:
+    """Ruta relativa del recorte, p. ej. 'distritos/junin/huancayo.3f2a9c1b0d4e.topojson'."""
+    partes = [nombre_capa.lower()] + [slug(parte) for parte in clave]
+    return '/'.join(partes) + f'.{huella}{EXTENSION}'
+
+
+# ===========================================
+# MANIFIESTO
+# ===========================================
+
+def archivos_publicados(datos: Any) -> Iterator[str]:
+    """Rutas de artefactos (cadenas terminadas en .topojson) dentro de un manifiesto."""
+    if isinstance(datos, str):
+        if datos.endswith(EXTENSION):
+            yield datos
+    elif isinstance(datos, dict):
+        for valor in datos.values():
+            yield from archivos_publicados(valor)
+    elif isinstance(datos, list):
+        for valor in datos:
+            yield from archivos_publicados(valor)
+
+
+@dataclass(frozen=True, slots=True)
+class Manifiesto:
+    """Manifiesto leído y el conjunto de archivos que publica."""
+
+    datos: Dict
+    archivos: frozenset
+
+
+_manifiesto_lock = Lock()
+_manifiesto_cache: Dict[str, Tuple[int, Manifiesto]] = {}
+
+
+def cargar_manifiesto(directorio: str, nombre: str = NOMBRE_MANIFIESTO) -> Optional[Manifiesto]:
+    """
+    Lee un manifiesto de artefactos, reutilizándolo mientras no cambie.
+
+    El manifiesto leído se guarda por proceso junto con la fecha de
+    modificación del archivo; una nueva generación lo reemplaza sin
+    reiniciar el servidor.
+
+    Args:
+        directorio: Directorio de los artefactos.
+        nombre: Archivo del manifiesto (recortes o índice de niveles).
+
+    Returns:
+        Manifiesto: Contenido y archivos publicados, o None si aún no
+        se generaron los artefactos.
+    """
+    ruta = os.path.join(directorio, nombre)
+    try:
+        modificado = os.stat(ruta).st_mtime_ns
+    except OSError:
+        return None
+
+    with _manifiesto_lock:
+        guardado = _manifiesto_cache.get(ruta)
+        if guardado is not None and guardado[0] == modificado:
+            return guardado[1]
+
+    with open(ruta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    manifiesto = Manifiesto(
+        datos=datos,
+        archivos=frozenset(archivos_publicados(datos))
+    )
+
+    with _manifiesto_lock:
+        _manifiesto_cache[ruta] = (modificado, manifiesto)
+    return manifiesto
+
+
+def codificaciones_aceptadas(accept_encoding: str) -> set:
+    """Codificaciones de la cabecera Accept-Encoding con calidad mayor que cero."""
+    aceptadas = set()
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.partition(';')
+        calidad = parametros.replace(' ', '')
+        if calidad.startswith('q='):
+            try:
+                if float(calidad[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        aceptadas.add(nombre.strip().lower())
+    return aceptadas
+
+
+def elegir_variante(ruta: str, accept_encoding: str) -> Tuple[str, Optional[str]]:
+    """
+    Variante precomprimida a servir según la cabecera Accept-Encoding.
+
+    Args:
+        ruta: Ruta del recorte sin comprimir.
+        accept_encoding: Cabecera Accept-Encoding de la petición.
+
+    Returns:
+        Tuple: (ruta del archivo a servir, Content-Encoding o None).
+    """
+    aceptadas = codificaciones_aceptadas(accept_encoding)
+    for codificacion, sufijo in CODIFICACIONES:
+        if (codificacion in aceptadas or '*' in aceptadas) and os.path.exists(ruta + sufijo):
+            return ruta + sufijo, codificacion
+    return ruta, None
@@ -0,0 +1,16 @@
+"""
+Renderizadores adicionales de la API.
+
+El formato compacto se elige como cualquier otro formato de DRF
+(?format=compact); la vista detecta el renderizador aceptado y arma la
+representación columnar directamente desde values(), sin pasar por los
+campos del serializador. La salida sigue siendo JSON.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+
+class CompactoRenderer(JSONRenderer):
+    """JSON columnar: un arreglo por campo en lugar de un objeto por fila."""
+
+    format = 'compact'
@@ -0,0 +1,160 @@
+"""
+Caché de resultados del cálculo de costos.
+
+El cálculo es determinista: depende solo de los datos validados de la
+solicitud, del catálogo (distritos, zonas, cultivos, paquetes) y de los
+precios de madera vigentes. La clave de un resultado es el hash SHA-256
+del JSON canónico de los datos validados junto con la versión del
+catálogo y la huella del snapshot de precios: una edición en el admin
+cambia la clave y un resultado calculado con los datos anteriores ya no
+se vuelve a leer (ver catalogo.py).
+
+La versión se lee de la base al armar la clave, no del snapshot (que
+solo la compara cada CATALOGO_VERIFICACION_SEGUNDOS): un cambio hecho en
+otro proceso se ve en la siguiente solicitud. Queda solo la ventana de
+una solicitud en curso: la que leyó la versión justo antes de que otro
+proceso confirmara un cambio responde con los datos anteriores.
+
+Los resultados se guardan en el alias 'calculos' de CACHES: por defecto
+LocMemCache del proceso, con desalojo LRU; con FileBasedCache
+(CALCULOS_CACHE_BACKEND) la comparten los procesos de gunicorn. Cada
+entrada se guarda ya serializada con pickle y las que superan
+CALCULOS_CACHE_ENTRADA_KB no se guardan (un barrido de escenarios
+grande), así que MAX_ENTRIES x CALCULOS_CACHE_ENTRADA_KB acota la
+memoria (ver CALCULOS_CACHE_MB). Los contadores son del proceso.
+"""
+
+import hashlib
+import json
+import pickle
+from threading import Lock
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .catalogo import obtener_catalogo
+from .precios import obtener_precios
+
+
+# Alias de CACHES para los resultados
+ALIAS_CACHE_CALCULOS = 'calculos'
+
+# Se incrementa cuando cambia el cálculo o el formato de los resultados,
+# para no leer entradas de una versión anterior en una caché compartida
+VERSION_RESULTADOS = 2
+
+
+def vigencia_resultados() -> Tuple[int, str]:
+    """
+    Versión del catálogo en la base y huella de los precios vigentes.
+
+    Fuerza la verificación del snapshot del catálogo (una consulta por
+    clave única): si otro proceso lo cambió, el snapshot, los planes y
+    los precios se recargan antes de calcular.
+    """
+    return obtener_catalogo(verificar=True).version, obtener_precios().huella
+
+
+def clave_resultado(
+    tipo: str,
+    data: Mapping[str, Any],
+    vigencia: Optional[Tuple[int, str]] = None
+) -> str:
+    """
+    Clave de caché de un cálculo.
+
+    Decimal y demás tipos no JSON se serializan como texto: los
+    serializadores ya los cuantizan, así que "1.5" y "1.50" llegan
+    iguales.
+
+    Args:
+        tipo: Tipo de resultado (ej: 'costos', 'escenarios').
+        data: Datos validados de la solicitud.
+        vigencia: Resultado de vigencia_resultados(); un lote la lee una
+            vez para todas sus parcelas. Por defecto se lee aquí.
+
+    Returns:
+        str: Clave con el tipo y el hash.
+    """
+    version, huella = vigencia or vigencia_resultados()
+    canonico = json.dumps(
+        [version, huella, data],
+        sort_keys=True,
+        default=str,
+        separators=(',', ':'),
+    )
+    return f"{tipo}:{hashlib.sha256(canonico.encode('utf-8')).hexdigest()}"
+
+
+class CacheResultados:
+    """Acceso al alias de resultados con contadores de aciertos y fallos."""
+
+    def __init__(self, alias: str = ALIAS_CACHE_CALCULOS):
+        self.alias = alias
+        self._lock = Lock()
+        self._aciertos = 0
+        self._fallos = 0
+        self._omitidos = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _contar(self, aciertos: int = 0, fallos: int = 0, omitidos: int = 0) -> None:
+        with self._lock:
+            self._aciertos += aciertos
+            self._fallos += fallos
+            self._omitidos += omitidos
+
+    def _serializar(self, valor: Any) -> Optional[bytes]:
+        """Entrada serializada, o None si supera CALCULOS_CACHE_ENTRADA_KB."""
+        datos = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+        if len(datos) > settings.CALCULOS_CACHE_ENTRADA_KB * 1024:
+            self._contar(omitidos=1)
+            return None
+        return datos
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        """Resultado guardado, o None."""
+        datos = self.cache.get(clave, version=VERSION_RESULTADOS)
+        self._contar(int(datos is not None), int(datos is None))
+        return pickle.loads(datos) if datos is not None else None
+
+    def obtener_varios(self, claves: Iterable[str]) -> Dict[str, Any]:
+        """Resultados guardados de varias claves (una lectura al backend)."""
+        claves = set(claves)
+        encontrados = self.cache.get_many(claves, version=VERSION_RESULTADOS)
+        self._contar(len(encontrados), len(claves) - len(encontrados))
+        return {clave: pickle.loads(datos) for clave, datos in encontrados.items()}
+
+    def guardar(self, clave: str, valor: Any) -> None:
+        datos = self._serializar(valor)
+        if datos is not None:
+            self.cache.set(clave, datos, version=VERSION_RESULTADOS)
+
+    def guardar_varios(self, valores: Mapping[str, Any]) -> None:
+        serializados = {}
+        for clave, valor in valores.items():
+            datos = self._serializar(valor)
+            if datos is not None:
+                serializados[clave] = datos
+        if serializados:
+            self.cache.set_many(serializados, version=VERSION_RESULTADOS)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Aciertos, fallos, tasa de aciertos y entradas omitidas por tamaño."""
+        with self._lock:
+            aciertos, fallos, omitidos = self._aciertos, self._fallos, self._omitidos
+        total = aciertos + fallos
+        return {
+            'backend': type(self.cache).__name__,
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa_aciertos': round(aciertos / total, 4) if total else None,
+            'omitidos_por_tamano': omitidos,
+            'max_kb_entrada': settings.CALCULOS_CACHE_ENTRADA_KB,
+        }
+
+
+cache_resultados = CacheResultados()
@@ -7,7 +7,11 @@ geometría de siembra (Cuadrado, Rectangular, Tres Bolillo).
 
 from rest_framework import serializers
 from decimal import Decimal
-from .models import ZonaEconomica, Distrito, Cultivo, PaqueteTecnologico
+from typing import Any, Dict, Iterable, Optional, Sequence
+from .models import ZonaEconomica, Distrito, Cultivo, PaqueteTecnologico, ObservacionPrecio
+from .motor import SistemaSiembra, factor_pendiente
+from .poligonos import almacen_geojson
+from .precios import normalizar_especie, normalizar_texto, normalizar_unidad
 
 
 class ZonaEconomicaSerializer(serializers.ModelSerializer):
@@ -23,7 +27,22 @@ class ZonaEconomicaSerializer(serializers.ModelSerializer):
         ]
 
 
-class DistritoSerializer(serializers.ModelSerializer):
+class CamposDinamicosMixin:
+    """
+    Permite limitar los campos de un ModelSerializer (?fields=).
+    
+    Recibe el argumento opcional 'campos' con los nombres a conservar;
+    los demás se quitan antes de serializar, así que tampoco se calculan.
+    """
+    
+    def __init__(self, *args, campos: Optional[Sequence[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+
+class DistritoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador de Distrito con Smart Defaults.
     
@@ -71,6 +90,86 @@ class DistritoSerializer(serializers.ModelSerializer):
         return str(obj.calcular_factor_pendiente())
 
 
+# Campos de DistritoSerializer que vienen de la zona económica: en el
+# formato compacto se publican una sola vez por zona, no por distrito
+CAMPOS_ZONA_DISTRITO = {
+    'zona_economica_nombre': 'nombre',
+    'costo_jornal_sugerido': 'costo_jornal_referencial',
+    'costo_planton_sugerido': 'costo_planton_referencial',
+}
+
+# Columnas de Distrito que el formato compacto lee con values()
+COLUMNAS_DISTRITO = (
+    'cod_ubigeo',
+    'nombre',
+    'departamento',
+    'provincia',
+    'zona_economica',
+    'latitud',
+    'longitud',
+    'pendiente_promedio_estimada',
+)
+
+
+def _texto_decimal(valor: Optional[Decimal]) -> Optional[str]:
+    """Decimal como texto, igual que DecimalField de DRF."""
+    return None if valor is None else str(valor)
+
+
+def distritos_compactos(filas: Iterable[Dict[str, Any]], campos: Sequence[str]) -> Dict:
+    """
+    Representación columnar de una lista de distritos (?format=compact).
+    
+    En lugar de un objeto por distrito retorna un arreglo por campo, en el
+    mismo orden, y los campos de la zona económica en una tabla indexada
+    por id (hay pocas zonas y cientos de distritos por zona). Los valores
+    tienen el mismo formato que en DistritoSerializer.
+    
+    Args:
+        filas: Filas de Distrito.objects.values(*COLUMNAS_DISTRITO).
+        campos: Campos de DistritoSerializer a incluir.
+    
+    Returns:
+        Dict: {'total', 'columnas': {campo: [...]}, 'zonas': {id: {...}}}.
+    """
+    filas = list(filas)
+    campos_zona = [c for c in campos if c in CAMPOS_ZONA_DISTRITO]
+    columnas = [c for c in campos if c not in CAMPOS_ZONA_DISTRITO]
+    if campos_zona and 'zona_economica' not in columnas:
+        # El id de zona es la clave para leer la tabla de zonas
+        columnas.append('zona_economica')
+    
+    factores = {}
+    resultado = {}
+    for campo in columnas:
+        if campo == 'factor_pendiente':
+            # Pocas pendientes distintas: el factor se calcula una vez por valor
+            for fila in filas:
+                pendiente = fila['pendiente_promedio_estimada']
+                if pendiente not in factores:
+                    factores[pendiente] = str(factor_pendiente(pendiente))
+            resultado[campo] = [factores[f['pendiente_promedio_estimada']] for f in filas]
+        elif campo in ('latitud', 'longitud'):
+            resultado[campo] = [_texto_decimal(f[campo]) for f in filas]
+        else:
+            resultado[campo] = [f[campo] for f in filas]
+    
+    zonas = {}
+    if campos_zona:
+        ids = {f['zona_economica'] for f in filas} - {None}
+        atributos = [CAMPOS_ZONA_DISTRITO[c] for c in campos_zona]
+        for zona in ZonaEconomica.objects.filter(id__in=ids).values('id', *atributos):
+            zonas[str(zona['id'])] = {
+                campo: (
+                    zona[atributo] if campo == 'zona_economica_nombre'
+                    else _texto_decimal(zona[atributo])
+                )
+                for campo, atributo in zip(campos_zona, atributos)
+            }
+    
+    return {'total': len(filas), 'columnas': resultado, 'zonas': zonas}
+
+
 class CultivoSerializer(serializers.ModelSerializer):
     """Serializador para cultivos forestales."""
     
@@ -117,27 +216,6 @@ class PaqueteTecnologicoSerializer(serializers.ModelSerializer):
         ]
 
 
-# ===========================================
-# CONSTANTES PARA CÁLCULO DE DENSIDAD
-# ===========================================
-
-class SistemaSiembra:
-    """Opciones de sistema de siembra."""
-    CUADRADO = 'CUADRADO'
-    RECTANGULAR = 'RECTANGULAR'
-    TRES_BOLILLO = 'TRES_BOLILLO'
-    
-    CHOICES = [
-        (CUADRADO, 'Cuadrado (distancia×distancia)'),
-        (RECTANGULAR, 'Rectangular (largo×ancho)'),
-        (TRES_BOLILLO, 'Tres Bolillo (triángulo equilátero)'),
-    ]
-
-
-# Factor para Tres Bolillo: sin(60°) = sqrt(3)/2 ≈ 0.866025
-FACTOR_TRES_BOLILLO = Decimal('0.866025')
-
-
 class CalculoCostosInputSerializer(serializers.Serializer):
     """
     Serializador para el input del endpoint de cálculo de costos.
@@ -262,6 +340,13 @@ class ResumenAnualSerializer(serializers.Serializer):
     total = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 
+class CurvaVanSerializer(serializers.Serializer):
+    """Serializador para un punto de la curva VAN vs tasa de descuento."""
+    
+    tasa = serializers.DecimalField(max_digits=6, decimal_places=4)
+    van = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
 class CalculoCostosOutputSerializer(serializers.Serializer):
     """
     Serializador para el output del cálculo de costos.
@@ -288,6 +373,10 @@ class CalculoCostosOutputSerializer(serializers.Serializer):
     costo_jornal_usado = serializers.DecimalField(max_digits=8, decimal_places=2)
     costo_planton_usado = serializers.DecimalField(max_digits=8, decimal_places=2)
     
+    # Precio de la madera (S/ por m3): mediana del departamento, nacional o del cultivo
+    precio_madera_usado = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    fuente_precio_madera = serializers.CharField(required=False)
+    
     # Detalle y resúmenes
     # Costos Agrupados (Refactor v1.3.1)
     costos_instalacion = ResumenAnualSerializer(required=False, allow_null=True)
@@ -297,6 +386,545 @@ class CalculoCostosOutputSerializer(serializers.Serializer):
     
     # Indicadores Financieros v1.3
     van = serializers.DecimalField(max_digits=14, decimal_places=2, required=False)
-    tir = serializers.DecimalField(max_digits=8, decimal_places=2, required=False)
+    tir = serializers.DecimalField(max_digits=8, decimal_places=2, required=False, allow_null=True)
     ratio_beneficio_costo = serializers.DecimalField(max_digits=8, decimal_places=2, required=False)
     ingreso_total_estimado = serializers.DecimalField(max_digits=14, decimal_places=2, required=False)
+    
+    # TIR: UNICA, MULTIPLE, SIN_RAIZ o SIN_CAMBIO_SIGNO (tir es null si no hay raíz)
+    tir_diagnostico = serializers.CharField(required=False)
+    curva_van = CurvaVanSerializer(many=True, required=False)
+
+
+# ===========================================
+# CÁLCULO EN LOTE (CARTERA DE PARCELAS)
+# ===========================================
+
+# Máximo de parcelas aceptadas en una solicitud de lote
+MAX_PARCELAS_LOTE = 5000
+
+
+class CalculoCostosLoteInputSerializer(serializers.Serializer):
+    """
+    Serializador para el input del cálculo de costos en lote.
+    
+    Cada parcela tiene el formato de CalculoCostosInputSerializer;
+    se valida individualmente para reportar errores por parcela.
+    """
+    
+    parcelas = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=MAX_PARCELAS_LOTE,
+        help_text="Lista de parcelas con el formato de /api/calcular-costos/"
+    )
+
+
+# Máximo de puntos aceptados en una detección en lote
+MAX_PUNTOS_LOTE = 20000
+
+
+class PuntoField(serializers.Field):
+    """
+    Coordenada como {"lat": ..., "lng": ...} o par GeoJSON [lng, lat].
+    
+    Retorna una tupla (lat, lng) en grados.
+    """
+    
+    default_error_messages = {
+        'invalido': 'Punto inválido: use un objeto con lat y lng, o un par [lng, lat].',
+        'rango': 'Coordenadas fuera de rango.',
+    }
+    
+    def to_internal_value(self, data):
+        try:
+            if isinstance(data, dict):
+                lat, lng = float(data['lat']), float(data['lng'])
+            elif isinstance(data, (list, tuple)) and len(data) >= 2:
+                lng, lat = float(data[0]), float(data[1])
+            else:
+                self.fail('invalido')
+        except (KeyError, TypeError, ValueError):
+            self.fail('invalido')
+        
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+            self.fail('rango')
+        return lat, lng
+    
+    def to_representation(self, value):
+        lat, lng = value
+        return {'lat': lat, 'lng': lng}
+
+
+class DeteccionLoteInputSerializer(serializers.Serializer):
+    """Serializador para el input de la detección de distritos en lote."""
+    
+    puntos = serializers.ListField(
+        child=PuntoField(),
+        min_length=1,
+        max_length=MAX_PUNTOS_LOTE,
+        help_text="Lista de puntos {lat, lng} o pares [lng, lat]"
+    )
+
+
+class ResumenCarteraSerializer(serializers.Serializer):
+    """Serializador para el total agregado de una cartera de parcelas."""
+    
+    parcelas = serializers.IntegerField()
+    calculadas = serializers.IntegerField()
+    con_error = serializers.IntegerField()
+    hectareas = serializers.DecimalField(max_digits=14, decimal_places=2)
+    costo_total_proyecto = serializers.DecimalField(max_digits=16, decimal_places=2)
+    ingreso_total_estimado = serializers.DecimalField(max_digits=16, decimal_places=2)
+    van = serializers.DecimalField(max_digits=16, decimal_places=2)
+    ratio_beneficio_costo = serializers.DecimalField(max_digits=8, decimal_places=2)
+    tir = serializers.DecimalField(max_digits=8, decimal_places=2, allow_null=True)
+    tir_diagnostico = serializers.CharField()
+
+
+# ===========================================
+# BARRIDO DE ESCENARIOS (GRILLA DE PARÁMETROS)
+# ===========================================
+
+# Límites del barrido para acotar el tamaño de la respuesta
+MAX_VALORES_EJE = 100
+MAX_CELDAS_ESCENARIOS = 50000
+# La TIR se resuelve una vez por (geometría, jornal, plantón); un flujo
+# con varios cambios de signo cuesta ~0.5 ms, así que se acotan aparte
+MAX_TIR_ESCENARIOS = 2500
+
+
+class EjeEscenarioField(serializers.Field):
+    """
+    Eje de un barrido de escenarios.
+    
+    Acepta un valor único, una lista de valores o un rango
+    {"inicio": 2, "fin": 4, "paso": 0.5} (fin inclusive). Cada valor
+    se valida con el campo hijo y se descartan los repetidos.
+    """
+    
+    default_error_messages = {
+        'invalid': 'Debe ser un valor, una lista o un rango {inicio, fin, paso}.',
+        'paso': 'El paso del rango debe ser mayor a 0.',
+        'max_valores': 'El eje no puede tener más de {max_valores} valores.',
+        'vacio': 'El eje debe tener al menos un valor.',
+    }
+    
+    def __init__(self, child, max_valores=MAX_VALORES_EJE, **kwargs):
+        self.child = child
+        self.max_valores = max_valores
+        super().__init__(**kwargs)
+        self.child.bind(field_name='', parent=self)
+    
+    def validate_empty_values(self, data):
+        # Un null explícito equivale a un eje de un solo valor nulo
+        if data is None and self.child.allow_null:
+            return (True, [None])
+        return super().validate_empty_values(data)
+    
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            valores = self._expandir_rango(data)
+        elif isinstance(data, (list, tuple)):
+            valores = list(data)
+        else:
+            valores = [data]
+        
+        if not valores:
+            self.fail('vacio')
+        if len(valores) > self.max_valores:
+            self.fail('max_valores', max_valores=self.max_valores)
+        
+        eje = []
+        for valor in valores:
+            valor = self.child.run_validation(valor)
+            if valor not in eje:
+                eje.append(valor)
+        return eje
+    
+    def to_representation(self, value):
+        return [self.child.to_representation(v) for v in value]
+    
+    def _expandir_rango(self, data):
+        try:
+            inicio = Decimal(str(data['inicio']))
+            fin = Decimal(str(data.get('fin', data['inicio'])))
+            paso = Decimal(str(data.get('paso', '1')))
+        except (KeyError, ArithmeticError, ValueError):
+            self.fail('invalid')
+        if paso <= 0:
+            self.fail('paso')
+        if (fin - inicio) / paso >= self.max_valores:
+            self.fail('max_valores', max_valores=self.max_valores)
+        
+        valores = []
+        valor = inicio
+        while valor <= fin:
+            valores.append(valor)
+            valor += paso
+        return valores
+
+
+class EscenariosInputSerializer(serializers.Serializer):
+    """
+    Serializador para el barrido de escenarios de una parcela.
+    
+    Los campos de CalculoCostosInputSerializer que varían en el
+    barrido se reciben como ejes (EjeEscenarioField).
+    """
+    
+    distrito_id = serializers.CharField(max_length=6)
+    cultivo_id = serializers.IntegerField()
+    anio_inicio = serializers.IntegerField(default=0, min_value=0)
+    anio_fin = serializers.IntegerField(min_value=0)
+    incluir_servicios = serializers.BooleanField(default=True)
+    
+    hectareas = EjeEscenarioField(
+        child=serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    )
+    costo_jornal_usuario = EjeEscenarioField(
+        child=serializers.DecimalField(max_digits=8, decimal_places=2, min_value=Decimal('1.00'))
+    )
+    costo_planton_usuario = EjeEscenarioField(
+        child=serializers.DecimalField(max_digits=8, decimal_places=2, min_value=Decimal('0.01'))
+    )
+    sistema_siembra = EjeEscenarioField(
+        child=serializers.ChoiceField(choices=SistemaSiembra.CHOICES),
+        default=[SistemaSiembra.CUADRADO]
+    )
+    distanciamiento_largo = EjeEscenarioField(
+        child=serializers.DecimalField(
+            max_digits=5, decimal_places=2,
+            min_value=Decimal('0.50'), max_value=Decimal('20.00')
+        )
+    )
+    distanciamiento_ancho = EjeEscenarioField(
+        child=serializers.DecimalField(
+            max_digits=5, decimal_places=2,
+            min_value=Decimal('0.00'), max_value=Decimal('20.00'),
+            allow_null=True
+        ),
+        default=[None]
+    )
+    
+    def validate(self, data):
+        """
+        Valida el rango de años, la geometría, el tamaño de la grilla y
+        el número de TIR que requiere.
+        """
+        if data['anio_fin'] < data['anio_inicio']:
+            raise serializers.ValidationError({
+                'anio_fin': 'El año final debe ser mayor o igual al año inicial.'
+            })
+        
+        if SistemaSiembra.RECTANGULAR in data['sistema_siembra']:
+            if any(a is None or a <= Decimal('0') for a in data['distanciamiento_ancho']):
+                raise serializers.ValidationError({
+                    'distanciamiento_ancho': 'Requerido y debe ser > 0 para sistema RECTANGULAR.'
+                })
+        
+        celdas = 1
+        for eje in (
+            'sistema_siembra', 'distanciamiento_largo', 'distanciamiento_ancho',
+            'hectareas', 'costo_jornal_usuario', 'costo_planton_usuario'
+        ):
+            celdas *= len(data[eje])
+        if celdas > MAX_CELDAS_ESCENARIOS:
+            raise serializers.ValidationError(
+                f'La grilla tiene {celdas} escenarios; el máximo es {MAX_CELDAS_ESCENARIOS}.'
+            )
+        
+        # La TIR no depende de las hectáreas
+        tirs = celdas // len(data['hectareas'])
+        if tirs > MAX_TIR_ESCENARIOS:
+            raise serializers.ValidationError(
+                f'La grilla requiere {tirs} cálculos de TIR (geometrías x jornales x plantones); '
+                f'el máximo es {MAX_TIR_ESCENARIOS}.'
+            )
+        
+        return data
+
+
+# ===========================================
+# SIMULACIÓN MONTE CARLO
+# ===========================================
+
+# Límites de la simulación (muestras y tiempo por solicitud)
+MAX_MUESTRAS_SIMULACION = 100000
+MAX_TIEMPO_SIMULACION_MS = 10000
+
+
+class DistribucionSerializer(serializers.Serializer):
+    """
+    Distribución de una variable incierta.
+    
+    - uniforme: minimo, maximo
+    - triangular: minimo, moda, maximo
+    - normal / lognormal: media, desviacion
+    
+    Si se omite media o moda se usa el valor determinístico.
+    """
+    
+    TIPOS = ['fijo', 'uniforme', 'triangular', 'normal', 'lognormal']
+    
+    tipo = serializers.ChoiceField(choices=TIPOS)
+    minimo = serializers.FloatField(required=False, min_value=0)
+    moda = serializers.FloatField(required=False, min_value=0)
+    maximo = serializers.FloatField(required=False, min_value=0)
+    media = serializers.FloatField(required=False, min_value=0)
+    desviacion = serializers.FloatField(required=False, min_value=0)
+    
+    def validate(self, data):
+        """Valida que estén los parámetros que requiere cada tipo."""
+        requeridos = {
+            'uniforme': ('minimo', 'maximo'),
+            'triangular': ('minimo', 'maximo'),
+            'normal': ('desviacion',),
+            'lognormal': ('desviacion',),
+        }.get(data['tipo'], ())
+        faltantes = [campo for campo in requeridos if campo not in data]
+        if faltantes:
+            raise serializers.ValidationError({
+                campo: f"Requerido para distribución {data['tipo']}." for campo in faltantes
+            })
+        
+        if 'minimo' in data and 'maximo' in data and data['minimo'] > data['maximo']:
+            raise serializers.ValidationError({
+                'maximo': 'Debe ser mayor o igual a minimo.'
+            })
+        if 'moda' in data and 'minimo' in data and not data['minimo'] <= data['moda'] <= data['maximo']:
+            raise serializers.ValidationError({
+                'moda': 'Debe estar entre minimo y maximo.'
+            })
+        return data
+
+
+class SimulacionConfigSerializer(serializers.Serializer):
+    """Configuración de la simulación Monte Carlo."""
+    
+    muestras = serializers.IntegerField(
+        default=10000,
+        min_value=100,
+        max_value=MAX_MUESTRAS_SIMULACION
+    )
+    semilla = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text="Semilla para reproducir la simulación (se genera si se omite)"
+    )
+    tiempo_max_ms = serializers.IntegerField(
+        default=2000,
+        min_value=100,
+        max_value=MAX_TIEMPO_SIMULACION_MS,
+        help_text="Presupuesto de tiempo; se evalúan las muestras que alcancen"
+    )
+    
+    # Variables inciertas
+    precio_madera = DistribucionSerializer(required=False)
+    rendimiento = DistribucionSerializer(required=False)
+    costo_jornal = DistribucionSerializer(required=False)
+    factor_pendiente = DistribucionSerializer(required=False)
+
+
+class SimulacionInputSerializer(CalculoCostosInputSerializer):
+    """
+    Input del cálculo de costos con simulación Monte Carlo.
+    
+    Extiende CalculoCostosInputSerializer con la configuración
+    de distribuciones, muestras, semilla y presupuesto de tiempo.
+    """
+    
+    simulacion = SimulacionConfigSerializer()
+
+
+# ===========================================
+# DIVISIÓN DE PARCELAS POR DISTRITO
+# ===========================================
+
+# Máximo de vértices de una parcela dibujada o cargada
+MAX_VERTICES_PARCELA = 20000
+
+# Área mínima de una parcela (ha), la misma que en /api/calcular-costos/
+MIN_HECTAREAS_PARCELA = 0.01
+
+
+class CalculoParcelaSerializer(CalculoCostosInputSerializer):
+    """
+    Parámetros del cálculo de costos para cada fragmento de una parcela.
+    
+    El distrito y las hectáreas de cada fragmento se obtienen de la
+    geometría, por lo que no se reciben.
+    """
+    
+    distrito_id = None
+    hectareas = None
+
+
+class ParcelaInputSerializer(serializers.Serializer):
+    """
+    Serializador para el input de la división de una parcela por distrito.
+    
+    La geometría validada se entrega como AlmacenPoligonos (ver poligonos.py).
+    """
+    
+    geometria = serializers.JSONField(
+        help_text="GeoJSON Polygon o MultiPolygon (o Feature) con pares [lng, lat]"
+    )
+    calculo = CalculoParcelaSerializer(
+        required=False,
+        help_text="Si se envía, se calculan los costos de cada fragmento"
+    )
+    
+    def validate_geometria(self, value):
+        """Valida el GeoJSON y construye el polígono de la parcela."""
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('Se esperaba un objeto GeoJSON.')
+        try:
+            parcela = almacen_geojson(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        
+        if len(parcela.xs) > MAX_VERTICES_PARCELA:
+            raise serializers.ValidationError(
+                f'La parcela supera el máximo de {MAX_VERTICES_PARCELA} vértices.'
+            )
+        # También rechaza anillos sin área y huecos mayores que su exterior
+        if not parcela.area(0) / 10000 >= MIN_HECTAREAS_PARCELA:
+            raise serializers.ValidationError(
+                f'La parcela debe tener al menos {MIN_HECTAREAS_PARCELA} ha.'
+            )
+        return parcela
+
+
+class FragmentoParcelaSerializer(serializers.Serializer):
+    """Serializador para la porción de una parcela dentro de un distrito."""
+    
+    cod_ubigeo = serializers.CharField()
+    nombre = serializers.CharField()
+    departamento = serializers.CharField()
+    provincia = serializers.CharField()
+    zona_economica = serializers.IntegerField(allow_null=True)
+    zona_economica_nombre = serializers.CharField(allow_null=True)
+    factor_pendiente = serializers.DecimalField(max_digits=4, decimal_places=2)
+    hectareas = serializers.DecimalField(max_digits=14, decimal_places=4)
+    porcentaje = serializers.DecimalField(max_digits=6, decimal_places=2)
+
+
+# ===========================================
+# PRECIOS DE MADERA (SERFOR)
+# ===========================================
+
+# Agrupaciones de la serie de precios
+AGRUPACION_MES = 'mes'
+AGRUPACION_ANIO = 'anio'
+
+
+class ObservacionPrecioSerializer(serializers.ModelSerializer):
+    """Serializador de una observación de la base de precios."""
+    
+    class Meta:
+        model = ObservacionPrecio
+        fields = [
+            'id',
+            'id_origen',
+            'departamento',
+            'sede',
+            'anio',
+            'mes',
+            'especie',
+            'nombre_cientifico',
+            'tipo_producto',
+            'producto',
+            'dimensiones',
+            'unidad',
+            'precio',
+            'recurso'
+        ]
+
+
+class PeriodoField(serializers.CharField):
+    """
+    Periodo como "AAAA" o "AAAA-MM".
+    
+    Retorna una tupla (anio, mes); mes es None si solo se indicó el año.
+    """
+    
+    default_error_messages = {
+        'periodo': 'Periodo inválido: use AAAA o AAAA-MM.',
+    }
+    
+    def to_internal_value(self, data):
+        texto = super().to_internal_value(data)
+        partes = texto.split('-')
+        try:
+            anio = int(partes[0])
+            mes = int(partes[1]) if len(partes) == 2 else None
+        except ValueError:
+            self.fail('periodo')
+        if len(partes) > 2 or not 1900 <= anio <= 2100 or (mes is not None and not 1 <= mes <= 12):
+            self.fail('periodo')
+        return anio, mes
+
+
+class PreciosFiltroSerializer(serializers.Serializer):
+    """
+    Filtros (query params) de /api/precios/.
+    
+    Los textos se normalizan como en la importación ("Capirona" y
+    "CAPIRONA" son la misma especie), de modo que el filtro es una
+    igualdad sobre columnas indexadas.
+    """
+    
+    especie = serializers.CharField(required=False)
+    departamento = serializers.CharField(required=False)
+    tipo_producto = serializers.CharField(required=False)
+    producto = serializers.CharField(required=False)
+    unidad = serializers.CharField(required=False)
+    desde = PeriodoField(required=False, help_text="AAAA o AAAA-MM (inclusive)")
+    hasta = PeriodoField(required=False, help_text="AAAA o AAAA-MM (inclusive)")
+    agrupacion = serializers.ChoiceField(
+        choices=[AGRUPACION_MES, AGRUPACION_ANIO],
+        default=AGRUPACION_MES,
+        help_text="Solo para /api/precios/serie/"
+    )
+    
+    def validate_especie(self, value):
+        return normalizar_especie(value)
+    
+    def validate_departamento(self, value):
+        return normalizar_texto(value)
+    
+    def validate_tipo_producto(self, value):
+        return normalizar_texto(value)
+    
+    def validate_producto(self, value):
+        return normalizar_texto(value)
+    
+    def validate_unidad(self, value):
+        return normalizar_unidad(value)
+    
+    def validate(self, data):
+        """Completa los meses omitidos y valida el rango."""
+        if 'desde' in data:
+            anio, mes = data['desde']
+            data['desde'] = (anio, mes or 1)
+        if 'hasta' in data:
+            anio, mes = data['hasta']
+            data['hasta'] = (anio, mes or 12)
+        if 'desde' in data and 'hasta' in data and data['desde'] > data['hasta']:
+            raise serializers.ValidationError({
+                'hasta': 'Debe ser posterior o igual a desde.'
+            })
+        return data
+
+
+class PuntoSeriePrecioSerializer(serializers.Serializer):
+    """Serializador de un punto (mes o año) de la serie de precios."""
+    
+    unidad = serializers.CharField()
+    anio = serializers.IntegerField()
+    mes = serializers.IntegerField(required=False, allow_null=True)
+    observaciones = serializers.IntegerField()
+    promedio = serializers.DecimalField(max_digits=12, decimal_places=2)
+    minimo = serializers.DecimalField(max_digits=12, decimal_places=2)
+    maximo = serializers.DecimalField(max_digits=12, decimal_places=2)
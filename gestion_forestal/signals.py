@@ -0,0 +1,110 @@
+"""
+Señales de invalidación de cachés del Geovisor de Costos Forestales.
+
+Cualquier cambio en el catálogo que alimenta el motor de cálculo
+descarta los planes de costos compilados del proceso. Los cambios en
+distritos o zonas descartan el índice espacial de detección y las capas
+de teselas vectoriales, y los de estadísticas de precios el snapshot de
+precios regionales de la madera. Los cambios en distritos, zonas,
+cultivos o paquetes incrementan además la versión del catálogo en la
+base, con la que los demás procesos detectan el cambio (ver catalogo.py).
+Las estadísticas de precios solo las reemplaza el comando
+actualizar_estadisticas_precios, que incrementa la versión una vez.
+
+Las señales se emiten por fila, así que dentro de una transacción cada
+invalidación posterior al commit se encola una sola vez y la versión se
+incrementa una sola vez. Los comandos que reemplazan tablas completas
+borran con catalogo.borrar_sin_senales e invalidan una vez al final.
+"""
+
+from typing import Callable
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogo import descartar_catalogo, invalidar_catalogo
+from .indice_espacial import invalidar_indice
+from .models import Cultivo, Distrito, EstadisticaPrecio, PaqueteTecnologico, ZonaEconomica
+from .plan_costos import invalidar_planes
+from .precios import invalidar_precios
+from .teselas import invalidar_teselas
+
+
+def pendiente_al_confirmar(funcion: Callable[[], None]) -> bool:
+    """
+    True si funcion ya está encolada con on_commit en la transacción en curso.
+
+    Al revertir una transacción o un savepoint Django descarta sus
+    callbacks, así que una invalidación revertida se vuelve a encolar.
+    """
+    conexion = transaction.get_connection()
+    return any(encolada is funcion for _, encolada, _ in conexion.run_on_commit)
+
+
+def al_confirmar(funcion: Callable[[], None]) -> None:
+    """Encola funcion con on_commit, una sola vez por transacción."""
+    if not pendiente_al_confirmar(funcion):
+        transaction.on_commit(funcion)
+
+
+@receiver(post_save, sender=PaqueteTecnologico)
+@receiver(post_delete, sender=PaqueteTecnologico)
+@receiver(post_save, sender=Cultivo)
+@receiver(post_delete, sender=Cultivo)
+@receiver(post_save, sender=ZonaEconomica)
+@receiver(post_delete, sender=ZonaEconomica)
+def invalidar_planes_costos(sender, **kwargs) -> None:
+    """Invalida los planes compilados al editar paquetes, cultivos o zonas."""
+    invalidar_planes()
+    # Repetir al confirmar la transacción: otro hilo pudo compilar
+    # el plan con los datos previos antes del commit.
+    al_confirmar(invalidar_planes)
+
+
+@receiver(post_save, sender=Distrito)
+@receiver(post_delete, sender=Distrito)
+@receiver(post_save, sender=ZonaEconomica)
+@receiver(post_delete, sender=ZonaEconomica)
+def invalidar_indice_distritos(sender, **kwargs) -> None:
+    """Invalida el índice espacial al editar distritos o sus zonas."""
+    invalidar_indice()
+    al_confirmar(invalidar_indice)
+
+
+@receiver(post_save, sender=Distrito)
+@receiver(post_delete, sender=Distrito)
+@receiver(post_save, sender=ZonaEconomica)
+@receiver(post_delete, sender=ZonaEconomica)
+def invalidar_teselas_distritos(sender, **kwargs) -> None:
+    """Invalida las capas de teselas (sus atributos vienen de distritos y zonas)."""
+    invalidar_teselas()
+    al_confirmar(invalidar_teselas)
+
+
+@receiver(post_save, sender=EstadisticaPrecio)
+@receiver(post_delete, sender=EstadisticaPrecio)
+def invalidar_precios_madera(sender, **kwargs) -> None:
+    """Invalida el snapshot de precios al editar estadísticas."""
+    invalidar_precios()
+    al_confirmar(invalidar_precios)
+
+
+@receiver(post_save, sender=Distrito)
+@receiver(post_delete, sender=Distrito)
+@receiver(post_save, sender=ZonaEconomica)
+@receiver(post_delete, sender=ZonaEconomica)
+@receiver(post_save, sender=Cultivo)
+@receiver(post_delete, sender=Cultivo)
+@receiver(post_save, sender=PaqueteTecnologico)
+@receiver(post_delete, sender=PaqueteTecnologico)
+def invalidar_catalogo_cambio(sender, **kwargs) -> None:
+    """Versiona el catálogo y descarta su snapshot al editar sus tablas."""
+    # Con descartar_catalogo ya encolado, la versión ya se incrementó en
+    # esta transacción: una sola UPDATE por transacción, no por fila
+    if pendiente_al_confirmar(descartar_catalogo):
+        descartar_catalogo()
+        return
+    # El incremento de versión va en la misma transacción que el cambio
+    invalidar_catalogo()
+    transaction.on_commit(descartar_catalogo)
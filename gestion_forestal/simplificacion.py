@@ -0,0 +1,226 @@
+"""
+Simplificación de capas TopoJSON por niveles de zoom (Visvalingam).
+
+Cada vértice interior de un arco recibe su área efectiva: el área del
+triángulo que forma con sus vecinos en el momento en que el algoritmo de
+Visvalingam-Whyatt lo elimina (con la corrección de que el área nunca
+baja respecto de la del vértice eliminado antes, para que el orden de
+eliminación sea estable). Un nivel conserva los vértices cuya área
+efectiva supera su umbral y cuantiza las coordenadas a una grilla acorde
+al tamaño del píxel.
+
+La simplificación se hace por arco y los extremos de los arcos nunca se
+eliminan, así que los bordes compartidos entre vecinos se simplifican
+una sola vez y la topología se conserva: no aparecen huecos ni
+solapamientos entre distritos. Además, los anillos formados por uno o
+dos arcos conservan los vértices mínimos para seguir siendo polígonos
+(un anillo menor que una celda de la grilla puede reducirse a un punto:
+a ese zoom no se vería de todos modos).
+
+Las áreas se miden en grados: entre el ecuador y los 18° S la escala de
+Web Mercator varía menos de un 5 %, irrelevante para elegir vértices.
+"""
+
+import heapq
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from .topologia import Arco, decodificar_arcos, geometrias, poligonos_geometria
+
+
+# Índice de niveles dentro de GEO_NIVELES_DIR
+NOMBRE_INDICE_NIVELES = 'indice.json'
+
+# Tamaño de tesela de Leaflet (píxeles)
+TAMANO_TESELA = 256
+
+# Umbral de área efectiva, en píxeles cuadrados del zoom del nivel
+AREA_MINIMA_PX2 = 1.0
+
+# Paso de la grilla de cuantización, en píxeles del zoom del nivel
+PASO_CUANTIZACION_PX = 0.5
+
+
+@dataclass(frozen=True, slots=True)
+class Nivel:
+    """Nivel de la pirámide: se usa para todo zoom menor o igual a zoom_max."""
+
+    zoom_max: int
+
+    @property
+    def pixel(self) -> float:
+        """Tamaño de un píxel en grados (en el ecuador) a este zoom."""
+        return 360.0 / (TAMANO_TESELA * 2 ** self.zoom_max)
+
+    @property
+    def area_minima(self) -> float:
+        """Área efectiva mínima (grados²) para conservar un vértice."""
+        return AREA_MINIMA_PX2 * self.pixel ** 2
+
+    @property
+    def paso(self) -> float:
+        """Paso de la grilla de cuantización (grados)."""
+        return PASO_CUANTIZACION_PX * self.pixel
+
+
+# Vista nacional (≤5), departamento (6-7), provincia (8-9) y distrito (10-11).
+# Desde el zoom 12 se usa la topología completa
+NIVELES = (Nivel(5), Nivel(7), Nivel(9), Nivel(11))
+
+
+def areas_efectivas(xs: Sequence[float], ys: Sequence[float]) -> array:
+    """
+    Área efectiva de Visvalingam de cada vértice de un arco.
+
+    Los vértices se eliminan de menor a mayor área con un heap; al
+    eliminar uno se recalcula el área de sus vecinos. Las entradas del
+    heap que quedaron obsoletas se descartan al salir.
+
+    Args:
+        xs, ys: Coordenadas del arco.
+
+    Returns:
+        array: Área por vértice; los extremos tienen área infinita.
+    """
+    n = len(xs)
+    areas = array('d', [math.inf]) * n
+    if n < 3:
+        return areas
+
+    def triangulo(a: int, b: int, c: int) -> float:
+        return abs(
+            (xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])
+        ) / 2
+
+    anterior = list(range(-1, n - 1))
+    siguiente = list(range(1, n + 1))
+    actual = [math.inf] * n
+    heap = []
+    for i in range(1, n - 1):
+        actual[i] = triangulo(i - 1, i, i + 1)
+        heap.append((actual[i], i))
+    heapq.heapify(heap)
+
+    maximo = 0.0
+    eliminado = [False] * n
+    while heap:
+        area, i = heapq.heappop(heap)
+        if eliminado[i] or area != actual[i]:
+            continue
+        eliminado[i] = True
+        maximo = max(maximo, area)
+        areas[i] = maximo
+
+        a, c = anterior[i], siguiente[i]
+        siguiente[a] = c
+        anterior[c] = a
+        if a > 0:
+            actual[a] = triangulo(anterior[a], a, c)
+            heapq.heappush(heap, (actual[a], a))
+        if c < n - 1:
+            actual[c] = triangulo(a, c, siguiente[c])
+            heapq.heappush(heap, (actual[c], c))
+    return areas
+
+
+def interiores_minimos(topologia: Dict) -> Dict[int, int]:
+    """
+    Vértices interiores que cada arco debe conservar en todo nivel.
+
+    Un anillo de un solo arco (islas) necesita dos vértices interiores
+    además del extremo repetido; uno de dos arcos, uno por arco. Con tres
+    o más arcos los extremos ya forman un polígono.
+
+    Returns:
+        Dict: Índice de arco -> mínimo de vértices interiores.
+    """
+    minimos: Dict[int, int] = {}
+    for geometria in geometrias(topologia):
+        for poligono in poligonos_geometria(geometria):
+            for anillo in poligono:
+                if len(anillo) > 2:
+                    continue
+                requerido = 2 if len(anillo) == 1 else 1
+                for indice in anillo:
+                    arco = indice if indice >= 0 else ~indice
+                    minimos[arco] = max(minimos.get(arco, 0), requerido)
+    return minimos
+
+
+def _cuantizar_arco(xs: Sequence[float], ys: Sequence[float], conservar: Sequence[int],
+                    paso: float, tx: float, ty: float) -> List[List[int]]:
+    """Arco simplificado en la grilla del nivel, codificado por diferencias."""
+    puntos = []
+    for i in conservar:
+        punto = (round((xs[i] - tx) / paso), round((ys[i] - ty) / paso))
+        # Vértices que caen en la misma celda que el anterior no aportan nada
+        if not puntos or punto != puntos[-1]:
+            puntos.append(punto)
+    if len(puntos) == 1:
+        puntos.append(puntos[0])
+
+    delta = [list(puntos[0])]
+    for (x0, y0), (x1, y1) in zip(puntos, puntos[1:]):
+        delta.append([x1 - x0, y1 - y0])
+    return delta
+
+
+class PiramideTopologia:
+    """
+    Topología decodificada con las áreas efectivas de todos sus vértices.
+
+    Las áreas se calculan una sola vez; cada nivel solo filtra y cuantiza.
+    """
+
+    def __init__(self, topologia: Dict):
+        self.topologia = topologia
+        self.arcos: List[Arco] = decodificar_arcos(topologia)
+        self.areas: List[array] = [areas_efectivas(xs, ys) for xs, ys in self.arcos]
+        self.minimos = interiores_minimos(topologia)
+
+        transform = topologia.get('transform')
+        self.origen = tuple(transform['translate']) if transform else (0.0, 0.0)
+
+    @property
+    def vertices(self) -> int:
+        """Vértices de la topología completa."""
+        return sum(len(xs) for xs, _ in self.arcos)
+
+    def _umbral_arco(self, indice: int, area_minima: float) -> float:
+        """Umbral del arco: el del nivel, salvo que deba conservar más vértices."""
+        minimo = self.minimos.get(indice, 0)
+        if not minimo:
+            return area_minima
+        interiores = sorted(self.areas[indice][1:-1], reverse=True)
+        if len(interiores) < minimo:
+            return 0.0
+        return min(area_minima, interiores[minimo - 1])
+
+    def nivel(self, nivel: Nivel) -> Dict:
+        """
+        TopoJSON simplificado y cuantizado para un nivel.
+
+        Conserva los objetos y propiedades originales; solo cambian los
+        arcos y la transformación.
+        """
+        tx, ty = self.origen
+        arcos = []
+        for indice, ((xs, ys), areas) in enumerate(zip(self.arcos, self.areas)):
+            umbral = self._umbral_arco(indice, nivel.area_minima)
+            conservar = [i for i, area in enumerate(areas) if area >= umbral]
+            arcos.append(_cuantizar_arco(xs, ys, conservar, nivel.paso, tx, ty))
+
+        return {
+            'type': 'Topology',
+            'transform': {'scale': [nivel.paso, nivel.paso], 'translate': [tx, ty]},
+            'arcs': arcos,
+            'objects': self.topologia['objects'],
+        }
+
+
+def contar_vertices(topologia: Dict) -> int:
+    """Vértices (posiciones) de todos los arcos de una topología."""
+    return sum(len(arco) for arco in topologia['arcs'])
+
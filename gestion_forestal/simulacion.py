@@ -0,0 +1,282 @@
+"""
+Simulación Monte Carlo del VAN, ratio B/C y TIR de una plantación.
+
+El precio de la madera, el rendimiento, el costo del jornal y el factor
+de pendiente son inciertos. Se muestrean N escenarios (reproducibles con
+una semilla) y se evalúan con la reducción lineal del plan de costos
+(ver escenarios.sumar_plan): cada muestra cuesta unas pocas
+multiplicaciones.
+
+La TIR exige resolver una raíz por flujo (hasta ~0.5 ms con varios
+cambios de signo), así que se calcula sobre un prefijo de la secuencia:
+las muestras son independientes, de modo que el prefijo es una
+submuestra aleatoria reproducible con la misma semilla. Se resuelven a
+lo sumo MAX_TIR_SIMULACION flujos distintos; las muestras que repiten
+precio, rendimiento, jornal y pendiente (todas, si ninguna variable
+tiene distribución) reutilizan la TIR ya resuelta.
+
+La evaluación se hace por bloques y se detiene al agotar el presupuesto
+de tiempo, para no bloquear un hilo de gunicorn. Como las muestras se
+generan antes de evaluar, un resultado truncado corresponde a un prefijo
+de la misma secuencia.
+"""
+
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .escenarios import sumar_plan
+from .finanzas import TASA_DESCUENTO, calcular_tir, factores_descuento
+from .motor import PlanCostos
+
+
+# Tipos de distribución soportados
+FIJO = 'fijo'
+UNIFORME = 'uniforme'
+TRIANGULAR = 'triangular'
+NORMAL = 'normal'
+LOGNORMAL = 'lognormal'
+
+# Variables inciertas que admiten distribución
+VARIABLES_SIMULACION = ('precio_madera', 'rendimiento', 'costo_jornal', 'factor_pendiente')
+
+# Percentiles reportados para cada indicador
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Muestras evaluadas entre cada control del presupuesto de tiempo
+TAMANO_BLOQUE = 500
+
+# Flujos distintos cuya TIR se resuelve en una simulación
+MAX_TIR_SIMULACION = 2000
+
+
+@dataclass(frozen=True, slots=True)
+class Distribucion:
+    """
+    Distribución de probabilidad de una variable incierta.
+
+    Attributes:
+        tipo: fijo, uniforme, triangular, normal o lognormal.
+        minimo: Límite inferior (uniforme, triangular).
+        moda: Valor más probable (triangular).
+        maximo: Límite superior (uniforme, triangular).
+        media: Media (normal, lognormal) o valor (fijo).
+        desviacion: Desviación estándar (normal, lognormal).
+    """
+
+    tipo: str
+    minimo: Optional[float] = None
+    moda: Optional[float] = None
+    maximo: Optional[float] = None
+    media: Optional[float] = None
+    desviacion: Optional[float] = None
+
+    def muestrear(self, rng: random.Random, n: int) -> List[float]:
+        """Genera n muestras no negativas de la distribución."""
+        if self.tipo == UNIFORME:
+            lo, hi = self.minimo, self.maximo
+            muestras = [rng.uniform(lo, hi) for _ in range(n)]
+        elif self.tipo == TRIANGULAR:
+            lo, moda, hi = self.minimo, self.moda, self.maximo
+            muestras = [rng.triangular(lo, hi, moda) for _ in range(n)]
+        elif self.tipo == NORMAL:
+            media, sigma = self.media, self.desviacion
+            muestras = [rng.gauss(media, sigma) for _ in range(n)]
+        elif self.tipo == LOGNORMAL and self.media > 0:
+            # Parámetros de la normal subyacente a partir de media y desviación
+            varianza = math.log(1.0 + (self.desviacion / self.media) ** 2)
+            mu = math.log(self.media) - varianza / 2.0
+            sigma = math.sqrt(varianza)
+            muestras = [rng.lognormvariate(mu, sigma) for _ in range(n)]
+        else:
+            # Fijo, o lognormal degenerada (media cero)
+            return [self.media] * n
+        return [m if m > 0.0 else 0.0 for m in muestras]
+
+
+def _percentil(ordenados: Sequence[float], q: float) -> float:
+    """Percentil q (0-100) por interpolación lineal sobre datos ordenados."""
+    posicion = (len(ordenados) - 1) * q / 100.0
+    inferior = math.floor(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fraccion = posicion - inferior
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fraccion
+
+
+def resumir(valores: List[float]) -> Optional[Dict[str, float]]:
+    """Media, desviación, extremos y percentiles de una muestra."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    n = len(ordenados)
+    media = math.fsum(ordenados) / n
+    varianza = math.fsum((v - media) ** 2 for v in ordenados) / n
+    resumen = {
+        'media': round(media, 2),
+        'desviacion': round(math.sqrt(varianza), 2),
+        'minimo': round(ordenados[0], 2),
+        'maximo': round(ordenados[-1], 2),
+    }
+    for q in PERCENTILES:
+        resumen[f'p{q}'] = round(_percentil(ordenados, q), 2)
+    return resumen
+
+
+def simular(
+    plan: PlanCostos,
+    *,
+    hectareas: float,
+    costo_jornal: float,
+    costo_planton: float,
+    factor_densidad: float,
+    factor_pendiente: float,
+    anio_inicio: int,
+    anio_fin: int,
+    incluir_servicios: bool,
+    distribuciones: Dict[str, Distribucion],
+    muestras: int,
+    semilla: int,
+    tiempo_max: float
+) -> Dict:
+    """
+    Ejecuta la simulación Monte Carlo sobre un plan compilado.
+
+    Las variables sin distribución toman su valor determinístico.
+    Cada variable usa su propio generador derivado de la semilla, de
+    modo que agregar o quitar una distribución no altera las demás.
+
+    Args:
+        plan: Plan de costos compilado.
+        hectareas, costo_jornal, costo_planton: Valores del usuario.
+        factor_densidad, factor_pendiente: Factores determinísticos.
+        anio_inicio, anio_fin, incluir_servicios: Alcance del cálculo.
+        distribuciones: Distribución por variable (ver VARIABLES_SIMULACION).
+        muestras: Número de muestras a generar.
+        semilla: Semilla del generador pseudoaleatorio.
+        tiempo_max: Presupuesto de tiempo de evaluación (segundos).
+
+    Returns:
+        Dict: Resumen por indicador, probabilidad de VAN < 0 y metadatos.
+        La TIR resume las primeras muestras_tir muestras (ver
+        MAX_TIR_SIMULACION); muestras_con_tir son las que tienen TIR.
+    """
+    base = {
+        'precio_madera': float(plan.precio_madera_referencial),
+        'rendimiento': float(plan.rendimiento_m3_ha),
+        'costo_jornal': costo_jornal,
+        'factor_pendiente': factor_pendiente,
+    }
+    inicio = time.perf_counter()
+    valores = {}
+    for nombre in VARIABLES_SIMULACION:
+        distribucion = distribuciones.get(nombre) or Distribucion(FIJO, media=base[nombre])
+        rng = random.Random(f'{semilla}:{nombre}')
+        valores[nombre] = distribucion.muestrear(rng, muestras)
+
+    # El costo es lineal en el factor de pendiente: sumas con fp=0 y su pendiente
+    s0 = sumar_plan(plan, factor_densidad, 0.0, anio_inicio, anio_fin, incluir_servicios)
+    s1 = sumar_plan(plan, factor_densidad, 1.0, anio_inicio, anio_fin, incluir_servicios)
+    dj = s1.jornales - s0.jornales
+    djv = s1.jornales_vp - s0.jornales_vp
+    djh = s1.jornales_cosecha - s0.jornales_cosecha
+    dj_anual = [b - a for a, b in zip(s0.jornales_anuales, s1.jornales_anuales)]
+
+    cosecha = plan.turno_estimado
+    d_cosecha = factores_descuento(float(TASA_DESCUENTO), cosecha)[cosecha]
+    ha = hectareas
+    planton = costo_planton
+    anios = len(s0.jornales_anuales)
+    largo_flujo = max(anios, cosecha + 1)
+
+    vans: List[float] = []
+    ratios: List[float] = []
+    costos: List[float] = []
+    ingresos: List[float] = []
+    tirs: List[float] = []
+    van_negativo = 0
+
+    # TIR ya resuelta por (ingreso por ha, jornal, pendiente); el prefijo
+    # con TIR termina en la primera muestra que excede MAX_TIR_SIMULACION
+    tir_por_flujo: Dict[tuple, Optional[float]] = {}
+    muestras_tir = 0
+    con_tir = True
+
+    truncado = False
+
+    for i, (precio, rendimiento, jornal, fp) in enumerate(zip(
+        valores['precio_madera'], valores['rendimiento'],
+        valores['costo_jornal'], valores['factor_pendiente']
+    )):
+        if i and i % TAMANO_BLOQUE == 0 and time.perf_counter() - inicio > tiempo_max:
+            truncado = True
+            break
+
+        ingreso_ha = rendimiento * precio
+        ingreso = ha * ingreso_ha
+        jornales = s0.jornales + fp * dj
+        jornales_vp = s0.jornales_vp + fp * djv
+        jornales_cosecha = s0.jornales_cosecha + fp * djh
+
+        costo = ha * (jornal * jornales + planton * s0.plantones + s0.fijos)
+        vp_costo = ha * (jornal * jornales_vp + planton * s0.plantones_vp + s0.fijos_vp)
+        costo_cosecha = ha * (
+            jornal * jornales_cosecha + planton * s0.plantones_cosecha + s0.fijos_cosecha
+        )
+
+        flujo_cosecha = ingreso - costo_cosecha
+        vp_otros = vp_costo - costo_cosecha * d_cosecha
+        if flujo_cosecha > 0:
+            vp_ingresos, vp_costos = flujo_cosecha * d_cosecha, vp_otros
+        else:
+            vp_ingresos, vp_costos = 0.0, vp_otros - flujo_cosecha * d_cosecha
+
+        van = ingreso * d_cosecha - vp_costo
+        vans.append(van)
+        costos.append(costo)
+        ingresos.append(ingreso)
+        ratios.append(vp_ingresos / vp_costos if vp_costos > 0 else 0.0)
+        if van < 0:
+            van_negativo += 1
+
+        if not con_tir:
+            continue
+
+        # TIR sobre el flujo por hectárea (independiente de la superficie)
+        clave = (ingreso_ha, jornal, fp)
+        if clave in tir_por_flujo:
+            tir = tir_por_flujo[clave]
+        elif len(tir_por_flujo) < MAX_TIR_SIMULACION:
+            flujos = [0.0] * largo_flujo
+            for anio in range(anios):
+                flujos[anio] = -(
+                    jornal * (s0.jornales_anuales[anio] + fp * dj_anual[anio])
+                    + planton * s0.plantones_anuales[anio]
+                    + s0.fijos_anuales[anio]
+                )
+            flujos[cosecha] += ingreso_ha
+            tir = tir_por_flujo[clave] = calcular_tir(flujos).tir
+        else:
+            con_tir = False
+            continue
+        muestras_tir += 1
+        if tir is not None:
+            tirs.append(tir * 100)
+
+    evaluadas = len(vans)
+    return {
+        'muestras_solicitadas': muestras,
+        'muestras_evaluadas': evaluadas,
+        'truncado': truncado,
+        'semilla': semilla,
+        'tiempo_ms': round((time.perf_counter() - inicio) * 1000, 1),
+        'probabilidad_van_negativo': round(van_negativo / evaluadas, 4) if evaluadas else None,
+        'van': resumir(vans),
+        'ratio_beneficio_costo': resumir(ratios),
+        'tir': resumir(tirs),
+        'muestras_tir': muestras_tir,
+        'muestras_con_tir': len(tirs),
+        'costo_total_proyecto': resumir(costos),
+        'ingreso_total_estimado': resumir(ingresos),
+    }
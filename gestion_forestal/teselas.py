@@ -0,0 +1,626 @@
+"""
+Teselas vectoriales (Mapbox Vector Tiles) de las capas de límites.
+
+Las teselas se generan en Python puro, sin GDAL ni PostGIS, a partir de
+los polígonos decodificados en memoria (ver poligonos.py): se eligen los
+polígonos cuya caja intersecta la tesela con el R-tree del almacén, se
+proyectan a Web Mercator, se recortan (Sutherland-Hodgman) contra la
+tesela más un margen, se cuantizan a la grilla de 4096 y se codifican en
+protobuf según la especificación MVT 2.1.
+
+En los zooms bajos se usa el nivel simplificado correspondiente de la
+pirámide de Visvalingam (ver simplificacion.py), así una tesela nacional
+no recorre los 300 mil vértices de los distritos.
+
+Los distritos llevan como atributos su UBIGEO, zona económica y
+pendiente (unidos con Distrito), de modo que el mapa puede colorear por
+zona sin otra consulta. Las teselas generadas se guardan comprimidas en
+disco, en un directorio por versión de la capa, con desalojo LRU al
+superar el tamaño máximo.
+"""
+
+import gzip
+import math
+import os
+import struct
+import tempfile
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from .huellas import huella_datos
+from .models import Distrito
+from .poligonos import CAMPOS_DISTRITO, AlmacenPoligonos, almacen_desde_topologia
+from .recortes import CAPAS_RECORTE
+from .simplificacion import NIVELES, PiramideTopologia
+from .topologia import cargar_topologia
+
+
+# Resolución de la grilla de cada tesela (especificación MVT)
+EXTENSION_MVT = 4096
+
+# Margen de recorte alrededor de la tesela, en unidades de la grilla
+MARGEN_MVT = 64
+
+# Zoom máximo servido
+ZOOM_MAXIMO = 18
+
+# Capas publicadas: nombre en la URL -> capa de CAPAS_RECORTE
+CAPAS_TESELAS = {
+    'departamentos': 'DEPARTAMENTOS',
+    'provincias': 'PROVINCIAS',
+    'distritos': 'DISTRITOS',
+}
+
+# Geometría MVT de tipo polígono y comandos de dibujo
+TIPO_POLIGONO = 3
+MOVER_A = 1
+LINEA_A = 2
+CERRAR = 7
+
+# Atributos de una entidad de la tesela
+Propiedades = Dict[str, object]
+
+
+# ===========================================
+# CODIFICACIÓN PROTOBUF
+# ===========================================
+
+def _varint(salida: bytearray, valor: int) -> None:
+    """Agrega un entero sin signo en formato varint."""
+    while valor > 0x7F:
+        salida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    salida.append(valor)
+
+
+def _zigzag(valor: int) -> int:
+    """Codificación zigzag de enteros con signo (sint)."""
+    return (valor << 1) ^ (valor >> 63)
+
+
+def _campo_varint(salida: bytearray, numero: int, valor: int) -> None:
+    _varint(salida, numero << 3)
+    _varint(salida, valor)
+
+
+def _campo_bytes(salida: bytearray, numero: int, datos: bytes) -> None:
+    _varint(salida, (numero << 3) | 2)
+    _varint(salida, len(datos))
+    salida.extend(datos)
+
+
+def _campo_empaquetado(salida: bytearray, numero: int, valores: Sequence[int]) -> None:
+    """Campo repetido de enteros sin signo, empaquetado."""
+    contenido = bytearray()
+    for valor in valores:
+        _varint(contenido, valor)
+    _campo_bytes(salida, numero, contenido)
+
+
+def _codificar_valor(valor: object) -> bytes:
+    """Mensaje Value de MVT para un atributo."""
+    salida = bytearray()
+    if isinstance(valor, bool):
+        _campo_varint(salida, 7, int(valor))
+    elif isinstance(valor, int):
+        if valor >= 0:
+            _campo_varint(salida, 5, valor)
+        else:
+            _campo_varint(salida, 6, _zigzag(valor))
+    elif isinstance(valor, float):
+        _varint(salida, (3 << 3) | 1)
+        salida.extend(struct.pack('<d', valor))
+    else:
+        _campo_bytes(salida, 1, str(valor).encode('utf-8'))
+    return bytes(salida)
+
+
+def codificar_capa(
+    nombre: str,
+    entidades: Sequence[Tuple[int, List[int], Propiedades]]
+) -> bytes:
+    """
+    Codifica una capa MVT como mensaje Tile completo.
+
+    Args:
+        nombre: Nombre de la capa dentro de la tesela.
+        entidades: (id, comandos de geometría, atributos) por entidad.
+
+    Returns:
+        bytes: Tesela protobuf con una sola capa.
+    """
+    claves: Dict[str, int] = {}
+    valores: Dict[object, int] = {}
+    capa = bytearray()
+    _campo_varint(capa, 15, 2)
+    _campo_bytes(capa, 1, nombre.encode('utf-8'))
+
+    for identificador, geometria, propiedades in entidades:
+        etiquetas = []
+        for clave, valor in propiedades.items():
+            if valor is None:
+                continue
+            etiquetas.append(claves.setdefault(clave, len(claves)))
+            # bool es subclase de int: el tipo forma parte de la clave
+            etiquetas.append(valores.setdefault((type(valor), valor), len(valores)))
+        entidad = bytearray()
+        _campo_varint(entidad, 1, identificador)
+        _campo_empaquetado(entidad, 2, etiquetas)
+        _campo_varint(entidad, 3, TIPO_POLIGONO)
+        _campo_empaquetado(entidad, 4, geometria)
+        _campo_bytes(capa, 2, entidad)
+
+    for clave in claves:
+        _campo_bytes(capa, 3, clave.encode('utf-8'))
+    for _, valor in valores:
+        _campo_bytes(capa, 4, _codificar_valor(valor))
+    _campo_varint(capa, 5, EXTENSION_MVT)
+
+    tesela = bytearray()
+    _campo_bytes(tesela, 3, capa)
+    return bytes(tesela)
+
+
+# ===========================================
+# GEOMETRÍA
+# ===========================================
+
+def limites_tesela(z: int, x: int, y: int, margen: float = 0.0) -> Tuple[float, float, float, float]:
+    """
+    Caja (oeste, sur, este, norte) en grados de una tesela XYZ.
+
+    Args:
+        margen: Fracción de tesela agregada a cada lado.
+    """
+    n = 2 ** z
+
+    def lng(tx: float) -> float:
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty: float) -> float:
+        ty = min(max(ty, 0.0), float(n))
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lng(x - margen), lat(y + 1 + margen), lng(x + 1 + margen), lat(y - margen)
+
+
+def _recortar_borde(puntos: List[Tuple[float, float]], eje: int, limite: float,
+                    menor: bool) -> List[Tuple[float, float]]:
+    """Un paso de Sutherland-Hodgman: conserva el lado interior de un borde."""
+    if not puntos:
+        return puntos
+
+    def dentro(p: Tuple[float, float]) -> bool:
+        return p[eje] >= limite if menor else p[eje] <= limite
+
+    resultado = []
+    anterior = puntos[-1]
+    anterior_dentro = dentro(anterior)
+    for punto in puntos:
+        punto_dentro = dentro(punto)
+        if punto_dentro != anterior_dentro:
+            t = (limite - anterior[eje]) / (punto[eje] - anterior[eje])
+            resultado.append((
+                anterior[0] + t * (punto[0] - anterior[0]),
+                anterior[1] + t * (punto[1] - anterior[1]),
+            ))
+        if punto_dentro:
+            resultado.append(punto)
+        anterior, anterior_dentro = punto, punto_dentro
+    return resultado
+
+
+def recortar_anillo(puntos: List[Tuple[float, float]], minimo: float,
+                    maximo: float) -> List[Tuple[float, float]]:
+    """
+    Recorta un anillo (sin repetir el primer vértice) al cuadrado [minimo, maximo]².
+
+    Los anillos por completo dentro del cuadrado se devuelven sin copiar.
+    """
+    xs = [p[0] for p in puntos]
+    ys = [p[1] for p in puntos]
+    if min(xs) >= minimo and max(xs) <= maximo and min(ys) >= minimo and max(ys) <= maximo:
+        return puntos
+    if min(xs) > maximo or max(xs) < minimo or min(ys) > maximo or max(ys) < minimo:
+        return []
+    for eje in (0, 1):
+        puntos = _recortar_borde(puntos, eje, minimo, menor=True)
+        puntos = _recortar_borde(puntos, eje, maximo, menor=False)
+    return puntos
+
+
+def _area_doble(puntos: Sequence[Tuple[int, int]]) -> int:
+    """Doble del área con signo (fórmula del agrimensor) en coordenadas de tesela."""
+    suma = 0
+    x0, y0 = puntos[-1]
+    for x1, y1 in puntos:
+        suma += x0 * y1 - x1 * y0
+        x0, y0 = x1, y1
+    return suma
+
+
+def geometria_poligono(almacen: AlmacenPoligonos, poligono: int,
+                       z: int, x: int, y: int) -> List[int]:
+    """
+    Comandos MVT de un polígono del almacén dentro de una tesela.
+
+    Los anillos del almacén son antihorarios los exteriores y horarios
+    los huecos en (lng, lat); con el eje y de la tesela hacia abajo se
+    invierten para que los exteriores tengan área positiva, como pide la
+    especificación. Los anillos que al cuantizar pierden su área se
+    omiten, junto con los huecos de un exterior omitido.
+
+    Returns:
+        List[int]: Comandos y parámetros (zigzag); vacía si el polígono
+        no tiene superficie en la tesela.
+    """
+    n = 2 ** z
+    escala_x = n * EXTENSION_MVT / 360.0
+    escala_y = n * EXTENSION_MVT / (2 * math.pi)
+    origen_x = x * EXTENSION_MVT
+    origen_y = y * EXTENSION_MVT
+    minimo = -MARGEN_MVT
+    maximo = EXTENSION_MVT + MARGEN_MVT
+
+    comandos: List[int] = []
+    cursor_x = cursor_y = 0
+    exterior_emitido = False
+    xs, ys = almacen.xs, almacen.ys
+
+    for anillo in range(almacen.inicio_poligono[poligono], almacen.inicio_poligono[poligono + 1]):
+        inicio = almacen.inicio_anillo[anillo]
+        fin = almacen.inicio_anillo[anillo + 1] - 1  # sin el vértice de cierre
+        if fin - inicio < 3:
+            continue
+
+        # Web Mercator en unidades de la grilla, recorrido invertido
+        puntos = []
+        for i in range(fin - 1, inicio - 1, -1):
+            seno = math.sin(math.radians(max(-85.0511, min(85.0511, ys[i]))))
+            puntos.append((
+                (xs[i] + 180.0) * escala_x - origen_x,
+                (math.pi - 0.5 * math.log((1 + seno) / (1 - seno))) * escala_y - origen_y,
+            ))
+        puntos = recortar_anillo(puntos, minimo, maximo)
+
+        cuantizados: List[Tuple[int, int]] = []
+        for px, py in puntos:
+            punto = (round(px), round(py))
+            if not cuantizados or punto != cuantizados[-1]:
+                cuantizados.append(punto)
+        while len(cuantizados) > 1 and cuantizados[-1] == cuantizados[0]:
+            cuantizados.pop()
+        if len(cuantizados) < 3:
+            continue
+
+        area = _area_doble(cuantizados)
+        if area > 0:
+            exterior_emitido = True
+        elif area == 0 or not exterior_emitido:
+            continue
+
+        primero_x, primero_y = cuantizados[0]
+        comandos.append(MOVER_A | (1 << 3))
+        comandos.append(_zigzag(primero_x - cursor_x))
+        comandos.append(_zigzag(primero_y - cursor_y))
+        comandos.append(LINEA_A | ((len(cuantizados) - 1) << 3))
+        cursor_x, cursor_y = primero_x, primero_y
+        for px, py in cuantizados[1:]:
+            comandos.append(_zigzag(px - cursor_x))
+            comandos.append(_zigzag(py - cursor_y))
+            cursor_x, cursor_y = px, py
+        comandos.append(CERRAR | (1 << 3))
+
+    return comandos
+
+
+# ===========================================
+# CAPAS EN MEMORIA
+# ===========================================
+
+class CapaTeselas:
+    """
+    Capa de límites lista para generar teselas.
+
+    Guarda los atributos de cada polígono y construye de forma perezosa
+    un almacén por nivel de la pirámide (el último, la topología
+    completa).
+
+    Attributes:
+        nombre: Nombre de la capa en la URL y dentro de la tesela.
+        propiedades: Atributos de cada polígono, en el orden del almacén.
+        version: Huella de la topología y de los atributos; cambia la
+            carpeta de la caché en disco cuando cambian los datos.
+    """
+
+    def __init__(self, nombre: str, topologia: Dict, campos: Tuple, almacen: AlmacenPoligonos,
+                 propiedades: List[Propiedades], version: str):
+        self.nombre = nombre
+        self.topologia = topologia
+        self.campos = campos
+        self.propiedades = propiedades
+        self.version = version
+        self._piramide: Optional[PiramideTopologia] = None
+        # El almacén de la topología completa sirve a los zooms altos
+        self._almacenes: Dict[int, AlmacenPoligonos] = {len(NIVELES): almacen}
+        self._lock = Lock()
+
+    def almacen(self, z: int) -> AlmacenPoligonos:
+        """Almacén del nivel de la pirámide que corresponde al zoom."""
+        nivel = next((k for k, n in enumerate(NIVELES) if z <= n.zoom_max), len(NIVELES))
+        with self._lock:
+            almacen = self._almacenes.get(nivel)
+            if almacen is None:
+                if self._piramide is None:
+                    self._piramide = PiramideTopologia(self.topologia)
+                topologia = self._piramide.nivel(NIVELES[nivel])
+                almacen = almacen_desde_topologia(topologia, self.campos)
+                self._almacenes[nivel] = almacen
+        return almacen
+
+    def tesela(self, z: int, x: int, y: int) -> bytes:
+        """
+        Tesela MVT (sin comprimir) de la capa.
+
+        Returns:
+            bytes: Tesela protobuf; vacía si ningún polígono la toca.
+        """
+        almacen = self.almacen(z)
+        oeste, sur, este, norte = limites_tesela(z, x, y, MARGEN_MVT / EXTENSION_MVT)
+        entidades = []
+        for poligono in sorted(almacen.intersectan(oeste, sur, este, norte)):
+            geometria = geometria_poligono(almacen, poligono, z, x, y)
+            if geometria:
+                entidades.append((poligono + 1, geometria, self.propiedades[poligono]))
+        if not entidades:
+            return b''
+        return codificar_capa(self.nombre, entidades)
+
+
+def _ruta_capa(nombre_recorte: str) -> str:
+    """Archivo TopoJSON de una capa (los distritos, el de DISTRITOS_TOPOJSON)."""
+    if nombre_recorte == 'DISTRITOS':
+        return str(settings.DISTRITOS_TOPOJSON)
+    return os.path.join(str(settings.GEO_DIR), CAPAS_RECORTE[nombre_recorte].archivo)
+
+
+def cargar_capa_teselas(nombre: str) -> Optional[CapaTeselas]:
+    """
+    Construye una capa de teselas con sus atributos unidos a Distrito.
+
+    Los distritos se emparejan por departamento + provincia + nombre,
+    como en import_coords_topojson. Provincias y departamentos llevan la
+    zona económica si todos sus distritos comparten la misma.
+
+    Returns:
+        CapaTeselas, o None si el archivo de la capa no existe.
+    """
+    nombre_recorte = CAPAS_TESELAS[nombre]
+    capa = CAPAS_RECORTE[nombre_recorte]
+    ruta = _ruta_capa(nombre_recorte)
+    try:
+        topologia = cargar_topologia(ruta)
+    except FileNotFoundError:
+        return None
+
+    if nombre_recorte == 'DISTRITOS':
+        campos = CAMPOS_DISTRITO
+    else:
+        campos = (capa.campo_departamento, capa.campo_provincia, None)
+
+    distritos = {}
+    zonas: Dict[Tuple[str, ...], set] = {}
+    for distrito in Distrito.objects.select_related('zona_economica').only(
+        'cod_ubigeo', 'nombre', 'provincia', 'departamento',
+        'pendiente_promedio_estimada', 'zona_economica__nombre'
+    ):
+        distritos[(distrito.departamento, distrito.provincia, distrito.nombre)] = distrito
+        zona = distrito.zona_economica.nombre if distrito.zona_economica else None
+        zonas.setdefault((distrito.departamento,), set()).add(zona)
+        zonas.setdefault((distrito.departamento, distrito.provincia), set()).add(zona)
+
+    almacen = almacen_desde_topologia(topologia, campos)
+    propiedades: List[Propiedades] = []
+    for departamento, provincia, nombre_distrito in almacen.claves:
+        atributos: Propiedades = {'departamento': departamento}
+        if provincia:
+            atributos['provincia'] = provincia
+        if nombre_distrito:
+            atributos['distrito'] = nombre_distrito
+            distrito = distritos.get((departamento, provincia, nombre_distrito))
+            if distrito is not None:
+                atributos['ubigeo'] = distrito.cod_ubigeo
+                atributos['zona_id'] = distrito.zona_economica_id
+                atributos['zona'] = distrito.zona_economica.nombre if distrito.zona_economica else None
+                atributos['pendiente'] = distrito.pendiente_promedio_estimada
+        else:
+            zonas_unidad = zonas.get((departamento, provincia) if provincia else (departamento,), set())
+            if len(zonas_unidad) == 1:
+                atributos['zona'] = next(iter(zonas_unidad))
+        propiedades.append(atributos)
+
+    version = huella_datos(nombre, propiedades, ruta=ruta)[:16]
+    return CapaTeselas(nombre, topologia, campos, almacen, propiedades, version)
+
+
+class CacheCapasTeselas:
+    """
+    Capas de teselas perezosas, locales al proceso y seguras entre hilos.
+
+    Usa el mismo esquema de generaciones que CachePlanes: una capa
+    construida mientras ocurría una invalidación se descarta.
+    """
+
+    def __init__(self):
+        self._capas: Dict[str, Optional[CapaTeselas]] = {}
+        self._lock = Lock()
+        self._generacion = 0
+
+    def obtener(self, nombre: str) -> Optional[CapaTeselas]:
+        """Retorna la capa, construyéndola si fue invalidada."""
+        with self._lock:
+            if nombre in self._capas:
+                return self._capas[nombre]
+            generacion = self._generacion
+
+        capa = cargar_capa_teselas(nombre)
+        with self._lock:
+            if generacion == self._generacion:
+                self._capas[nombre] = capa
+        return capa
+
+    def invalidar(self) -> None:
+        """Descarta las capas; se reconstruyen en la siguiente tesela."""
+        with self._lock:
+            self._generacion += 1
+            self._capas = {}
+
+
+cache_capas_teselas = CacheCapasTeselas()
+
+
+def obtener_capa_teselas(nombre: str) -> Optional[CapaTeselas]:
+    """Atajo para obtener una capa de teselas del proceso."""
+    return cache_capas_teselas.obtener(nombre)
+
+
+def invalidar_teselas() -> None:
+    """Atajo para invalidar las capas de teselas del proceso."""
+    cache_capas_teselas.invalidar()
+
+
+# ===========================================
+# CACHÉ EN DISCO
+# ===========================================
+
+class CacheTeselasDisco:
+    """
+    Teselas comprimidas en disco con desalojo LRU por tamaño.
+
+    Cada lectura actualiza la fecha de modificación del archivo; al
+    superar el tamaño máximo se eliminan los archivos más antiguos hasta
+    quedar en el 90 % del límite. El total se mide una vez por proceso y
+    luego se lleva en memoria, así que con varios procesos el límite es
+    aproximado.
+    """
+
+    def __init__(self, directorio: str, tamano_maximo: int):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        self._total: Optional[int] = None
+        self._lock = Lock()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave)
+
+    def leer(self, clave: str) -> Optional[bytes]:
+        """Tesela guardada, o None si no está en la caché."""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as f:
+                datos = f.read()
+            os.utime(ruta)
+        except OSError:
+            return None
+        return datos
+
+    def guardar(self, clave: str, datos: bytes) -> None:
+        """
+        Guarda una tesela y desaloja las menos usadas si se supera el límite.
+
+        Un error de escritura (disco lleno, permisos) no se propaga: la
+        tesela ya generada se sirve igual, solo queda fuera de la caché.
+        """
+        ruta = self._ruta(clave)
+        directorio = os.path.dirname(ruta)
+        temporal = None
+        try:
+            os.makedirs(directorio, exist_ok=True)
+            # Nombre único por proceso e hilo, en el mismo directorio para
+            # que os.replace sea atómico
+            descriptor, temporal = tempfile.mkstemp(suffix='.tmp', dir=directorio)
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(datos)
+            try:
+                reemplazado = os.stat(ruta).st_size
+            except FileNotFoundError:
+                reemplazado = 0
+            os.replace(temporal, ruta)
+        except OSError:
+            if temporal is not None:
+                try:
+                    os.remove(temporal)
+                except OSError:
+                    pass
+            return
+
+        with self._lock:
+            if self._total is None:
+                self._total = sum(tamano for _, tamano, _ in self._archivos())
+            else:
+                self._total += len(datos) - reemplazado
+            if self._total > self.tamano_maximo:
+                self._desalojar()
+
+    def _archivos(self) -> List[Tuple[float, int, str]]:
+        """(fecha de uso, tamaño, ruta) de cada tesela guardada."""
+        archivos = []
+        for raiz, _, nombres in os.walk(self.directorio):
+            for nombre in nombres:
+                ruta = os.path.join(raiz, nombre)
+                try:
+                    estado = os.stat(ruta)
+                except OSError:
+                    continue
+                archivos.append((estado.st_mtime, estado.st_size, ruta))
+        return archivos
+
+    def _desalojar(self) -> None:
+        """Elimina las teselas usadas hace más tiempo hasta el 90 % del límite."""
+        archivos = sorted(self._archivos())
+        total = sum(tamano for _, tamano, _ in archivos)
+        objetivo = self.tamano_maximo * 0.9
+        for _, tamano, ruta in archivos:
+            if total <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+        self._total = total
+
+
+_cache_disco: Optional[CacheTeselasDisco] = None
+_cache_disco_lock = Lock()
+
+
+def cache_disco() -> CacheTeselasDisco:
+    """Caché en disco configurada en settings (TESELAS_CACHE_DIR, TESELAS_CACHE_MB)."""
+    global _cache_disco
+    with _cache_disco_lock:
+        if _cache_disco is None:
+            _cache_disco = CacheTeselasDisco(
+                str(settings.TESELAS_CACHE_DIR),
+                int(settings.TESELAS_CACHE_MB) * 1024 * 1024
+            )
+        return _cache_disco
+
+
+def obtener_tesela(capa: CapaTeselas, z: int, x: int, y: int) -> bytes:
+    """
+    Tesela comprimida con gzip, desde la caché en disco o generada.
+
+    La clave incluye la versión de la capa: si cambian los límites o los
+    atributos, las teselas anteriores dejan de usarse y el LRU las
+    desaloja.
+    """
+    clave = f'{capa.version}/{capa.nombre}/{z}/{x}/{y}.pbf.gz'
+    cache = cache_disco()
+    datos = cache.leer(clave)
+    if datos is None:
+        datos = gzip.compress(capa.tesela(z, x, y), compresslevel=6, mtime=0)
+        cache.guardar(clave, datos)
+    return datos
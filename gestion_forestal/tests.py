@@ -1,3 +1,1075 @@
-from django.test import TestCase
+"""
+Pruebas del Geovisor de Costos Forestales.
 
-# Create your tests here.
+Cada prueba parte de un catálogo mínimo (una zona, dos distritos
+contiguos y un cultivo con su paquete tecnológico) y de las cachés del
+proceso vacías: el catálogo, los planes, el índice espacial, los
+precios, las teselas y la caché de resultados.
+
+Ejecutar:
+    python manage.py test gestion_forestal
+"""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .catalogo import (
+    descartar_catalogo,
+    descartar_dependientes,
+    incrementar_version_catalogo,
+    version_catalogo,
+)
+from .finanzas import (
+    TIR_MULTIPLE,
+    TIR_SIN_CAMBIO_SIGNO,
+    TIR_SIN_RAIZ,
+    TIR_UNICA,
+    calcular_tir,
+)
+from .management.commands.seed_data import huella_seed
+from .models import (
+    Cultivo,
+    Distrito,
+    EstadisticaPrecio,
+    ObservacionPrecio,
+    PaqueteTecnologico,
+    RegistroCarga,
+    ZonaEconomica,
+)
+from . import teselas
+from .poligonos import cargar_almacen
+from .precios import (
+    COLUMNAS_CSV,
+    FUENTE_DEPARTAMENTO,
+    FUENTE_DEPARTAMENTO_GENERO,
+    FUENTE_NACIONAL,
+    FUENTE_NACIONAL_GENERO,
+    PreciosReferencia,
+    calcular_estadisticas,
+    claves_especie,
+)
+from .serializers import MAX_TIR_ESCENARIOS
+from .simulacion import MAX_TIR_SIMULACION
+from .teselas import CacheTeselasDisco, obtener_capa_teselas
+from .views import CalcularCostosLoteView
+
+
+# Dos distritos cuadrados contiguos de 0.1° de lado, divididos por el
+# meridiano -76.0 (coordenadas absolutas, sin 'transform')
+TOPOLOGIA_PRUEBA = {
+    'type': 'Topology',
+    'objects': {
+        'distritos': {
+            'type': 'GeometryCollection',
+            'geometries': [
+                {
+                    'type': 'Polygon',
+                    'arcs': [[0]],
+                    'properties': {'NOM_DEP': 'Lima', 'NOM_PRO': 'Lima', 'NOM_DIST': 'Oeste'},
+                },
+                {
+                    'type': 'Polygon',
+                    'arcs': [[1]],
+                    'properties': {'NOM_DEP': 'Lima', 'NOM_PRO': 'Lima', 'NOM_DIST': 'Este'},
+                },
+            ],
+        },
+    },
+    'arcs': [
+        [[-76.1, -12.1], [-76.0, -12.1], [-76.0, -12.0], [-76.1, -12.0], [-76.1, -12.1]],
+        [[-76.0, -12.1], [-75.9, -12.1], [-75.9, -12.0], [-76.0, -12.0], [-76.0, -12.1]],
+    ],
+}
+
+
+def cuadrado(oeste: float, sur: float, este: float, norte: float) -> dict:
+    """GeoJSON Polygon rectangular con pares [lng, lat]."""
+    return {
+        'type': 'Polygon',
+        'coordinates': [[[oeste, sur], [este, sur], [este, norte], [oeste, norte], [oeste, sur]]],
+    }
+
+
+class GeovisorTestCase(TestCase):
+    """Catálogo mínimo y cachés del proceso vacías en cada prueba."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.zona = ZonaEconomica.objects.create(
+            nombre='Costa',
+            costo_jornal_referencial=Decimal('50.00'),
+            costo_planton_referencial=Decimal('1.00'),
+        )
+        cls.oeste = Distrito.objects.create(
+            cod_ubigeo='150101', nombre='OESTE', departamento='LIMA', provincia='LIMA',
+            zona_economica=cls.zona, latitud=Decimal('-12.050000'),
+            longitud=Decimal('-76.050000'), pendiente_promedio_estimada=10,
+        )
+        cls.este = Distrito.objects.create(
+            cod_ubigeo='150102', nombre='ESTE', departamento='LIMA', provincia='LIMA',
+            zona_economica=cls.zona, latitud=Decimal('-12.050000'),
+            longitud=Decimal('-75.950000'), pendiente_promedio_estimada=30,
+        )
+        cls.cultivo = Cultivo.objects.create(
+            nombre='Pino', turno_estimado=10, densidad_base=1111,
+            precio_madera_referencial=Decimal('200.00'), rendimiento_m3_ha=Decimal('250.00'),
+        )
+        PaqueteTecnologico.objects.create(
+            cultivo=cls.cultivo, zona_economica=cls.zona, anio_proyecto=0,
+            rubro=PaqueteTecnologico.Rubro.MANO_OBRA, actividad='Plantación',
+            unidad_medida='Jornal', cantidad_tecnica=Decimal('10.00'), sensible_pendiente=True,
+        )
+        PaqueteTecnologico.objects.create(
+            cultivo=cls.cultivo, zona_economica=cls.zona, anio_proyecto=0,
+            rubro=PaqueteTecnologico.Rubro.INSUMO, actividad='Plantones',
+            unidad_medida='Unidad', cantidad_tecnica=Decimal('1111.00'),
+            es_planton=True, sensible_densidad=True,
+        )
+        PaqueteTecnologico.objects.create(
+            cultivo=cls.cultivo, zona_economica=cls.zona, anio_proyecto=1,
+            rubro=PaqueteTecnologico.Rubro.MANO_OBRA, actividad='Limpieza',
+            unidad_medida='Jornal', cantidad_tecnica=Decimal('5.00'),
+        )
+
+    def setUp(self):
+        descartar_catalogo()
+        descartar_dependientes()
+        caches['calculos'].clear()
+        # La clase corre en una sola transacción: los datos de
+        # setUpTestData cuentan como confirmados (sus invalidaciones se
+        # aplican arriba), para que cada prueba versione el catálogo
+        transaction.get_connection().run_on_commit.clear()
+        self.client = APIClient()
+
+    def datos_calculo(self, **cambios) -> dict:
+        """Cuerpo válido de /api/calcular-costos/ para el distrito oeste."""
+        data = {
+            'distrito_id': self.oeste.cod_ubigeo,
+            'cultivo_id': self.cultivo.id,
+            'hectareas': '2.00',
+            'costo_jornal_usuario': '50.00',
+            'costo_planton_usuario': '1.00',
+            'anio_inicio': 0,
+            'anio_fin': 10,
+            'sistema_siembra': 'CUADRADO',
+            'distanciamiento_largo': '3.00',
+        }
+        data.update(cambios)
+        return data
+
+    def cambio_remoto(self, **campos) -> None:
+        """
+        Modifica el distrito oeste como lo haría otro proceso: sin señales
+        en este proceso, solo con la versión del catálogo en la base.
+        """
+        Distrito.objects.filter(pk=self.oeste.pk).update(**campos)
+        incrementar_version_catalogo()
+
+
+class TopologiaPruebaMixin:
+    """Usa TOPOLOGIA_PRUEBA como límites distritales (DISTRITOS_TOPOJSON)."""
+
+    def setUp(self):
+        super().setUp()
+        directorio = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ruta = directorio / 'distritos.topojson'
+        ruta.write_text(json.dumps(TOPOLOGIA_PRUEBA), encoding='utf-8')
+
+        ajuste = override_settings(DISTRITOS_TOPOJSON=str(ruta))
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+        cargar_almacen.cache_clear()
+        self.addCleanup(cargar_almacen.cache_clear)
+        descartar_dependientes()
+        self.addCleanup(descartar_dependientes)
+
+
+# =============================================================================
+# CATÁLOGOS CON ETAG
+# =============================================================================
+
+class CatalogoEtagTests(GeovisorTestCase):
+    """GET de los catálogos con ETag, If-None-Match y Cache-Control."""
+
+    def test_listado_responde_304_con_etag_vigente(self):
+        respuesta = self.client.get('/api/zonas/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('max-age', respuesta['Cache-Control'])
+        etag = respuesta['ETag']
+
+        respuesta = self.client.get('/api/zonas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+    def test_detalle_responde_304_con_etag_vigente(self):
+        url = f'/api/distritos/{self.oeste.cod_ubigeo}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Otra URL del mismo catálogo tiene otro ETag
+        otra = self.client.get(f'/api/distritos/{self.este.cod_ubigeo}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(otra.status_code, 200)
+
+    def test_editar_el_catalogo_cambia_el_etag(self):
+        etag = self.client.get('/api/zonas/')['ETag']
+        self.zona.costo_jornal_referencial = Decimal('55.00')
+        self.zona.save()
+
+        respuesta = self.client.get('/api/zonas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        self.assertEqual(respuesta.json()[0]['costo_jornal_referencial'], '55.00')
+
+    def test_una_version_por_transaccion(self):
+        antes = version_catalogo()
+        with transaction.atomic():
+            self.zona.save()
+            self.cultivo.save()
+            PaqueteTecnologico.objects.filter(cultivo=self.cultivo).delete()
+        self.assertEqual(version_catalogo(), antes + 1)
+
+    def test_savepoint_revertido_vuelve_a_versionar(self):
+        # El savepoint revertido deshace la versión y su encolado: el
+        # cambio siguiente vuelve a incrementarla
+        antes = version_catalogo()
+        with transaction.atomic():
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.zona.save()
+                raise RuntimeError
+            self.cultivo.save()
+        self.assertEqual(version_catalogo(), antes + 1)
+
+
+# =============================================================================
+# API DE DISTRITOS
+# =============================================================================
+
+def filas_compactas(datos: dict) -> list:
+    """Filas de ?format=compact reconstruidas como las del serializador."""
+    columnas = datos['columnas']
+    filas = []
+    for i in range(datos['total']):
+        fila = {campo: valores[i] for campo, valores in columnas.items()}
+        fila.update(datos['zonas'].get(str(fila['zona_economica']), {}))
+        filas.append(fila)
+    return filas
+
+
+class DistritosApiTests(GeovisorTestCase):
+    """GET /api/distritos/ con ?format=compact, ?fields= y cursor."""
+
+    url = '/api/distritos/'
+
+    def test_compacto_equivale_al_serializador(self):
+        completo = self.client.get(self.url).json()
+        respuesta = self.client.get(self.url, {'format': 'compact'})
+        self.assertEqual(respuesta.status_code, 200)
+        compacto = respuesta.json()
+
+        # Los dos distritos comparten zona: sus datos se publican una vez
+        self.assertEqual(compacto['total'], 2)
+        self.assertEqual(list(compacto['zonas']), [str(self.zona.pk)])
+        self.assertNotIn('zona_economica_nombre', compacto['columnas'])
+        self.assertEqual(
+            sorted(filas_compactas(compacto), key=lambda f: f['cod_ubigeo']),
+            sorted(completo, key=lambda f: f['cod_ubigeo']),
+        )
+
+    def test_campos_pedidos(self):
+        campos = ['cod_ubigeo', 'zona_economica_nombre']
+        listado = self.client.get(self.url, {'fields': ','.join(campos)}).json()
+        self.assertEqual([sorted(f) for f in listado], [sorted(campos)] * 2)
+        detalle = self.client.get(f'{self.url}{self.oeste.cod_ubigeo}/', {'fields': 'nombre'})
+        self.assertEqual(detalle.json(), {'nombre': 'OESTE'})
+
+        compacto = self.client.get(self.url, {'format': 'compact', 'fields': ','.join(campos)}).json()
+        # zona_economica se agrega como clave de la tabla de zonas
+        self.assertEqual(sorted(compacto['columnas']), ['cod_ubigeo', 'zona_economica'])
+        self.assertEqual(compacto['zonas'], {str(self.zona.pk): {'zona_economica_nombre': 'Costa'}})
+
+    def test_campo_desconocido_responde_400(self):
+        for parametros in ({'fields': 'nombre,altitud'}, {'fields': 'altitud', 'format': 'compact'}):
+            with self.subTest(parametros=parametros):
+                respuesta = self.client.get(self.url, parametros)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('altitud', respuesta.json()['fields'])
+
+    def test_paginacion_por_cursor(self):
+        pagina = self.client.get(self.url, {'page_size': 1}).json()
+        self.assertEqual([f['cod_ubigeo'] for f in pagina['results']], ['150101'])
+        self.assertIsNone(pagina['previous'])
+
+        pagina = self.client.get(pagina['next']).json()
+        self.assertEqual([f['cod_ubigeo'] for f in pagina['results']], ['150102'])
+        self.assertIsNone(pagina['next'])
+
+        # El formato compacto pagina igual, con una tabla de zonas por página
+        pagina = self.client.get(self.url, {'page_size': 1, 'format': 'compact'}).json()
+        self.assertEqual(pagina['results']['columnas']['cod_ubigeo'], ['150101'])
+        self.assertEqual(list(pagina['results']['zonas']), [str(self.zona.pk)])
+        self.assertIn('format=compact', pagina['next'])
+
+
+# =============================================================================
+# CACHÉ DE RESULTADOS
+# =============================================================================
+
+class CacheResultadosTests(GeovisorTestCase):
+    """POST /api/calcular-costos/ con la caché de resultados."""
+
+    url = '/api/calcular-costos/'
+
+    def calcular(self):
+        respuesta = self.client.post(self.url, self.datos_calculo(), format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta['X-Cache-Calculo'], respuesta.json()['costo_total_proyecto']
+
+    def test_segunda_solicitud_sale_de_la_cache(self):
+        self.assertEqual(self.calcular()[0], 'MISS')
+        self.assertEqual(self.calcular()[0], 'HIT')
+
+    def test_editar_paquete_invalida_el_resultado(self):
+        _, costo = self.calcular()
+        paquete = PaqueteTecnologico.objects.get(actividad='Limpieza')
+        paquete.cantidad_tecnica = Decimal('15.00')
+        paquete.save()
+
+        origen, nuevo = self.calcular()
+        self.assertEqual(origen, 'MISS')
+        # 10 jornales más por hectárea, 2 ha, S/ 50 el jornal
+        self.assertEqual(Decimal(nuevo) - Decimal(costo), Decimal('1000.00'))
+
+    def test_cambio_de_otro_proceso_sin_esperar_la_verificacion(self):
+        # CATALOGO_VERIFICACION_SEGUNDOS (1 s) no ha vencido entre ambas
+        # solicitudes: la versión se lee de la base al armar la clave
+        self.calcular()
+        self.cambio_remoto(pendiente_promedio_estimada=40)
+
+        origen, _ = self.calcular()
+        self.assertEqual(origen, 'MISS')
+        respuesta = self.client.post(self.url, self.datos_calculo(), format='json')
+        self.assertEqual(respuesta.json()['factor_pendiente'], '1.30')
+
+    @override_settings(CALCULOS_CACHE_ENTRADA_KB=1)
+    def test_no_guarda_entradas_mayores_al_limite(self):
+        self.assertEqual(self.calcular()[0], 'MISS')
+        self.assertEqual(self.calcular()[0], 'MISS')
+        estadisticas = self.client.get('/api/calcular-costos/cache/').json()
+        self.assertGreaterEqual(estadisticas['omitidos_por_tamano'], 2)
+
+
+# =============================================================================
+# CÁLCULO EN LOTE
+# =============================================================================
+
+@mock.patch.object(CalcularCostosLoteView, 'TAMANO_BLOQUE', 2)
+class CalcularCostosLoteTests(GeovisorTestCase):
+    """POST /api/calcular-costos/batch/ en bloques de dos parcelas."""
+
+    url = '/api/calcular-costos/batch/'
+
+    def parcelas(self):
+        return [
+            self.datos_calculo(),
+            self.datos_calculo(hectareas='0.00'),
+            self.datos_calculo(distrito_id='999999'),
+            self.datos_calculo(distrito_id=self.este.cod_ubigeo),
+            self.datos_calculo(),
+        ]
+
+    def test_ndjson_por_bloques(self):
+        aciertos = self.client.get('/api/calcular-costos/cache/').json()['aciertos']
+        respuesta = self.client.post(
+            self.url + '?formato=ndjson', self.parcelas(), format='json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        lineas = [json.loads(linea) for linea in b''.join(respuesta.streaming_content).splitlines()]
+
+        resultados, resumen = lineas[:-1], lineas[-1]['resumen']
+        self.assertEqual([r['indice'] for r in resultados], [0, 1, 2, 3, 4])
+        self.assertEqual([r['ok'] for r in resultados], [True, False, False, True, True])
+        self.assertIn('hectareas', resultados[1]['errores'])
+        self.assertEqual(resultados[4]['resultado'], resultados[0]['resultado'])
+        self.assertEqual((resumen['parcelas'], resumen['calculadas'], resumen['con_error']), (5, 3, 2))
+
+        # La última parcela repite la primera: el primer bloque ya la guardó
+        estadisticas = self.client.get('/api/calcular-costos/cache/').json()
+        self.assertEqual(estadisticas['aciertos'], aciertos + 1)
+
+    def test_json_igual_a_ndjson(self):
+        completo = self.client.post(self.url, {'parcelas': self.parcelas()}, format='json').json()
+        respuesta = self.client.post(self.url + '?formato=ndjson', self.parcelas(), format='json')
+        lineas = [json.loads(linea) for linea in b''.join(respuesta.streaming_content).splitlines()]
+        self.assertEqual(completo['resultados'], lineas[:-1])
+        self.assertEqual(completo['resumen'], lineas[-1]['resumen'])
+
+
+# =============================================================================
+# DETECCIÓN DE DISTRITOS
+# =============================================================================
+
+@override_settings(CATALOGO_VERIFICACION_SEGUNDOS=0)
+class DetectarDistritoTests(TopologiaPruebaMixin, GeovisorTestCase):
+    """GET /api/distritos/detectar/ y POST /api/distritos/detectar-lote/"""
+
+    def test_detecta_por_poligono(self):
+        respuesta = self.client.get('/api/distritos/detectar/', {'lat': -12.05, 'lng': -75.95})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['cod_ubigeo'], '150102')
+        self.assertTrue(respuesta.json()['dentro_del_limite'])
+
+    def test_cambio_de_otro_proceso_descarta_el_indice(self):
+        url = '/api/distritos/detectar/'
+        punto = {'lat': -12.05, 'lng': -76.05}
+        self.assertEqual(self.client.get(url, punto).json()['pendiente_promedio_estimada'], 10)
+
+        self.cambio_remoto(pendiente_promedio_estimada=40)
+        respuesta = self.client.get(url, punto)
+        self.assertEqual(respuesta.json()['pendiente_promedio_estimada'], 40)
+        self.assertEqual(respuesta.json()['factor_pendiente'], '1.30')
+
+        self.cambio_remoto(pendiente_promedio_estimada=20)
+        respuesta = self.client.post('/api/distritos/detectar-lote/', [[-76.05, -12.05]], format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['distritos']['150101']['pendiente_promedio_estimada'], 20)
+
+
+# =============================================================================
+# DIVISIÓN DE PARCELAS
+# =============================================================================
+
+class DividirParcelaTests(TopologiaPruebaMixin, GeovisorTestCase):
+    """POST /api/parcelas/dividir/"""
+
+    url = '/api/parcelas/dividir/'
+
+    def test_reparte_area_y_porcentaje_por_distrito(self):
+        # 0.02° al oeste del meridiano -76.0 y 0.03° al este: 40 % / 60 %
+        respuesta = self.client.post(self.url, {
+            'geometria': cuadrado(-76.02, -12.06, -75.97, -12.04),
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+
+        datos = respuesta.json()
+        fragmentos = {f['cod_ubigeo']: f for f in datos['fragmentos']}
+        self.assertEqual(set(fragmentos), {'150101', '150102'})
+        self.assertEqual(datos['fragmentos'][0]['cod_ubigeo'], '150102')
+        self.assertAlmostEqual(float(fragmentos['150101']['porcentaje']), 40.0, places=1)
+        self.assertAlmostEqual(float(fragmentos['150102']['porcentaje']), 60.0, places=1)
+        self.assertAlmostEqual(
+            sum(float(f['hectareas']) for f in fragmentos.values()), datos['hectareas'], places=2
+        )
+        self.assertEqual(datos['hectareas_fuera'], 0)
+
+    def test_costea_cada_fragmento_con_su_distrito(self):
+        calculo = self.datos_calculo()
+        del calculo['distrito_id'], calculo['hectareas']
+        respuesta = self.client.post(self.url, {
+            'geometria': cuadrado(-76.02, -12.06, -75.97, -12.04),
+            'calculo': calculo,
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+
+        factores = {
+            f['cod_ubigeo']: f['resultado']['factor_pendiente']
+            for f in respuesta.json()['fragmentos']
+        }
+        self.assertEqual(factores, {'150101': '1.00', '150102': '1.15'})
+
+    def test_coordenadas_no_numericas(self):
+        for coordenadas in ('abc', [[['a', 'b'], [1, 2], [3, 4]]], [[None]], 5):
+            with self.subTest(coordenadas=coordenadas):
+                respuesta = self.client.post(self.url, {
+                    'geometria': {'type': 'Polygon', 'coordinates': coordenadas},
+                }, format='json')
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertEqual(
+                    respuesta.json()['geometria'], ['Coordenadas inválidas: use pares [lng, lat].']
+                )
+
+    def test_anillo_con_menos_de_tres_vertices(self):
+        respuesta = self.client.post(self.url, {
+            'geometria': {'type': 'Polygon', 'coordinates': [[[-76.0, -12.0], [-75.9, -12.0]]]},
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(
+            respuesta.json()['geometria'], ['Cada anillo debe tener al menos 3 vértices.']
+        )
+
+    def test_parcela_sin_area_o_menor_al_minimo(self):
+        geometrias = {
+            'sin_area': {'type': 'Polygon', 'coordinates': [
+                [[-76.0, -12.0], [-75.99, -12.0], [-75.98, -12.0], [-76.0, -12.0]],
+            ]},
+            # 5 m x 5 m: 0.0025 ha
+            'menor_al_minimo': cuadrado(-76.0, -12.0, -75.999954, -11.999955),
+        }
+        for caso, geometria in geometrias.items():
+            with self.subTest(caso=caso):
+                respuesta = self.client.post(self.url, {'geometria': geometria}, format='json')
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertEqual(
+                    respuesta.json()['geometria'], ['La parcela debe tener al menos 0.01 ha.']
+                )
+
+
+# =============================================================================
+# TESELAS VECTORIALES
+# =============================================================================
+
+def leer_protobuf(datos: bytes) -> list:
+    """(campo, valor) de un mensaje protobuf: int (varint) o bytes."""
+    campos = []
+    i = 0
+
+    def varint() -> int:
+        nonlocal i
+        valor = desplazamiento = 0
+        while True:
+            byte = datos[i]
+            i += 1
+            valor |= (byte & 0x7F) << desplazamiento
+            desplazamiento += 7
+            if byte < 0x80:
+                return valor
+
+    while i < len(datos):
+        llave = varint()
+        campo, tipo = llave >> 3, llave & 7
+        if tipo == 0:
+            campos.append((campo, varint()))
+        elif tipo == 1:
+            campos.append((campo, datos[i:i + 8]))
+            i += 8
+        else:
+            largo = varint()
+            campos.append((campo, datos[i:i + largo]))
+            i += largo
+    return campos
+
+
+def leer_empaquetado(datos: bytes) -> list:
+    """Enteros de un campo repetido empaquetado."""
+    valores = []
+    valor = desplazamiento = 0
+    for byte in datos:
+        valor |= (byte & 0x7F) << desplazamiento
+        desplazamiento += 7
+        if byte < 0x80:
+            valores.append(valor)
+            valor = desplazamiento = 0
+    return valores
+
+
+def anillos_mvt(comandos: list) -> list:
+    """Anillos [(x, y), ...] de una geometría MVT; falla si alguno no se cierra."""
+    anillos = []
+    x = y = 0
+    i = 0
+    while i < len(comandos):
+        comando, cuenta = comandos[i] & 7, comandos[i] >> 3
+        i += 1
+        if comando == teselas.CERRAR:
+            anillos[-1].append(anillos[-1][0])
+            continue
+        if comando == teselas.MOVER_A:
+            if anillos and anillos[-1][0] != anillos[-1][-1]:
+                raise AssertionError('anillo sin ClosePath')
+            anillos.append([])
+        for _ in range(cuenta):
+            dx, dy = comandos[i], comandos[i + 1]
+            x += (dx >> 1) ^ -(dx & 1)
+            y += (dy >> 1) ^ -(dy & 1)
+            anillos[-1].append((x, y))
+            i += 2
+    if anillos and anillos[-1][0] != anillos[-1][-1]:
+        raise AssertionError('anillo sin ClosePath')
+    return anillos
+
+
+class TeselasVectorialesTests(TopologiaPruebaMixin, GeovisorTestCase):
+    """Codificación MVT de la capa de distritos, unida a Distrito."""
+
+    def test_decodifica_tesela_de_distritos(self):
+        # z6/18/34 contiene por completo a los dos distritos de prueba
+        tesela = obtener_capa_teselas('distritos').tesela(6, 18, 34)
+        [(campo, capa)] = leer_protobuf(tesela)
+        self.assertEqual(campo, 3)
+
+        capa = leer_protobuf(capa)
+        campos = dict(capa)
+        self.assertEqual(campos[15], 2)
+        self.assertEqual(campos[1], b'distritos')
+        self.assertEqual(campos[5], teselas.EXTENSION_MVT)
+        claves = [v.decode('utf-8') for c, v in capa if c == 3]
+        valores = [dict(leer_protobuf(v)) for c, v in capa if c == 4]
+
+        entidades = [dict(leer_protobuf(v)) for c, v in capa if c == 2]
+        self.assertEqual(len(entidades), 2)
+        atributos = {}
+        for entidad in entidades:
+            self.assertEqual(entidad[3], teselas.TIPO_POLIGONO)
+            etiquetas = leer_empaquetado(entidad[2])
+            propiedades = {
+                claves[k]: next(iter(valores[v].values()))
+                for k, v in zip(etiquetas[::2], etiquetas[1::2])
+            }
+            atributos[propiedades['ubigeo'].decode('utf-8')] = propiedades
+
+            [anillo] = anillos_mvt(leer_empaquetado(entidad[4]))
+            self.assertEqual(anillo[0], anillo[-1])
+            self.assertGreater(teselas._area_doble(anillo[:-1]), 0)
+
+        self.assertEqual(set(atributos), {'150101', '150102'})
+        self.assertEqual(atributos['150101']['zona'], b'Costa')
+        self.assertEqual(atributos['150102']['pendiente'], 30)
+
+
+class CacheTeselasDiscoTests(SimpleTestCase):
+    """CacheTeselasDisco: desalojo LRU bajo el límite de tamaño."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        self.cache = CacheTeselasDisco(self.directorio, tamano_maximo=1000)
+
+    def usar(self, clave: str, instante: float) -> None:
+        """Fija la fecha de último uso de una tesela guardada."""
+        os.utime(os.path.join(self.directorio, clave), (instante, instante))
+
+    def test_desaloja_las_menos_usadas(self):
+        self.cache.guardar('v/a.pbf.gz', b'a' * 400)
+        self.cache.guardar('v/b.pbf.gz', b'b' * 400)
+        self.usar('v/a.pbf.gz', 2000)
+        self.usar('v/b.pbf.gz', 1000)
+
+        # 1200 bytes superan el límite: se baja al 90 % sacando la más antigua
+        self.cache.guardar('v/c.pbf.gz', b'c' * 400)
+        self.assertIsNone(self.cache.leer('v/b.pbf.gz'))
+        self.assertEqual(self.cache.leer('v/a.pbf.gz'), b'a' * 400)
+        self.assertEqual(self.cache.leer('v/c.pbf.gz'), b'c' * 400)
+
+    def test_reescribir_no_suma_el_tamano_anterior(self):
+        # 960 bytes: bajo el límite, pero sobre el 90 % al que baja el desalojo
+        self.cache.guardar('v/a.pbf.gz', b'a' * 480)
+        self.cache.guardar('v/b.pbf.gz', b'b' * 480)
+        self.cache.guardar('v/a.pbf.gz', b'A' * 480)
+
+        self.assertEqual(self.cache.leer('v/a.pbf.gz'), b'A' * 480)
+        self.assertEqual(self.cache.leer('v/b.pbf.gz'), b'b' * 480)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.directorio, 'v'))), ['a.pbf.gz', 'b.pbf.gz'])
+
+    def test_error_de_escritura_no_se_propaga(self):
+        # Un archivo donde debería ir el directorio de la versión
+        Path(self.directorio, 'v').write_bytes(b'')
+        self.cache.guardar('v/a.pbf.gz', b'a' * 400)
+        self.assertIsNone(self.cache.leer('v/a.pbf.gz'))
+
+
+# =============================================================================
+# PRECIOS DE MADERA
+# =============================================================================
+
+class PreciosMaderaTests(SimpleTestCase):
+    """Claves de especie de un cultivo y búsqueda del precio regional."""
+
+    def test_claves_especie(self):
+        casos = {
+            'Pino (Pinus tecunumanii)': (('PINUS TECUNUMANII', 'PINO TECUNUMANI'), ('PINO',)),
+            'Pino Radiata': (('PINO RADIATA',), ('PINO',)),
+            'Eucalipto (E. grandis)': (('EUCALIPTO GRANDIS',), ('EUCALIPTO',)),
+            'Teca (Clonal)': (('TECA',), ()),
+            'Capirona': (('CAPIRONA',), ()),
+        }
+        for nombre, (especie, genero) in casos.items():
+            with self.subTest(nombre=nombre):
+                claves = claves_especie(nombre)
+                self.assertEqual(claves.especie, especie)
+                self.assertEqual(claves.genero, genero)
+
+    def test_estadisticas_por_nombre_comun_y_cientifico(self):
+        filas = [
+            ('PINO', 'PINUS TECUNUMANII', 'JUNIN', 2023, 'MADERA ROLLIZA', 'M3', Decimal('300')),
+            ('PINO', '', 'JUNIN', 2023, 'MADERA ROLLIZA', 'M3', Decimal('100')),
+            ('PINO', 'PINUS RADIATA', 'JUNIN', 2023, 'MADERA ROLLIZA', 'PIEZA', Decimal('5')),
+        ]
+        medianas = {
+            (e.especie, e.departamento): (e.observaciones, e.mediana)
+            for e in calcular_estadisticas(filas)
+        }
+        self.assertEqual(medianas, {
+            ('PINO', 'JUNIN'): (2, Decimal('200.00')),
+            ('PINO', ''): (2, Decimal('200.00')),
+            ('PINUS TECUNUMANII', 'JUNIN'): (1, Decimal('300.00')),
+            ('PINUS TECUNUMANII', ''): (1, Decimal('300.00')),
+        })
+
+    def test_prefiere_la_especie_al_genero(self):
+        def estadisticas(*filas):
+            return [
+                EstadisticaPrecio(
+                    especie=especie, departamento=departamento, anio=2023, mediana=Decimal(mediana)
+                )
+                for especie, departamento, mediana in filas
+            ]
+
+        nombre = 'Pino (Pinus tecunumanii)'
+        precios = PreciosReferencia(estadisticas(
+            ('PINO', 'JUNIN', '150.00'), ('PINO', '', '140.00'), ('PINUS TECUNUMANII', '', '300.00'),
+        ))
+        # La especie en el total nacional gana al género del departamento
+        self.assertEqual(precios.buscar(nombre, 'Junín'), (Decimal('300.00'), FUENTE_NACIONAL))
+
+        precios = PreciosReferencia(estadisticas(
+            ('PINO', 'JUNIN', '150.00'), ('PINO TECUNUMANI', 'JUNIN', '250.00'),
+        ))
+        self.assertEqual(precios.buscar(nombre, 'JUNIN'), (Decimal('250.00'), FUENTE_DEPARTAMENTO))
+
+        precios = PreciosReferencia(estadisticas(('PINO', 'JUNIN', '150.00'), ('PINO', '', '140.00')))
+        self.assertEqual(precios.buscar(nombre, 'JUNIN'), (Decimal('150.00'), FUENTE_DEPARTAMENTO_GENERO))
+        self.assertEqual(precios.buscar(nombre, 'CUSCO'), (Decimal('140.00'), FUENTE_NACIONAL_GENERO))
+        self.assertIsNone(precios.buscar('Teca', 'JUNIN'))
+
+
+# =============================================================================
+# TIR Y ESCENARIOS
+# =============================================================================
+
+class CalcularTirTests(SimpleTestCase):
+    """calcular_tir con sus diagnósticos."""
+
+    def test_raiz_unica(self):
+        resultado = calcular_tir([-100.0, 110.0])
+        self.assertEqual(resultado.diagnostico, TIR_UNICA)
+        self.assertAlmostEqual(resultado.tir, 0.10)
+
+    def test_sin_cambio_de_signo(self):
+        for flujos in ([-100.0, -5.0], [0.0, 10.0, 20.0]):
+            with self.subTest(flujos=flujos):
+                resultado = calcular_tir(flujos)
+                self.assertIsNone(resultado.tir)
+                self.assertEqual(resultado.diagnostico, TIR_SIN_CAMBIO_SIGNO)
+
+    def test_varias_raices(self):
+        # -100 + 230 / (1 + r) - 132 / (1 + r)² = 0 en r = 10 % y r = 20 %
+        resultado = calcular_tir([-100.0, 230.0, -132.0])
+        self.assertEqual(resultado.diagnostico, TIR_MULTIPLE)
+        self.assertEqual(len(resultado.raices), 2)
+        self.assertAlmostEqual(resultado.raices[0], 0.10)
+        self.assertAlmostEqual(resultado.raices[1], 0.20)
+        # Se informa la raíz más cercana a la tasa de referencia
+        self.assertAlmostEqual(resultado.tir, 0.10)
+        self.assertAlmostEqual(calcular_tir([-100.0, 230.0, -132.0], referencia=0.3).tir, 0.20)
+
+    def test_cambios_de_signo_sin_raiz(self):
+        # -1 + x - x² < 0 para todo x = 1 / (1 + r)
+        resultado = calcular_tir([-1.0, 1.0, -1.0])
+        self.assertIsNone(resultado.tir)
+        self.assertEqual(resultado.diagnostico, TIR_SIN_RAIZ)
+        self.assertEqual(resultado.cambios_signo, 2)
+
+
+class CalcularEscenariosTests(GeovisorTestCase):
+    """POST /api/calcular-costos/escenarios/"""
+
+    url = '/api/calcular-costos/escenarios/'
+
+    def test_tir_por_celda_sin_depender_de_hectareas(self):
+        data = self.datos_calculo(hectareas=['1.00', '5.00'], costo_jornal_usuario=['40.00', '60.00'])
+        respuesta = self.client.post(self.url, data, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+
+        datos = respuesta.json()
+        self.assertEqual(datos['forma'], [1, 1, 1, 2, 2, 1])
+        self.assertEqual(datos['tir'][:2], datos['tir'][2:])
+        self.assertGreater(datos['tir'][0], datos['tir'][1])
+
+    def test_limite_de_tir(self):
+        # 1 geometría x 100 jornales x 26 plantones supera el límite de TIR
+        # aunque la grilla (2600 celdas) está dentro de MAX_CELDAS_ESCENARIOS
+        data = self.datos_calculo(
+            costo_jornal_usuario={'inicio': 1, 'fin': 100, 'paso': 1},
+            costo_planton_usuario={'inicio': '0.50', 'fin': '0.75', 'paso': '0.01'},
+        )
+        respuesta = self.client.post(self.url, data, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn(str(MAX_TIR_ESCENARIOS), respuesta.json()['non_field_errors'][0])
+
+        data['costo_planton_usuario'] = {'inicio': '0.50', 'fin': '0.74', 'paso': '0.01'}
+        self.assertEqual(self.client.post(self.url, data, format='json').status_code, 200)
+
+
+class SimularCostosTests(GeovisorTestCase):
+    """POST /api/calcular-costos/simulacion/"""
+
+    url = '/api/calcular-costos/simulacion/'
+
+    def simular(self, **config) -> dict:
+        data = self.datos_calculo(simulacion={'semilla': 7, **config})
+        respuesta = self.client.post(self.url, data, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.json()['simulacion']
+
+    def test_sin_distribuciones_una_sola_tir(self):
+        simulacion = self.simular(muestras=MAX_TIR_SIMULACION * 2)
+        self.assertEqual(simulacion['muestras_evaluadas'], MAX_TIR_SIMULACION * 2)
+        self.assertFalse(simulacion['truncado'])
+        self.assertEqual(simulacion['muestras_tir'], MAX_TIR_SIMULACION * 2)
+        self.assertEqual(simulacion['tir']['desviacion'], 0.0)
+
+    def test_tir_sobre_submuestra_reproducible(self):
+        config = {
+            'muestras': MAX_TIR_SIMULACION * 2,
+            'precio_madera': {'tipo': 'uniforme', 'minimo': 100, 'maximo': 300},
+        }
+        simulacion = self.simular(**config)
+        self.assertEqual(simulacion['muestras_evaluadas'], MAX_TIR_SIMULACION * 2)
+        self.assertEqual(simulacion['muestras_tir'], MAX_TIR_SIMULACION)
+        self.assertGreater(simulacion['tir']['desviacion'], 0.0)
+        self.assertEqual(self.simular(**config)['tir'], simulacion['tir'])
+
+
+# =============================================================================
+# MOTOR DE CÁLCULO
+# =============================================================================
+
+class VerificarMotorTests(GeovisorTestCase):
+    """verificar_motor sobre el catálogo de prueba (576 cálculos)."""
+
+    def test_motor_coincide_con_la_referencia_en_decimal(self):
+        # Completa las ramas del motor: mano de obra sensible a densidad,
+        # insumo con costo referencial, servicio y costo legal
+        for anio, rubro, actividad, cantidad, costo, densidad in (
+            (0, PaqueteTecnologico.Rubro.MANO_OBRA, 'Hoyado', '7.35', '0.00', True),
+            (0, PaqueteTecnologico.Rubro.INSUMO, 'Abono', '0.333', '12.75', True),
+            (2, PaqueteTecnologico.Rubro.SERVICIOS, 'Asistencia técnica', '1.00', '333.33', False),
+            (3, PaqueteTecnologico.Rubro.LEGAL, 'Permiso', '0.50', '125.10', False),
+        ):
+            PaqueteTecnologico.objects.create(
+                cultivo=self.cultivo, zona_economica=self.zona, anio_proyecto=anio,
+                rubro=rubro, actividad=actividad, unidad_medida='Global',
+                cantidad_tecnica=Decimal(cantidad), costo_unitario_referencial=Decimal(costo),
+                sensible_densidad=densidad, sensible_pendiente=rubro == PaqueteTecnologico.Rubro.MANO_OBRA,
+            )
+
+        salida = StringIO()
+        call_command('verificar_motor', stdout=salida)
+        self.assertIn('Los 576 cálculos coinciden exactamente', salida.getvalue())
+
+
+# =============================================================================
+# IMPORTACIÓN DE DISTRITOS
+# =============================================================================
+
+class ImportDistritosTests(TestCase):
+    """import_distritos: actualización en bloque, --dry-run y huella del CSV."""
+
+    def setUp(self):
+        directorio = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.ruta = directorio / 'distritos.csv'
+
+    def escribir_csv(self, nombre_oeste: str = 'OESTE') -> None:
+        self.ruta.write_text(
+            'UBIGEO,NOM_DEP,NOM_PROV,NOM_DIST,COD_REG_NAT,REGION NATURAL\n'
+            f'150101,LIMA,LIMA,{nombre_oeste},1,COSTA\n'
+            '150102,LIMA,LIMA,ESTE,2,SIERRA\n',
+            encoding='utf-8',
+        )
+
+    def importar(self, *opciones: str) -> str:
+        salida = StringIO()
+        call_command(
+            'import_distritos', '--file', str(self.ruta), *opciones,
+            stdout=salida, stderr=StringIO(),
+        )
+        return salida.getvalue()
+
+    def test_reimportar_una_fila_editada(self):
+        self.escribir_csv()
+        self.importar()
+        self.assertEqual(Distrito.objects.count(), 2)
+        # Coordenadas cargadas después (import_coords_topojson)
+        Distrito.objects.update(latitud=Decimal('-12.050000'), longitud=Decimal('-76.050000'))
+        huella = RegistroCarga.objects.get(comando='import_distritos').huella
+
+        # --dry-run informa la diferencia sin escribir nada
+        self.escribir_csv('OESTE NUEVO')
+        salida = self.importar('--dry-run')
+        self.assertIn('~ 150101 OESTE NUEVO: nombre', salida)
+        self.assertEqual(Distrito.objects.get(cod_ubigeo='150101').nombre, 'OESTE')
+        self.assertEqual(RegistroCarga.objects.get(comando='import_distritos').huella, huella)
+
+        # La importación real actualiza solo esa fila, con un único UPDATE
+        with CaptureQueriesContext(connection) as consultas:
+            self.importar()
+        actualizaciones = [
+            c['sql'] for c in consultas
+            if c['sql'].startswith('UPDATE "gestion_forestal_distrito"')
+        ]
+        self.assertEqual(len(actualizaciones), 1)
+        oeste = Distrito.objects.get(cod_ubigeo='150101')
+        self.assertEqual(oeste.nombre, 'OESTE NUEVO')
+        self.assertEqual((oeste.latitud, oeste.longitud), (Decimal('-12.050000'), Decimal('-76.050000')))
+        self.assertNotEqual(RegistroCarga.objects.get(comando='import_distritos').huella, huella)
+
+        # Sin cambios en el CSV: solo la búsqueda de la huella
+        with self.assertNumQueries(1):
+            salida = self.importar()
+        self.assertIn('CSV sin cambios', salida)
+
+
+# =============================================================================
+# IMPORTACIÓN DE PRECIOS
+# =============================================================================
+
+def fila_precio(id_origen: int, precio: str = '850.00') -> dict:
+    """Fila del CSV de precios de madera (ver precios.COLUMNAS_CSV)."""
+    return {
+        'ID': id_origen, 'ARFFS': 'GORE HUANUCO', 'SEDE': 'HUANUCO', 'DEPART': 'HUANUCO',
+        'AÑO': 2020, 'MES': 'ENE', 'NOMCOM': 'PINO', 'NOMCIE': 'PINUS RADIATA',
+        'TIPPROD': 'MADERA ASERRADA', 'PRODUC': 'TABLA', 'DIMENS': '', 'UNID': 'M3',
+        'PRECIO': precio, 'OBSERV': '', 'RECURSO': 'MADERABLE',
+    }
+
+
+class ImportPreciosMaderaTests(TestCase):
+    """import_precios_madera: huella del CSV y modo --incremental."""
+
+    def setUp(self):
+        directorio = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.ruta = directorio / 'precios.csv'
+
+    def escribir_csv(self, *filas: dict) -> None:
+        with open(self.ruta, 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.DictWriter(f, fieldnames=list(COLUMNAS_CSV))
+            escritor.writeheader()
+            escritor.writerows(filas)
+
+    def importar(self, *opciones: str) -> str:
+        salida = StringIO()
+        call_command(
+            'import_precios_madera', '--file', str(self.ruta), *opciones,
+            stdout=salida, stderr=StringIO(),
+        )
+        return salida.getvalue()
+
+    def test_csv_sin_cambios_no_consulta_las_observaciones(self):
+        self.escribir_csv(fila_precio(1), fila_precio(2))
+        self.importar()
+        self.assertEqual(ObservacionPrecio.objects.count(), 2)
+
+        # Solo la búsqueda de la huella en RegistroCarga
+        with self.assertNumQueries(1):
+            salida = self.importar()
+        self.assertIn('CSV sin cambios', salida)
+
+    def test_incremental_agrega_solo_ids_nuevos(self):
+        self.escribir_csv(fila_precio(1), fila_precio(2))
+        self.importar()
+        anteriores = dict(ObservacionPrecio.objects.values_list('id_origen', 'pk'))
+
+        # El ID 2 cambia de precio pero ya existe: el modo incremental lo omite
+        self.escribir_csv(fila_precio(1), fila_precio(2, '900.00'), fila_precio(3))
+        salida = self.importar('--incremental')
+        self.assertIn('IDs ya existentes (omitidos): 2', salida)
+        self.assertEqual(
+            dict(ObservacionPrecio.objects.filter(id_origen__lte=2).values_list('id_origen', 'pk')),
+            anteriores,
+        )
+        self.assertEqual(ObservacionPrecio.objects.get(id_origen=2).precio, Decimal('850.00'))
+        self.assertTrue(ObservacionPrecio.objects.filter(id_origen=3).exists())
+
+        # La carga completa reemplaza todas las observaciones
+        self.escribir_csv(fila_precio(2, '900.00'))
+        self.importar()
+        self.assertEqual(
+            list(ObservacionPrecio.objects.values_list('id_origen', 'precio')),
+            [(2, Decimal('900.00'))],
+        )
+
+    def test_recalculo_reemplaza_estadisticas_y_versiona_una_vez(self):
+        self.escribir_csv(fila_precio(1), fila_precio(2, '900.00'))
+        self.importar()
+        call_command('actualizar_estadisticas_precios', stdout=StringIO())
+        estadisticas = EstadisticaPrecio.objects.count()
+        self.assertGreater(estadisticas, 0)
+
+        # Las filas se reemplazan sin una señal ni una versión por fila
+        antes = version_catalogo()
+        call_command('actualizar_estadisticas_precios', stdout=StringIO())
+        self.assertEqual(EstadisticaPrecio.objects.count(), estadisticas)
+        self.assertEqual(version_catalogo(), antes + 1)
+
+
+# =============================================================================
+# DATOS DE PRUEBA (seed_data)
+# =============================================================================
+
+class SeedDataTests(TestCase):
+    """seed_data: se omite mientras la huella de sus datos no cambie."""
+
+    def sembrar(self, *opciones: str) -> str:
+        salida = StringIO()
+        call_command('seed_data', *opciones, stdout=salida)
+        return salida.getvalue()
+
+    def test_datos_sin_cambios_no_se_recargan(self):
+        self.sembrar()
+        self.assertEqual(RegistroCarga.objects.get(comando='seed_data').huella, huella_seed())
+        paquetes = PaqueteTecnologico.objects.count()
+        self.assertGreater(paquetes, 0)
+
+        # Un cambio manual sobrevive a la siguiente ejecución...
+        paquete = PaqueteTecnologico.objects.order_by('pk').first()
+        original = paquete.cantidad_tecnica
+        PaqueteTecnologico.objects.filter(pk=paquete.pk).update(cantidad_tecnica=original + 1)
+        with self.assertNumQueries(1):
+            salida = self.sembrar()
+        self.assertIn('sin cambios', salida)
+        paquete.refresh_from_db()
+        self.assertEqual(paquete.cantidad_tecnica, original + 1)
+
+        # ...salvo con --force, que recarga los datos de origen
+        self.sembrar('--force')
+        paquete.refresh_from_db()
+        self.assertEqual(paquete.cantidad_tecnica, original)
+        self.assertEqual(PaqueteTecnologico.objects.count(), paquetes)
+
+    def test_v1_1_reemplaza_paquetes_con_una_version(self):
+        call_command('seed_data_v1_1', stdout=StringIO())
+        paquetes = PaqueteTecnologico.objects.count()
+        self.assertGreater(paquetes, 0)
+        transaction.get_connection().run_on_commit.clear()
+
+        # Cada combinación se borra sin una señal por fila: la versión se
+        # escribe una vez por las zonas y cultivos de la transacción y otra
+        # en el invalidar_catalogo() final, no una vez por paquete
+        with CaptureQueriesContext(connection) as consultas:
+            call_command('seed_data_v1_1', '--force', stdout=StringIO())
+        escrituras_version = [
+            c['sql'] for c in consultas
+            if 'versioncatalogo' in c['sql'].lower() and not c['sql'].startswith('SELECT')
+        ]
+        self.assertEqual(len(escrituras_version), 2)
+        # DELETE directo: sin cargar antes los paquetes de cada combinación
+        self.assertFalse([
+            c['sql'] for c in consultas
+            if c['sql'].startswith('SELECT') and 'paquetetecnologico' in c['sql']
+        ])
+        self.assertEqual(PaqueteTecnologico.objects.count(), paquetes)
@@ -0,0 +1,120 @@
+"""
+Lectura de archivos TopoJSON sin GDAL.
+
+Un TopoJSON guarda los bordes compartidos una sola vez como arcos
+cuantizados y codificados por diferencias (delta). Este módulo decodifica
+los arcos a coordenadas reales (lng, lat) en arreglos compactos y arma
+los anillos de cada geometría Polygon / MultiPolygon.
+"""
+
+import json
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+# Arco decodificado: longitudes y latitudes en arreglos paralelos
+Arco = Tuple[array, array]
+
+
+def cargar_topologia(ruta) -> Dict:
+    """Lee un archivo TopoJSON y valida su estructura mínima."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        topologia = json.load(f)
+    if 'objects' not in topologia or 'arcs' not in topologia:
+        raise ValueError(f'Formato TopoJSON inválido: {ruta}')
+    return topologia
+
+
+def decodificar_arcos(topologia: Dict) -> List[Arco]:
+    """
+    Decodifica todos los arcos de la topología.
+
+    Las coordenadas delta se acumulan con itertools.accumulate y se
+    transforman (escala + traslación) de una sola pasada por arco.
+
+    Args:
+        topologia: TopoJSON cargado.
+
+    Returns:
+        List[Arco]: (longitudes, latitudes) de cada arco, por índice.
+    """
+    transform = topologia.get('transform')
+    if transform:
+        sx, sy = transform['scale']
+        tx, ty = transform['translate']
+    else:
+        sx, sy, tx, ty = 1.0, 1.0, 0.0, 0.0
+
+    arcos = []
+    for arco in topologia['arcs']:
+        if transform:
+            xs = accumulate(p[0] for p in arco)
+            ys = accumulate(p[1] for p in arco)
+        else:
+            xs = (p[0] for p in arco)
+            ys = (p[1] for p in arco)
+        arcos.append((
+            array('d', (x * sx + tx for x in xs)),
+            array('d', (y * sy + ty for y in ys)),
+        ))
+    return arcos
+
+
+def poligonos_geometria(geometria: Dict) -> List[List[List[int]]]:
+    """
+    Anillos (listas de índices de arco) de cada polígono de una geometría.
+
+    Returns:
+        List: Un elemento por polígono; cada polígono es una lista de
+        anillos (exterior primero, luego huecos). Vacía si no es
+        Polygon ni MultiPolygon.
+    """
+    tipo = geometria.get('type')
+    if tipo == 'Polygon':
+        return [geometria.get('arcs', [])]
+    if tipo == 'MultiPolygon':
+        return list(geometria.get('arcs', []))
+    return []
+
+
+def ensamblar_anillo(arcos: Sequence[Arco], indices: Sequence[int]) -> Arco:
+    """
+    Une los arcos de un anillo en una sola secuencia de vértices.
+
+    Un índice negativo (~i) recorre el arco i al revés. El primer vértice
+    de cada arco repite el último del anterior y se omite.
+
+    Returns:
+        Arco: (longitudes, latitudes) del anillo cerrado.
+    """
+    xs = array('d')
+    ys = array('d')
+    for indice in indices:
+        omitir = 1 if xs else 0
+        if indice >= 0:
+            ax, ay = arcos[indice]
+            xs.extend(ax[omitir:])
+            ys.extend(ay[omitir:])
+        else:
+            # Un solo corte con paso -1, sin copiar el arco invertido completo
+            ax, ay = arcos[~indice]
+            ultimo = len(ax) - 1 - omitir
+            if ultimo >= 0:
+                xs.extend(ax[ultimo::-1])
+                ys.extend(ay[ultimo::-1])
+    return xs, ys
+
+
+def geometrias(topologia: Dict) -> Iterator[Dict]:
+    """Recorre las geometrías de todas las capas de la topología."""
+    for capa in topologia['objects'].values():
+        if capa.get('type') == 'GeometryCollection':
+            yield from capa.get('geometries', [])
+        else:
+            yield capa
+
+
+def normalizar_nombre(valor) -> str:
+    """Nombre en mayúsculas y sin espacios extremos, como en la BD."""
+    return (valor or '').strip().upper()
@@ -11,7 +11,18 @@ from .views import (
     DistritoViewSet,
     CultivoViewSet,
     PaqueteTecnologicoViewSet,
-    CalcularCostosView
+    PrecioViewSet,
+    CalcularCostosView,
+    EstadisticasCacheCalculoView,
+    CalcularCostosLoteView,
+    CalcularEscenariosView,
+    SimularCostosView,
+    DividirParcelaView,
+    ManifiestoGeoView,
+    RecorteGeoView,
+    IndiceNivelesGeoView,
+    NivelGeoView,
+    tesela_vectorial
 )
 
 # Router para ViewSets
@@ -20,6 +31,7 @@ router.register(r'zonas', ZonaEconomicaViewSet, basename='zona')
 router.register(r'distritos', DistritoViewSet, basename='distrito')
 router.register(r'cultivos', CultivoViewSet, basename='cultivo')
 router.register(r'paquetes', PaqueteTecnologicoViewSet, basename='paquete')
+router.register(r'precios', PrecioViewSet, basename='precio')
 
 urlpatterns = [
     # Endpoints REST
@@ -27,4 +39,22 @@ urlpatterns = [
     
     # Endpoint de cálculo de costos
     path('calcular-costos/', CalcularCostosView.as_view(), name='calcular-costos'),
+    path('calcular-costos/batch/', CalcularCostosLoteView.as_view(), name='calcular-costos-batch'),
+    path('calcular-costos/escenarios/', CalcularEscenariosView.as_view(), name='calcular-costos-escenarios'),
+    path('calcular-costos/simulacion/', SimularCostosView.as_view(), name='calcular-costos-simulacion'),
+    path('calcular-costos/cache/', EstadisticasCacheCalculoView.as_view(), name='calcular-costos-cache'),
+    
+    # División de parcelas por distrito
+    path('parcelas/dividir/', DividirParcelaView.as_view(), name='parcelas-dividir'),
+    
+    # Recortes TopoJSON por departamento/provincia
+    path('geo/manifiesto/', ManifiestoGeoView.as_view(), name='geo-manifiesto'),
+    path('geo/recortes/<path:ruta>', RecorteGeoView.as_view(), name='geo-recorte'),
+    
+    # Pirámide de simplificación por zoom
+    path('geo/niveles/', IndiceNivelesGeoView.as_view(), name='geo-niveles'),
+    path('geo/niveles/<path:ruta>', NivelGeoView.as_view(), name='geo-nivel'),
+    
+    # Teselas vectoriales (MVT) de las capas de límites
+    path('tiles/<str:capa>/<int:z>/<int:x>/<int:y>.pbf', tesela_vectorial, name='tesela'),
 ]
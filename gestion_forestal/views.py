@@ -8,16 +8,52 @@ de plantaciones forestales con:
 - Factor de Densidad (geometría de siembra)
 """
 
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min, Q
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from django.views.decorators.vary import vary_on_headers
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 from decimal import Decimal, ROUND_HALF_UP
-from collections import defaultdict
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
+import gzip
+import hashlib
+import json
 import math
+import os
+import secrets
 
-from .models import ZonaEconomica, Distrito, Cultivo, PaqueteTecnologico
+from .models import ZonaEconomica, Distrito, Cultivo, PaqueteTecnologico, ObservacionPrecio
+from .catalogo import DistritoCatalogo, obtener_catalogo
+from .escenarios import ORDEN_EJES, barrer_escenarios
+from .finanzas import calcular_tir, tir_porcentaje
+from .motor import (
+    TASAS_CURVA_VAN_DECIMAL,
+    ParametrosCalculo,
+    ResultadoCostos,
+    calcular_costos_plan,
+    calcular_factor_densidad,
+    calcular_plantas_por_hectarea
+)
+from .indice_espacial import IndiceDistritos, obtener_indice
+from .plan_costos import PlanCostos, obtener_plan, obtener_planes
+from .precios import aplicar_precio_regional, version_precios
+from .recortes import Manifiesto, cargar_manifiesto, codificaciones_aceptadas, elegir_variante
+from .renderers import CompactoRenderer
+from .resultados import cache_resultados, clave_resultado, vigencia_resultados
+from .simplificacion import NOMBRE_INDICE_NIVELES
+from .teselas import CAPAS_TESELAS, ZOOM_MAXIMO, obtener_capa_teselas, obtener_tesela
+from .simulacion import VARIABLES_SIMULACION, Distribucion, simular
 from .serializers import (
     ZonaEconomicaSerializer,
     DistritoSerializer,
@@ -25,19 +61,126 @@ from .serializers import (
     PaqueteTecnologicoSerializer,
     CalculoCostosInputSerializer,
     CalculoCostosOutputSerializer,
-    SistemaSiembra,
-    FACTOR_TRES_BOLILLO
+    CalculoCostosLoteInputSerializer,
+    DeteccionLoteInputSerializer,
+    ResumenCarteraSerializer,
+    EscenariosInputSerializer,
+    SimulacionInputSerializer,
+    ParcelaInputSerializer,
+    FragmentoParcelaSerializer,
+    ObservacionPrecioSerializer,
+    PreciosFiltroSerializer,
+    PuntoSeriePrecioSerializer,
+    AGRUPACION_MES,
+    COLUMNAS_DISTRITO,
+    distritos_compactos
 )
 
 
-class ZonaEconomicaViewSet(viewsets.ReadOnlyModelViewSet):
+# ===========================================
+# CATÁLOGO (zonas, distritos, cultivos, paquetes)
+# ===========================================
+
+def etag_catalogo(request, *args, **kwargs) -> str:
+    """ETag de los catálogos: huella del snapshot, URL completa y formato."""
+    clave = '|'.join((
+        obtener_catalogo().huella,
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+    ))
+    return hashlib.sha256(clave.encode('utf-8')).hexdigest()[:32]
+
+
+# El navegador y los proxies reutilizan la respuesta CATALOGO_MAX_AGE
+# segundos; después la revalidan y con ETag vigente se responde 304 sin
+# consultar la base ni serializar
+revalidar_catalogo = cache_control(
+    public=True, max_age=settings.CATALOGO_MAX_AGE, must_revalidate=True
+)
+etag_condicional_catalogo = condition(etag_func=etag_catalogo)
+
+
+def listado_precalculado(request, cuerpo: bytes) -> Optional[HttpResponse]:
+    """
+    Respuesta con el JSON del snapshot del catálogo (ver catalogo.py).
+    
+    Solo aplica al listado completo en JSON: con parámetros o con la API
+    navegable, la vista serializa como siempre.
+    
+    Args:
+        request: Request de DRF, con el renderizador ya negociado.
+        cuerpo: Listado serializado del snapshot.
+    
+    Returns:
+        HttpResponse o None si la solicitud no es el listado completo.
+    """
+    if request.query_params or request.accepted_renderer.format != 'json':
+        return None
+    return HttpResponse(cuerpo, content_type='application/json')
+
+
+def indice_vigente() -> IndiceDistritos:
+    """
+    Índice espacial del proceso, tras verificar la versión del catálogo.
+    
+    Si otro proceso modificó distritos o zonas, obtener_catalogo() lo
+    detecta y descarta el índice antes de usarlo (ver catalogo.py).
+    """
+    obtener_catalogo()
+    return obtener_indice()
+
+
+class CatalogoViewSetMixin:
+    """
+    Listado y detalle de un catálogo con ETag y Cache-Control.
+    
+    Con If-None-Match vigente se responde 304 antes de tocar el queryset.
+    Si el viewset define listado_catalogo (atributo de Catalogo con el
+    JSON del listado completo), ese listado sale del snapshot; el resto
+    de los listados pasa por listar().
+    """
+    
+    listado_catalogo: Optional[str] = None
+    
+    @method_decorator(revalidar_catalogo)
+    @method_decorator(vary_on_headers('Accept'))
+    @method_decorator(etag_condicional_catalogo)
+    def list(self, request, *args, **kwargs):
+        if self.listado_catalogo is not None:
+            cuerpo = getattr(obtener_catalogo(), self.listado_catalogo)
+            respuesta = listado_precalculado(request, cuerpo)
+            if respuesta is not None:
+                return respuesta
+        return self.listar(request, *args, **kwargs)
+    
+    def listar(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @method_decorator(revalidar_catalogo)
+    @method_decorator(vary_on_headers('Accept'))
+    @method_decorator(etag_condicional_catalogo)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class ZonaEconomicaViewSet(CatalogoViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """API ViewSet para zonas económicas (solo lectura)."""
     
     queryset = ZonaEconomica.objects.all()
     serializer_class = ZonaEconomicaSerializer
+    listado_catalogo = 'json_zonas'
 
 
-class DistritoViewSet(viewsets.ReadOnlyModelViewSet):
+class DistritoCursorPagination(CursorPagination):
+    """Paginación por cursor de distritos, activa solo a pedido del cliente."""
+    
+    ordering = 'cod_ubigeo'
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 2000
+
+
+class DistritoViewSet(CatalogoViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API ViewSet para distritos (solo lectura).
     
@@ -47,19 +190,74 @@ class DistritoViewSet(viewsets.ReadOnlyModelViewSet):
     Filtros soportados:
     - ?departamento=San Martin
     - ?provincia=Tocache
+    
+    Representación:
+    - ?fields=cod_ubigeo,nombre: solo esos campos (lista y detalle).
+    - ?format=compact: lista columnar, un arreglo por campo y los datos
+      de zona económica una vez por zona (ver distritos_compactos).
+    - ?page_size=500 o ?cursor=...: paginación por cursor, opcional; sin
+      esos parámetros la lista completa se retorna como antes.
     """
     
     queryset = Distrito.objects.select_related('zona_economica').all()
     serializer_class = DistritoSerializer
+    pagination_class = DistritoCursorPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactoRenderer]
+    listado_catalogo = 'json_distritos'
     lookup_field = 'cod_ubigeo'
     filterset_fields = ['departamento', 'provincia']
     ordering_fields = ['nombre', 'departamento', 'provincia']
     ordering = ['departamento', 'provincia', 'nombre']
+    
+    def _campos(self) -> List[str]:
+        """Campos pedidos con ?fields= (400 si alguno no existe)."""
+        todos = DistritoSerializer.Meta.fields
+        valor = self.request.query_params.get('fields')
+        if not valor:
+            return list(todos)
+        campos = [c.strip() for c in valor.split(',') if c.strip()]
+        desconocidos = [c for c in campos if c not in todos]
+        if desconocidos or not campos:
+            raise ValidationError({
+                'fields': f"Campos no válidos: {', '.join(desconocidos) or valor}. "
+                          f"Disponibles: {', '.join(todos)}."
+            })
+        return campos
+    
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('list', 'retrieve'):
+            kwargs.setdefault('campos', self._campos())
+        return super().get_serializer(*args, **kwargs)
+    
+    def paginate_queryset(self, queryset):
+        # La paginación es opcional: solo si el cliente la pide
+        parametros = self.request.query_params
+        if not ({'cursor', 'page_size'} & set(parametros)):
+            return None
+        return super().paginate_queryset(queryset)
+    
+    def listar(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != CompactoRenderer.format:
+            return super().listar(request, *args, **kwargs)
+        
+        # Formato compacto: filas planas desde values(), sin instancias ni
+        # campos del serializador
+        campos = self._campos()
+        queryset = self.filter_queryset(
+            Distrito.objects.values(*COLUMNAS_DISTRITO)
+        )
+        pagina = self.paginate_queryset(queryset)
+        if pagina is not None:
+            return self.get_paginated_response(distritos_compactos(pagina, campos))
+        return Response(distritos_compactos(queryset, campos))
 
     @action(detail=False, methods=['get'])
     def detectar(self, request):
         """
-        Detecta el distrito más cercano a una coordenada dada.
+        Detecta el distrito que contiene una coordenada dada.
+        
+        Si el punto cae fuera de todos los límites distritales,
+        retorna el distrito de centroide más cercano.
         
         Uso: /api/distritos/detectar/?lat=-7.5&lng=-76.5
         """
@@ -80,49 +278,93 @@ class DistritoViewSet(viewsets.ReadOnlyModelViewSet):
                 {'error': 'Coordenadas inválidas. Deben ser números.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+            return Response(
+                {'error': 'Coordenadas fuera de rango.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
             
-        # Obtener todos los distritos con coordenadas
-        # Nota: Para una base de datos grande, esto debería optimizarse con GIS
-        # pero para ~2000 distritos es aceptable en memoria.
-        distritos = list(Distrito.objects.filter(
-            latitud__isnull=False, 
-            longitud__isnull=False
-        ).values('cod_ubigeo', 'latitud', 'longitud'))
-        
-        if not distritos:
+        # Índice espacial en memoria: polígono que contiene el punto,
+        # o el centroide más cercano si cae fuera de todos los límites
+        cercano = indice_vigente().localizar(lat, lng)
+        if cercano is None:
             return Response(
                 {'error': 'No hay distritos con coordenadas en la base de datos.'},
                 status=status.HTTP_404_NOT_FOUND
             )
-            
-        closest_distrito = None
-        min_dist_sq = float('inf')
         
-        for d in distritos:
-            d_lat = float(d['latitud'])
-            d_lng = float(d['longitud'])
-            
-            # Distancia euclidiana cuadrada (suficiente para comparar)
-            dist_sq = (d_lat - lat)**2 + (d_lng - lng)**2
-            
-            if dist_sq < min_dist_sq:
-                min_dist_sq = dist_sq
-                closest_distrito = d
-                
-        if closest_distrito:
-            distrito_obj = self.get_queryset().get(
-                cod_ubigeo=closest_distrito['cod_ubigeo']
+        serializer = self.get_serializer(cercano.distrito)
+        return Response({
+            **serializer.data,
+            'dentro_del_limite': cercano.dentro,
+            'distancia_km': (
+                round(cercano.distancia_km, 3) if cercano.distancia_km is not None else None
             )
-            serializer = self.get_serializer(distrito_obj)
-            return Response(serializer.data)
-        else:
+        })
+
+    
+    @action(detail=False, methods=['post'], url_path='detectar-lote')
+    def detectar_lote(self, request):
+        """
+        Detecta el distrito de muchos puntos en una sola solicitud.
+        
+        Uso: POST /api/distritos/detectar-lote/
+        
+        Body: lista de puntos {lat, lng} o [lng, lat], {"puntos": [...]},
+        o una geometría GeoJSON MultiPoint (también dentro de un Feature).
+        
+        Cada punto retorna el UBIGEO detectado; los datos de cada distrito
+        se serializan una sola vez en 'distritos', indexados por UBIGEO.
+        """
+        payload = request.data
+        if isinstance(payload, dict) and payload.get('type') == 'Feature':
+            payload = payload.get('geometry') or {}
+        if isinstance(payload, dict) and payload.get('type') == 'MultiPoint':
+            payload = payload.get('coordinates')
+        if isinstance(payload, list):
+            payload = {'puntos': payload}
+        
+        input_serializer = DeteccionLoteInputSerializer(data=payload)
+        if not input_serializer.is_valid():
             return Response(
-                {'error': 'No se pudo determinar el distrito más cercano.'},
-                status=status.HTTP_404_NOT_FOUND
+                input_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
             )
+        
+        indice = indice_vigente()
+        # Los puntos repetidos (p. ej. GPS detenido) se resuelven una vez
+        resueltos = {}
+        distritos = {}
+        puntos = []
+        
+        for lat, lng in input_serializer.validated_data['puntos']:
+            cercano = resueltos.get((lat, lng))
+            if cercano is None:
+                cercano = resueltos[(lat, lng)] = indice.localizar(lat, lng)
+            if cercano is None:
+                puntos.append({'lat': lat, 'lng': lng, 'cod_ubigeo': None})
+                continue
+            
+            distrito = cercano.distrito
+            if distrito.cod_ubigeo not in distritos:
+                distritos[distrito.cod_ubigeo] = self.get_serializer(distrito).data
+            puntos.append({
+                'lat': lat,
+                'lng': lng,
+                'cod_ubigeo': distrito.cod_ubigeo,
+                'dentro_del_limite': cercano.dentro,
+            })
+        
+        return Response({
+            'total': len(puntos),
+            'sin_distrito': sum(1 for p in puntos if p['cod_ubigeo'] is None),
+            'puntos': puntos,
+            'distritos': distritos,
+        })
 
 
-class CultivoViewSet(viewsets.ReadOnlyModelViewSet):
+class CultivoViewSet(CatalogoViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API ViewSet para cultivos forestales (solo lectura).
     
@@ -134,25 +376,24 @@ class CultivoViewSet(viewsets.ReadOnlyModelViewSet):
     
     queryset = Cultivo.objects.all()
     serializer_class = CultivoSerializer
+    listado_catalogo = 'json_cultivos'
     
     def get_queryset(self):
         queryset = Cultivo.objects.all()
         distrito_id = self.request.query_params.get('distrito', None)
         
         if distrito_id:
-            try:
-                distrito = Distrito.objects.get(cod_ubigeo=distrito_id)
+            distrito = obtener_catalogo().distritos.get(distrito_id)
+            if distrito is not None:
                 # Filtrar cultivos que tengan paquetes en la zona del distrito
                 queryset = queryset.filter(
-                    paquete_tecnologico__zona_economica=distrito.zona_economica
+                    paquete_tecnologico__zona_economica_id=distrito.zona_economica_id
                 ).distinct()
-            except Distrito.DoesNotExist:
-                pass
                 
         return queryset
 
 
-class PaqueteTecnologicoViewSet(viewsets.ReadOnlyModelViewSet):
+class PaqueteTecnologicoViewSet(CatalogoViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """API ViewSet para paquetes tecnológicos (solo lectura)."""
     
     queryset = PaqueteTecnologico.objects.select_related('cultivo').all()
@@ -160,78 +401,411 @@ class PaqueteTecnologicoViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['cultivo', 'anio_proyecto', 'rubro']
 
 
-def calcular_plantas_por_hectarea(
-    sistema_siembra: str,
-    distanciamiento_largo: Decimal,
-    distanciamiento_ancho: Decimal = None
-) -> int:
+# ===========================================
+# PRECIOS DE MADERA (SERFOR)
+# ===========================================
+
+def etag_precios(request, *args, **kwargs) -> str:
+    """ETag de /api/precios/: versión de la base, URL completa y formato."""
+    clave = '|'.join((
+        version_precios(),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+    ))
+    return hashlib.sha256(clave.encode('utf-8')).hexdigest()[:32]
+
+
+# Las respuestas se revalidan siempre; con ETag vigente se responde 304
+# sin cuerpo y sin consultar las observaciones (solo la versión)
+revalidar_precios = cache_control(public=True, max_age=0, must_revalidate=True)
+etag_condicional_precios = condition(etag_func=etag_precios)
+
+
+class PrecioCursorPagination(CursorPagination):
+    """Paginación por cursor (estable aunque se agreguen filas)."""
+    
+    ordering = 'id'
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
+
+
+class PrecioViewSet(viewsets.ReadOnlyModelViewSet):
     """
-    Calcula el número de plantas por hectárea según la geometría de siembra.
+    API de la base de precios de madera de SERFOR (solo lectura).
     
-    Fórmulas:
-    - CUADRADO: plantas = 10,000 / (largo × largo)
-    - RECTANGULAR: plantas = 10,000 / (largo × ancho)
-    - TRES_BOLILLO: plantas = 10,000 / ((largo × largo) × 0.866025)
+    - GET /api/precios/: observaciones, paginadas por cursor.
+    - GET /api/precios/serie/: promedio, mínimo, máximo y n por mes o
+      año (?agrupacion=mes|anio), calculados en SQL.
     
-    Args:
-        sistema_siembra: Tipo de geometría ('CUADRADO', 'RECTANGULAR', 'TRES_BOLILLO')
-        distanciamiento_largo: Distancia entre plantas en metros
-        distanciamiento_ancho: Distancia entre hileras (solo para RECTANGULAR)
+    Filtros soportados:
+    - ?especie=Capirona
+    - ?departamento=Junin
+    - ?tipo_producto=Madera rolliza
+    - ?producto=...
+    - ?unidad=PT
+    - ?desde=2019-01&hasta=2024 (AAAA o AAAA-MM, inclusive)
     
-    Returns:
-        int: Número de plantas por hectárea (redondeado)
+    Las respuestas llevan ETag: una carga repetida con If-None-Match
+    recibe 304 Not Modified.
     """
-    AREA_HECTAREA = Decimal('10000')  # 10,000 m² = 1 hectárea
     
-    if sistema_siembra == SistemaSiembra.CUADRADO:
-        # Cuadrado: distancia × distancia
-        area_por_planta = distanciamiento_largo * distanciamiento_largo
-        plantas = AREA_HECTAREA / area_por_planta
+    queryset = ObservacionPrecio.objects.all()
+    serializer_class = ObservacionPrecioSerializer
+    pagination_class = PrecioCursorPagination
+    
+    def _filtros(self) -> Dict[str, Any]:
+        """Valida y normaliza los filtros de la query string (400 si no son válidos)."""
+        serializer = PreciosFiltroSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+    
+    def _filtrar(self, queryset, filtros: Dict[str, Any]):
+        """Aplica los filtros como igualdades y rangos sobre columnas indexadas."""
+        for campo in ('especie', 'departamento', 'tipo_producto', 'producto', 'unidad'):
+            if campo in filtros:
+                queryset = queryset.filter(**{campo: filtros[campo]})
+        if 'desde' in filtros:
+            anio, mes = filtros['desde']
+            queryset = queryset.filter(Q(anio__gt=anio) | Q(anio=anio, mes__gte=mes))
+        if 'hasta' in filtros:
+            anio, mes = filtros['hasta']
+            queryset = queryset.filter(Q(anio__lt=anio) | Q(anio=anio, mes__lte=mes))
+        return queryset
+    
+    def get_queryset(self):
+        return self._filtrar(super().get_queryset(), self._filtros())
+    
+    @method_decorator(revalidar_precios)
+    @method_decorator(etag_condicional_precios)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @action(detail=False, methods=['get'])
+    @method_decorator(revalidar_precios)
+    @method_decorator(etag_condicional_precios)
+    def serie(self, request):
+        """
+        Serie de precios agregada por unidad y periodo.
         
-    elif sistema_siembra == SistemaSiembra.RECTANGULAR:
-        # Rectangular: largo × ancho
-        if distanciamiento_ancho is None or distanciamiento_ancho <= 0:
-            raise ValueError("distanciamiento_ancho es requerido para sistema RECTANGULAR")
-        area_por_planta = distanciamiento_largo * distanciamiento_ancho
-        plantas = AREA_HECTAREA / area_por_planta
+        Uso: /api/precios/serie/?especie=Capirona&departamento=Junin&agrupacion=anio
+        """
+        filtros = self._filtros()
+        queryset = self._filtrar(ObservacionPrecio.objects.all(), filtros)
         
-    elif sistema_siembra == SistemaSiembra.TRES_BOLILLO:
-        # Tres Bolillo: (largo × largo) × sin(60°)
-        # sin(60°) = √3/2 ≈ 0.866025
-        area_por_planta = distanciamiento_largo * distanciamiento_largo * FACTOR_TRES_BOLILLO
-        plantas = AREA_HECTAREA / area_por_planta
+        campos = ['unidad', 'anio']
+        if filtros['agrupacion'] == AGRUPACION_MES:
+            campos.append('mes')
+        puntos = queryset.order_by().values(*campos).annotate(
+            observaciones=Count('id'),
+            promedio=Avg('precio'),
+            minimo=Min('precio'),
+            maximo=Max('precio')
+        ).order_by(*campos)
         
+        aplicados = {
+            campo: valor for campo, valor in filtros.items()
+            if campo not in ('desde', 'hasta')
+        }
+        for campo in ('desde', 'hasta'):
+            if campo in filtros:
+                anio, mes = filtros[campo]
+                aplicados[campo] = f'{anio:04d}-{mes:02d}'
+        
+        return Response({
+            'filtros': aplicados,
+            'puntos': PuntoSeriePrecioSerializer(puntos, many=True).data
+        })
+
+
+# ===========================================
+# ARTEFACTOS TOPOJSON (RECORTES Y NIVELES)
+# ===========================================
+
+# Los artefactos llevan el hash de su contenido en el nombre: nunca cambian
+CACHE_RECORTE_GEO = 'public, max-age=31536000, immutable'
+
+
+def etag_manifiesto_geo(request, *args, **kwargs) -> Optional[str]:
+    """ETag del manifiesto de recortes: su versión (hash del conjunto de recortes)."""
+    manifiesto = cargar_manifiesto(str(settings.GEO_RECORTES_DIR))
+    return manifiesto.datos.get('version') if manifiesto else None
+
+
+def etag_indice_niveles(request, *args, **kwargs) -> Optional[str]:
+    """ETag del índice de niveles: su versión (hash del conjunto de niveles)."""
+    indice = cargar_manifiesto(str(settings.GEO_NIVELES_DIR), NOMBRE_INDICE_NIVELES)
+    return indice.datos.get('version') if indice else None
+
+
+def respuesta_manifiesto_geo(manifiesto: Optional[Manifiesto], comando: str) -> Response:
+    """Contenido del manifiesto, o 404 indicando el comando que lo genera."""
+    if manifiesto is None:
+        return Response(
+            {'error': f'Archivos no generados (python manage.py {comando})'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(manifiesto.datos)
+
+
+def servir_artefacto_geo(request, directorio: str, manifiesto: Optional[Manifiesto], ruta: str):
+    """
+    Sirve un artefacto TopoJSON publicado en un manifiesto.
+    
+    Elige la variante .br o .gz según Accept-Encoding (o el JSON sin
+    comprimir) y la envía con caché inmutable. Las rutas que no figuran
+    en el manifiesto responden 404.
+    """
+    if manifiesto is None or ruta not in manifiesto.archivos:
+        return Response(
+            {'error': 'Archivo no encontrado'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    archivo, codificacion = elegir_variante(
+        os.path.join(directorio, ruta),
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    response = FileResponse(
+        open(archivo, 'rb'),
+        content_type='application/json',
+        filename=os.path.basename(ruta)
+    )
+    if codificacion:
+        response['Content-Encoding'] = codificacion
+    response['Cache-Control'] = CACHE_RECORTE_GEO
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+class ManifiestoGeoView(APIView):
+    """
+    Manifiesto de los recortes TopoJSON por departamento y provincia.
+    
+    GET /api/geo/manifiesto/
+    
+    Asocia cada clave ('JUNIN' o 'JUNIN/HUANCAYO') con la ruta de su
+    recorte en /api/geo/recortes/. Se revalida en cada uso (ETag); los
+    recortes en sí se guardan en caché por un año.
+    """
+    
+    @method_decorator(cache_control(public=True, max_age=0, must_revalidate=True))
+    @method_decorator(condition(etag_func=etag_manifiesto_geo))
+    def get(self, request):
+        manifiesto = cargar_manifiesto(str(settings.GEO_RECORTES_DIR))
+        return respuesta_manifiesto_geo(manifiesto, 'generar_recortes_topojson')
+
+
+class RecorteGeoView(APIView):
+    """
+    Recorte TopoJSON precomprimido.
+    
+    GET /api/geo/recortes/<ruta>
+    """
+    
+    def get(self, request, ruta: str):
+        directorio = str(settings.GEO_RECORTES_DIR)
+        return servir_artefacto_geo(request, directorio, cargar_manifiesto(directorio), ruta)
+
+
+class IndiceNivelesGeoView(APIView):
+    """
+    Índice de la pirámide de simplificación de las capas de límites.
+    
+    GET /api/geo/niveles/
+    
+    Por cada capa lista sus niveles en orden de zoom_max (el último, con
+    zoom_max null, es la topología completa) con su ruta en
+    /api/geo/niveles/<ruta>, vértices y tamaños. El cliente usa el primer
+    nivel cuyo zoom_max sea mayor o igual al zoom del mapa.
+    """
+    
+    @method_decorator(cache_control(public=True, max_age=0, must_revalidate=True))
+    @method_decorator(condition(etag_func=etag_indice_niveles))
+    def get(self, request):
+        indice = cargar_manifiesto(str(settings.GEO_NIVELES_DIR), NOMBRE_INDICE_NIVELES)
+        return respuesta_manifiesto_geo(indice, 'generar_niveles_topojson')
+
+
+class NivelGeoView(APIView):
+    """
+    Nivel simplificado de una capa, precomprimido.
+    
+    GET /api/geo/niveles/<ruta>
+    """
+    
+    def get(self, request, ruta: str):
+        directorio = str(settings.GEO_NIVELES_DIR)
+        indice = cargar_manifiesto(directorio, NOMBRE_INDICE_NIVELES)
+        return servir_artefacto_geo(request, directorio, indice, ruta)
+
+
+# ===========================================
+# TESELAS VECTORIALES (MVT)
+# ===========================================
+
+def etag_tesela(request, capa: str, z: int, x: int, y: int) -> Optional[str]:
+    """ETag de una tesela: versión de la capa (límites y atributos) y coordenadas."""
+    if capa not in CAPAS_TESELAS:
+        return None
+    # Las capas dependen de distritos y zonas: verificar antes la versión
+    obtener_catalogo()
+    capa_teselas = obtener_capa_teselas(capa)
+    return f'{capa_teselas.version}-{z}-{x}-{y}' if capa_teselas else None
+
+
+@require_GET
+@cache_control(public=True, max_age=3600)
+@condition(etag_func=etag_tesela)
+def tesela_vectorial(request, capa: str, z: int, x: int, y: int):
+    """
+    Tesela vectorial (Mapbox Vector Tile) de una capa de límites.
+    
+    GET /api/tiles/{capa}/{z}/{x}/{y}.pbf
+    capa: departamentos, provincias o distritos.
+    
+    Es una vista de Django sin DRF: la respuesta es binaria y no pasa
+    por la negociación de contenido. Las teselas se generan desde los
+    polígonos en memoria y se guardan en la caché en disco; se envían
+    con gzip si el cliente lo acepta. Una tesela sin polígonos es un
+    cuerpo vacío.
+    """
+    if capa not in CAPAS_TESELAS or z > ZOOM_MAXIMO or x >= 2 ** z or y >= 2 ** z:
+        raise Http404('Tesela no encontrada')
+    capa_teselas = obtener_capa_teselas(capa)
+    if capa_teselas is None:
+        raise Http404('Capa no disponible')
+    
+    datos = obtener_tesela(capa_teselas, z, x, y)
+    response = HttpResponse(content_type='application/vnd.mapbox-vector-tile')
+    if 'gzip' in codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        response['Content-Encoding'] = 'gzip'
+        response.content = datos
     else:
-        raise ValueError(f"Sistema de siembra no reconocido: {sistema_siembra}")
+        response.content = gzip.decompress(datos)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def calcular_costos(
+    distrito: Union[Distrito, DistritoCatalogo],
+    plan: PlanCostos,
+    data: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Calcula los costos de una plantación a partir de un plan compilado.
+    
+    No consulta la base de datos: el cálculo lo hace motor.py con el
+    plan del cultivo para la zona del distrito; aquí solo se adapta el
+    resultado al diccionario de los serializadores.
     
-    # Redondear al entero más cercano
-    return int(plantas.quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    Args:
+        distrito: Distrito de la plantación (define el factor de pendiente).
+        plan: Paquete tecnológico compilado (ver plan_costos.py), con el
+            precio de la madera del departamento ya aplicado.
+        data: Datos validados por CalculoCostosInputSerializer.
+    
+    Returns:
+        Dict: Datos de salida para CalculoCostosOutputSerializer.
+    """
+    resultado = calcular_costos_plan(
+        plan, distrito.calcular_factor_pendiente(), ParametrosCalculo.desde_datos(data)
+    )
+    return salida_calculo(distrito, resultado)
 
 
-def calcular_factor_densidad(
-    densidad_base: int,
-    densidad_usuario: int
-) -> Decimal:
+def salida_calculo(
+    distrito: Union[Distrito, DistritoCatalogo],
+    resultado: ResultadoCostos
+) -> Dict[str, Any]:
     """
-    Calcula el factor de densidad.
+    Diccionario de salida de un ResultadoCostos del motor.
+    
+    Los registros por actividad y por año se entregan tal cual
+    (NamedTuple): los serializadores leen sus campos por atributo, y
+    copiarlos a diccionarios costaba más que calcularlos.
     
-    factor = plantas_usuario / densidad_base
+    Args:
+        distrito: Distrito del cálculo (para la etiqueta).
+        resultado: Resultado de motor.calcular_costos_plan.
+    
+    Returns:
+        Dict: Datos de salida para CalculoCostosOutputSerializer.
+    """
+    return {
+        'distrito': f"{distrito.nombre} ({distrito.cod_ubigeo})",
+        'cultivo': resultado.cultivo,
+        'hectareas': resultado.hectareas,
+        'factor_pendiente': resultado.factor_pendiente,
+        'factor_densidad': resultado.factor_densidad,
+        'densidad_base': resultado.densidad_base,
+        'densidad_usuario': resultado.densidad_usuario,
+        'sistema_siembra': resultado.sistema_siembra,
+        'costo_jornal_usado': resultado.costo_jornal_usado,
+        'costo_planton_usado': resultado.costo_planton_usado,
+        'precio_madera_usado': resultado.precio_madera_usado,
+        'fuente_precio_madera': resultado.fuente_precio_madera,
+        'detalle_actividades': resultado.detalle_actividades,
+        
+        # Refactor v1.3.1 - Segregación
+        'costos_instalacion': resultado.costos_instalacion,
+        'resumen_anual': resultado.resumen_anual, # Ahora solo contiene años >= 1
+        
+        'costo_total_proyecto': resultado.costo_total_proyecto,
+        
+        # Nuevos indicadores financieros
+        'van': resultado.van,
+        'tir': resultado.tir, # % anual; None si no existe
+        'tir_diagnostico': resultado.tir_diagnostico,
+        'curva_van': [
+            {'tasa': tasa, 'van': van}
+            for tasa, van in zip(TASAS_CURVA_VAN_DECIMAL, resultado.curva_van)
+        ],
+        'ratio_beneficio_costo': resultado.ratio_beneficio_costo,
+        'ingreso_total_estimado': resultado.ingreso_total_estimado,
+        
+        # Valores internos (no se serializan; usados al agregar carteras)
+        'vp_ingresos': resultado.vp_ingresos,
+        'vp_costos': resultado.vp_costos,
+        'flujos': resultado.flujos
+    }
+
+
+def resolver_distrito_plan(
+    data: Dict[str, Any]
+) -> Tuple[Optional[DistritoCatalogo], Optional[PlanCostos], Optional[Response]]:
+    """
+    Obtiene el distrito y el plan compilado del cultivo para su zona.
     
-    Si el usuario elige más plantas que el estándar, el factor > 1
-    y los costos sensibles a densidad aumentan proporcionalmente.
+    El distrito sale del snapshot del catálogo (sin consultar la base) y
+    el plan lleva el precio de la madera del departamento del distrito
+    (ver precios.aplicar_precio_regional).
     
     Args:
-        densidad_base: Densidad estándar del cultivo (plantas/ha)
-        densidad_usuario: Densidad calculada del usuario (plantas/ha)
+        data: Datos validados con distrito_id y cultivo_id.
     
     Returns:
-        Decimal: Factor de densidad (ej: 1.2500 si 25% más plantas)
+        Tuple: (distrito, plan, None) o (None, None, Response 404).
     """
-    if densidad_base <= 0:
-        return Decimal('1.0000')
+    distrito = obtener_catalogo().distritos.get(data['distrito_id'])
+    if distrito is None:
+        return None, None, Response(
+            {'error': f"Distrito con UBIGEO {data['distrito_id']} no encontrado."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    plan = obtener_plan(data['cultivo_id'], distrito.zona_economica_id)
+    if plan is None:
+        return None, None, Response(
+            {'error': f"Cultivo con ID {data['cultivo_id']} no encontrado."},
+            status=status.HTTP_404_NOT_FOUND
+        )
     
-    factor = Decimal(densidad_usuario) / Decimal(densidad_base)
-    return factor.quantize(Decimal('0.0001'))
+    return distrito, aplicar_precio_regional(plan, distrito.departamento), None
+
+
+# Encabezado que indica si un cálculo vino de la caché de resultados
+ENCABEZADO_CACHE_CALCULO = 'X-Cache-Calculo'
 
 
 class CalcularCostosView(APIView):
@@ -244,6 +818,12 @@ class CalcularCostosView(APIView):
     - Factor de Pendiente: ajusta mano de obra según topografía
     - Factor de Densidad: ajusta costos según geometría de siembra
     - Smart Defaults: el usuario define sus propios costos
+    
+    El paquete tecnológico se toma del plan compilado en caché
+    (cultivo, zona económica), sin consultar PaqueteTecnologico.
+    
+    El resultado se guarda en la caché de resultados (ver resultados.py);
+    el encabezado X-Cache-Calculo indica si vino de ella (HIT o MISS).
     """
     
     def post(self, request) -> Response:
@@ -267,273 +847,548 @@ class CalcularCostosView(APIView):
         
         data = input_serializer.validated_data
         
-        # Obtener objetos de la base de datos
-        try:
-            distrito = Distrito.objects.select_related('zona_economica').get(
-                cod_ubigeo=data['distrito_id']
-            )
-        except Distrito.DoesNotExist:
+        # La clave incluye la versión del catálogo y de los precios
+        clave = clave_resultado('costos', data)
+        entrada = cache_resultados.obtener(clave)
+        if entrada is not None:
             return Response(
-                {'error': f"Distrito con UBIGEO {data['distrito_id']} no encontrado."},
-                status=status.HTTP_404_NOT_FOUND
+                entrada['datos'],
+                status=status.HTTP_200_OK,
+                headers={ENCABEZADO_CACHE_CALCULO: 'HIT'}
             )
         
-        try:
-            cultivo = Cultivo.objects.get(id=data['cultivo_id'])
-        except Cultivo.DoesNotExist:
-            return Response(
-                {'error': f"Cultivo con ID {data['cultivo_id']} no encontrado."},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        # Distrito y plan compilado del cultivo para su zona
+        distrito, plan, error = resolver_distrito_plan(data)
+        if error is not None:
+            return error
         
-        # Extraer parámetros del request
-        hectareas = data['hectareas']
-        costo_jornal = data['costo_jornal_usuario']
-        costo_planton = data['costo_planton_usuario']
-        anio_inicio = data['anio_inicio']
-        anio_fin = data['anio_fin']
-        incluir_servicios = data.get('incluir_servicios', True)
-        
-        # Parámetros de geometría de siembra
-        sistema_siembra = data['sistema_siembra']
-        dist_largo = data['distanciamiento_largo']
-        dist_ancho = data.get('distanciamiento_ancho')
-        
-        # ===========================================
-        # CÁLCULO DE FACTORES
-        # ===========================================
-        
-        # Factor de Pendiente (según topografía del distrito)
-        factor_pendiente = distrito.calcular_factor_pendiente()
-        
-        # Factor de Densidad (según geometría de siembra del usuario)
-        densidad_base = cultivo.densidad_base
-        densidad_usuario = calcular_plantas_por_hectarea(
-            sistema_siembra=sistema_siembra,
-            distanciamiento_largo=dist_largo,
-            distanciamiento_ancho=dist_ancho
+        entrada = entrada_resultado(calcular_costos(distrito, plan, data))
+        cache_resultados.guardar(clave, entrada)
+        return Response(
+            entrada['datos'],
+            status=status.HTTP_200_OK,
+            headers={ENCABEZADO_CACHE_CALCULO: 'MISS'}
         )
-        factor_densidad = calcular_factor_densidad(densidad_base, densidad_usuario)
+
+
+class EstadisticasCacheCalculoView(APIView):
+    """
+    Aciertos y fallos de la caché de resultados en este proceso.
+    
+    GET /api/calcular-costos/cache/
+    """
+    
+    def get(self, request) -> Response:
+        return Response(cache_resultados.estadisticas())
+
+
+# Campos del resultado que AcumuladorCartera suma (incluye los internos)
+CAMPOS_CARTERA = (
+    'hectareas',
+    'costo_total_proyecto',
+    'ingreso_total_estimado',
+    'van',
+    'vp_ingresos',
+    'vp_costos',
+    'flujos',
+)
+
+
+def entrada_resultado(output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entrada de la caché de resultados para un cálculo.
+    
+    Guarda la respuesta ya serializada (serializar cuesta más que
+    calcular) y los totales que necesita AcumuladorCartera.
+    """
+    return {
+        'datos': CalculoCostosOutputSerializer(output).data,
+        'cartera': {campo: output[campo] for campo in CAMPOS_CARTERA},
+    }
+
+
+class AcumuladorCartera:
+    """
+    Acumula los totales de una cartera de parcelas calculadas.
+    
+    El ratio B/C de la cartera se obtiene de la suma de valores
+    presentes, no del promedio de ratios individuales.
+    """
+    
+    def __init__(self):
+        self.parcelas = 0
+        self.calculadas = 0
+        self.hectareas = Decimal('0')
+        self.costo_total_proyecto = Decimal('0')
+        self.ingreso_total_estimado = Decimal('0')
+        self.van = Decimal('0')
+        self.vp_ingresos = Decimal('0')
+        self.vp_costos = Decimal('0')
+        self.flujos: List[float] = []
+    
+    def agregar(self, output: Optional[Dict[str, Any]]) -> None:
+        """Agrega el resultado de una parcela (None si tuvo error)."""
+        self.parcelas += 1
+        if output is None:
+            return
+        self.calculadas += 1
+        self.hectareas += output['hectareas']
+        self.costo_total_proyecto += output['costo_total_proyecto']
+        self.ingreso_total_estimado += output['ingreso_total_estimado']
+        self.van += output['van']
+        self.vp_ingresos += output['vp_ingresos']
+        self.vp_costos += output['vp_costos']
         
-        # ===========================================
-        # OBTENER ACTIVIDADES
-        # ===========================================
+        flujos = output['flujos']
+        if len(flujos) > len(self.flujos):
+            self.flujos.extend([0.0] * (len(flujos) - len(self.flujos)))
+        for anio, flujo in enumerate(flujos):
+            self.flujos[anio] += flujo
+    
+    def resumen(self) -> Dict[str, Any]:
+        """Retorna el resumen serializado de la cartera."""
+        ratio_bc = Decimal('0')
+        if self.vp_costos > 0:
+            ratio_bc = (self.vp_ingresos / self.vp_costos).quantize(Decimal('0.01'))
         
-        actividades = PaqueteTecnologico.objects.filter(
-            cultivo=cultivo,
-            zona_economica=distrito.zona_economica,
-            anio_proyecto__gte=anio_inicio,
-            anio_proyecto__lte=anio_fin
-        )
+        # TIR de la cartera sobre el flujo consolidado
+        resultado_tir = calcular_tir(self.flujos)
+        
+        return ResumenCarteraSerializer({
+            'parcelas': self.parcelas,
+            'calculadas': self.calculadas,
+            'con_error': self.parcelas - self.calculadas,
+            'hectareas': self.hectareas,
+            'costo_total_proyecto': self.costo_total_proyecto,
+            'ingreso_total_estimado': self.ingreso_total_estimado,
+            'van': self.van,
+            'ratio_beneficio_costo': ratio_bc,
+            'tir': tir_porcentaje(resultado_tir),
+            'tir_diagnostico': resultado_tir.diagnostico,
+        }).data
 
-        if not incluir_servicios:
-            actividades = actividades.exclude(rubro__in=[
-                PaqueteTecnologico.Rubro.SERVICIOS,
-                PaqueteTecnologico.Rubro.LEGAL,
-                PaqueteTecnologico.Rubro.ACTIVO
-            ])
-            
-        actividades = actividades.order_by('anio_proyecto', 'rubro', 'actividad')
+
+class CalcularCostosLoteView(APIView):
+    """
+    Cálculo de costos para muchas parcelas en una sola solicitud.
+    
+    POST /api/calcular-costos/batch/
+    
+    Body: lista de parcelas con el formato de /api/calcular-costos/,
+    o bien {"parcelas": [...]}.
+    
+    Procesa las parcelas en bloques de TAMANO_BLOQUE: por bloque valida,
+    lee de la caché de resultados las ya calculadas (una lectura), carga
+    cada paquete (cultivo, zona) una sola vez y guarda los resultados
+    nuevos. Toma los distritos del snapshot del catálogo. Responde con el
+    resultado de cada parcela y el total agregado de la cartera.
+    
+    Con ?formato=ndjson (o Accept: application/x-ndjson) la respuesta
+    se transmite como una línea JSON por parcela y una línea final
+    con el resumen; además del cuerpo recibido, solo se retiene el
+    bloque en curso.
+    """
+    
+    NDJSON = 'application/x-ndjson'
+    
+    # Parcelas validadas, buscadas en caché y calculadas a la vez
+    TAMANO_BLOQUE = 250
+    
+    def post(self, request):
+        """
+        Calcula los costos de una cartera de parcelas.
         
-        # ===========================================
-        # CÁLCULO DE COSTOS
-        # ===========================================
+        Returns:
+            Response o StreamingHttpResponse con resultados por parcela.
+        """
+        payload = request.data
+        if isinstance(payload, list):
+            payload = {'parcelas': payload}
         
-        detalle_actividades = []
-        resumen_por_anio: Dict[int, Dict[str, Decimal]] = defaultdict(
-            lambda: {'mano_obra': Decimal('0'), 'insumos': Decimal('0'), 'servicios': Decimal('0')}
+        lote_serializer = CalculoCostosLoteInputSerializer(data=payload)
+        if not lote_serializer.is_valid():
+            return Response(
+                lote_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # La versión del catálogo se lee una vez para todo el lote
+        vigencia = vigencia_resultados()
+        acumulador = AcumuladorCartera()
+        resultados = self._resultados(
+            lote_serializer.validated_data['parcelas'],
+            vigencia,
+            obtener_catalogo().distritos,
+            acumulador
         )
         
-        for actividad in actividades:
-            # Cantidad base por hectárea
-            cantidad_base = actividad.cantidad_tecnica * hectareas
-            cantidad_ajustada = cantidad_base
+        if self._pide_ndjson(request):
+            return StreamingHttpResponse(
+                self._lineas_ndjson(resultados, acumulador),
+                content_type=self.NDJSON
+            )
+        
+        return Response({
+            'resultados': list(resultados),
+            'resumen': acumulador.resumen()
+        }, status=status.HTTP_200_OK)
+    
+    def _pide_ndjson(self, request) -> bool:
+        if request.query_params.get('formato') == 'ndjson':
+            return True
+        return self.NDJSON in request.META.get('HTTP_ACCEPT', '')
+    
+    def _resultados(
+        self,
+        parcelas: List[Dict[str, Any]],
+        vigencia: Tuple[int, str],
+        distritos: Dict[str, DistritoCatalogo],
+        acumulador: AcumuladorCartera
+    ) -> Iterator[Dict[str, Any]]:
+        """Genera el resultado de cada parcela en el orden recibido, bloque a bloque."""
+        for inicio in range(0, len(parcelas), self.TAMANO_BLOQUE):
+            yield from self._bloque(
+                parcelas[inicio:inicio + self.TAMANO_BLOQUE], inicio, vigencia, distritos, acumulador
+            )
+    
+    def _bloque(
+        self,
+        parcelas: List[Dict[str, Any]],
+        inicio: int,
+        vigencia: Tuple[int, str],
+        distritos: Dict[str, DistritoCatalogo],
+        acumulador: AcumuladorCartera
+    ) -> List[Dict[str, Any]]:
+        """
+        Resultados de un bloque de parcelas.
+        
+        Las parcelas en caché y las repetidas dentro del bloque no se
+        recalculan; las calculadas se guardan antes de responder el
+        bloque, así que las repetidas en bloques siguientes salen de la
+        caché.
+        """
+        items = []
+        for parcela in parcelas:
+            serializer = CalculoCostosInputSerializer(data=parcela)
+            if serializer.is_valid():
+                items.append((serializer.validated_data, None))
+            else:
+                items.append((None, serializer.errors))
+        
+        claves = [
+            clave_resultado('costos', data, vigencia) if data is not None else None
+            for data, _ in items
+        ]
+        guardados = cache_resultados.obtener_varios(c for c in claves if c is not None)
+        
+        # Planes por (cultivo, zona) de las parcelas que hay que calcular
+        planes = obtener_planes({
+            (data['cultivo_id'], distritos[data['distrito_id']].zona_economica_id)
+            for (data, _), clave in zip(items, claves)
+            if data is not None and clave not in guardados and data['distrito_id'] in distritos
+        })
+        
+        nuevos = {}
+        salida = []
+        for desplazamiento, ((data, errores), clave) in enumerate(zip(items, claves)):
+            entrada = None
             
-            # 1. Aplicar Factor de Densidad (Modelo 50/50)
-            # Solo afecta a Mano de Obra sensible a densidad (Hoyado, Plantación)
-            # Fórm: Jornales = (Base * 0.5) + (Base * 0.5 * Factor)
-            if actividad.sensible_densidad:
-                if actividad.rubro == PaqueteTecnologico.Rubro.MANO_OBRA:
-                    # Modelo 50/50 para Mano de Obra
-                    parte_fija = cantidad_ajustada * Decimal('0.5')
-                    parte_variable = cantidad_ajustada * Decimal('0.5') * factor_densidad
-                    cantidad_ajustada = parte_fija + parte_variable
+            if data is not None:
+                entrada = guardados.get(clave) or nuevos.get(clave)
+            if data is not None and entrada is None:
+                distrito = distritos.get(data['distrito_id'])
+                if distrito is None:
+                    errores = {'error': f"Distrito con UBIGEO {data['distrito_id']} no encontrado."}
                 else:
-                    # Para Insumos (Plantones), el factor es 100% directo
-                    cantidad_ajustada = cantidad_ajustada * factor_densidad
+                    plan = planes.get((data['cultivo_id'], distrito.zona_economica_id))
+                    if plan is None:
+                        errores = {'error': f"Cultivo con ID {data['cultivo_id']} no encontrado."}
+                    else:
+                        plan = aplicar_precio_regional(plan, distrito.departamento)
+                        entrada = nuevos[clave] = entrada_resultado(
+                            calcular_costos(distrito, plan, data)
+                        )
             
-            # 2. Aplicar Factor de Pendiente (si aplica, solo para mano de obra)
-            if actividad.sensible_pendiente and actividad.rubro == PaqueteTecnologico.Rubro.MANO_OBRA:
-                cantidad_ajustada = cantidad_ajustada * factor_pendiente
+            acumulador.agregar(entrada['cartera'] if entrada is not None else None)
             
-            # 3. Determinar costo unitario según rubro
-            if actividad.rubro == PaqueteTecnologico.Rubro.MANO_OBRA:
-                costo_unitario = costo_jornal
-                categoria_resumen = 'mano_obra'
-                
-            elif actividad.rubro == PaqueteTecnologico.Rubro.INSUMO:
-                if actividad.es_planton:
-                    costo_unitario = costo_planton
-                else:
-                    costo_unitario = actividad.costo_unitario_referencial
-                categoria_resumen = 'insumos'
-                
-            elif actividad.rubro in [
-                PaqueteTecnologico.Rubro.SERVICIOS,
-                PaqueteTecnologico.Rubro.LEGAL,
-                PaqueteTecnologico.Rubro.ACTIVO
-            ]:
-                costo_unitario = actividad.costo_unitario_referencial
-                categoria_resumen = 'servicios'
+            if entrada is None:
+                salida.append({'indice': inicio + desplazamiento, 'ok': False, 'errores': errores})
             else:
-                costo_unitario = actividad.costo_unitario_referencial
-                categoria_resumen = 'servicios'
-            
-            # 4. Calcular costo total de la actividad
-            costo_total = (cantidad_ajustada * costo_unitario).quantize(Decimal('0.01'))
-            
-            # Agregar al detalle
-            detalle_actividades.append({
-                'anio': actividad.anio_proyecto,
-                'rubro': actividad.get_rubro_display(),
-                'actividad': actividad.actividad,
-                'cantidad_base': cantidad_base.quantize(Decimal('0.01')),
-                'cantidad_ajustada': cantidad_ajustada.quantize(Decimal('0.01')),
-                'costo_unitario': costo_unitario,
-                'costo_total': costo_total
-            })
-            
-            # Agregar al resumen anual
-            resumen_por_anio[actividad.anio_proyecto][categoria_resumen] += costo_total
+                salida.append({
+                    'indice': inicio + desplazamiento,
+                    'ok': True,
+                    'resultado': entrada['datos']
+                })
         
-        # ===========================================
-        # CONSTRUIR RESUMEN ANUAL (Refactor v1.3.1)
-        # ===========================================
+        cache_resultados.guardar_varios(nuevos)
+        return salida
+    
+    def _lineas_ndjson(
+        self,
+        resultados: Iterator[Dict[str, Any]],
+        acumulador: AcumuladorCartera
+    ) -> Iterator[str]:
+        for resultado in resultados:
+            yield json.dumps(resultado, cls=JSONEncoder, ensure_ascii=False) + '\n'
+        yield json.dumps({'resumen': acumulador.resumen()}, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+class CalcularEscenariosView(APIView):
+    """
+    Barrido de escenarios para una parcela.
+    
+    POST /api/calcular-costos/escenarios/
+    
+    Recibe los mismos campos que /api/calcular-costos/, pero sistema_siembra,
+    distanciamientos, hectáreas y costos de jornal/plantón pueden ser un valor,
+    una lista o un rango {inicio, fin, paso}. Retorna las matrices de costo
+    total, VAN y ratio B/C para el producto cartesiano de los ejes, aplanadas
+    en el orden de 'ejes' (el último eje varía más rápido).
+    """
+    
+    def post(self, request) -> Response:
+        """
+        Evalúa la grilla de escenarios sobre el plan compilado.
         
-        resumen_anual = []
-        costos_instalacion = None
-        costo_total_proyecto = Decimal('0')
+        Returns:
+            Response: Ejes, forma de la grilla y matrices aplanadas.
+        """
+        input_serializer = EscenariosInputSerializer(data=request.data)
+        if not input_serializer.is_valid():
+            return Response(
+                input_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for anio in sorted(resumen_por_anio.keys()):
-            datos = resumen_por_anio[anio]
-            total_anio = datos['mano_obra'] + datos['insumos'] + datos['servicios']
-            costo_total_proyecto += total_anio
-            
-            resumen_obj = {
-                'anio': anio,
-                'mano_obra': datos['mano_obra'],
-                'insumos': datos['insumos'],
-                'servicios': datos['servicios'],
-                'total': total_anio
-            }
-            
-            # Segregar Año 0 (Instalación) de Años 1+ (Mantenimiento)
-            if anio == 0:
-                costos_instalacion = resumen_obj
-            else:
-                resumen_anual.append(resumen_obj)
+        data = input_serializer.validated_data
         
-        # ===========================================
-        # CÁLCULO FINANCIERO (VAN / TIR)
-        # ===========================================
+        clave = clave_resultado('escenarios', data)
+        respuesta = cache_resultados.obtener(clave)
+        if respuesta is not None:
+            return Response(
+                respuesta,
+                status=status.HTTP_200_OK,
+                headers={ENCABEZADO_CACHE_CALCULO: 'HIT'}
+            )
         
-        # Parámetros financieros base
-        tasa_descuento = Decimal('0.10') # 10%
-        precio_madera = cultivo.precio_madera_referencial
-        rendimiento_ha = cultivo.rendimiento_m3_ha
+        distrito, plan, error = resolver_distrito_plan(data)
+        if error is not None:
+            return error
         
-        # Ingreso proyectado al final del turno
-        ingreso_total = (hectareas * rendimiento_ha * precio_madera).quantize(Decimal('0.01'))
-        anio_cosecha = cultivo.turno_estimado
+        # Un factor de densidad por combinación de geometría de siembra
+        densidades = []
+        factores_densidad = []
+        for sistema in data['sistema_siembra']:
+            for largo in data['distanciamiento_largo']:
+                for ancho in data['distanciamiento_ancho']:
+                    densidad = calcular_plantas_por_hectarea(sistema, largo, ancho)
+                    densidades.append(densidad)
+                    factores_densidad.append(
+                        float(calcular_factor_densidad(plan.densidad_base, densidad))
+                    )
         
-        # Construir Flujo de Caja
-        # Flujo = Ingresos - Costos
-        flujo_caja = {}
+        matrices = barrer_escenarios(
+            plan,
+            factor_pendiente=float(distrito.calcular_factor_pendiente()),
+            factores_densidad=factores_densidad,
+            hectareas=[float(v) for v in data['hectareas']],
+            costos_jornal=[float(v) for v in data['costo_jornal_usuario']],
+            costos_planton=[float(v) for v in data['costo_planton_usuario']],
+            anio_inicio=data['anio_inicio'],
+            anio_fin=data['anio_fin'],
+            incluir_servicios=data['incluir_servicios']
+        )
         
-        # 1. Costos (flujos negativos)
-        for anio, datos in resumen_por_anio.items():
-            costo_anio = datos['mano_obra'] + datos['insumos'] + datos['servicios']
-            flujo_caja[anio] = -costo_anio
-            
-        # 2. Ingresos (flujos positivos)
-        # Sumar al año de cosecha (si está dentro del rango o si es el final)
-        if anio_cosecha not in flujo_caja:
-            flujo_caja[anio_cosecha] = Decimal('0')
-        flujo_caja[anio_cosecha] += ingreso_total
-        
-        # 3. Calcular VAN
-        van = Decimal('0')
-        for anio, flujo in flujo_caja.items():
-            factor = (Decimal('1') + tasa_descuento) ** Decimal(anio)
-            van += flujo / factor
-            
-        van = van.quantize(Decimal('0.01'))
-        
-        # 4. Calcular TIR (Aproximación simple o 0 si no hay ingresos)
-        # La TIR requiere métodos numéricos iterativos (Newton-Raphson).
-        # Implementación simplificada para no depender de numpy
-        tir = Decimal('0')
-        
-        # Solo intentamos calcular TIR si hay al menos un flujo negativo y uno positivo
-        flujos_lista = [flujo_caja.get(a, Decimal('0')) for a in range(max(flujo_caja.keys()) + 1)]
-        has_negative = any(f < 0 for f in flujos_lista)
-        has_positive = any(f > 0 for f in flujos_lista)
-        
-        if has_negative and has_positive:
-            try:
-                # Estimación muy básica o placeholder. 
-                # Realmente necesitamos numpy.financial.irr inputs floats
-                # Para esta versión, dejaremos un valor indicativo o implementaremos irr simple
-                # Opción robusta: Retornar 0 y pedir instalar numpy si se requiere precisión
-                pass 
-            except:
-                pass
-
-        # Ratio Beneficio/Costo
-        # B/C = VP_Ingresos / VP_Costos
-        vp_ingresos = Decimal('0')
-        vp_costos = Decimal('0')
-        
-        for anio, flujo in flujo_caja.items():
-            factor = (Decimal('1') + tasa_descuento) ** Decimal(anio)
-            if flujo > 0:
-                vp_ingresos += flujo / factor
-            else:
-                vp_costos += abs(flujo) / factor
-                
-        ratio_bc = Decimal('0')
-        if vp_costos > 0:
-            ratio_bc = (vp_ingresos / vp_costos).quantize(Decimal('0.01'))
-
-        # ===========================================
-        # CONSTRUIR RESPUESTA
-        # ===========================================
+        ejes = EscenariosInputSerializer(data).data
         
-        output = {
+        respuesta = {
             'distrito': f"{distrito.nombre} ({distrito.cod_ubigeo})",
-            'cultivo': cultivo.nombre,
-            'hectareas': hectareas,
-            'factor_pendiente': factor_pendiente,
-            'factor_densidad': factor_densidad,
-            'densidad_base': densidad_base,
-            'densidad_usuario': densidad_usuario,
-            'sistema_siembra': sistema_siembra,
-            'costo_jornal_usado': costo_jornal,
-            'costo_planton_usado': costo_planton,
-            'detalle_actividades': detalle_actividades,
-            
-            # Refactor v1.3.1 - Segregación
-            'costos_instalacion': costos_instalacion,
-            'resumen_anual': resumen_anual, # Ahora solo contiene años >= 1
+            'cultivo': plan.cultivo_nombre,
+            'ejes': {eje: ejes[eje] for eje in ORDEN_EJES},
+            'forma': [len(data[eje]) for eje in ORDEN_EJES],
+            'densidad_usuario': densidades,
+            **matrices
+        }
+        cache_resultados.guardar(clave, respuesta)
+        return Response(
+            respuesta,
+            status=status.HTTP_200_OK,
+            headers={ENCABEZADO_CACHE_CALCULO: 'MISS'}
+        )
+
+
+class SimularCostosView(APIView):
+    """
+    Cálculo de costos con simulación Monte Carlo.
+    
+    POST /api/calcular-costos/simulacion/
+    
+    Recibe los mismos campos que /api/calcular-costos/ más un bloque
+    'simulacion' con distribuciones para precio_madera, rendimiento,
+    costo_jornal y factor_pendiente. Retorna el cálculo determinístico
+    y, en 'simulacion', la distribución del VAN, ratio B/C y TIR.
+    """
+    
+    def post(self, request) -> Response:
+        """
+        Calcula los costos y simula la incertidumbre del resultado.
+        
+        Returns:
+            Response: Cálculo determinístico más el resumen de la simulación.
+        """
+        input_serializer = SimulacionInputSerializer(data=request.data)
+        if not input_serializer.is_valid():
+            return Response(
+                input_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        data = input_serializer.validated_data
+        
+        distrito, plan, error = resolver_distrito_plan(data)
+        if error is not None:
+            return error
+        
+        output = calcular_costos(distrito, plan, data)
+        
+        config = data['simulacion']
+        semilla = config['semilla']
+        if semilla is None:
+            semilla = secrets.randbits(32)
+        
+        # Valor determinístico por defecto para media y moda omitidas
+        base = {
+            'precio_madera': float(plan.precio_madera_referencial),
+            'rendimiento': float(plan.rendimiento_m3_ha),
+            'costo_jornal': float(data['costo_jornal_usuario']),
+            'factor_pendiente': float(output['factor_pendiente']),
+        }
+        distribuciones = {}
+        for nombre in VARIABLES_SIMULACION:
+            parametros = config.get(nombre)
+            if not parametros:
+                continue
+            parametros = dict(parametros)
+            parametros.setdefault('media', base[nombre])
+            if parametros['tipo'] == 'triangular':
+                parametros.setdefault(
+                    'moda', min(max(base[nombre], parametros['minimo']), parametros['maximo'])
+                )
+            distribuciones[nombre] = Distribucion(**parametros)
+        
+        simulacion = simular(
+            plan,
+            hectareas=float(data['hectareas']),
+            costo_jornal=base['costo_jornal'],
+            costo_planton=float(data['costo_planton_usuario']),
+            factor_densidad=float(output['factor_densidad']),
+            factor_pendiente=base['factor_pendiente'],
+            anio_inicio=data['anio_inicio'],
+            anio_fin=data['anio_fin'],
+            incluir_servicios=data.get('incluir_servicios', True),
+            distribuciones=distribuciones,
+            muestras=config['muestras'],
+            semilla=semilla,
+            tiempo_max=config['tiempo_max_ms'] / 1000.0
+        )
+        
+        output_serializer = CalculoCostosOutputSerializer(output)
+        return Response({
+            **output_serializer.data,
+            'simulacion': simulacion
+        }, status=status.HTTP_200_OK)
+
+
+class DividirParcelaView(APIView):
+    """
+    División de una parcela dibujada o cargada entre distritos.
+    
+    POST /api/parcelas/dividir/
+    
+    Body: {"geometria": GeoJSON Polygon/MultiPolygon, "calculo": {...}}.
+    
+    Calcula el área geodésica de la parcela (misma fórmula que
+    L.GeometryUtil.geodesicArea) y la reparte entre los distritos que
+    toca. Si se envía 'calculo' (los campos de /api/calcular-costos/ sin
+    distrito_id ni hectareas), cada fragmento se costea con el factor de
+    pendiente y el paquete de la zona de su propio distrito.
+    """
+    
+    def post(self, request) -> Response:
+        """
+        Reparte la parcela por distrito y, opcionalmente, la costea.
+        
+        Returns:
+            Response: Hectáreas totales, fragmentos por distrito y,
+            si hubo cálculo, el resumen consolidado.
+        """
+        input_serializer = ParcelaInputSerializer(data=request.data)
+        if not input_serializer.is_valid():
+            return Response(
+                input_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        data = input_serializer.validated_data
+        parcela = data['geometria']
+        calculo = data.get('calculo')
+        
+        area_total = parcela.area(0)
+        fragmentos = indice_vigente().dividir_parcela(parcela)
+        
+        planes = {}
+        if calculo is not None:
+            planes = obtener_planes({
+                (calculo['cultivo_id'], distrito.zona_economica_id)
+                for distrito, _ in fragmentos
+            })
+        acumulador = AcumuladorCartera()
+        
+        salida = []
+        area_distritos = 0.0
+        for distrito, area in fragmentos:
+            area_distritos += area
+            zona = distrito.zona_economica
+            fragmento = FragmentoParcelaSerializer({
+                'cod_ubigeo': distrito.cod_ubigeo,
+                'nombre': distrito.nombre,
+                'departamento': distrito.departamento,
+                'provincia': distrito.provincia,
+                'zona_economica': distrito.zona_economica_id,
+                'zona_economica_nombre': zona.nombre if zona else None,
+                'factor_pendiente': distrito.calcular_factor_pendiente(),
+                'hectareas': Decimal(area / 10000),
+                'porcentaje': Decimal(100 * area / area_total) if area_total > 0 else Decimal(0),
+            }).data
             
-            'costo_total_proyecto': costo_total_proyecto,
+            if calculo is not None:
+                hectareas = Decimal(area / 10000).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                plan = planes.get((calculo['cultivo_id'], distrito.zona_economica_id))
+                output = None
+                if hectareas < Decimal('0.01'):
+                    fragmento['errores'] = {'hectareas': 'Fragmento menor a 0.01 ha.'}
+                elif plan is None:
+                    fragmento['errores'] = {
+                        'error': f"Cultivo con ID {calculo['cultivo_id']} no encontrado."
+                    }
+                else:
+                    plan = aplicar_precio_regional(plan, distrito.departamento)
+                    output = calcular_costos(distrito, plan, {
+                        **calculo,
+                        'distrito_id': distrito.cod_ubigeo,
+                        'hectareas': hectareas
+                    })
+                    fragmento['resultado'] = CalculoCostosOutputSerializer(output).data
+                acumulador.agregar(output)
             
-            # Nuevos indicadores financieros
-            'van': van,
-            'tir': Decimal('0'), # Placeholder por ahora sin numpy
-            'ratio_beneficio_costo': ratio_bc,
-            'ingreso_total_estimado': ingreso_total
+            salida.append(fragmento)
+        
+        respuesta = {
+            'hectareas': round(area_total / 10000, 4),
+            'hectareas_fuera': round(max(0.0, area_total - area_distritos) / 10000, 4),
+            'fragmentos': salida,
         }
+        if calculo is not None:
+            respuesta['resumen'] = acumulador.resumen()
         
-        output_serializer = CalculoCostosOutputSerializer(output)
-        return Response(output_serializer.data, status=status.HTTP_200_OK)
+        return Response(respuesta, status=status.HTTP_200_OK)